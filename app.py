@@ -1,19 +1,21 @@
 import os
 import sys
-import threading
-import time
 import logging
 import signal
 from pathlib import Path
 from flask import Flask
 from src.config import Config, settings
-from src.routes import register_routes
+from src.routes import register_routes, concurrency_controller, job_manager
 from src.logging import setup_logging
+from src.cleanup import cleanup_service
+from src.converters.supervisor import ProcessLimits
 
 def create_app(config_class=Config):
     os.makedirs(settings.LOGS_FOLDER, exist_ok=True)
     setup_logging()
     logger = logging.getLogger('file_converter')
+    # Mejor no arrancar que convertir sin los límites CONVERTER_* configurados
+    ProcessLimits.from_settings().check_tools()
     app = Flask(__name__)
     
     app.config.from_object(config_class)
@@ -26,32 +28,12 @@ def create_app(config_class=Config):
     logger.info("Application initialized successfully")
     return app
 
-def cleanup_thread(app):
-    logger = logging.getLogger('file_converter')
-    while True:
-        try:
-            time.sleep(300)
-            now = time.time()
-            ttl = settings.MAX_UPLOAD_TIMEOUT if hasattr(settings, 'MAX_UPLOAD_TIMEOUT') else 3600
-
-            for folder in [settings.UPLOAD_FOLDER, settings.CONVERTED_FOLDER]:
-                if not folder.exists():
-                    continue
-                for item in folder.iterdir():
-                    if item.is_file():
-                        if item.stat().st_mtime < now - ttl:
-                            try:
-                                item.unlink()
-                                logger.info(f"Cleaned up old file: {item}")
-                            except Exception as e:
-                                logger.error(f"Failed to delete {item}: {e}")
-        except Exception as e:
-            logger.error(f"Error in cleanup thread: {e}")
-
 def main():
     app = create_app()
-    cleaner = threading.Thread(target=cleanup_thread, args=(app,), daemon=True)
-    cleaner.start()
+    cleanup_service.ensure_started()
+    if concurrency_controller is not None:
+        concurrency_controller.ensure_started()
+    job_manager.ensure_started()
     def signal_handler(sig, frame):
         logging.getLogger('file_converter').info("Shutting down...")
         sys.exit(0)
@@ -0,0 +1,21 @@
+"""
+Punto de entrada ASGI
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+    gunicorn --config gunicorn.conf.py --worker-class uvicorn.workers.UvicornWorker asgi:app
+
+POST /convert se atiende de forma asíncrona (src/asgi.py); el resto de
+rutas las sirve la aplicación Flask en un pool de THREADS hilos.
+"""
+from a2wsgi import WSGIMiddleware
+
+from app import create_app
+from src.asgi import AsyncConverterApp
+from src.config import settings
+from src.routes import converter_factory, job_manager
+
+app = AsyncConverterApp(
+    converter_factory,
+    fallback=WSGIMiddleware(create_app(), workers=settings.THREADS),
+    job_manager=job_manager
+)
@@ -0,0 +1,3 @@
+"""
+Benchmarks de rendimiento del servicio (no forman parte de la suite de tests)
+"""
@@ -0,0 +1,100 @@
+"""
+Comparación de resultados de benchmarks con una línea base
+
+Uso:
+    python -m benchmarks.compare results.json baseline.json --threshold 0.2
+
+Termina con código 1 si algún caso es más lento que la línea base en más
+de 'threshold' (fracción) y más de 'min-delta' segundos; el margen
+absoluto evita falsos positivos en casos de pocos milisegundos.
+"""
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    """
+    Args:
+        path: Archivo JSON generado por benchmarks.suite
+
+    Returns:
+        dict: Contenido del archivo
+    """
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(current, baseline, threshold=0.2, min_delta_seconds=0.05):
+    """
+    Compara la mediana de cada caso con la de la línea base
+
+    Args:
+        current: Resultados actuales ({'results': {caso: {...}}})
+        baseline: Resultados de referencia
+        threshold: Empeoramiento relativo tolerado (0.2 = 20 %)
+        min_delta_seconds: Empeoramiento absoluto mínimo para contar
+
+    Returns:
+        list: Un dict por caso comparado con 'case', 'baseline_seconds',
+            'current_seconds', 'change' (relativo) y 'regression' (bool)
+    """
+    rows = []
+    baseline_results = baseline.get('results', {})
+    for case, result in sorted(current.get('results', {}).items()):
+        reference = baseline_results.get(case)
+        if result.get('status') != 'ok' or not reference or reference.get('status') != 'ok':
+            continue
+        base = reference['median_seconds']
+        now = result['median_seconds']
+        change = (now - base) / base if base else 0.0
+        rows.append({
+            'case': case,
+            'baseline_seconds': base,
+            'current_seconds': now,
+            'change': round(change, 4),
+            'regression': change > threshold and now - base > min_delta_seconds
+        })
+    return rows
+
+
+def format_report(rows):
+    """
+    Args:
+        rows: Resultado de compare()
+
+    Returns:
+        str: Tabla de texto con una línea por caso
+    """
+    lines = [f"{'case':<32} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        lines.append(
+            f"{row['case']:<32} {row['baseline_seconds']:>10.3f} "
+            f"{row['current_seconds']:>10.3f} {row['change']:>+8.1%}{flag}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare benchmark results against a baseline')
+    parser.add_argument('results', help='JSON results to check')
+    parser.add_argument('baseline', help='Baseline JSON results')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed relative slowdown (default: 0.2)')
+    parser.add_argument('--min-delta', type=float, default=0.05,
+                        help='Minimum absolute slowdown in seconds (default: 0.05)')
+    args = parser.parse_args(argv)
+
+    rows = compare(
+        load_results(args.results),
+        load_results(args.baseline),
+        threshold=args.threshold,
+        min_delta_seconds=args.min_delta
+    )
+    print(format_report(rows))
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
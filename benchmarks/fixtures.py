@@ -0,0 +1,313 @@
+"""
+Generación de fixtures deterministas para los benchmarks
+
+Todos los archivos se crean localmente a partir de una semilla fija: el
+mismo código produce siempre los mismos bytes, así que los tiempos de dos
+ejecuciones son comparables. Los documentos OOXML, imágenes, PDFs y
+archivos comprimidos se generan en Python; el vídeo y el audio necesitan
+ffmpeg (fuentes lavfi testsrc/sine) y se omiten si no está instalado.
+"""
+import io
+import random
+import shutil
+import subprocess
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+SEED = 1234
+
+# Fecha fija para las entradas de zip y tar y los metadatos del PDF
+ZIP_DATE_TIME = (2024, 1, 1, 0, 0, 0)
+TAR_MTIME = 1704067200
+FIXED_DATE = time.gmtime(TAR_MTIME)
+
+WORDS = (
+    'conversión documento archivo servicio página texto imagen formato '
+    'calidad rendimiento latencia memoria proceso tabla informe datos '
+    'the quick brown fox jumps over lazy dog lorem ipsum dolor sit amet'
+).split()
+
+IMAGE_SIZES = {
+    'small': (800, 600),
+    'medium': (2000, 1500),
+    'large': (4000, 3000)
+}
+
+
+def _sentences(rng, count, words_per_sentence=12):
+    return [
+        ' '.join(rng.choice(WORDS) for _ in range(words_per_sentence)).capitalize() + '.'
+        for _ in range(count)
+    ]
+
+
+def _write_zip(path, members):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, data)
+
+
+def make_docx(path, paragraphs=200):
+    """
+    Documento Word mínimo (OOXML) con párrafos de texto
+
+    Args:
+        path: Ruta de destino
+        paragraphs: Número de párrafos
+    """
+    rng = random.Random(SEED)
+    body = ''.join(
+        f'<w:p><w:r><w:t>{escape(sentence)}</w:t></w:r></w:p>'
+        for sentence in _sentences(rng, paragraphs)
+    )
+    _write_zip(path, {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/>'
+            '</Relationships>'
+        ),
+        'word/document.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        )
+    })
+
+
+def make_xlsx(path, rows=1000, columns=8):
+    """
+    Libro Excel mínimo (OOXML) con una hoja de números y textos
+
+    Args:
+        path: Ruta de destino
+        rows: Filas de datos
+        columns: Columnas por fila
+    """
+    rng = random.Random(SEED)
+    letters = [chr(ord('A') + i) for i in range(columns)]
+    sheet_rows = []
+    for r in range(1, rows + 1):
+        cells = []
+        for c, letter in enumerate(letters):
+            ref = f'{letter}{r}'
+            if c == 0:
+                value = escape(rng.choice(WORDS))
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{value}</t></is></c>')
+            else:
+                cells.append(f'<c r="{ref}"><v>{rng.randint(0, 100000) / 100}</v></c>')
+        sheet_rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+
+    _write_zip(path, {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Datos" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            'Target="worksheets/sheet1.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/worksheets/sheet1.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            f'<sheetData>{"".join(sheet_rows)}</sheetData></worksheet>'
+        )
+    })
+
+
+def render_text_page(size, seed=SEED):
+    """
+    Página en blanco con líneas de texto negro (apta para OCR)
+
+    Args:
+        size: (ancho, alto) en píxeles
+        seed: Semilla del texto
+
+    Returns:
+        PIL.Image.Image
+    """
+    rng = random.Random(seed)
+    width, height = size
+    font_size = max(16, width // 50)
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        font = ImageFont.load_default()
+
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    margin = width // 20
+    line_height = int(font_size * 1.6)
+    y = margin
+    while y + line_height < height - margin:
+        draw.text((margin, y), ' '.join(rng.choice(WORDS) for _ in range(8)), fill='black', font=font)
+        y += line_height
+    return image
+
+
+def make_image(path, size):
+    """
+    Imagen de texto en el formato indicado por la extensión de path
+
+    Args:
+        path: Ruta de destino (.png, .jpg)
+        size: (ancho, alto) en píxeles
+    """
+    image = render_text_page(size)
+    if Path(path).suffix.lower() in ('.jpg', '.jpeg'):
+        image.save(path, quality=90)
+    else:
+        image.save(path)
+
+
+def make_pdf(path, pages=5, size=(1240, 1754)):
+    """
+    PDF de varias páginas con texto rasterizado (A4 a 150 dpi)
+
+    Args:
+        path: Ruta de destino
+        pages: Número de páginas
+        size: Tamaño de cada página en píxeles
+    """
+    images = [render_text_page(size, seed=SEED + page) for page in range(pages)]
+    images[0].save(
+        path,
+        save_all=True,
+        append_images=images[1:],
+        resolution=150,
+        title='benchmark',
+        creationDate=FIXED_DATE,
+        modDate=FIXED_DATE
+    )
+
+
+def _text_members(count=20):
+    rng = random.Random(SEED)
+    return {
+        f'docs/file_{i:03d}.txt': '\n'.join(_sentences(rng, 200)).encode('utf-8')
+        for i in range(count)
+    }
+
+
+def make_zip(path):
+    """Archivo ZIP con documentos de texto."""
+    _write_zip(path, _text_members())
+
+
+def make_tar(path):
+    """Archivo TAR con documentos de texto."""
+    with tarfile.open(path, 'w', format=tarfile.USTAR_FORMAT) as archive:
+        for name, data in _text_members().items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = TAR_MTIME
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(data))
+
+
+def _ffmpeg(path, *args):
+    if not shutil.which('ffmpeg'):
+        return False
+    subprocess.run(
+        ['ffmpeg', '-y', '-loglevel', 'error', *args,
+         '-fflags', '+bitexact', '-flags', '+bitexact', '-map_metadata', '-1', str(path)],
+        check=True,
+        capture_output=True
+    )
+    return True
+
+
+def make_video(path, seconds=5, size='640x360'):
+    """Vídeo de patrón de prueba (requiere ffmpeg)."""
+    return _ffmpeg(path, '-f', 'lavfi', '-i', f'testsrc=duration={seconds}:size={size}:rate=25',
+                   '-pix_fmt', 'yuv420p', '-threads', '1')
+
+
+def make_audio(path, seconds=10):
+    """Tono de prueba (requiere ffmpeg)."""
+    return _ffmpeg(path, '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}')
+
+
+# nombre -> (archivo, generador)
+FIXTURES = {
+    'docx': ('document.docx', make_docx),
+    'xlsx': ('workbook.xlsx', make_xlsx),
+    'png_small': ('small.png', lambda p: make_image(p, IMAGE_SIZES['small'])),
+    'png_medium': ('medium.png', lambda p: make_image(p, IMAGE_SIZES['medium'])),
+    'png_large': ('large.png', lambda p: make_image(p, IMAGE_SIZES['large'])),
+    'jpg_small': ('small.jpg', lambda p: make_image(p, IMAGE_SIZES['small'])),
+    'jpg_large': ('large.jpg', lambda p: make_image(p, IMAGE_SIZES['large'])),
+    'pdf': ('pages.pdf', make_pdf),
+    'zip': ('docs.zip', make_zip),
+    'tar': ('docs.tar', make_tar),
+    'mp4': ('pattern.mp4', make_video),
+    'wav': ('tone.wav', make_audio)
+}
+
+
+def generate_fixtures(directory, names=None):
+    """
+    Genera las fixtures que aún no existen en directory
+
+    Args:
+        directory: Carpeta de destino
+        names: Fixtures a generar (None = todas)
+
+    Returns:
+        dict: {nombre: Path o None si no se pudo generar}
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    generated = {}
+    for name in names or FIXTURES:
+        filename, generator = FIXTURES[name]
+        path = directory / filename
+        if not path.exists() and generator(path) is False:
+            generated[name] = None
+            continue
+        generated[name] = path
+    return generated
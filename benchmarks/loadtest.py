@@ -0,0 +1,426 @@
+"""
+Prueba de carga con mezcla de conversiones y OCR
+
+Uso:
+    python -m benchmarks.loadtest run --output load.json
+    python -m benchmarks.loadtest run --concurrency 1,2,4,8,16,32 --stage-seconds 60
+    python -m benchmarks.loadtest run --url http://10.0.0.5:5000 --mix "convert:png_small:jpg=3,ocr:pdf:fast=1"
+
+Arranca la aplicación en un servidor WSGI real (Gunicorn si está
+instalado; si no, el servidor multihilo de Werkzeug), o usa uno ya en
+marcha con --url. Después lanza etapas de concurrencia creciente: en cada
+una, N clientes envían peticiones sin pausa durante --stage-seconds,
+eligiendo el tipo de petición según los pesos de la mezcla con un
+generador con semilla fija (misma semilla, misma secuencia).
+
+Por etapa se informa del rendimiento, p50/p95/p99, la tasa de error y la
+espera en cola del servidor (etapa 'queue' de Server-Timing). El informe
+indica en qué etapa empieza a formarse cola y en cuál se satura el nodo
+(el rendimiento deja de crecer mientras p99 se dispara).
+"""
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from benchmarks.fixtures import generate_fixtures
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# endpoint:fixture:parámetro=peso (parámetro = formato destino o perfil OCR)
+DEFAULT_MIX = (
+    'convert:docx:pdf=2,'
+    'convert:xlsx:csv=1,'
+    'convert:png_small:jpg=4,'
+    'convert:png_large:webp=1,'
+    'convert:mp4:webm=1,'
+    'convert:wav:mp3=1,'
+    'ocr:png_small:fast=2,'
+    'ocr:pdf:fast=1'
+)
+
+# Espera en cola (mediana) a partir de la cual se considera que hay cola
+QUEUE_THRESHOLD_MS = 5.0
+
+# Saturación: el rendimiento crece menos de esto...
+SATURATION_THROUGHPUT_GAIN = 0.10
+# ...mientras p99 crece más de esto
+SATURATION_P99_GROWTH = 0.50
+
+
+def parse_mix(spec):
+    """
+    Interpreta una mezcla 'endpoint:fixture:param=peso,...'
+
+    Args:
+        spec: Cadena de la mezcla
+
+    Returns:
+        list: [{'endpoint', 'fixture', 'param', 'weight'}, ...]
+    """
+    mix = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        entry, _, weight = item.partition('=')
+        endpoint, fixture, param = entry.split(':')
+        if endpoint not in ('convert', 'ocr'):
+            raise ValueError(f"Unknown endpoint in mix: {endpoint}")
+        mix.append({
+            'endpoint': endpoint,
+            'fixture': fixture,
+            'param': param,
+            'weight': float(weight or 1)
+        })
+    return mix
+
+
+def percentile(values, fraction):
+    """
+    Percentil por rango más cercano
+
+    Args:
+        values: Lista de valores
+        fraction: 0.5, 0.95, 0.99...
+
+    Returns:
+        float: Valor del percentil (0.0 si no hay valores)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def parse_server_timing(header):
+    """
+    Args:
+        header: Valor de la cabecera Server-Timing
+
+    Returns:
+        dict: {etapa: milisegundos}
+    """
+    stages = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'dur':
+                try:
+                    stages[name] = float(value)
+                except ValueError:
+                    pass
+    return stages
+
+
+class LoadClient:
+    """
+    Cliente de un trabajador: elige peticiones de la mezcla y las envía
+    """
+
+    def __init__(self, base_url, mix, payloads, seed, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.mix = mix
+        self.weights = [entry['weight'] for entry in mix]
+        self.payloads = payloads
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def next_request(self):
+        entry = self.rng.choices(self.mix, weights=self.weights)[0]
+        filename, content = self.payloads[entry['fixture']]
+        if entry['endpoint'] == 'convert':
+            return entry, '/convert', {'format': entry['param']}, (filename, content)
+        return entry, '/extract-text', {'profile': entry['param'], 'lang': 'eng'}, (filename, content)
+
+    def send(self):
+        """
+        Returns:
+            dict: {'kind', 'latency', 'status', 'queue_ms'}
+        """
+        entry, path, data, upload = self.next_request()
+        kind = f"{entry['endpoint']}:{entry['fixture']}:{entry['param']}"
+        started = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.base_url + path,
+                data=data,
+                files={'file': upload},
+                timeout=self.timeout
+            )
+            status = response.status_code
+            queue_ms = parse_server_timing(response.headers.get('Server-Timing')).get('queue', 0.0)
+        except requests.RequestException:
+            status = 0
+            queue_ms = 0.0
+        return {
+            'kind': kind,
+            'latency': time.perf_counter() - started,
+            'status': status,
+            'queue_ms': queue_ms
+        }
+
+
+def run_stage(base_url, concurrency, seconds, mix, payloads, seed, timeout):
+    """
+    Ejecuta una etapa de concurrencia fija
+
+    Returns:
+        list: Muestras de todas las peticiones terminadas
+    """
+    samples = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker(index):
+        client = LoadClient(base_url, mix, payloads, f'{seed}-{concurrency}-{index}', timeout)
+        while time.monotonic() < deadline:
+            sample = client.send()
+            with lock:
+                samples.append(sample)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize_stage(concurrency, samples, seconds):
+    """
+    Returns:
+        dict: Métricas agregadas de la etapa
+    """
+    latencies = [s['latency'] * 1000 for s in samples]
+    errors = sum(1 for s in samples if s['status'] != 200)
+    queue = [s['queue_ms'] for s in samples]
+    by_kind = {}
+    for sample in samples:
+        by_kind.setdefault(sample['kind'], []).append(sample['latency'] * 1000)
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / seconds, 3) if seconds else 0.0,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'queue_p50_ms': round(percentile(queue, 0.50), 1),
+        'queue_p95_ms': round(percentile(queue, 0.95), 1),
+        'by_kind_p50_ms': {
+            kind: round(percentile(values, 0.50), 1) for kind, values in sorted(by_kind.items())
+        }
+    }
+
+
+def find_knees(stages):
+    """
+    Localiza el inicio de la cola y la saturación
+
+    Args:
+        stages: Resúmenes de etapa en orden de concurrencia creciente
+
+    Returns:
+        dict: {'queueing_starts_at', 'saturation_at'} (concurrencia o None)
+    """
+    queueing = next(
+        (s['concurrency'] for s in stages if s['queue_p50_ms'] > QUEUE_THRESHOLD_MS),
+        None
+    )
+    saturation = None
+    for previous, current in zip(stages, stages[1:]):
+        if not previous['throughput_rps'] or not previous['p99_ms']:
+            continue
+        gain = current['throughput_rps'] / previous['throughput_rps'] - 1
+        growth = current['p99_ms'] / previous['p99_ms'] - 1
+        if gain < SATURATION_THROUGHPUT_GAIN and growth > SATURATION_P99_GROWTH:
+            saturation = current['concurrency']
+            break
+    return {'queueing_starts_at': queueing, 'saturation_at': saturation}
+
+
+def start_server(server, port, workers, data_dir):
+    """
+    Arranca la aplicación en un proceso aparte y espera a que responda
+
+    Args:
+        server: 'gunicorn' o 'werkzeug'
+        port: Puerto local
+        workers: Workers de Gunicorn
+        data_dir: Carpeta para subidas, conversiones y logs
+
+    Returns:
+        subprocess.Popen
+    """
+    env = dict(os.environ)
+    env.update({
+        'UPLOAD_FOLDER': str(Path(data_dir) / 'uploads'),
+        'CONVERTED_FOLDER': str(Path(data_dir) / 'converted'),
+        'LOGS_FOLDER': str(Path(data_dir) / 'logs'),
+        'LOG_LEVEL': env.get('LOG_LEVEL', 'WARNING'),
+        'SERVER_TIMING_ENABLED': 'true'
+    })
+    if server == 'gunicorn':
+        # La misma configuración que producción; WORKERS la lee gunicorn.conf.py
+        env['WORKERS'] = str(workers)
+        command = [
+            sys.executable, '-m', 'gunicorn',
+            '--config', 'gunicorn.conf.py',
+            '--bind', f'127.0.0.1:{port}',
+            'wsgi:app'
+        ]
+    else:
+        command = [sys.executable, '-m', 'benchmarks.loadtest', 'serve', '--port', str(port)]
+
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} exited with code {process.returncode}")
+        try:
+            if requests.get(f'http://127.0.0.1:{port}/health/live', timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{server} did not become ready in 60 seconds")
+
+
+def default_server():
+    try:
+        import gunicorn  # noqa: F401
+        return 'gunicorn'
+    except ImportError:
+        return 'werkzeug'
+
+
+def run_load_test(base_url, mix, fixtures_dir, concurrency_levels, stage_seconds,
+                  warmup_seconds=5, seed=42, timeout=300):
+    """
+    Ejecuta todas las etapas contra base_url
+
+    Returns:
+        dict: {'config': {...}, 'stages': [...], 'knees': {...}}
+    """
+    fixtures = generate_fixtures(fixtures_dir, sorted({entry['fixture'] for entry in mix}))
+    available = [entry for entry in mix if fixtures.get(entry['fixture'])]
+    skipped = sorted({entry['fixture'] for entry in mix} - {entry['fixture'] for entry in available})
+    if not available:
+        raise RuntimeError('No fixtures available for the requested mix')
+    payloads = {name: (path.name, path.read_bytes()) for name, path in fixtures.items() if path}
+
+    if warmup_seconds:
+        run_stage(base_url, concurrency_levels[0], warmup_seconds, available, payloads, f'{seed}-warmup', timeout)
+
+    stages = []
+    for concurrency in concurrency_levels:
+        started = time.monotonic()
+        samples = run_stage(base_url, concurrency, stage_seconds, available, payloads, seed, timeout)
+        summary = summarize_stage(concurrency, samples, time.monotonic() - started)
+        stages.append(summary)
+        print(
+            f"c={concurrency:<4} rps={summary['throughput_rps']:<8} p50={summary['p50_ms']}ms "
+            f"p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms errors={summary['error_rate']:.1%} "
+            f"queue_p50={summary['queue_p50_ms']}ms",
+            file=sys.stderr
+        )
+
+    return {
+        'config': {
+            'url': base_url,
+            'seed': seed,
+            'stage_seconds': stage_seconds,
+            'concurrency': concurrency_levels,
+            'mix': available,
+            'skipped_fixtures': skipped
+        },
+        'stages': stages,
+        'knees': find_knees(stages)
+    }
+
+
+def serve(port):
+    """Servidor WSGI multihilo de Werkzeug (cuando Gunicorn no está instalado)."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app import create_app
+
+    class QuietHandler(WSGIRequestHandler):
+        # Una línea de log por petición falsearía la medición
+        def log_request(self, *args, **kwargs):
+            pass
+
+    make_server('127.0.0.1', port, create_app(), threaded=True, request_handler=QuietHandler).serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mixed-workload load test')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the load test')
+    run.add_argument('--url', help='Target an already running server instead of starting one')
+    run.add_argument('--server', choices=['gunicorn', 'werkzeug'], default=default_server())
+    run.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Gunicorn workers')
+    run.add_argument('--port', type=int, default=8765)
+    run.add_argument('--mix', default=DEFAULT_MIX, help='endpoint:fixture:param=weight,...')
+    run.add_argument('--concurrency', default='1,2,4,8,16', help='Comma-separated concurrency levels')
+    run.add_argument('--stage-seconds', type=float, default=30)
+    run.add_argument('--warmup-seconds', type=float, default=5)
+    run.add_argument('--seed', type=int, default=42)
+    run.add_argument('--timeout', type=float, default=300, help='Per-request timeout in seconds')
+    run.add_argument('--fixtures', default=os.path.join(tempfile.gettempdir(), 'file-converter-bench-fixtures'))
+    run.add_argument('--output', default='loadtest-results.json')
+
+    serve_parser = commands.add_parser('serve', help='Serve the app with Werkzeug (used internally)')
+    serve_parser.add_argument('--port', type=int, default=8765)
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        serve(args.port)
+        return 0
+
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    process = None
+    with tempfile.TemporaryDirectory(prefix='loadtest-') as data_dir:
+        try:
+            if args.url:
+                base_url = args.url
+            else:
+                process = start_server(args.server, args.port, args.workers, data_dir)
+                base_url = f'http://127.0.0.1:{args.port}'
+            report = run_load_test(
+                base_url,
+                parse_mix(args.mix),
+                args.fixtures,
+                levels,
+                args.stage_seconds,
+                warmup_seconds=args.warmup_seconds,
+                seed=args.seed,
+                timeout=args.timeout
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    report['config']['server'] = 'external' if args.url else args.server
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report['knees']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
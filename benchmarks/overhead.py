@@ -0,0 +1,379 @@
+"""
+Microbenchmarks del coste propio del servicio (sin herramientas externas)
+
+Uso:
+    python -m benchmarks.overhead --output overhead.json
+    python -m benchmarks.overhead --engine-latency 0.05 --output overhead.json
+    python -m benchmarks.compare overhead.json baseline-overhead.json --min-delta 0
+
+BaseConverter.run_command se sustituye por un motor falso en proceso
+(FakeEngine) con latencia y tamaño de salida configurables, de modo que
+todo lo que se mide es Python: enrutado de Flask, secure_filename y
+sanitize_filename, validación, nombres UUID, construcción del JSON,
+guardado del archivo subido, Server-Timing, planificador y caché OCR. No
+hace falta LibreOffice, ImageMagick ni FFmpeg y los resultados son
+deterministas salvo por el ruido de la máquina.
+
+Los resultados usan el mismo formato que benchmarks.suite (segundos por
+operación), así que se comparan con benchmarks.compare; al ser tiempos de
+microsegundos, usar --min-delta 0.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from benchmarks.loadtest import parse_server_timing
+from benchmarks.suite import summarize
+
+
+SAMPLE_FILENAME = 'Informe Trimestral (versión final) 2024.docx'
+
+
+class FakeEngine:
+    """
+    Sustituto en proceso de las herramientas externas
+
+    Espera latency_seconds y escribe output_bytes en la ruta de salida que
+    habría generado la herramienta real (deducida de sus argumentos).
+    """
+
+    def __init__(self, latency_seconds=0.0, output_bytes=4096):
+        self.latency_seconds = latency_seconds
+        self.output_bytes = output_bytes
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def output_paths(command):
+        """
+        Args:
+            command: Lista del comando que se habría ejecutado
+
+        Returns:
+            list: Rutas que la herramienta habría creado
+        """
+        tool = os.path.basename(command[0])
+        if tool in ('libreoffice', 'soffice'):
+            output_format = command[command.index('--convert-to') + 1]
+            outdir = command[command.index('--outdir') + 1]
+            stem = os.path.splitext(os.path.basename(command[-1]))[0]
+            return [os.path.join(outdir, f'{stem}.{output_format}')]
+        if tool == 'tar':
+            return [command[2]]
+        if tool in ('7z', '7za'):
+            if command[1] == 'x':
+                outdir = next(arg[2:] for arg in command if arg.startswith('-o'))
+                return [os.path.join(outdir, 'extracted.bin')]
+            return [command[3]]
+        return [command[-1]]
+
+    def run_command(self, command, timeout_seconds=None):
+        with self._lock:
+            self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        for path in self.output_paths(command):
+            with open(path, 'wb') as f:
+                f.write(b'\0' * self.output_bytes)
+        return {
+            'success': True,
+            'stdout': '',
+            'stderr': '',
+            'resources': {
+                'wall_seconds': self.latency_seconds,
+                'user_seconds': 0.0,
+                'system_seconds': 0.0,
+                'max_rss_kb': 0
+            }
+        }
+
+    @contextmanager
+    def installed(self):
+        """Sustituye BaseConverter.run_command mientras dura el bloque."""
+        from src.converters.base import BaseConverter
+
+        original = BaseConverter.run_command
+        engine = self
+
+        def run_command(converter, command, timeout_seconds=None):
+            return engine.run_command(command, timeout_seconds)
+
+        BaseConverter.run_command = run_command
+        try:
+            yield self
+        finally:
+            BaseConverter.run_command = original
+
+
+def per_op(fn, number, repeat):
+    """
+    Args:
+        fn: Operación sin argumentos
+        number: Llamadas por medición
+        repeat: Mediciones
+
+    Returns:
+        list: Segundos por operación en cada medición
+    """
+    return [total / number for total in timeit.Timer(fn).repeat(repeat=repeat, number=number)]
+
+
+def _case(samples, **extra):
+    case = {'status': 'ok'}
+    case.update(summarize(samples, digits=9))
+    case['per_op_us'] = round(case['median_seconds'] * 1e6, 2)
+    case.update(extra)
+    return case
+
+
+def run_microbenchmarks(app, work_dir, number=2000, repeat=5):
+    """
+    Mide cada paso del manejo de una petición por separado
+
+    Args:
+        app: Aplicación Flask (para jsonify)
+        work_dir: Carpeta para los archivos guardados
+        number: Operaciones por medición
+        repeat: Mediciones por caso
+
+    Returns:
+        dict: {caso: resultado}
+    """
+    from flask import jsonify
+    from PIL import Image
+    from werkzeug.datastructures import FileStorage
+    from werkzeug.utils import secure_filename
+
+    from src.ocr import OCRResultCache
+    from src.scheduler import ConversionScheduler
+    from src.timing import StageTimer
+    from src.utils import is_allowed_extension, sanitize_filename
+
+    safe_name = sanitize_filename(secure_filename(SAMPLE_FILENAME))
+    response_data = {
+        'success': True,
+        'file_id': uuid.uuid4().hex,
+        'source_format': '.docx',
+        'output_format': 'pdf',
+        'output_size_mb': 0.25,
+        'download_url': '/download/abc.pdf',
+        'timestamp': '2024-01-01T00:00:00'
+    }
+    upload = b'x' * (64 * 1024)
+    save_path = Path(work_dir) / 'upload.bin'
+
+    def save_upload():
+        FileStorage(io.BytesIO(upload), filename=safe_name).save(save_path)
+
+    def stage_timer():
+        timer = StageTimer()
+        for name in ('upload', 'validate', 'queue', 'convert', 'cleanup'):
+            with timer.stage(name):
+                pass
+        return timer.header()
+
+    scheduler = ConversionScheduler(4)
+
+    def scheduler_slot():
+        with scheduler.slot('bench'):
+            pass
+
+    cache = OCRResultCache(max_entries=128)
+    image = Image.new('L', (256, 256), 255)
+    key = OCRResultCache.make_key(image, lang='eng', profile='fast')
+    cache.set(key, {'text': 'x', 'confidence': 90})
+
+    with app.test_request_context():
+        cases = {
+            'secure_filename': lambda: secure_filename(SAMPLE_FILENAME),
+            'sanitize_filename': lambda: sanitize_filename(secure_filename(SAMPLE_FILENAME)),
+            'is_allowed_extension': lambda: is_allowed_extension(safe_name),
+            'uuid_naming': lambda: f"{uuid.uuid4().hex}_{safe_name}",
+            'json_response': lambda: jsonify(response_data),
+            'stage_timer_5_stages': stage_timer,
+            'scheduler_slot_uncontended': scheduler_slot,
+            'ocr_cache_key_256px': lambda: OCRResultCache.make_key(image, lang='eng', profile='fast'),
+            'ocr_cache_hit': lambda: cache.get(key)
+        }
+        results = {name: _case(per_op(fn, number, repeat)) for name, fn in cases.items()}
+
+    # El guardado toca disco: menos iteraciones
+    results['file_save_64kb'] = _case(per_op(save_upload, max(1, number // 10), repeat))
+    return results
+
+
+def _average_stages(headers):
+    totals = {}
+    for header in headers:
+        for name, ms in parse_server_timing(header).items():
+            totals[name] = totals.get(name, 0.0) + ms
+    return {name: round(total / len(headers), 3) for name, total in totals.items()} if headers else {}
+
+
+def run_http_benchmarks(app, engine, requests_per_case=200, repeat=5):
+    """
+    Mide peticiones completas con el cliente de pruebas de Flask
+
+    Las conversiones usan el motor falso; 'overhead_us' descuenta su
+    latencia y 'stages_ms' promedia el desglose de Server-Timing.
+
+    Returns:
+        dict: {caso: resultado}
+    """
+    client = app.test_client()
+    png = b'\x89PNG\r\n\x1a\n' + b'\0' * (64 * 1024)
+    docx = b'PK\x03\x04' + b'\0' * (64 * 1024)
+    downloads = []
+
+    def convert(filename, content, target):
+        def request():
+            response = client.post(
+                '/convert',
+                data={'file': (io.BytesIO(content), filename), 'format': target},
+                content_type='multipart/form-data'
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f'/convert returned {response.status_code}: {response.get_data(as_text=True)}')
+            downloads.append(response.get_json()['download_url'])
+            return response
+        return request
+
+    def get(path):
+        return lambda: client.get(path)
+
+    cases = {
+        'http_health_live': (get('/health/live'), False),
+        'http_formats': (get('/formats'), False),
+        'http_convert_png_to_jpg': (convert('image.png', png, 'jpg'), True),
+        'http_convert_docx_to_pdf': (convert('report.docx', docx, 'pdf'), True)
+    }
+
+    results = {}
+    with engine.installed():
+        for name, (request, uses_engine) in cases.items():
+            headers = []
+
+            def timed(request=request, headers=headers):
+                response = request()
+                headers.append(response.headers.get('Server-Timing', ''))
+                response.close()
+
+            samples = per_op(timed, requests_per_case, repeat)
+            extra = {}
+            if uses_engine:
+                extra['overhead_us'] = round((statistics.median(samples) - engine.latency_seconds) * 1e6, 2)
+                extra['stages_ms'] = _average_stages([h for h in headers if h])
+            results[name] = _case(samples, **extra)
+
+        if downloads:
+            paths = iter(downloads * (repeat + 1))
+
+            def download():
+                response = client.get(next(paths))
+                response.close()
+
+            results['http_download'] = _case(per_op(download, min(len(downloads), requests_per_case), repeat))
+
+    from src.config import settings
+    for url in set(downloads):
+        (settings.CONVERTED_FOLDER / os.path.basename(url)).unlink(missing_ok=True)
+    return results
+
+
+def run_scheduler_benchmark(engine, clients=16, conversions_per_client=10, limit=4):
+    """
+    Conversiones concurrentes a través de ConverterFactory con el planificador
+
+    Con latencia fija, el tiempo ideal es ceil(total / limit) * latencia;
+    'overhead_ratio' compara el tiempo real con ese ideal.
+
+    Returns:
+        dict: Resultado del caso
+    """
+    from src.converters.factory import ConverterFactory
+    from src.scheduler import ConversionScheduler
+
+    factory = ConverterFactory(scheduler=ConversionScheduler(limit))
+    total = clients * conversions_per_client
+
+    with tempfile.TemporaryDirectory(prefix='bench-sched-') as work_dir, engine.installed():
+        def client(index):
+            for n in range(conversions_per_client):
+                output = os.path.join(work_dir, f'{index}-{n}.jpg')
+                factory.perform_conversion('input.png', output, '.png', '.jpg')
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    ideal = math.ceil(total / limit) * engine.latency_seconds
+    return _case(
+        [elapsed / total],
+        conversions=total,
+        limit=limit,
+        elapsed_seconds=round(elapsed, 4),
+        ideal_seconds=round(ideal, 4),
+        overhead_ratio=round(elapsed / ideal, 3) if ideal else None
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Framework overhead microbenchmarks with a fake engine')
+    parser.add_argument('--output', default='overhead-results.json')
+    parser.add_argument('--engine-latency', type=float, default=0.0, help='Fake engine latency in seconds')
+    parser.add_argument('--output-bytes', type=int, default=4096, help='Fake engine output size')
+    parser.add_argument('--number', type=int, default=2000, help='Operations per micro measurement')
+    parser.add_argument('--requests', type=int, default=200, help='HTTP requests per measurement')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scheduler-latency', type=float, default=0.02,
+                        help='Fake engine latency for the scheduler benchmark')
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from src.logging import setup_logging
+
+    app = create_app()
+    # Un registro por petición falsearía la medición
+    setup_logging(level='WARNING')
+
+    with tempfile.TemporaryDirectory(prefix='bench-overhead-') as work_dir:
+        engine = FakeEngine(args.engine_latency, args.output_bytes)
+        results = run_microbenchmarks(app, work_dir, number=args.number, repeat=args.repeat)
+        results.update(run_http_benchmarks(app, engine, requests_per_case=args.requests, repeat=args.repeat))
+        results['scheduler_contended'] = run_scheduler_benchmark(
+            FakeEngine(args.scheduler_latency, args.output_bytes)
+        )
+
+    report = {
+        'meta': {
+            'python': sys.version.split()[0],
+            'engine_latency_seconds': args.engine_latency,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    for name, case in sorted(results.items()):
+        print(f"{name:<32} {case['per_op_us']:>12.2f} us/op")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Benchmarks offline de los motores de conversión y del OCR
+
+Uso:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --output results.json --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --filter ocr_ --repeat 5
+
+Cada caso llama directamente a ConverterFactory.perform_conversion u
+OCRProcessor (sin HTTP) sobre las fixtures de benchmarks.fixtures. Los
+casos cuyo motor no está instalado se marcan como 'skipped'. El resultado
+es un JSON con la mediana, mínimo, máximo y desviación de cada caso y el
+consumo de los procesos externos; con --baseline se compara con una
+ejecución anterior (ver benchmarks.compare).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks import compare as compare_module
+from benchmarks.fixtures import generate_fixtures
+from src.converters.factory import ConverterFactory
+from src.health import ENGINE_BINARIES
+from src.ocr import OCRProcessor
+
+
+# Herramientas necesarias por motor (cualquiera de las alternativas)
+REQUIREMENTS = {
+    'libreoffice': ENGINE_BINARIES['libreoffice'],
+    'imagemagick': ENGINE_BINARIES['imagemagick'],
+    'ffmpeg': ENGINE_BINARIES['ffmpeg'],
+    'archive': ENGINE_BINARIES['7z'],
+    'ocr': ENGINE_BINARIES['tesseract'],
+    'ocr_pdf': ('pdftoppm',)
+}
+
+# nombre -> (fixture, extensión destino). El motor lo decide la factoría
+CONVERSION_CASES = {
+    'docx_to_pdf': ('docx', '.pdf'),
+    'docx_to_odt': ('docx', '.odt'),
+    'xlsx_to_pdf': ('xlsx', '.pdf'),
+    'xlsx_to_csv': ('xlsx', '.csv'),
+    'png_small_to_jpg': ('png_small', '.jpg'),
+    'png_medium_to_webp': ('png_medium', '.webp'),
+    'png_large_to_jpg': ('png_large', '.jpg'),
+    'jpg_small_to_png': ('jpg_small', '.png'),
+    'jpg_large_to_pdf': ('jpg_large', '.pdf'),
+    'mp4_to_webm': ('mp4', '.webm'),
+    'mp4_to_gif': ('mp4', '.gif'),
+    'wav_to_mp3': ('wav', '.mp3'),
+    'wav_to_ogg': ('wav', '.ogg'),
+    'zip_to_tar_gz': ('zip', '.tar.gz'),
+    'tar_to_zip': ('tar', '.zip')
+}
+
+# nombre -> (fixture, opciones de OCRProcessor.extract_text, opciones del procesador)
+OCR_CASES = {
+    'ocr_png_small_fast': ('png_small', {'profile': 'fast'}, {}),
+    'ocr_png_medium_balanced': ('png_medium', {'profile': 'balanced'}, {}),
+    'ocr_png_large_tiled': ('png_large', {'profile': 'fast'}, {'tile_threshold_pixels': 4_000_000}),
+    'ocr_pdf_fast': ('pdf', {'profile': 'fast'}, {}),
+    'ocr_pdf_balanced': ('pdf', {'profile': 'balanced'}, {})
+}
+
+
+def missing_tools(requirement):
+    """
+    Args:
+        requirement: Clave de REQUIREMENTS
+
+    Returns:
+        str o None: Herramienta ausente
+    """
+    binaries = REQUIREMENTS[requirement]
+    if any(shutil.which(binary) for binary in binaries):
+        return None
+    return binaries[0]
+
+
+def summarize(samples, digits=4):
+    """
+    Args:
+        samples: Duraciones en segundos
+        digits: Decimales conservados
+
+    Returns:
+        dict: median/min/max/stdev en segundos
+    """
+    return {
+        'median_seconds': round(statistics.median(samples), digits),
+        'min_seconds': round(min(samples), digits),
+        'max_seconds': round(max(samples), digits),
+        'stdev_seconds': round(statistics.stdev(samples), digits) if len(samples) > 1 else 0.0,
+        'samples': [round(s, digits) for s in samples]
+    }
+
+
+def _measure(run, repeat, warmup):
+    """Ejecuta run() warmup + repeat veces y devuelve (tiempos, último resultado)."""
+    samples = []
+    result = None
+    for iteration in range(warmup + repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        if not result.get('success'):
+            return None, result
+        if iteration >= warmup:
+            samples.append(elapsed)
+    return samples, result
+
+
+def run_conversion_case(factory, fixture, target_ext, work_dir, repeat, warmup):
+    """
+    Mide una ruta de ConverterFactory
+
+    Returns:
+        dict: Resultado del caso
+    """
+    from_ext = fixture.suffix.lower()
+    engine = factory.get_engine_name(from_ext, target_ext)
+    if engine is None:
+        return {'status': 'skipped', 'reason': f'no engine for {from_ext} -> {target_ext}'}
+    missing = missing_tools(engine)
+    if missing:
+        return {'status': 'skipped', 'engine': engine, 'reason': f'{missing} not installed'}
+
+    output_path = Path(work_dir) / f'output{target_ext}'
+
+    def run():
+        if output_path.exists():
+            output_path.unlink()
+        return factory.perform_conversion(str(fixture), str(output_path), from_ext, target_ext)
+
+    samples, result = _measure(run, repeat, warmup)
+    if samples is None:
+        return {'status': 'failed', 'engine': engine, 'error': result.get('error')}
+
+    case = {'status': 'ok', 'engine': engine, 'input_bytes': fixture.stat().st_size}
+    case.update(summarize(samples))
+    case['output_bytes'] = output_path.stat().st_size if output_path.exists() else 0
+    if result.get('resources'):
+        case['resources'] = result['resources']
+    return case
+
+
+def run_ocr_case(fixture, options, processor_options, repeat, warmup):
+    """
+    Mide una ruta de OCRProcessor (sin caché)
+
+    Returns:
+        dict: Resultado del caso
+    """
+    missing = missing_tools('ocr')
+    if not missing and fixture.suffix.lower() == '.pdf':
+        missing = missing_tools('ocr_pdf')
+    if missing:
+        return {'status': 'skipped', 'engine': 'ocr', 'reason': f'{missing} not installed'}
+
+    processor = OCRProcessor(default_lang='eng', cache=None, **processor_options)
+    samples, result = _measure(lambda: processor.extract_text(str(fixture), **options), repeat, warmup)
+    if samples is None:
+        return {'status': 'failed', 'engine': 'ocr', 'error': result.get('error')}
+
+    case = {'status': 'ok', 'engine': 'ocr', 'input_bytes': fixture.stat().st_size, 'pages': result['pages']}
+    case.update(summarize(samples))
+    case['pages_per_second'] = round(result['pages'] / case['median_seconds'], 3) if case['median_seconds'] else 0.0
+    return case
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(fixtures_dir, repeat=3, warmup=1, case_filter=None):
+    """
+    Ejecuta todos los casos
+
+    Args:
+        fixtures_dir: Carpeta de fixtures (se generan las que falten)
+        repeat: Mediciones por caso
+        warmup: Ejecuciones previas no medidas
+        case_filter: Subcadena que deben contener los nombres de caso
+
+    Returns:
+        dict: {'meta': {...}, 'results': {caso: {...}}}
+    """
+    fixtures = generate_fixtures(fixtures_dir)
+    factory = ConverterFactory()
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='bench-') as work_dir:
+        for name, (fixture_name, target_ext) in CONVERSION_CASES.items():
+            if case_filter and case_filter not in name:
+                continue
+            fixture = fixtures.get(fixture_name)
+            if fixture is None:
+                results[name] = {'status': 'skipped', 'reason': f'fixture {fixture_name} unavailable'}
+            else:
+                results[name] = run_conversion_case(factory, fixture, target_ext, work_dir, repeat, warmup)
+            print(f"{name}: {results[name]['status']}", file=sys.stderr)
+
+    for name, (fixture_name, options, processor_options) in OCR_CASES.items():
+        if case_filter and case_filter not in name:
+            continue
+        results[name] = run_ocr_case(fixtures[fixture_name], options, processor_options, repeat, warmup)
+        print(f"{name}: {results[name]['status']}", file=sys.stderr)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'warmup': warmup
+        },
+        'results': results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run offline conversion and OCR benchmarks')
+    parser.add_argument('--output', default='benchmark-results.json', help='JSON results file')
+    parser.add_argument('--fixtures', default=os.path.join(tempfile.gettempdir(), 'file-converter-bench-fixtures'),
+                        help='Fixture directory (generated if missing)')
+    parser.add_argument('--repeat', type=int, default=3, help='Measured runs per case')
+    parser.add_argument('--warmup', type=int, default=1, help='Unmeasured runs per case')
+    parser.add_argument('--filter', dest='case_filter', help='Only run cases containing this text')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative slowdown')
+    parser.add_argument('--min-delta', type=float, default=0.05, help='Minimum absolute slowdown in seconds')
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.fixtures, repeat=args.repeat, warmup=args.warmup, case_filter=args.case_filter)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if not args.baseline:
+        return 0
+    rows = compare_module.compare(
+        report,
+        compare_module.load_results(args.baseline),
+        threshold=args.threshold,
+        min_delta_seconds=args.min_delta
+    )
+    print(compare_module.format_report(rows))
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Configuración de Gunicorn
+
+    gunicorn --config gunicorn.conf.py wsgi:app
+
+Workers, hilos y reciclado salen de Settings (WORKERS, THREADS,
+WORKER_CLASS, MAX_REQUESTS, MAX_REQUESTS_JITTER, GRACEFUL_TIMEOUT). La
+aplicación se carga en el maestro antes del fork (preload_app), así que
+cada worker hereda los módulos ya importados. Con SIGTERM el maestro deja
+de aceptar conexiones y espera hasta GRACEFUL_TIMEOUT a que terminen las
+peticiones en curso.
+"""
+import os
+import shutil
+import tempfile
+
+# Las métricas de varios procesos se agregan en este directorio; debe
+# existir antes de importar prometheus_client (ver src/metrics.py), y con
+# preload_app la aplicación se importa antes de on_starting
+multiproc_dir = (
+    os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    or os.path.join(tempfile.gettempdir(), 'file-converter-prometheus')
+)
+os.environ['PROMETHEUS_MULTIPROC_DIR'] = multiproc_dir
+# Valores de una ejecución anterior falsearían los contadores. Un HUP vuelve
+# a leer este archivo con los workers vivos: solo se limpia al arrancar
+if os.environ.get('FILE_CONVERTER_METRICS_OWNER') != str(os.getpid()):
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.environ['FILE_CONVERTER_METRICS_OWNER'] = str(os.getpid())
+os.makedirs(multiproc_dir, exist_ok=True)
+
+from src.config import settings  # noqa: E402
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.WORKERS
+worker_class = settings.WORKER_CLASS
+threads = settings.THREADS
+preload_app = True
+max_requests = settings.MAX_REQUESTS
+max_requests_jitter = settings.MAX_REQUESTS_JITTER
+graceful_timeout = settings.GRACEFUL_TIMEOUT
+# Las conversiones largas no deben confundirse con un worker colgado
+timeout = max(settings.MAX_UPLOAD_TIMEOUT, 120)
+keepalive = 5
+accesslog = None
+errorlog = '-'
+loglevel = settings.LOG_LEVEL.lower()
+
+
+def post_fork(server, worker):
+    # El hilo que escribe los logs no sobrevive al fork: crear uno por worker
+    from src.logging import setup_logging
+    setup_logging()
+
+
+def post_worker_init(worker):
+    # Solo el worker que obtiene el lock del host limpia; los demás esperan turno
+    from src.cleanup import cleanup_service
+    from src.routes import concurrency_controller, job_manager
+    cleanup_service.ensure_started()
+    # Cada worker ajusta su propio límite de conversiones (ADAPTIVE_CONCURRENCY)
+    if concurrency_controller is not None:
+        concurrency_controller.ensure_started()
+    # Retoma los jobs que quedaron en cola (JOB_WORKERS=0: solo src.worker)
+    job_manager.ensure_started()
+
+
+def worker_exit(server, worker):
+    # Los jobs en curso vuelven a la cola y se mata su herramienta
+    from src.routes import job_manager
+    job_manager.stop(timeout=0)
+    from src.logging import stop_logging
+    stop_logging()
+
+
+def child_exit(server, worker):
+    from src import metrics
+    metrics.mark_process_dead(worker.pid)
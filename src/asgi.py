@@ -0,0 +1,441 @@
+"""
+Aplicación ASGI con la conversión asíncrona
+
+POST /convert se atiende en el bucle de eventos sin ocupar un hilo por
+conversión: el cuerpo multipart se procesa por trozos
+(werkzeug.sansio.multipart), la espera de turno y los comandos usan
+ConverterFactory.perform_conversion_async y, si el cliente cierra la
+conexión o vence CONVERSION_DEADLINE_SECONDS, se cancela la tarea, lo que
+mata el grupo de procesos de la herramienta y borra los archivos parciales.
+Con mode=job la subida se entrega al JobManager y se responde 202, igual
+que en la ruta Flask.
+El resto de rutas se delegan en la aplicación Flask (fallback).
+"""
+import asyncio
+import json
+import re
+import time
+import uuid
+from contextlib import suppress
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+from werkzeug.utils import secure_filename
+
+from src import metrics
+from src.auth import auth
+from src.config import settings
+from src.conversion import CONVERT_MODES, parse_max_latency
+from src.exceptions import (
+    ConversionFailedException,
+    ConversionTimeoutException,
+    DeadlineUnachievableException,
+    FileConverterException,
+    FileTooLargeException,
+    InvalidFileException,
+    InvalidParameterException,
+    UnsupportedFormatException,
+    URLDownloadException
+)
+from src.logging import logger
+from src.scheduler import PRIORITIES
+from src.singleflight import single_flight
+from src.timing import StageTimer
+from src.utils import (
+    download_file_from_url,
+    get_allowed_extensions,
+    get_file_size,
+    is_allowed_extension,
+    sanitize_filename
+)
+
+# Tamaño máximo de un campo de texto del formulario (format, url, timings)
+MAX_FORM_FIELD_BYTES = 64 * 1024
+
+# Mismo patrón que acepta la aplicación Flask para X-Request-ID
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,128}$')
+
+
+class ClientDisconnected(Exception):
+    """El cliente cerró la conexión antes de recibir la respuesta"""
+    pass
+
+
+class AsyncConverterApp:
+    """
+    Aplicación ASGI: /convert asíncrono y el resto delegado
+    """
+
+    def __init__(self, factory, fallback=None, deadline_seconds=None, job_manager=None):
+        """
+        Args:
+            factory: ConverterFactory (normalmente la de src.routes, para
+                compartir el planificador con la ruta síncrona)
+            fallback: Aplicación ASGI para las demás rutas (None = 404)
+            deadline_seconds: Plazo total de la conversión, espera incluida
+                (None = CONVERSION_DEADLINE_SECONDS)
+            job_manager: JobManager para mode=job (None = solo mode=sync)
+        """
+        self.factory = factory
+        self.job_manager = job_manager
+        self.fallback = fallback
+        self.deadline_seconds = deadline_seconds or settings.CONVERSION_DEADLINE_SECONDS
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['path'] == '/convert' and scope['method'] == 'POST':
+            await self._convert(scope, receive, send)
+        elif self.fallback is not None:
+            await self.fallback(scope, receive, send)
+        else:
+            await _send_json(send, 404, {
+                'success': False,
+                'error': 'Not found',
+                'error_code': 'NOT_FOUND',
+                'timestamp': datetime.utcnow().isoformat()
+            })
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _convert(self, scope, receive, send):
+        headers = _headers(scope)
+        request_id = headers.get('x-request-id', '')
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        timer = StageTimer()
+        source_path = None
+        partial_paths = []
+
+        try:
+            with timer.stage('upload'):
+                fields, source_path = await _receive_form(receive, headers)
+
+            target_format = fields.get('format', '').lower().strip()
+            if not target_format or not is_allowed_extension(f"file.{target_format}"):
+                raise UnsupportedFormatException(
+                    target_format,
+                    supported_formats=get_allowed_extensions()
+                )
+
+            mode = (query.get('mode', [None])[0] or fields.get('mode', 'sync')).lower().strip()
+            modes = CONVERT_MODES if self.job_manager is not None else ['sync']
+            if mode not in modes:
+                raise InvalidParameterException('mode', mode, modes)
+
+            priority = (query.get('priority', [None])[0] or fields.get('priority', 'normal')).lower().strip()
+            if priority not in PRIORITIES:
+                raise InvalidParameterException('priority', priority, list(PRIORITIES))
+            tenant = auth.get_tenant(headers.get('x-api-key') or query.get('api_key', [None])[0])
+            max_latency = parse_max_latency(query.get('max_latency', [None])[0] or fields.get('max_latency'))
+            deadline = None if max_latency is None else time.monotonic() + max_latency
+
+            if source_path is None:
+                if 'url' not in fields:
+                    raise InvalidFileException(
+                        'Provide either "file" (multipart) or "url" parameter',
+                        details={'expected': ['file', 'url']}
+                    )
+                url = fields['url'].strip()
+                if not url:
+                    raise URLDownloadException('', 'Empty URL provided')
+                try:
+                    with timer.stage('fetch'):
+                        source_path = await asyncio.to_thread(
+                            download_file_from_url, url, settings.UPLOAD_FOLDER
+                        )
+                except ValueError as e:
+                    raise URLDownloadException(url, str(e))
+                logger.info(f"File downloaded from URL: {url}", extra={'request_id': request_id})
+
+                if source_path.stat().st_size > settings.MAX_FILE_SIZE:
+                    raise FileTooLargeException(
+                        get_file_size(source_path),
+                        settings.MAX_FILE_SIZE / (1024 * 1024)
+                    )
+
+            if mode == 'job':
+                # El job es dueño de la subida a partir de aquí
+                deadline_at = None if max_latency is None else time.time() + max_latency
+                job = await asyncio.to_thread(
+                    self.job_manager.submit, source_path, target_format,
+                    tenant=tenant, priority=priority, deadline_at=deadline_at
+                )
+                await _send_json(send, 202, {
+                    'success': True,
+                    **job,
+                    'status_url': f"/jobs/{job['job_id']}"
+                }, request_id, timer)
+                return
+
+            original_ext = source_path.suffix.lower()
+            target_ext = f".{target_format}"
+            file_id = source_path.stem.split('_')[0]
+            output_filename = f"{file_id}{target_ext}"
+            output_path = settings.CONVERTED_FOLDER / output_filename
+            # LibreOffice escribe primero <nombre de entrada><ext> en CONVERTED_FOLDER
+            partial_paths = [output_path, settings.CONVERTED_FOLDER / f"{source_path.stem}{target_ext}"]
+
+            logger.info(
+                f"Starting async conversion {original_ext} → {target_ext} (ID: {file_id})",
+                extra={'request_id': request_id}
+            )
+            with timer.stage('convert'):
+                result = await self._run_until_disconnect(
+                    receive,
+                    str(source_path),
+                    str(output_path),
+                    original_ext,
+                    target_ext,
+                    tenant=tenant,
+                    priority=priority,
+                    deadline=deadline
+                )
+            timer.record_within('queue', 'convert', result.get('queue_seconds', 0.0))
+
+            if result.get('deadline_unachievable'):
+                raise DeadlineUnachievableException(result['estimated_seconds'], result['remaining_seconds'])
+
+            if not result['success']:
+                raise ConversionFailedException(
+                    result.get('error', 'Unknown error'),
+                    source_format=original_ext,
+                    target_format=target_ext
+                )
+
+            with timer.stage('cleanup'):
+                _remove(source_path)
+
+            logger.info(f"Conversion completed successfully (ID: {file_id})", extra={'request_id': request_id})
+            response_data = {
+                'success': True,
+                'file_id': file_id,
+                'source_format': original_ext,
+                'output_format': target_format,
+                'output_size_mb': get_file_size(output_path),
+                'download_url': f'/download/{output_filename}',
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            if result.get('fast_preset'):
+                response_data['fast_preset'] = True
+            wants_timings = (query.get('timings', [None])[0] or fields.get('timings', 'false')).lower() == 'true'
+            if wants_timings:
+                response_data['timings'] = timer.as_dict()
+                if result.get('resources'):
+                    response_data['resources'] = result['resources']
+            await _send_json(send, 200, response_data, request_id, timer)
+
+        except ClientDisconnected:
+            _remove(source_path, *partial_paths)
+            logger.info("Client disconnected, conversion cancelled", extra={'request_id': request_id})
+
+        except asyncio.TimeoutError:
+            _remove(source_path, *partial_paths)
+            e = ConversionTimeoutException(self.deadline_seconds)
+            logger.warning(f"{e.error_code}: {e.message}", extra={'request_id': request_id})
+            await _send_json(send, e.status_code, e.to_dict(), request_id, timer)
+
+        except FileConverterException as e:
+            _remove(source_path, *partial_paths)
+            logger.warning(f"{e.error_code}: {e.message}", extra={'request_id': request_id})
+            await _send_json(send, e.status_code, e.to_dict(), request_id, timer)
+
+        except Exception as e:
+            _remove(source_path, *partial_paths)
+            logger.error(f"Unexpected conversion error: {str(e)}", exc_info=True, extra={'request_id': request_id})
+            await _send_json(send, 500, {
+                'success': False,
+                'error': 'Conversion failed',
+                'error_code': 'CONVERSION_ERROR',
+                'timestamp': datetime.utcnow().isoformat()
+            }, request_id, timer)
+
+    async def _convert_once(self, input_path, output_path, from_ext, to_ext, **options):
+        """
+        Convierte o, si hay una conversión idéntica en curso en el host,
+        espera a que termine y reutiliza su salida (SINGLE_FLIGHT_ENABLED)
+
+        Returns:
+            dict: Igual que perform_conversion_async
+        """
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await self.factory.perform_conversion_async(input_path, output_path, from_ext, to_ext, **options)
+
+        key = await asyncio.to_thread(single_flight.key, input_path, to_ext, {'source_format': from_ext})
+        deadline = options.get('deadline')
+        reserve = self.factory.estimate_duration(input_path, from_ext, to_ext) if deadline is not None else 0.0
+        async with single_flight.join_async(key, deadline, reserve) as flight:
+            result = flight.shared_result(output_path, deadline is not None)
+            if result:
+                logger.info("Reusing output of an identical in-flight conversion")
+                metrics.CONVERSIONS_SHARED.labels(to_ext).inc()
+                return result
+            result = await self.factory.perform_conversion_async(input_path, output_path, from_ext, to_ext, **options)
+            result['queue_seconds'] = result.get('queue_seconds', 0.0) + flight.wait_seconds
+            if result.get('success'):
+                flight.publish(output_path, result.get('fast_preset'))
+            return result
+
+    async def _run_until_disconnect(self, receive, input_path, output_path, from_ext, to_ext, **options):
+        """
+        Ejecuta la conversión hasta que termine, venza el plazo o el cliente se vaya
+
+        Args:
+            options: tenant, priority y deadline para el planificador
+
+        Raises:
+            asyncio.TimeoutError: Si vence deadline_seconds
+            ClientDisconnected: Si llega http.disconnect antes del resultado
+        """
+        conversion = asyncio.ensure_future(asyncio.wait_for(
+            self._convert_once(input_path, output_path, from_ext, to_ext, **options),
+            self.deadline_seconds
+        ))
+        disconnect = asyncio.ensure_future(_wait_disconnect(receive))
+        try:
+            await asyncio.wait({conversion, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            if not conversion.done():
+                # Cancelar mata el proceso en curso; esperar a que se recoja
+                conversion.cancel()
+                with suppress(asyncio.CancelledError):
+                    await conversion
+                raise ClientDisconnected()
+            return conversion.result()
+        finally:
+            conversion.cancel()
+            disconnect.cancel()
+
+
+def _headers(scope):
+    return {
+        name.decode('latin-1').lower(): value.decode('latin-1')
+        for name, value in scope.get('headers', [])
+    }
+
+
+async def _wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def _receive_form(receive, headers):
+    """
+    Lee el cuerpo multipart guardando el archivo 'file' en UPLOAD_FOLDER
+
+    Args:
+        receive: Canal receive de ASGI
+        headers: Cabeceras de la petición (nombres en minúsculas)
+
+    Returns:
+        tuple: (campos de texto, Path del archivo subido o None)
+
+    Raises:
+        InvalidFileException: Cuerpo no multipart, mal formado o nombre inválido
+        FileTooLargeException: Si el archivo supera MAX_FILE_SIZE
+        ClientDisconnected: Si el cliente se va durante la subida
+    """
+    mimetype, options = parse_options_header(headers.get('content-type', ''))
+    if mimetype != 'multipart/form-data' or 'boundary' not in options:
+        raise InvalidFileException('Expected a multipart/form-data body')
+
+    # Sin max_form_memory_size: Werkzeug lo aplica a cada trozo recibido,
+    # también a los del archivo; el límite de los campos se comprueba abajo
+    decoder = MultipartDecoder(options['boundary'].encode('latin-1'))
+    fields = {}
+    upload_path = None
+    upload = None
+    upload_bytes = 0
+    field_name = None
+    field_data = bytearray()
+
+    try:
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ClientDisconnected()
+            more_body = message.get('more_body', False)
+            decoder.receive_data(message.get('body', b''))
+            if not more_body:
+                decoder.receive_data(None)
+
+            event = decoder.next_event()
+            while not isinstance(event, (NeedData, Epilogue)):
+                if isinstance(event, Field):
+                    field_name = event.name
+                    field_data.clear()
+                elif isinstance(event, File):
+                    field_name = None
+                    if event.name == 'file' and event.filename and upload_path is None:
+                        filename = sanitize_filename(secure_filename(event.filename))
+                        if not filename or not is_allowed_extension(filename):
+                            raise InvalidFileException(f"Invalid filename: {filename}")
+                        upload_path = settings.UPLOAD_FOLDER / f"{uuid.uuid4().hex}_{filename}"
+                        upload = open(upload_path, 'wb')
+                elif isinstance(event, Data):
+                    if field_name is not None:
+                        field_data += event.data
+                        if len(field_data) > MAX_FORM_FIELD_BYTES:
+                            raise InvalidFileException(
+                                f"Form field too large: {field_name}",
+                                details={'max_bytes': MAX_FORM_FIELD_BYTES}
+                            )
+                        if not event.more_data:
+                            fields[field_name] = field_data.decode('utf-8', errors='replace')
+                    elif upload is not None and not upload.closed:
+                        upload_bytes += len(event.data)
+                        if upload_bytes > settings.MAX_FILE_SIZE:
+                            raise FileTooLargeException(
+                                upload_bytes / (1024 * 1024),
+                                settings.MAX_FILE_SIZE / (1024 * 1024)
+                            )
+                        upload.write(event.data)
+                        if not event.more_data:
+                            upload.close()
+                event = decoder.next_event()
+    except ValueError as e:
+        _remove(upload_path)
+        raise InvalidFileException(f"Malformed multipart body: {e}")
+    except BaseException:
+        _remove(upload_path)
+        raise
+    finally:
+        if upload is not None:
+            upload.close()
+
+    if upload_path is not None:
+        logger.info(f"File uploaded: {upload_path.name}")
+    return fields, upload_path
+
+
+def _remove(*paths):
+    for path in paths:
+        if path is not None:
+            with suppress(FileNotFoundError):
+                path.unlink()
+
+
+async def _send_json(send, status, payload, request_id=None, timer=None):
+    body = json.dumps(payload).encode('utf-8')
+    headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode('latin-1'))
+    ]
+    if request_id:
+        headers.append((b'x-request-id', request_id.encode('latin-1')))
+    if timer is not None and settings.SERVER_TIMING_ENABLED:
+        headers.append((b'server-timing', timer.header().encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
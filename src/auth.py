@@ -1,6 +1,7 @@
 """
 Sistema de autenticación con API Keys
 """
+import hashlib
 import os
 import secrets
 from functools import wraps
@@ -20,6 +21,9 @@ class APIKeyAuth:
         # API keys válidas (formato: API_KEY_1, API_KEY_2, etc.)
         self.valid_keys = set()
         
+        # Nombre de cliente de cada key: el sufijo de API_KEY_<NOMBRE>
+        self.key_names = {}
+        
         # Cargar API keys desde env vars
         self._load_api_keys_from_env()
         
@@ -35,11 +39,13 @@ class APIKeyAuth:
         for key, value in os.environ.items():
             if key.startswith('API_KEY_') and value:
                 self.valid_keys.add(value.strip())
+                self.key_names[value.strip()] = key[len('API_KEY_'):].upper()
         
         # Si no hay keys configuradas, generar una de desarrollo
         if not self.valid_keys and os.getenv('FLASK_ENV') == 'development':
             dev_key = os.getenv('DEV_API_KEY', 'dev-key-12345')
             self.valid_keys.add(dev_key)
+            self.key_names[dev_key] = 'DEV'
             print(f"[WARNING] Using development API key: {dev_key}")
     
     def is_valid_key(self, api_key):
@@ -76,6 +82,35 @@ class APIKeyAuth:
         
         return None
     
+    def get_tenant(self, api_key):
+        """
+        Cliente al que pertenece una API key, para el reparto de turnos
+        del planificador de conversiones
+        
+        Args:
+            api_key: API key de la petición (o None)
+            
+        Returns:
+            str: NOMBRE de API_KEY_<NOMBRE>, 'key-<hash>' si la key no está
+                registrada (autenticación desactivada) o 'anonymous' sin key
+        """
+        if not api_key:
+            return 'anonymous'
+        name = self.key_names.get(api_key)
+        if name:
+            return name
+        # La key en claro no debe llegar a logs ni estadísticas
+        return 'key-' + hashlib.sha256(api_key.encode()).hexdigest()[:12]
+    
+    def get_tenant_from_request(self):
+        """
+        Cliente del request actual (ver get_tenant)
+        
+        Returns:
+            str: Nombre del cliente
+        """
+        return self.get_tenant(self.get_api_key_from_request())
+    
     def require_api_key(self, f):
         """
         Decorador para requerir autenticación con API key en un endpoint
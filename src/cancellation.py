@@ -0,0 +1,210 @@
+"""
+Cancelación de conversiones
+
+Cada conversión lleva un CancellationToken. Al activarse se mata el grupo
+de procesos de la herramienta en curso (ver supervisor), no se lanzan los
+comandos siguientes y no se concede turno en el planificador. En modo
+síncrono lo activa DisconnectMonitor cuando el cliente cierra la conexión;
+en modo job, DELETE /jobs/<id>.
+
+El token de la conversión en curso se propaga con un ContextVar
+(cancellation_scope), igual que la medición de consumo, para no cambiar
+la firma de convert() de cada conversor.
+"""
+import os
+import selectors
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from src.logging import logger
+
+
+class CancellationToken:
+    """
+    Señal de cancelación compartida entre hilos
+    """
+
+    def __init__(self):
+        self.reason = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason='cancelled'):
+        """
+        Activa el token y ejecuta los callbacks registrados
+
+        Args:
+            reason: Motivo ('client_disconnected', 'job_cancelled', ...)
+
+        Returns:
+            bool: False si ya estaba activado
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Cancellation callback failed: {str(e)}")
+        return True
+
+    def add_callback(self, callback):
+        """
+        Registra una función a llamar al cancelar (inmediatamente si ya lo está)
+
+        Args:
+            callback: Función sin argumentos
+
+        Returns:
+            callable: Función que retira el callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+_current = ContextVar('cancellation_token', default=None)
+
+
+@contextmanager
+def cancellation_scope(token):
+    """
+    Hace de 'token' el token de los comandos lanzados en el bloque
+
+    Args:
+        token: CancellationToken o None
+    """
+    previous = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(previous)
+
+
+def current_token():
+    """
+    Returns:
+        CancellationToken o None: Token de la conversión en curso
+    """
+    return _current.get()
+
+
+class DisconnectMonitor:
+    """
+    Vigila en un único hilo los sockets de las peticiones síncronas
+
+    Cuando una conversión está en curso el cuerpo de la petición ya se ha
+    leído, así que el socket solo vuelve a ser legible si el cliente
+    cierra la conexión (EOF) o envía otra petición (keep-alive). Solo el
+    primer caso activa el token.
+    """
+
+    # Claves del entorno WSGI con el socket del cliente
+    SOCKET_KEYS = ('gunicorn.socket', 'werkzeug.socket')
+
+    def __init__(self, interval_seconds=0.5):
+        """
+        Args:
+            interval_seconds: Espera máxima de cada vuelta del selector
+        """
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._selector = None
+        self._thread = None
+        self._pid = None
+
+    @contextmanager
+    def watch(self, environ, token):
+        """
+        Activa 'token' si el cliente de la petición se desconecta
+
+        Sin socket en el entorno (cliente de pruebas, otros servidores) no
+        hace nada.
+
+        Args:
+            environ: Entorno WSGI de la petición
+            token: CancellationToken a activar
+        """
+        sock = next((environ[key] for key in self.SOCKET_KEYS if environ.get(key) is not None), None)
+        if sock is None:
+            yield token
+            return
+
+        selector = self._ensure_started()
+        try:
+            with self._lock:
+                selector.register(sock, selectors.EVENT_READ, token)
+        except (ValueError, KeyError, OSError):
+            yield token
+            return
+        try:
+            yield token
+        finally:
+            with self._lock:
+                try:
+                    selector.unregister(sock)
+                except (KeyError, ValueError, OSError):
+                    pass
+
+    def _ensure_started(self):
+        # Los workers creados con fork heredan el objeto pero no el hilo
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._selector = selectors.DefaultSelector()
+                self._thread = threading.Thread(target=self._run, args=(self._selector,),
+                                                name='disconnect-monitor', daemon=True)
+                self._thread.start()
+            return self._selector
+
+    def _run(self, selector):
+        while True:
+            if not selector.get_map():
+                time.sleep(self.interval_seconds)
+                continue
+            try:
+                events = selector.select(self.interval_seconds)
+            except (OSError, ValueError):
+                continue
+            for key, _ in events:
+                self._check(selector, key)
+
+    def _check(self, selector, key):
+        sock, token = key.fileobj, key.data
+        try:
+            closed = sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b''
+        except BlockingIOError:
+            return
+        except OSError:
+            closed = True
+        # Con datos o cerrado, el socket deja de vigilarse
+        with self._lock:
+            try:
+                selector.unregister(sock)
+            except (KeyError, ValueError, OSError):
+                pass
+        if closed and token.cancel('client_disconnected'):
+            logger.info("Client disconnected, cancelling conversion")
+
+
+disconnect_monitor = DisconnectMonitor()
@@ -0,0 +1,163 @@
+"""
+Limpieza periódica de archivos subidos y convertidos
+
+Las subidas de los jobs en cola o en curso no se borran aunque superen el
+TTL: con la API solo encolando, un job puede esperar o reintentarse más de
+MAX_UPLOAD_TIMEOUT antes de ejecutarse.
+
+Con varios workers (o varios contenedores sobre el mismo volumen) la
+limpieza debe ejecutarse una sola vez por host. Cada proceso que arranca
+el servicio intenta tomar un flock exclusivo sobre TEMP_FOLDER/cleanup.lock;
+solo quien lo consigue limpia, y el resto reintenta en cada intervalo por
+si el propietario termina.
+"""
+import fcntl
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from src.config import settings
+from src.jobs import create_store
+
+logger = logging.getLogger(__name__)
+
+
+class CleanupService:
+    """
+    Hilo de limpieza protegido por un lock de archivo
+    """
+
+    def __init__(self, folders=None, ttl_seconds=None, interval_seconds=None, lock_path=None, job_store=None):
+        """
+        Args:
+            folders: Carpetas a limpiar (None = UPLOAD_FOLDER, CONVERTED_FOLDER
+                y los locks de single-flight)
+            ttl_seconds: Antigüedad a partir de la cual se borra un archivo
+            interval_seconds: Pausa entre pasadas
+            lock_path: Archivo de lock compartido por los procesos del host
+            job_store: Broker de jobs cuyas subidas pendientes se conservan
+                (None = no se consulta)
+        """
+        self.folders = folders or [
+            settings.UPLOAD_FOLDER,
+            settings.CONVERTED_FOLDER,
+            Path(settings.TEMP_FOLDER) / 'singleflight'
+        ]
+        self.ttl_seconds = ttl_seconds or settings.MAX_UPLOAD_TIMEOUT
+        self.interval_seconds = interval_seconds or settings.CLEANUP_INTERVAL
+        self.lock_path = lock_path or os.path.join(settings.TEMP_FOLDER, 'cleanup.lock')
+        self.job_store = job_store
+        self._lock_file = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def ensure_started(self):
+        """Arranca el hilo en este proceso si aún no está en marcha."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='file-cleanup', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo y libera el lock."""
+        self._stop.set()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @property
+    def is_owner(self):
+        return self._lock_file is not None
+
+    def try_acquire(self):
+        """
+        Returns:
+            bool: True si este proceso es (o pasa a ser) el encargado de limpiar
+        """
+        if self._lock_file is not None:
+            return True
+        lock_file = open(self.lock_path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+        logger.info(f"Cleanup lock acquired by process {os.getpid()}")
+        return True
+
+    def cleanup_once(self):
+        """
+        Borra los archivos más antiguos que ttl_seconds, salvo las subidas
+        de jobs pendientes
+
+        Returns:
+            int: Archivos borrados
+        """
+        removed = 0
+        try:
+            # Los nombres de las subidas son únicos (uuid), aunque cada nodo
+            # guarde la ruta según su propio directorio de trabajo
+            pending = {Path(path).name for path in self.job_store.pending_sources()} if self.job_store else set()
+        except Exception as e:
+            # Sin saber qué jobs siguen pendientes es mejor no borrar nada
+            logger.error(f"Failed to list pending job sources, skipping cleanup: {e}")
+            return 0
+        cutoff = time.time() - self.ttl_seconds
+        for folder in self.folders:
+            if not folder.exists():
+                continue
+            for item in folder.iterdir():
+                try:
+                    if item.name in pending:
+                        continue
+                    if item.is_file() and item.stat().st_mtime < cutoff and _unlink_unless_locked(item):
+                        removed += 1
+                        logger.info(f"Cleaned up old file: {item}")
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.error(f"Failed to delete {item}: {e}")
+        return removed
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                if self.try_acquire():
+                    self.cleanup_once()
+            except Exception as e:
+                logger.error(f"Error in cleanup thread: {e}")
+
+
+def _unlink_unless_locked(path):
+    """
+    Borra un archivo; un .lock de single-flight solo si nadie lo tiene
+
+    El .lock se borra con el lock tomado, así quien lo estaba esperando
+    ve al conseguirlo que su archivo ya no está enlazado y abre el nuevo.
+
+    Returns:
+        bool: True si se borró
+    """
+    if path.suffix != '.lock':
+        path.unlink()
+        return True
+    with open(path, 'a+') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        path.unlink()
+        return True
+
+
+cleanup_service = CleanupService(job_store=create_store())
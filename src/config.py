@@ -8,9 +8,19 @@ class Settings(BaseSettings):
     DEBUG: bool = Field(default=False)
     ENV: str = Field(default="development")
     LOG_LEVEL: str = Field(default="INFO")
+    LOG_FILE: str = Field(default="")
+    LOG_JSON: bool = Field(default=True)
+    LOG_RATE_LIMIT: int = Field(default=100)
+    LOG_RATE_LIMIT_WINDOW: int = Field(default=60)
+    LOG_SAMPLE_RATES: dict = Field(default={})
     HOST: str = Field(default="0.0.0.0")
     PORT: int = Field(default=5000)
     WORKERS: int = Field(default=4)
+    THREADS: int = Field(default=4)
+    WORKER_CLASS: str = Field(default="gthread")
+    MAX_REQUESTS: int = Field(default=1000)
+    MAX_REQUESTS_JITTER: int = Field(default=100)
+    GRACEFUL_TIMEOUT: int = Field(default=60)
     UPLOAD_FOLDER: Path = Field(default="/tmp/file-converter/uploads")
     CONVERTED_FOLDER: Path = Field(default="/tmp/file-converter/converted")
     LOGS_FOLDER: Path = Field(default="/tmp/file-converter/logs")
@@ -21,6 +31,24 @@ class Settings(BaseSettings):
     OCR_DEFAULT_LANGUAGE: str = Field(default="spa")
     OCR_MAX_PAGES: int = Field(default=50)
     OCR_TIMEOUT_SECONDS: int = Field(default=300)
+    OCR_DEFAULT_PROFILE: str = Field(default="balanced")
+    OCR_TESSDATA_FAST_DIR: str = Field(default="")
+    OCR_TESSDATA_BEST_DIR: str = Field(default="")
+    OCR_BINARIZATION: str = Field(default="otsu")
+    OCR_DENOISE: bool = Field(default=True)
+    OCR_DESKEW: bool = Field(default=True)
+    OCR_ANALYSIS_MAX_SIDE: int = Field(default=1024)
+    OCR_TILE_THRESHOLD_PIXELS: int = Field(default=40_000_000)
+    OCR_TILE_SIZE: int = Field(default=3000)
+    OCR_TILE_OVERLAP: int = Field(default=200)
+    OCR_TILE_WORKERS: int = Field(default=max(1, min(4, os.cpu_count() or 1)))
+    OCR_BATCH_WORKERS: int = Field(default=max(1, os.cpu_count() or 1))
+    OCR_BATCH_MAX_FILES: int = Field(default=500)
+    OCR_OSD_ENABLED: bool = Field(default=False)
+    OCR_OSD_MAX_SIDE: int = Field(default=1200)
+    OCR_OSD_MIN_CONFIDENCE: float = Field(default=2.0)
+    OCR_CACHE_ENABLED: bool = Field(default=True)
+    OCR_CACHE_MAX_ENTRIES: int = Field(default=512)
     RATE_LIMIT_ENABLED: bool = Field(default=True)
     RATE_LIMIT_REQUESTS: int = Field(default=100)
     RATE_LIMIT_WINDOW: int = Field(default=60)
@@ -30,6 +58,39 @@ class Settings(BaseSettings):
     CACHE_TTL_HOURS: int = Field(default=24)
     CORS_ORIGINS: List[str] = Field(default=["*"])
     MAX_UPLOAD_TIMEOUT: int = Field(default=600)
+    CLEANUP_INTERVAL: int = Field(default=300)
+    MAX_CONCURRENT_CONVERSIONS: int = Field(default=4)
+    SCHEDULER_TENANT_WEIGHTS: str = Field(default="")
+    SCHEDULER_TENANT_PRIORITIES: str = Field(default="")
+    SCHEDULER_SHORT_JOB_SECONDS: float = Field(default=15.0)
+    SCHEDULER_SHORT_LANE_SLOTS: int = Field(default=1)
+    SCHEDULER_QUANTUM_SECONDS: float = Field(default=10.0)
+    SCHEDULER_DEADLINE_SLACK_SECONDS: float = Field(default=30.0)
+    SINGLE_FLIGHT_ENABLED: bool = Field(default=True)
+    ADAPTIVE_CONCURRENCY: bool = Field(default=False)
+    ADAPTIVE_MIN_CONCURRENCY: int = Field(default=1)
+    ADAPTIVE_MAX_CONCURRENCY: int = Field(default=16)
+    ADAPTIVE_INTERVAL_SECONDS: float = Field(default=2.0)
+    ADAPTIVE_CPU_TARGET_PERCENT: float = Field(default=85.0)
+    ADAPTIVE_PSI_THRESHOLD: float = Field(default=20.0)
+    ADAPTIVE_MEMORY_RESERVE_MB: int = Field(default=512)
+    ADAPTIVE_DECREASE_FACTOR: float = Field(default=0.5)
+    CONVERSION_DEADLINE_SECONDS: int = Field(default=300)
+    JOB_WORKERS: int = Field(default=2)
+    JOB_BROKER: str = Field(default="sqlite")
+    JOB_LEASE_SECONDS: int = Field(default=30)
+    JOB_MAX_ATTEMPTS: int = Field(default=3)
+    SERVER_TIMING_ENABLED: bool = Field(default=True)
+    PROFILING_ADMIN_KEY: str = Field(default="")
+    PROFILING_MAX_PER_MINUTE: int = Field(default=6)
+    HEALTH_SAMPLE_INTERVAL_SECONDS: float = Field(default=5.0)
+    HEALTH_MAX_SNAPSHOT_AGE_SECONDS: float = Field(default=30.0)
+    HEALTH_READY_MAX_QUEUED: int = Field(default=16)
+    CONVERTER_MEMORY_LIMIT_MB: int = Field(default=0)
+    CONVERTER_CPU_LIMIT_SECONDS: int = Field(default=0)
+    CONVERTER_NICE: int = Field(default=5)
+    CONVERTER_CPU_AFFINITY: str = Field(default="")
+    CONVERTER_OUTPUT_LIMIT_KB: int = Field(default=64)
     
     SUPPORTED_CONVERSIONS: dict = Field(default={
         'documents': {'from': ['.docx', '.doc', '.odt', '.rtf', '.txt', '.pdf', '.xls', '.xlsx', '.ppt', '.pptx', '.csv', '.json', '.xml'], 'to': ['.pdf', '.docx', '.doc', '.txt', '.html', '.odt', '.rtf', '.csv', '.json', '.xml']},
@@ -83,6 +144,277 @@ class Settings(BaseSettings):
             raise ValueError('OCR_MAX_PAGES must be less than 1000')
         return v
 
+    @field_validator('OCR_DEFAULT_PROFILE')
+    @classmethod
+    def validate_ocr_profile(cls, v):
+        valid_profiles = ['fast', 'balanced', 'accurate']
+        if v.lower() not in valid_profiles:
+            raise ValueError(f'OCR_DEFAULT_PROFILE must be one of {valid_profiles}')
+        return v.lower()
+
+    @field_validator('OCR_BINARIZATION')
+    @classmethod
+    def validate_ocr_binarization(cls, v):
+        valid_methods = ['otsu', 'adaptive', 'none']
+        if v.lower() not in valid_methods:
+            raise ValueError(f'OCR_BINARIZATION must be one of {valid_methods}')
+        return v.lower()
+
+    @field_validator('OCR_ANALYSIS_MAX_SIDE')
+    @classmethod
+    def validate_ocr_analysis_side(cls, v):
+        if v < 256:
+            raise ValueError('OCR_ANALYSIS_MAX_SIDE must be at least 256')
+        return v
+
+    @field_validator('OCR_OSD_MAX_SIDE')
+    @classmethod
+    def validate_ocr_osd_side(cls, v):
+        if v < 300:
+            raise ValueError('OCR_OSD_MAX_SIDE must be at least 300')
+        return v
+
+    @field_validator('OCR_TILE_OVERLAP')
+    @classmethod
+    def validate_ocr_tile_overlap(cls, v, info):
+        tile_size = info.data.get('OCR_TILE_SIZE', 3000)
+        if v < 0 or v >= tile_size:
+            raise ValueError('OCR_TILE_OVERLAP must be between 0 and OCR_TILE_SIZE')
+        return v
+
+    @field_validator('OCR_TILE_WORKERS', 'OCR_BATCH_WORKERS', 'OCR_BATCH_MAX_FILES')
+    @classmethod
+    def validate_ocr_workers(cls, v):
+        if v <= 0:
+            raise ValueError('OCR worker and batch limits must be greater than 0')
+        return v
+
+    @field_validator('OCR_CACHE_MAX_ENTRIES')
+    @classmethod
+    def validate_ocr_cache_size(cls, v):
+        if v <= 0:
+            raise ValueError('OCR_CACHE_MAX_ENTRIES must be greater than 0')
+        return v
+
+    @field_validator('LOG_RATE_LIMIT', 'LOG_RATE_LIMIT_WINDOW')
+    @classmethod
+    def validate_log_rate_limit(cls, v):
+        if v < 0:
+            raise ValueError('Log rate limit values must be 0 or greater')
+        return v
+
+    @field_validator('LOG_SAMPLE_RATES')
+    @classmethod
+    def validate_log_sample_rates(cls, v):
+        for name, rate in v.items():
+            if not 0 <= float(rate) <= 1:
+                raise ValueError(f'LOG_SAMPLE_RATES[{name}] must be between 0 and 1')
+        return {name: float(rate) for name, rate in v.items()}
+
+    @field_validator('PROFILING_MAX_PER_MINUTE')
+    @classmethod
+    def validate_profiling_rate(cls, v):
+        if v < 0:
+            raise ValueError('PROFILING_MAX_PER_MINUTE must be 0 or greater')
+        return v
+
+    @field_validator('WORKERS', 'THREADS')
+    @classmethod
+    def validate_workers(cls, v):
+        if v < 1 or v > 64:
+            raise ValueError('WORKERS and THREADS must be between 1 and 64')
+        return v
+
+    @field_validator('WORKER_CLASS')
+    @classmethod
+    def validate_worker_class(cls, v):
+        valid_classes = ['sync', 'gthread']
+        if v.lower() not in valid_classes:
+            raise ValueError(f'WORKER_CLASS must be one of {valid_classes}')
+        return v.lower()
+
+    @field_validator('MAX_REQUESTS', 'MAX_REQUESTS_JITTER', 'GRACEFUL_TIMEOUT')
+    @classmethod
+    def validate_worker_recycling(cls, v):
+        if v < 0:
+            raise ValueError('MAX_REQUESTS, MAX_REQUESTS_JITTER and GRACEFUL_TIMEOUT must be 0 or greater')
+        return v
+
+    @field_validator('CLEANUP_INTERVAL')
+    @classmethod
+    def validate_cleanup_interval(cls, v):
+        if v < 10:
+            raise ValueError('CLEANUP_INTERVAL must be at least 10 seconds')
+        return v
+
+    @field_validator('MAX_CONCURRENT_CONVERSIONS')
+    @classmethod
+    def validate_max_concurrent_conversions(cls, v):
+        if v < 1 or v > 16:
+            raise ValueError('MAX_CONCURRENT_CONVERSIONS must be between 1 and 16')
+        return v
+
+    @field_validator('SCHEDULER_TENANT_WEIGHTS')
+    @classmethod
+    def validate_scheduler_tenant_weights(cls, v):
+        for part in filter(None, (p.strip() for p in v.split(','))):
+            name, _, weight = part.rpartition(':')
+            try:
+                valid = bool(name.strip()) and float(weight) > 0
+            except ValueError:
+                valid = False
+            if not valid:
+                raise ValueError('SCHEDULER_TENANT_WEIGHTS must look like "ACME:4,BATCH:1" with positive weights')
+        return v
+
+    @field_validator('SCHEDULER_TENANT_PRIORITIES')
+    @classmethod
+    def validate_scheduler_tenant_priorities(cls, v):
+        valid = ['high', 'normal', 'low']
+        for part in filter(None, (p.strip() for p in v.split(','))):
+            name, _, priority = part.rpartition(':')
+            if not name.strip() or priority.strip() not in valid:
+                raise ValueError(f'SCHEDULER_TENANT_PRIORITIES must look like "ACME:high" with a class in {valid}')
+        return v
+
+    @field_validator('SCHEDULER_SHORT_JOB_SECONDS', 'SCHEDULER_QUANTUM_SECONDS', 'SCHEDULER_DEADLINE_SLACK_SECONDS')
+    @classmethod
+    def validate_scheduler_seconds(cls, v):
+        if v <= 0:
+            raise ValueError('Scheduler durations must be greater than 0')
+        return v
+
+    @field_validator('SCHEDULER_SHORT_LANE_SLOTS')
+    @classmethod
+    def validate_scheduler_short_lane_slots(cls, v):
+        if v < 0:
+            raise ValueError('SCHEDULER_SHORT_LANE_SLOTS must be 0 or greater')
+        return v
+
+    @field_validator('JOB_WORKERS')
+    @classmethod
+    def validate_job_workers(cls, v):
+        if v < 0 or v > 32:
+            raise ValueError('JOB_WORKERS must be between 0 and 32')
+        return v
+
+    @field_validator('JOB_BROKER')
+    @classmethod
+    def validate_job_broker(cls, v):
+        valid = ['sqlite', 'redis']
+        if v.lower() not in valid:
+            raise ValueError(f'JOB_BROKER must be one of {valid}')
+        return v.lower()
+
+    @field_validator('JOB_LEASE_SECONDS')
+    @classmethod
+    def validate_job_lease(cls, v):
+        if v < 5:
+            raise ValueError('JOB_LEASE_SECONDS must be at least 5 seconds')
+        return v
+
+    @field_validator('JOB_MAX_ATTEMPTS')
+    @classmethod
+    def validate_job_max_attempts(cls, v):
+        if v < 1:
+            raise ValueError('JOB_MAX_ATTEMPTS must be at least 1')
+        return v
+
+    @field_validator('CONVERSION_DEADLINE_SECONDS')
+    @classmethod
+    def validate_conversion_deadline(cls, v):
+        if v < 1:
+            raise ValueError('CONVERSION_DEADLINE_SECONDS must be at least 1 second')
+        return v
+
+    @field_validator('CONVERTER_MEMORY_LIMIT_MB', 'CONVERTER_CPU_LIMIT_SECONDS')
+    @classmethod
+    def validate_converter_limits(cls, v):
+        if v < 0:
+            raise ValueError('Converter resource limits must be 0 (unlimited) or greater')
+        return v
+
+    @field_validator('CONVERTER_NICE')
+    @classmethod
+    def validate_converter_nice(cls, v):
+        if v < 0 or v > 19:
+            raise ValueError('CONVERTER_NICE must be between 0 and 19')
+        return v
+
+    @field_validator('CONVERTER_CPU_AFFINITY')
+    @classmethod
+    def validate_converter_cpu_affinity(cls, v):
+        v = v.strip()
+        for part in filter(None, (p.strip() for p in v.split(','))):
+            bounds = part.split('-', 1)
+            if not all(b.strip().isdigit() for b in bounds) or int(bounds[0]) > int(bounds[-1]):
+                raise ValueError('CONVERTER_CPU_AFFINITY must be a CPU list like "0-3,6"')
+        return v
+
+    @field_validator('CONVERTER_OUTPUT_LIMIT_KB')
+    @classmethod
+    def validate_converter_output_limit(cls, v):
+        if v < 1:
+            raise ValueError('CONVERTER_OUTPUT_LIMIT_KB must be at least 1')
+        return v
+
+    @field_validator('ADAPTIVE_MIN_CONCURRENCY', 'ADAPTIVE_MAX_CONCURRENCY')
+    @classmethod
+    def validate_adaptive_limits(cls, v):
+        if v < 1 or v > 64:
+            raise ValueError('Adaptive concurrency limits must be between 1 and 64')
+        return v
+
+    @field_validator('ADAPTIVE_MAX_CONCURRENCY')
+    @classmethod
+    def validate_adaptive_range(cls, v, info):
+        minimum = info.data.get('ADAPTIVE_MIN_CONCURRENCY')
+        if minimum is not None and v < minimum:
+            raise ValueError('ADAPTIVE_MAX_CONCURRENCY must be at least ADAPTIVE_MIN_CONCURRENCY')
+        return v
+
+    @field_validator('ADAPTIVE_INTERVAL_SECONDS')
+    @classmethod
+    def validate_adaptive_interval(cls, v):
+        if v <= 0:
+            raise ValueError('ADAPTIVE_INTERVAL_SECONDS must be greater than 0')
+        return v
+
+    @field_validator('ADAPTIVE_CPU_TARGET_PERCENT', 'ADAPTIVE_PSI_THRESHOLD')
+    @classmethod
+    def validate_adaptive_percent(cls, v):
+        if v <= 0 or v > 100:
+            raise ValueError('Adaptive concurrency thresholds must be between 0 and 100')
+        return v
+
+    @field_validator('ADAPTIVE_MEMORY_RESERVE_MB')
+    @classmethod
+    def validate_adaptive_memory_reserve(cls, v):
+        if v < 0:
+            raise ValueError('ADAPTIVE_MEMORY_RESERVE_MB must be 0 or greater')
+        return v
+
+    @field_validator('ADAPTIVE_DECREASE_FACTOR')
+    @classmethod
+    def validate_adaptive_decrease_factor(cls, v):
+        if not 0 < v < 1:
+            raise ValueError('ADAPTIVE_DECREASE_FACTOR must be between 0 and 1')
+        return v
+
+    @field_validator('HEALTH_SAMPLE_INTERVAL_SECONDS', 'HEALTH_MAX_SNAPSHOT_AGE_SECONDS')
+    @classmethod
+    def validate_health_intervals(cls, v):
+        if v <= 0:
+            raise ValueError('Health sampling intervals must be greater than 0')
+        return v
+
+    @field_validator('HEALTH_READY_MAX_QUEUED')
+    @classmethod
+    def validate_health_ready_queue(cls, v):
+        if v < 0:
+            raise ValueError('HEALTH_READY_MAX_QUEUED must be 0 or greater')
+        return v
+
     @field_validator('RATE_LIMIT_REQUESTS', 'RATE_LIMIT_WINDOW')
     @classmethod
     def validate_rate_limit(cls, v):
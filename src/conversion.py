@@ -0,0 +1,164 @@
+"""
+Conversión de un archivo ya subido
+
+Lo comparten POST /convert (modo sync), los jobs que ejecuta la propia API
+y el worker independiente (python -m src.worker). El archivo de origen no
+se borra aquí: lo hace quien lo subió, porque un job devuelto a la cola
+debe conservarlo para el siguiente intento.
+"""
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, Tuple
+
+from src import metrics
+from src.config import settings
+from src.logging import logger
+from src.exceptions import (
+    ConversionCancelledException,
+    ConversionFailedException,
+    DeadlineUnachievableException,
+    InvalidParameterException
+)
+from src.singleflight import single_flight
+from src.utils import get_file_size
+
+# Modos de POST /convert: 'sync' convierte en la petición, 'job' encola
+CONVERT_MODES = ['sync', 'job']
+
+
+def parse_max_latency(value) -> Optional[float]:
+    """
+    Valida el parámetro max_latency de /convert
+
+    Args:
+        value: Segundos como texto (None o vacío = sin plazo)
+
+    Returns:
+        float o None
+
+    Raises:
+        InvalidParameterException: Si no es un número positivo
+    """
+    if value is None or not str(value).strip():
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise InvalidParameterException('max_latency', value)
+    if not 0 < seconds < float('inf'):
+        raise InvalidParameterException('max_latency', value)
+    return seconds
+
+
+def convert_source(factory, source_path: Path, target_format: str, timer, token=None,
+                   tenant: str = None, priority: str = None, deadline_at: float = None) -> Tuple[dict, dict]:
+    """
+    Convierte un archivo de UPLOAD_FOLDER a CONVERTED_FOLDER
+
+    Con SINGLE_FLIGHT_ENABLED, si ya hay en curso una conversión idéntica
+    (mismo contenido y formatos) se espera a que termine y se reutiliza su
+    salida (ver src/singleflight.py).
+
+    Args:
+        factory: ConverterFactory que ejecuta la conversión
+        source_path: Archivo subido
+        target_format: Formato de destino sin punto
+        timer: StageTimer donde medir las etapas
+        token: CancellationToken de la conversión
+        tenant: Cliente que la pide (reparto de turnos del planificador)
+        priority: Clase de prioridad pedida
+        deadline_at: Instante (time.time) en que debe estar terminada; es
+            de reloj de pared porque los jobs pueden ejecutarse en otro nodo
+
+    Returns:
+        tuple: (datos de la respuesta, resultado de perform_conversion)
+
+    Raises:
+        ConversionCancelledException: Si se activó el token; la salida
+            parcial se borra
+        DeadlineUnachievableException: Si no puede terminar antes de
+            deadline_at
+        ConversionFailedException: Si la herramienta falló
+    """
+    source_path = Path(source_path)
+    original_ext = source_path.suffix.lower()
+    target_ext = f".{target_format}" if not target_format.startswith('.') else target_format
+    file_id = source_path.stem.split('_')[0]
+    output_filename = f"{file_id}{target_ext}"
+    output_path = settings.CONVERTED_FOLDER / output_filename
+
+    deadline = None if deadline_at is None else time.monotonic() + (deadline_at - time.time())
+
+    logger.info(f"Starting conversion {original_ext} → {target_ext} (ID: {file_id})")
+
+    flight_scope = nullcontext()
+    if settings.SINGLE_FLIGHT_ENABLED:
+        with timer.stage('dedupe'):
+            key = single_flight.key(source_path, target_ext, {'source_format': original_ext})
+            # Quien espera a otra conversión debe poder hacer la suya si esa falla
+            reserve = 0.0
+            if deadline is not None:
+                reserve = factory.estimate_duration(str(source_path), original_ext, target_ext)
+        flight_scope = single_flight.join(key, token, deadline, reserve)
+
+    with timer.stage('convert'), flight_scope as flight:
+        conversion_result = flight.shared_result(output_path, deadline is not None) if flight else None
+        if conversion_result:
+            logger.info(f"Reusing output of an identical in-flight conversion (ID: {file_id})")
+            metrics.CONVERSIONS_SHARED.labels(target_ext).inc()
+        else:
+            conversion_result = factory.perform_conversion(
+                str(source_path),
+                str(output_path),
+                original_ext,
+                target_ext,
+                token=token,
+                tenant=tenant,
+                priority=priority,
+                deadline=deadline
+            )
+            if flight:
+                conversion_result['queue_seconds'] = conversion_result.get('queue_seconds', 0.0) + flight.wait_seconds
+                if conversion_result.get('success'):
+                    flight.publish(output_path, conversion_result.get('fast_preset'))
+    timer.record_within('queue', 'convert', conversion_result.get('queue_seconds', 0.0))
+
+    if conversion_result.get('cancelled'):
+        # LibreOffice escribe primero <nombre de entrada><ext> en CONVERTED_FOLDER
+        partial_paths = (output_path, settings.CONVERTED_FOLDER / f"{source_path.stem}{target_ext}")
+        for path in partial_paths:
+            if path.exists():
+                path.unlink()
+        logger.info(f"Conversion cancelled (ID: {file_id})")
+        raise ConversionCancelledException(token.reason if token else 'cancelled')
+
+    if conversion_result.get('deadline_unachievable'):
+        logger.info(f"Conversion rejected, deadline cannot be met (ID: {file_id})")
+        raise DeadlineUnachievableException(
+            conversion_result['estimated_seconds'],
+            conversion_result['remaining_seconds']
+        )
+
+    if not conversion_result['success']:
+        raise ConversionFailedException(
+            conversion_result.get('error', 'Unknown error'),
+            source_format=original_ext,
+            target_format=target_ext
+        )
+
+    logger.info(f"Conversion completed successfully (ID: {file_id})")
+
+    response_data = {
+        'success': True,
+        'file_id': file_id,
+        'source_format': original_ext,
+        'output_format': target_format,
+        'output_size_mb': get_file_size(output_path),
+        'download_url': f'/download/{output_filename}',
+        'timestamp': datetime.utcnow().isoformat()
+    }
+    if conversion_result.get('fast_preset'):
+        response_data['fast_preset'] = True
+    return response_data, conversion_result
@@ -1,9 +1,97 @@
 """
 Clase base para todos los conversores
+
+Cada conversor describe su trabajo en plan(): un generador que produce los
+comandos a ejecutar, recibe el resultado de cada uno y devuelve el
+resultado de la conversión. convert() lo recorre con run_command (un hilo
+bloqueado por comando) y convert_async() con run_command_async (sin hilos,
+cancelable), así que ambas variantes comparten la construcción de
+argumentos y el tratamiento de la salida.
 """
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
 import subprocess
+from .. import metrics
+from ..cancellation import current_token
 from ..config import Config
+from ..logging import logger
+from .supervisor import ProcessLimits, supervise, supervise_async
+
+
+# Consumo de los comandos lanzados en el hilo o tarea actual (ver track_resource_usage)
+_tracking = ContextVar('resource_tracking', default=None)
+
+
+@contextmanager
+def track_resource_usage():
+    """
+    Recoge el consumo de todos los comandos ejecutados en el bloque
+
+    Yields:
+        list: Se rellena con el dict 'resources' de cada comando
+    """
+    records = []
+    token = _tracking.set(records)
+    try:
+        yield records
+    finally:
+        _tracking.reset(token)
+
+
+# Si los conversores deben usar su preset más rápido (ver fast_encoding)
+_fast_encoding = ContextVar('fast_encoding', default=False)
+
+
+@contextmanager
+def fast_encoding(enabled=True):
+    """
+    Pide a los conversores del bloque su preset más rápido
+
+    Se usa cuando una conversión con plazo no llegaría a tiempo con los
+    ajustes normales: la salida puede ser más grande o de menor calidad.
+
+    Args:
+        enabled: False deja los ajustes normales
+    """
+    token = _fast_encoding.set(enabled)
+    try:
+        yield
+    finally:
+        _fast_encoding.reset(token)
+
+
+def fast_encoding_requested():
+    """
+    Returns:
+        bool: True dentro de fast_encoding()
+    """
+    return _fast_encoding.get()
+
+
+def summarize_resource_usage(records):
+    """
+    Agrega el consumo de varios comandos de una misma conversión
+
+    Args:
+        records: Lista de dicts 'resources'
+
+    Returns:
+        dict o None si no se ejecutó ningún comando: {
+            'commands', 'wall_seconds', 'user_seconds',
+            'system_seconds', 'max_rss_kb'
+        }
+    """
+    if not records:
+        return None
+    return {
+        'commands': len(records),
+        'wall_seconds': round(sum(r['wall_seconds'] for r in records), 4),
+        'user_seconds': round(sum(r['user_seconds'] for r in records), 4),
+        'system_seconds': round(sum(r['system_seconds'] for r in records), 4),
+        'max_rss_kb': max(r['max_rss_kb'] for r in records)
+    }
 
 
 class TimeoutException(Exception):
@@ -18,6 +106,38 @@ class BaseConverter(ABC):
     DEFAULT_TIMEOUT = 300
     
     @abstractmethod
+    def plan(self, input_path: str, output_path: str, from_ext: str, to_ext: str):
+        """
+        Describe la conversión como una secuencia de comandos
+        
+        Generador que produce cada comando (lista de argumentos), recibe el
+        dict de run_command correspondiente y termina devolviendo el
+        resultado de la conversión.
+        
+        Args:
+            input_path: Ruta del archivo de entrada
+            output_path: Ruta del archivo de salida
+            from_ext: Extensión del archivo de entrada
+            to_ext: Extensión del archivo de salida
+            
+        Returns:
+            dict: Resultado de la conversión con 'success' y 'error' (si aplica)
+        """
+        pass
+    
+    def has_fast_preset(self, from_ext: str, to_ext: str) -> bool:
+        """
+        Indica si la conversión cambia dentro de fast_encoding()
+        
+        Args:
+            from_ext: Extensión del archivo de entrada
+            to_ext: Extensión del archivo de salida
+            
+        Returns:
+            bool: True si hay un preset más rápido para esta conversión
+        """
+        return False
+    
     def convert(self, input_path: str, output_path: str, from_ext: str, to_ext: str) -> dict:
         """
         Convierte un archivo de un formato a otro
@@ -31,50 +151,150 @@ class BaseConverter(ABC):
         Returns:
             dict: Resultado de la conversión con 'success' y 'error' (si aplica)
         """
-        pass
+        steps = self.plan(input_path, output_path, from_ext, to_ext)
+        try:
+            command = next(steps)
+            while True:
+                command = steps.send(self.run_command(command))
+        except StopIteration as done:
+            return done.value
+        finally:
+            steps.close()
+    
+    async def convert_async(self, input_path: str, output_path: str, from_ext: str, to_ext: str) -> dict:
+        """
+        Variante asyncio de convert
+        
+        Cancelar la tarea mata el comando en curso y cierra el plan (se
+        borran sus directorios temporales).
+        
+        Args:
+            input_path: Ruta del archivo de entrada
+            output_path: Ruta del archivo de salida
+            from_ext: Extensión del archivo de entrada
+            to_ext: Extensión del archivo de salida
+            
+        Returns:
+            dict: Resultado de la conversión con 'success' y 'error' (si aplica)
+        """
+        steps = self.plan(input_path, output_path, from_ext, to_ext)
+        try:
+            command = next(steps)
+            while True:
+                command = steps.send(await self.run_command_async(command))
+        except StopIteration as done:
+            return done.value
+        finally:
+            steps.close()
     
     def run_command(self, command: list, timeout_seconds: int = None) -> dict:
         """
-        Ejecuta un comando con timeout
+        Ejecuta un comando con timeout y mide su consumo
+        
+        El proceso corre bajo el supervisor (grupo propio, límites
+        CONVERTER_*, salida acotada) y se recoge con os.wait4 para obtener
+        su rusage: tiempo de reloj, CPU de usuario y de sistema y memoria
+        residente máxima. Si la conversión tiene un CancellationToken
+        (cancellation_scope) y se activa, se mata el proceso y el resultado
+        lleva 'cancelled'.
         
         Args:
             command: Lista con el comando y argumentos
             timeout_seconds: Timeout en segundos (None usa DEFAULT_TIMEOUT)
             
         Returns:
-            dict: Resultado con 'success', 'stdout', 'stderr', 'error'
+            dict: Resultado con 'success', 'stdout', 'stderr', 'error',
+                'cancelled' (si aplica) y 'resources' ({'wall_seconds',
+                'user_seconds', 'system_seconds', 'max_rss_kb'})
         """
         if timeout_seconds is None:
             timeout_seconds = self.DEFAULT_TIMEOUT
+        token = current_token()
+        if token is not None and token.cancelled:
+            return self._cancelled_result()
         
         try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=timeout_seconds,
-                check=True
-            )
-            return {
-                'success': True,
-                'stdout': result.stdout,
-                'stderr': result.stderr
-            }
-        except subprocess.TimeoutExpired:
+            completed = supervise(command, timeout_seconds, ProcessLimits.from_settings(), token)
+        except Exception as e:
+            return self._spawn_failed(command, e)
+        return self._command_result(command, completed, timeout_seconds)
+    
+    async def run_command_async(self, command: list, timeout_seconds: int = None) -> dict:
+        """
+        Variante asyncio de run_command (mismo formato de resultado)
+        
+        Args:
+            command: Lista con el comando y argumentos
+            timeout_seconds: Timeout en segundos (None usa DEFAULT_TIMEOUT)
+            
+        Returns:
+            dict: Igual que run_command
+        """
+        if timeout_seconds is None:
+            timeout_seconds = self.DEFAULT_TIMEOUT
+        token = current_token()
+        if token is not None and token.cancelled:
+            return self._cancelled_result()
+        
+        try:
+            completed = await supervise_async(command, timeout_seconds, ProcessLimits.from_settings(), token)
+        except Exception as e:
+            return self._spawn_failed(command, e)
+        return self._command_result(command, completed, timeout_seconds)
+    
+    def _cancelled_result(self, resources=None):
+        result = {
+            'success': False,
+            'error': 'Conversion cancelled',
+            'cancelled': True
+        }
+        if resources is not None:
+            result['resources'] = resources
+        return result
+    
+    def _spawn_failed(self, command, error):
+        metrics.observe_subprocess_failure(command)
+        return {
+            'success': False,
+            'error': str(error)
+        }
+    
+    def _command_result(self, command, completed, timeout_seconds):
+        resources = completed['resources']
+        if completed['output_truncated']:
+            logger.debug(f"Output of {os.path.basename(command[0])} truncated to the last bytes")
+        records = _tracking.get()
+        if records is not None:
+            records.append(resources)
+        
+        if completed.get('cancelled'):
+            return self._cancelled_result(resources)
+        
+        if completed['timed_out']:
+            metrics.observe_subprocess_failure(command, timeout=True)
             error_msg = f"Command timed out after {timeout_seconds} seconds: {' '.join(command)}"
             return {
                 'success': False,
                 'error': error_msg,
-                'timeout': True
+                'timeout': True,
+                'resources': resources
             }
-        except subprocess.CalledProcessError as e:
-            return {
-                'success': False,
-                'error': f'Conversion failed: {e.stderr or str(e)}',
-                'returncode': e.returncode
-            }
-        except Exception as e:
+        
+        if completed['returncode'] != 0:
+            metrics.observe_subprocess_failure(command)
+            error = subprocess.CalledProcessError(
+                completed['returncode'], command, completed['stdout'], completed['stderr']
+            )
             return {
                 'success': False,
-                'error': str(e)
+                'error': f'Conversion failed: {error.stderr or str(error)}',
+                'returncode': error.returncode,
+                'resources': resources
             }
+        
+        return {
+            'success': True,
+            'stdout': completed['stdout'],
+            'stderr': completed['stderr'],
+            'resources': resources
+        }
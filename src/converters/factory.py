@@ -1,10 +1,23 @@
+import os
+import time
+
+from .. import metrics
+from ..cancellation import cancellation_scope
+from ..logging import logger
+from .base import fast_encoding, summarize_resource_usage, track_resource_usage
 from .libreoffice import LibreOfficeConverter
 from .imagemagick import ImageMagickConverter
 from .ffmpeg import FFmpegConverter
 from .archive import ArchiveConverter
 
 class ConverterFactory:
-    def __init__(self):
+    def __init__(self, scheduler=None):
+        """
+        Args:
+            scheduler: ConversionScheduler que limita las conversiones
+                simultáneas (None = sin límite)
+        """
+        self.scheduler = scheduler
         self.converters = {
             'libreoffice': LibreOfficeConverter(),
             'imagemagick': ImageMagickConverter(),
@@ -23,13 +36,27 @@ class ConverterFactory:
         Returns:
             Conversor apropiado o None
         """
+        engine = self.get_engine_name(from_ext, to_ext)
+        return self.converters[engine] if engine else None
+
+    def get_engine_name(self, from_ext, to_ext):
+        """
+        Determina qué motor usar basado en las extensiones
+        
+        Args:
+            from_ext: Extensión de origen (ej: '.txt')
+            to_ext: Extensión de destino (ej: '.pdf')
+            
+        Returns:
+            str: 'libreoffice', 'imagemagick', 'ffmpeg', 'archive' o None
+        """
         # Listas de definición (Deben coincidir con los converters individuales)
 
         # Archivos Comprimidos
         archive_input = ['.zip', '.7z', '.rar', '.tar', '.gz', '.bz2', '.xz']
         archive_output = ['.zip', '.7z', '.tar', '.tar.gz', '.gz']
         if from_ext in archive_input and to_ext in archive_output:
-            return self.converters['archive']
+            return 'archive'
 
         # Documentos, Hojas de Cálculo, Presentaciones (LibreOffice)
         doc_input = [
@@ -45,7 +72,7 @@ class ConverterFactory:
         if from_ext in doc_input and to_ext in doc_output:
             # Prioridad: Si es imagen -> imagen, usar ImageMagick.
             # Pero aquí son documentos.
-            return self.converters['libreoffice']
+            return 'libreoffice'
 
         # Imágenes (ImageMagick)
         img_input = [
@@ -57,7 +84,7 @@ class ConverterFactory:
             '.tiff', '.ico', '.pdf', '.svg'
         ]
         if from_ext in img_input and to_ext in img_output:
-            return self.converters['imagemagick']
+            return 'imagemagick'
 
         # Audio / Video (FFmpeg)
         av_input = [
@@ -72,11 +99,12 @@ class ConverterFactory:
             '.opus', '.wma', '.aiff'
         ]
         if from_ext in av_input and to_ext in av_output:
-            return self.converters['ffmpeg']
+            return 'ffmpeg'
 
         return None
 
-    def perform_conversion(self, input_path, output_path, from_ext, to_ext):
+    def perform_conversion(self, input_path, output_path, from_ext, to_ext, token=None, tenant=None, priority=None,
+                           deadline=None):
         """
         Realiza la conversión de archivo
         
@@ -85,11 +113,191 @@ class ConverterFactory:
             output_path: Ruta del archivo de salida
             from_ext: Extensión de origen
             to_ext: Extensión de destino
+            token: CancellationToken de la conversión (None = no cancelable)
+            tenant: Cliente que la pide (reparto de turnos del planificador)
+            priority: Clase de prioridad pedida ('high', 'normal', 'low')
+            deadline: Instante (time.monotonic) en que debe estar terminada
+                (None = sin plazo)
             
         Returns:
-            dict: Resultado de la conversión
+            dict: Resultado de la conversión ('queue_seconds' indica la
+                espera por un turno libre, 'resources' el consumo agregado
+                de los procesos lanzados, 'cancelled' si se canceló,
+                'fast_preset' si se usó el preset más rápido para llegar al
+                plazo y 'deadline_unachievable' con 'estimated_seconds' y
+                'remaining_seconds' si se rechazó porque no llegaba)
         """
-        converter = self.get_converter(from_ext, to_ext)
-        if converter:
-            return converter.convert(input_path, output_path, from_ext, to_ext)
-        return {'success': False, 'error': 'Conversion not supported'}
+        engine = self.get_engine_name(from_ext, to_ext)
+        if not engine:
+            return {'success': False, 'error': 'Conversion not supported'}
+        
+        if self.scheduler is None:
+            return self._run_conversion(engine, input_path, output_path, from_ext, to_ext, token)
+        
+        size_bytes = _input_size(input_path)
+        fast_preset = self.converters[engine].has_fast_preset(from_ext, to_ext)
+        rejected = self._check_deadline(engine, size_bytes, deadline, tenant, priority, fast_preset)
+        if rejected:
+            return rejected
+        
+        # Esperar turno si ya hay MAX_CONCURRENT_CONVERSIONS en curso
+        waiting_since = time.monotonic()
+        with self.scheduler.slot(engine, token=token, tenant=tenant, priority=priority, size_bytes=size_bytes,
+                                 deadline=deadline, fast_preset=fast_preset) as acquired:
+            queue_seconds = time.monotonic() - waiting_since
+            if acquired:
+                fast = self.scheduler.needs_fast_path(engine, size_bytes, deadline, fast_preset)
+                result = self._run_conversion(engine, input_path, output_path, from_ext, to_ext, token, fast)
+                self._record_duration(engine, size_bytes, result, waiting_since + queue_seconds, deadline, fast)
+            elif token is not None and token.cancelled:
+                metrics.CONVERSIONS_CANCELLED.labels(engine, token.reason).inc()
+                result = {'success': False, 'error': 'Conversion cancelled', 'cancelled': True}
+            else:
+                result = self._deadline_unachievable(engine, size_bytes, deadline, tenant, priority, fast_preset)
+        result['queue_seconds'] = queue_seconds
+        return result
+
+    async def perform_conversion_async(self, input_path, output_path, from_ext, to_ext, tenant=None, priority=None,
+                                       deadline=None):
+        """
+        Variante asyncio de perform_conversion
+        
+        Espera turno en el mismo planificador sin bloquear el bucle y
+        ejecuta los comandos con convert_async. Si la tarea se cancela
+        (cliente desconectado, plazo vencido) se mata el proceso en curso y
+        se libera el turno.
+        
+        Args:
+            input_path: Ruta del archivo de entrada
+            output_path: Ruta del archivo de salida
+            from_ext: Extensión de origen
+            to_ext: Extensión de destino
+            tenant, priority, deadline: Ver perform_conversion
+            
+        Returns:
+            dict: Igual que perform_conversion
+        """
+        engine = self.get_engine_name(from_ext, to_ext)
+        if not engine:
+            return {'success': False, 'error': 'Conversion not supported'}
+        
+        if self.scheduler is None:
+            return await self._run_conversion_async(engine, input_path, output_path, from_ext, to_ext)
+        
+        size_bytes = _input_size(input_path)
+        fast_preset = self.converters[engine].has_fast_preset(from_ext, to_ext)
+        rejected = self._check_deadline(engine, size_bytes, deadline, tenant, priority, fast_preset)
+        if rejected:
+            return rejected
+        
+        waiting_since = time.monotonic()
+        async with self.scheduler.slot_async(engine, tenant=tenant, priority=priority, size_bytes=size_bytes,
+                                             deadline=deadline, fast_preset=fast_preset) as acquired:
+            queue_seconds = time.monotonic() - waiting_since
+            if acquired:
+                fast = self.scheduler.needs_fast_path(engine, size_bytes, deadline, fast_preset)
+                result = await self._run_conversion_async(engine, input_path, output_path, from_ext, to_ext, fast)
+                self._record_duration(engine, size_bytes, result, waiting_since + queue_seconds, deadline, fast)
+            else:
+                result = self._deadline_unachievable(engine, size_bytes, deadline, tenant, priority, fast_preset)
+        result['queue_seconds'] = queue_seconds
+        return result
+
+    def estimate_duration(self, input_path, from_ext, to_ext):
+        """
+        Duración estimada de la conversión, sin espera de turno, con el
+        preset más rápido que tenga
+        
+        Args:
+            input_path: Ruta del archivo de entrada
+            from_ext: Extensión de origen
+            to_ext: Extensión de destino
+            
+        Returns:
+            float: Segundos estimados (0.0 sin planificador o sin motor)
+        """
+        engine = self.get_engine_name(from_ext, to_ext)
+        if not engine or self.scheduler is None:
+            return 0.0
+        fast_preset = self.converters[engine].has_fast_preset(from_ext, to_ext)
+        return self.scheduler.estimate_duration(engine, _input_size(input_path), fast_preset)
+
+    def _check_deadline(self, engine, size_bytes, deadline, tenant, priority, fast_preset):
+        # Rechazar de entrada es mejor que convertir y no llegar
+        if deadline is None:
+            return None
+        estimated = self.scheduler.estimate_latency(engine, size_bytes, deadline, tenant, priority, fast_preset)
+        if estimated <= deadline - time.monotonic():
+            return None
+        result = self._deadline_unachievable(engine, size_bytes, deadline, tenant, priority, fast_preset, estimated)
+        result['queue_seconds'] = 0.0
+        return result
+
+    def _deadline_unachievable(self, engine, size_bytes, deadline, tenant, priority, fast_preset, estimated=None):
+        if estimated is None:
+            estimated = self.scheduler.estimate_latency(engine, size_bytes, deadline, tenant, priority, fast_preset)
+        metrics.DEADLINE_REQUESTS.labels(engine, 'rejected').inc()
+        return {
+            'success': False,
+            'error': 'Deadline cannot be met',
+            'deadline_unachievable': True,
+            'estimated_seconds': estimated,
+            'remaining_seconds': deadline - time.monotonic()
+        }
+
+    def _record_duration(self, engine, size_bytes, result, started, deadline=None, fast=False):
+        # Solo las conversiones completas dicen cuánto cuesta un motor
+        if not result.get('success'):
+            return
+        self.scheduler.record_duration(engine, size_bytes, time.monotonic() - started, fast)
+        if fast:
+            result['fast_preset'] = True
+        if deadline is not None:
+            outcome = 'met' if time.monotonic() <= deadline else 'missed'
+            metrics.DEADLINE_REQUESTS.labels(engine, f'{outcome}_fast' if fast else outcome).inc()
+
+    def _run_conversion(self, engine, input_path, output_path, from_ext, to_ext, token=None, fast=False):
+        started = time.monotonic()
+        with track_resource_usage() as records, cancellation_scope(token), fast_encoding(fast):
+            result = self.converters[engine].convert(input_path, output_path, from_ext, to_ext)
+        if token is not None and token.cancelled:
+            # Los conversores traducen el fallo a su propio mensaje
+            result = {'success': False, 'error': 'Conversion cancelled', 'cancelled': True}
+            metrics.CONVERSIONS_CANCELLED.labels(engine, token.reason).inc()
+        return self._finish_conversion(engine, input_path, output_path, from_ext, to_ext, result, records, started)
+
+    async def _run_conversion_async(self, engine, input_path, output_path, from_ext, to_ext, fast=False):
+        started = time.monotonic()
+        with track_resource_usage() as records, fast_encoding(fast):
+            result = await self.converters[engine].convert_async(input_path, output_path, from_ext, to_ext)
+        return self._finish_conversion(engine, input_path, output_path, from_ext, to_ext, result, records, started)
+
+    def _finish_conversion(self, engine, input_path, output_path, from_ext, to_ext, result, records, started):
+        resources = summarize_resource_usage(records)
+        if resources:
+            result['resources'] = resources
+            metrics.observe_resources(engine, from_ext, to_ext, resources)
+        
+        success = bool(result.get('success'))
+        duration = time.monotonic() - started
+        logger.info(
+            f"Conversion {from_ext} → {to_ext} {'succeeded' if success else 'failed'}",
+            extra={'engine': engine, 'duration_ms': round(duration * 1000, 1)}
+        )
+        metrics.observe_conversion(
+            engine,
+            from_ext,
+            to_ext,
+            duration,
+            success,
+            input_bytes=os.path.getsize(input_path) if os.path.exists(input_path) else 0,
+            output_bytes=os.path.getsize(output_path) if success and os.path.exists(output_path) else 0
+        )
+        return result
+
+
+def _input_size(input_path):
+    try:
+        return os.path.getsize(input_path)
+    except OSError:
+        return 0
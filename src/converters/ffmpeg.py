@@ -1,7 +1,20 @@
-from .base import BaseConverter
+from .base import BaseConverter, fast_encoding_requested
+
+# Opciones del codificador por defecto de cada contenedor que más aceleran
+# la codificación (libx264 para mp4/mov/mkv, libvpx-vp9 para webm)
+FAST_PRESET_ARGS = {
+    '.mp4': ['-preset', 'ultrafast'],
+    '.mov': ['-preset', 'ultrafast'],
+    '.mkv': ['-preset', 'ultrafast'],
+    '.webm': ['-deadline', 'realtime', '-cpu-used', '8']
+}
 
 class FFmpegConverter(BaseConverter):
-    def convert(self, input_path: str, output_path: str, from_ext: str, to_ext: str) -> dict:
+    def has_fast_preset(self, from_ext: str, to_ext: str) -> bool:
+        # Solo los contenedores de vídeo con FAST_PRESET_ARGS cambian
+        return to_ext in FAST_PRESET_ARGS
+
+    def plan(self, input_path: str, output_path: str, from_ext: str, to_ext: str):
         # Listas extendidas de formatos soportados
         video_input = [
             '.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.webm',
@@ -22,19 +35,20 @@ class FFmpegConverter(BaseConverter):
 
         # Video
         if from_ext in video_input and to_ext in video_output:
-            return self.run_command([
-                'ffmpeg', '-i', input_path, '-y', output_path
+            preset = FAST_PRESET_ARGS.get(to_ext, []) if fast_encoding_requested() else []
+            return (yield [
+                'ffmpeg', '-i', input_path, *preset, '-y', output_path
             ])
 
         # Audio
         elif from_ext in audio_input and to_ext in audio_output:
-            return self.run_command([
+            return (yield [
                 'ffmpeg', '-i', input_path, '-y', output_path
             ])
 
         # Extracción de Audio desde Video (Video -> Audio)
         elif from_ext in video_input and to_ext in audio_output:
-             return self.run_command([
+             return (yield [
                 'ffmpeg', '-i', input_path, '-vn', '-y', output_path
             ])
 
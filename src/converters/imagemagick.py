@@ -1,7 +1,7 @@
 from .base import BaseConverter
 
 class ImageMagickConverter(BaseConverter):
-    def convert(self, input_path: str, output_path: str, from_ext: str, to_ext: str) -> dict:
+    def plan(self, input_path: str, output_path: str, from_ext: str, to_ext: str):
         supported_input = [
             '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif',
             '.webp', '.svg', '.heic', '.avif', '.ico', '.psd', '.xcf'
@@ -12,7 +12,7 @@ class ImageMagickConverter(BaseConverter):
         ]
 
         if from_ext in supported_input and to_ext in supported_output:
-            return self.run_command([
+            return (yield [
                 'convert', input_path, output_path
             ])
         return {'success': False, 'error': 'Conversion not supported by ImageMagick'}
@@ -4,7 +4,7 @@ import os
 import shutil
 
 class LibreOfficeConverter(BaseConverter):
-    def convert(self, input_path: str, output_path: str, from_ext: str, to_ext: str) -> dict:
+    def plan(self, input_path: str, output_path: str, from_ext: str, to_ext: str):
         """
         Convierte documentos, hojas de cálculo y presentaciones usando LibreOffice.
         Soporta una amplia gama de formatos de Office y Texto.
@@ -59,13 +59,13 @@ class LibreOfficeConverter(BaseConverter):
 
         # Ejecutar conversión
         # --convert-to identifica el filtro de salida basado en la extensión proporcionada
-        result = self.run_command([
+        result = yield [
             'libreoffice',
             '--headless',
             '--convert-to', output_format,
             '--outdir', Config.CONVERTED_FOLDER,
             input_path
-        ])
+        ]
         
         if not result['success']:
             return result
@@ -0,0 +1,426 @@
+"""
+Supervisor de los procesos externos de conversión
+
+Cada herramienta (soffice, convert, ffmpeg, 7z...) se lanza en su propio
+grupo de procesos con límites de memoria (RLIMIT_AS) y CPU (RLIMIT_CPU),
+prioridad reducida (nice) y, opcionalmente, afinidad de CPU. Al terminar o
+al vencer el timeout se mata el grupo entero, así que los procesos
+auxiliares no sobreviven a la conversión; lo mismo ocurre si se activa el
+CancellationToken de la conversión. De stdout y stderr solo se conservan
+los últimos bytes (búfer circular acotado).
+
+supervise_async hace lo mismo desde un bucle asyncio sin ocupar hilos: las
+tuberías se leen con add_reader y el fin del proceso se espera con un
+pidfd, así que cancelar la tarea (cliente desconectado, plazo vencido)
+mata el grupo y recoge el proceso.
+"""
+import asyncio
+import functools
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+
+from ..config import settings
+from ..exceptions import InvalidConfigException
+
+
+# Herramienta que aplica cada límite y variable que lo configura
+LIMIT_TOOLS = {
+    'prlimit': 'CONVERTER_MEMORY_LIMIT_MB / CONVERTER_CPU_LIMIT_SECONDS',
+    'nice': 'CONVERTER_NICE',
+    'taskset': 'CONVERTER_CPU_AFFINITY'
+}
+
+# Margen entre el límite blando de CPU (SIGXCPU) y el duro (SIGKILL)
+CPU_LIMIT_GRACE_SECONDS = 5
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def parse_cpu_list(value):
+    """
+    Interpreta una lista de CPUs al estilo de taskset ('0-3,6')
+
+    Args:
+        value: Cadena con CPUs y rangos separados por comas
+
+    Returns:
+        set: Índices de CPU (vacío si value está vacío)
+    """
+    cpus = set()
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+class ProcessLimits:
+    """
+    Límites aplicados a cada proceso de conversión
+    """
+
+    def __init__(self, memory_mb=0, cpu_seconds=0, nice=0, cpu_affinity=None,
+                 output_limit_bytes=64 * 1024):
+        """
+        Args:
+            memory_mb: Espacio de direcciones máximo en MB (0 = sin límite)
+            cpu_seconds: Tiempo de CPU máximo en segundos (0 = sin límite)
+            nice: Incremento de nice del proceso
+            cpu_affinity: Conjunto de CPUs permitidas (None = todas)
+            output_limit_bytes: Bytes conservados de stdout y de stderr
+        """
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.nice = nice
+        self.cpu_affinity = cpu_affinity or None
+        self.output_limit_bytes = output_limit_bytes
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Returns:
+            ProcessLimits: Límites configurados con CONVERTER_*
+        """
+        return cls(
+            memory_mb=settings.CONVERTER_MEMORY_LIMIT_MB,
+            cpu_seconds=settings.CONVERTER_CPU_LIMIT_SECONDS,
+            nice=settings.CONVERTER_NICE,
+            cpu_affinity=parse_cpu_list(settings.CONVERTER_CPU_AFFINITY),
+            output_limit_bytes=settings.CONVERTER_OUTPUT_LIMIT_KB * 1024
+        )
+
+    def wrap(self, command):
+        """
+        Antepone al comando las herramientas que aplican los límites
+
+        prlimit, nice y taskset (util-linux y coreutils) fijan el límite y
+        hacen exec del siguiente, así que el comando arranca ya limitado y
+        conserva el pid. Se evita preexec_fn, que no es seguro en un proceso
+        con hilos y obliga a usar fork en lugar de vfork/posix_spawn.
+
+        Args:
+            command: Lista con el comando y argumentos
+
+        Returns:
+            list: Comando con los prefijos necesarios (igual si no hay límites)
+
+        Raises:
+            InvalidConfigException: Si falta una herramienta (ver check_tools)
+        """
+        self.check_tools()
+        prefix = []
+        rlimits = []
+        if self.memory_mb:
+            rlimits.append(f'--as={self.memory_mb * 1024 * 1024}')
+        if self.cpu_seconds:
+            rlimits.append(f'--cpu={self.cpu_seconds}:{self.cpu_seconds + CPU_LIMIT_GRACE_SECONDS}')
+        if rlimits:
+            prefix += [_limit_tool('prlimit'), *rlimits, '--']
+        if self.nice:
+            prefix += [_limit_tool('nice'), '-n', str(self.nice)]
+        if self.cpu_affinity:
+            cpus = ','.join(str(cpu) for cpu in sorted(self.cpu_affinity))
+            prefix += [_limit_tool('taskset'), '-c', cpus]
+        return prefix + list(command)
+
+    def check_tools(self):
+        """
+        Comprueba que están instaladas las herramientas de los límites
+        configurados; sin ellas las herramientas correrían sin límites
+
+        Raises:
+            InvalidConfigException: Con la primera herramienta que falta
+        """
+        needed = {
+            'prlimit': self.memory_mb or self.cpu_seconds,
+            'nice': self.nice,
+            'taskset': self.cpu_affinity
+        }
+        for name, configured in needed.items():
+            if configured and _limit_tool(name) is None:
+                raise InvalidConfigException(
+                    f"{name} is required by the converter limits but is not installed",
+                    config_key=LIMIT_TOOLS[name]
+                )
+
+
+@functools.lru_cache(maxsize=None)
+def _limit_tool(name):
+    return shutil.which(name)
+
+
+class OutputBuffer:
+    """
+    Búfer circular que conserva los últimos 'limit' bytes leídos
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.total_bytes = 0
+        self._data = bytearray()
+
+    def append(self, chunk):
+        self.total_bytes += len(chunk)
+        self._data += chunk
+        if len(self._data) > self.limit:
+            del self._data[:-self.limit]
+
+    @property
+    def truncated(self):
+        return self.total_bytes > len(self._data)
+
+    def text(self):
+        return self._data.decode('utf-8', errors='replace')
+
+
+def _drain(stream, buffer):
+    try:
+        while True:
+            chunk = stream.read1(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer.append(chunk)
+    finally:
+        stream.close()
+
+
+def _kill_group(pgid):
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _spawn(command, limits):
+    return subprocess.Popen(
+        limits.wrap(command),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True
+    )
+
+
+def _reap(process):
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return rusage
+
+
+def _completed(process, stdout, stderr, timed_out, wall_seconds, rusage, cancelled=False):
+    return {
+        'returncode': process.returncode,
+        'stdout': stdout.text(),
+        'stderr': stderr.text(),
+        'timed_out': timed_out,
+        'cancelled': cancelled,
+        'output_truncated': stdout.truncated or stderr.truncated,
+        'resources': {
+            'wall_seconds': round(wall_seconds, 4),
+            'user_seconds': round(rusage.ru_utime, 4),
+            'system_seconds': round(rusage.ru_stime, 4),
+            'max_rss_kb': rusage.ru_maxrss
+        }
+    }
+
+
+def supervise(command, timeout_seconds, limits=None, token=None):
+    """
+    Ejecuta un comando bajo supervisión
+
+    Args:
+        command: Lista con el comando y argumentos
+        timeout_seconds: Tiempo máximo de reloj
+        limits: ProcessLimits (None = sin límites)
+        token: CancellationToken; al activarse se mata el grupo
+
+    Returns:
+        dict: {'returncode', 'stdout', 'stderr', 'timed_out', 'cancelled',
+            'output_truncated', 'resources'} donde resources contiene
+            'wall_seconds', 'user_seconds', 'system_seconds' y 'max_rss_kb'
+    """
+    limits = limits or ProcessLimits()
+    started = time.monotonic()
+    process = _spawn(command, limits)
+    # Con start_new_session el hijo lidera un grupo cuyo id es su pid
+    pgid = process.pid
+
+    stdout = OutputBuffer(limits.output_limit_bytes)
+    stderr = OutputBuffer(limits.output_limit_bytes)
+    readers = [
+        threading.Thread(target=_drain, args=(process.stdout, stdout), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, stderr), daemon=True)
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        _kill_group(pgid)
+
+    cancelled = threading.Event()
+
+    def cancel():
+        cancelled.set()
+        _kill_group(pgid)
+
+    timer = threading.Timer(timeout_seconds, kill)
+    timer.daemon = True
+    timer.start()
+    remove_callback = token.add_callback(cancel) if token is not None else None
+    try:
+        # Esperar sin recoger: el pid (y el grupo) siguen reservados
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    finally:
+        timer.cancel()
+        if remove_callback is not None:
+            remove_callback()
+
+    # Matar auxiliares que sigan vivos (y que mantendrían abiertas las tuberías)
+    _kill_group(pgid)
+    rusage = _reap(process)
+    wall_seconds = time.monotonic() - started
+    for reader in readers:
+        reader.join()
+
+    return _completed(process, stdout, stderr, timed_out.is_set(), wall_seconds, rusage, cancelled.is_set())
+
+
+def _watch_pipe(loop, stream, buffer):
+    """
+    Vuelca una tubería en 'buffer' desde el bucle de eventos
+
+    Returns:
+        asyncio.Future: Se completa al llegar EOF
+    """
+    fd = stream.fileno()
+    os.set_blocking(fd, False)
+    eof = loop.create_future()
+
+    def on_readable():
+        try:
+            chunk = os.read(fd, READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        if chunk:
+            buffer.append(chunk)
+        elif not eof.done():
+            eof.set_result(None)
+
+    def close(_):
+        loop.remove_reader(fd)
+        stream.close()
+
+    eof.add_done_callback(close)
+    loop.add_reader(fd, on_readable)
+    return eof
+
+
+async def _wait_exit(pid):
+    """Espera a que el proceso termine sin recogerlo."""
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        # Sin pidfd (kernel < 5.3, macOS) se espera en un hilo
+        await asyncio.to_thread(os.waitid, os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+        return
+
+    loop = asyncio.get_running_loop()
+    exited = loop.create_future()
+    loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+    try:
+        await exited
+    finally:
+        loop.remove_reader(pidfd)
+        os.close(pidfd)
+
+
+async def _reap_killed(process):
+    """
+    Recoge un hijo ya matado sin bloquear el bucle
+
+    Se llama mientras se propaga una cancelación: si la tarea vuelve a
+    cancelarse se sigue esperando, para no dejar un zombi ni llamar a
+    wait4 bloqueante antes de que salga.
+    """
+    exited = asyncio.ensure_future(_wait_exit(process.pid))
+    while not exited.done():
+        try:
+            await asyncio.shield(exited)
+        except asyncio.CancelledError:
+            continue
+    _reap(process)
+
+
+async def supervise_async(command, timeout_seconds, limits=None, token=None):
+    """
+    Versión asyncio de supervise
+
+    Si la tarea se cancela mientras el comando corre, se mata el grupo de
+    procesos, se recoge el hijo y se propaga CancelledError.
+
+    Args:
+        command: Lista con el comando y argumentos
+        timeout_seconds: Tiempo máximo de reloj
+        limits: ProcessLimits (None = sin límites)
+        token: CancellationToken; al activarse se mata el grupo
+
+    Returns:
+        dict: Mismo formato que supervise
+    """
+    limits = limits or ProcessLimits()
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    process = _spawn(command, limits)
+    pgid = process.pid
+
+    stdout = OutputBuffer(limits.output_limit_bytes)
+    stderr = OutputBuffer(limits.output_limit_bytes)
+    pipes = [
+        _watch_pipe(loop, process.stdout, stdout),
+        _watch_pipe(loop, process.stderr, stderr)
+    ]
+
+    timed_out = False
+    cancelled = []
+
+    def cancel():
+        cancelled.append(True)
+        _kill_group(pgid)
+
+    remove_callback = token.add_callback(cancel) if token is not None else None
+    try:
+        try:
+            await asyncio.wait_for(_wait_exit(process.pid), timeout_seconds)
+        except asyncio.TimeoutError:
+            timed_out = True
+        _kill_group(pgid)
+        if timed_out:
+            # Tras SIGKILL el proceso puede tardar un instante en salir
+            await _wait_exit(process.pid)
+        rusage = _reap(process)
+        wall_seconds = time.monotonic() - started
+        await asyncio.gather(*pipes)
+    except BaseException:
+        _kill_group(pgid)
+        if process.returncode is None:
+            await _reap_killed(process)
+        for pipe in pipes:
+            pipe.cancel()
+        raise
+    finally:
+        if remove_callback is not None:
+            remove_callback()
+
+    return _completed(process, stdout, stderr, timed_out, wall_seconds, rusage, bool(cancelled))
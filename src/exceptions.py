@@ -96,6 +96,69 @@ class ConversionFailedException(FileConverterException):
         )
 
 
+class ConversionTimeoutException(FileConverterException):
+    """Se lanza cuando la conversión no termina dentro del plazo."""
+    
+    def __init__(self, deadline_seconds: float, source_format: str = None, target_format: str = None):
+        details = {'deadline_seconds': deadline_seconds}
+        if source_format:
+            details['source_format'] = source_format
+        if target_format:
+            details['target_format'] = target_format
+        
+        super().__init__(
+            message=f'Conversion did not finish within {deadline_seconds} seconds',
+            error_code='CONVERSION_TIMEOUT',
+            status_code=504,
+            details=details
+        )
+
+
+class DeadlineUnachievableException(FileConverterException):
+    """Se lanza cuando una conversión con max_latency no puede terminar a tiempo."""
+    
+    def __init__(self, estimated_seconds: float, remaining_seconds: float):
+        super().__init__(
+            message='Conversion cannot finish within the requested max_latency',
+            error_code='DEADLINE_UNACHIEVABLE',
+            status_code=503,
+            details={
+                'estimated_seconds': round(estimated_seconds, 2),
+                'remaining_seconds': round(max(remaining_seconds, 0.0), 2)
+            }
+        )
+
+
+class ConversionCancelledException(FileConverterException):
+    """Se lanza cuando la conversión se cancela (cliente desconectado o DELETE del job)."""
+    
+    def __init__(self, reason: str = 'cancelled'):
+        super().__init__(
+            message='Conversion cancelled',
+            error_code='CONVERSION_CANCELLED',
+            # 499: código habitual de "el cliente cerró la petición"
+            status_code=499,
+            details={'reason': reason}
+        )
+
+
+class InvalidParameterException(FileConverterException):
+    """Se lanza cuando un parámetro de la petición tiene un valor inválido."""
+    
+    def __init__(self, parameter: str, value, allowed: list = None):
+        message = f"Invalid value for '{parameter}': {value}"
+        details = {'parameter': parameter, 'value': value}
+        if allowed:
+            details['allowed'] = allowed
+        
+        super().__init__(
+            message=message,
+            error_code='INVALID_PARAMETER',
+            status_code=400,
+            details=details
+        )
+
+
 class FileTooLargeException(FileConverterException):
     """Se lanza cuando el archivo excede el tamaño máximo."""
     
@@ -127,6 +190,30 @@ class FileNotFoundException(FileConverterException):
         )
 
 
+class JobNotFoundException(FileConverterException):
+    """Se lanza cuando no existe el job solicitado."""
+    
+    def __init__(self, job_id: str):
+        super().__init__(
+            message=f"Job not found: {job_id}",
+            error_code='JOB_NOT_FOUND',
+            status_code=404,
+            details={'job_id': job_id}
+        )
+
+
+class JobAbandonedException(FileConverterException):
+    """Se lanza cuando un job agota sus intentos porque su worker murió en cada uno."""
+    
+    def __init__(self, attempts: int):
+        super().__init__(
+            message='Job abandoned by its worker',
+            error_code='JOB_ABANDONED',
+            status_code=500,
+            details={'attempts': attempts}
+        )
+
+
 class OCRDisabledException(FileConverterException):
     """Se lanza cuando OCR está deshabilitado."""
     
@@ -0,0 +1,177 @@
+"""
+Estado de salud del servicio
+
+Un hilo en segundo plano toma periódicamente una instantánea del sistema
+(CPU, memoria, disco), de las carpetas de trabajo, de los motores
+instalados y de los idiomas OCR. Los endpoints de salud solo leen esa
+instantánea, así que responden al instante y nunca lanzan procesos.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+
+import psutil
+
+
+logger = logging.getLogger(__name__)
+
+
+# Ejecutables que delatan cada motor (basta con encontrar uno)
+ENGINE_BINARIES = {
+    'libreoffice': ('soffice', 'libreoffice'),
+    'imagemagick': ('magick', 'convert'),
+    'ffmpeg': ('ffmpeg',),
+    'tesseract': ('tesseract',),
+    '7z': ('7z', '7za')
+}
+
+
+class HealthSampler:
+    """
+    Mantiene una instantánea de salud actualizada en segundo plano
+    """
+
+    def __init__(self, interval_seconds=5.0, folders=None, languages_provider=None):
+        """
+        Inicializa el muestreador (el hilo arranca con la primera consulta)
+
+        Args:
+            interval_seconds: Segundos entre muestras
+            folders: {nombre: Path} de carpetas cuya existencia se comprueba
+            languages_provider: Callable que devuelve los idiomas OCR
+                instalados; solo se invoca desde el hilo de fondo
+        """
+        self.interval_seconds = interval_seconds
+        self.folders = folders or {}
+        self.languages_provider = languages_provider
+        self.started_at = time.time()
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def ensure_started(self):
+        """
+        Arranca el hilo de muestreo si no está corriendo en este proceso
+
+        Comprueba el PID porque los workers creados con fork heredan el
+        objeto pero no el hilo.
+        """
+        if self._is_running():
+            return
+        with self._lock:
+            if self._is_running():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='health-sampler',
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo de muestreo"""
+        self._stop.set()
+
+    def _is_running(self):
+        return (
+            self._thread is not None
+            and self._pid == os.getpid()
+            and self._thread.is_alive()
+        )
+
+    def _run(self):
+        # La primera llamada sin intervalo solo fija la referencia de CPU
+        psutil.cpu_percent(interval=None)
+        while not self._stop.is_set():
+            try:
+                self.sample(include_languages=True)
+            except Exception as e:
+                logger.error(f"Health sampling failed: {str(e)}")
+            self._stop.wait(self.interval_seconds)
+
+    def sample(self, include_languages=False):
+        """
+        Toma una muestra nueva
+
+        Args:
+            include_languages: Consultar los idiomas OCR (puede lanzar
+                Tesseract, por eso solo se hace desde el hilo de fondo)
+
+        Returns:
+            dict: Instantánea (ver snapshot)
+        """
+        disk_usage = psutil.disk_usage('/')
+        memory_info = psutil.virtual_memory()
+
+        previous = self._snapshot
+        languages = previous['languages'] if previous else []
+        if include_languages and self.languages_provider is not None:
+            languages = list(self.languages_provider())
+
+        snapshot = {
+            'sampled_at': time.time(),
+            'monotonic': time.monotonic(),
+            'system': {
+                'cpu_usage_percent': psutil.cpu_percent(interval=None),
+                'memory_usage_percent': memory_info.percent,
+                'memory_available_mb': memory_info.available / (1024 * 1024),
+                'disk_usage_percent': disk_usage.percent,
+                'disk_free_gb': disk_usage.free / (1024 ** 3)
+            },
+            'folders': {name: path.exists() for name, path in self.folders.items()},
+            'engines': {
+                name: any(shutil.which(binary) for binary in binaries)
+                for name, binaries in ENGINE_BINARIES.items()
+            },
+            'languages': languages
+        }
+        self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self):
+        """
+        Devuelve la última instantánea
+
+        Si el hilo aún no ha tomado ninguna, toma una sin idiomas (no lanza
+        procesos).
+
+        Returns:
+            dict: {
+                'sampled_at': float (epoch),
+                'monotonic': float,
+                'system': dict,
+                'folders': {nombre: bool},
+                'engines': {motor: bool},
+                'languages': list
+            }
+        """
+        self.ensure_started()
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.sample()
+        return snapshot
+
+    def age_seconds(self, snapshot):
+        """
+        Antigüedad de una instantánea
+
+        Args:
+            snapshot: dict devuelto por snapshot()
+
+        Returns:
+            float: Segundos desde que se tomó
+        """
+        return time.monotonic() - snapshot['monotonic']
+
+    def uptime_seconds(self):
+        """
+        Returns:
+            float: Segundos desde que arrancó el proceso
+        """
+        return time.time() - self.started_at
@@ -0,0 +1,947 @@
+"""
+Conversiones en modo job
+
+POST /convert con mode=job guarda la subida, encola el job en el broker y
+responde 202 con su id. Los jobs los ejecuta un JobWorker: los hilos de la
+propia API (JOB_WORKERS por proceso) y/o procesos independientes
+(python -m src.worker) que comparten el broker y las carpetas
+UPLOAD_FOLDER y CONVERTED_FOLDER. Con JOB_WORKERS=0 la API solo encola.
+
+Brokers (JOB_BROKER):
+    sqlite: TEMP_FOLDER/jobs.sqlite3; sirve para los procesos de un host o
+        para varios nodos sobre un volumen compartido con locks POSIX.
+    redis: REDIS_URL; requiere el paquete redis.
+
+Los jobs en cola se reparten como en ConversionScheduler: primero la clase
+de prioridad y, dentro de ella, por turnos entre clientes (API keys), cada
+vez al que hace más que no recibe un job; los de un mismo cliente salen
+por orden de llegada. Así un cliente con cientos de vídeos en cola no
+ocupa todos los hilos de JOB_WORKERS.
+
+Un worker reclama un job con un lease de JOB_LEASE_SECONDS que renueva
+mientras lo ejecuta. Si el worker muere, el lease vence y el siguiente
+worker que busque trabajo lo devuelve a la cola; tras JOB_MAX_ATTEMPTS
+intentos el job falla con JOB_ABANDONED para que un archivo que tumba al
+worker no lo haga en bucle. La ejecución es "al menos una vez".
+
+Cancelar un job en cola lo descarta antes de empezar; cancelar uno en
+curso marca cancel_requested y el worker que lo ejecuta, al renovar el
+lease, activa su CancellationToken, que mata el grupo de procesos de la
+herramienta.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+
+from src.cancellation import CancellationToken
+from src.config import settings
+from src.exceptions import ConversionCancelledException, FileConverterException, JobAbandonedException
+from src.logging import logger
+from src.scheduler import ANONYMOUS_TENANT, DEFAULT_PRIORITY, PRIORITIES, effective_priority, parse_tenant_map
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Motivo de cancelación de los jobs que un worker devuelve a la cola al parar
+WORKER_SHUTDOWN = 'worker_shutdown'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    source_path TEXT NOT NULL,
+    target_format TEXT NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    options TEXT,
+    tenant TEXT NOT NULL DEFAULT 'anonymous',
+    priority TEXT NOT NULL DEFAULT 'normal'
+)
+"""
+
+# Turno de cada cliente en el reparto: el de last_claim más bajo va primero
+TENANTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_tenants (
+    tenant TEXT PRIMARY KEY,
+    last_claim INTEGER NOT NULL
+)
+"""
+
+PRIORITY_ORDER = 'CASE jobs.priority ' + ' '.join(
+    f"WHEN '{priority}' THEN {rank}" for rank, priority in enumerate(PRIORITIES)
+) + ' END'
+
+# Columnas que faltan en bases de datos creadas por versiones anteriores
+ADDED_COLUMNS = {
+    'attempts': 'INTEGER NOT NULL DEFAULT 0',
+    'lease_owner': 'TEXT',
+    'lease_expires_at': 'REAL',
+    'options': 'TEXT',
+    'tenant': "TEXT NOT NULL DEFAULT 'anonymous'",
+    'priority': "TEXT NOT NULL DEFAULT 'normal'"
+}
+
+
+def _dumps(value):
+    return json.dumps(value) if value is not None else None
+
+
+def _queue_of(options):
+    # Cliente y clase con los que el job espera en el broker
+    tenant = options.get('tenant') or ANONYMOUS_TENANT
+    tenant_priorities = parse_tenant_map(settings.SCHEDULER_TENANT_PRIORITIES)
+    return tenant, effective_priority(tenant, options.get('priority'), tenant_priorities)
+
+
+class JobStore:
+    """
+    Broker de jobs sobre SQLite, compartido entre procesos
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: Archivo SQLite (None = TEMP_FOLDER/jobs.sqlite3)
+        """
+        self.path = str(path or Path(settings.TEMP_FOLDER) / 'jobs.sqlite3')
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                    connection.execute('PRAGMA journal_mode=WAL')
+                    connection.execute(SCHEMA)
+                    connection.execute(TENANTS_SCHEMA)
+                    existing = {row['name'] for row in connection.execute('PRAGMA table_info(jobs)')}
+                    for column, definition in ADDED_COLUMNS.items():
+                        if column not in existing:
+                            connection.execute(f'ALTER TABLE jobs ADD COLUMN {column} {definition}')
+                    self._initialized = True
+        return connection
+
+    def create(self, source_path, target_format, options=None):
+        """
+        Args:
+            options: Argumentos adicionales del runner (cliente, prioridad...)
+
+        Returns:
+            str: Id del nuevo job (en cola)
+        """
+        job_id = uuid.uuid4().hex
+        options = options or {}
+        tenant, priority = _queue_of(options)
+        with closing(self._connect()) as db:
+            db.execute(
+                'INSERT INTO jobs (id, status, source_path, target_format, created_at, options, tenant, priority) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, QUEUED, str(source_path), target_format, time.time(), _dumps(options), tenant, priority)
+            )
+        return job_id
+
+    def get(self, job_id):
+        """
+        Returns:
+            dict o None: Fila del job
+        """
+        with closing(self._connect()) as db:
+            row = db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim(self, owner, lease_seconds, max_attempts):
+        """
+        Reclama el siguiente job en cola
+
+        Clase de prioridad más alta; dentro de ella, el cliente que hace
+        más que no recibe un job y, de ese cliente, el más antiguo. Antes
+        recupera los jobs cuyo lease venció: vuelven a la cola, o
+        terminan si estaban cancelados o agotaron max_attempts (y se borra
+        su subida, porque ningún worker llegará a hacerlo).
+
+        Args:
+            owner: Identificador del worker
+            lease_seconds: Duración del lease
+            max_attempts: Intentos máximos por job
+
+        Returns:
+            dict o None: Fila del job reclamado
+        """
+        now = time.time()
+        with closing(self._connect()) as db:
+            # Los workers ociosos sondean a menudo: sin trabajo no se toma el lock de escritura
+            pending = db.execute(
+                'SELECT 1 FROM jobs WHERE (status = ? AND cancel_requested = 0) OR (status = ? AND lease_expires_at < ?) '
+                'LIMIT 1',
+                (QUEUED, RUNNING, now)
+            ).fetchone()
+            if pending is None:
+                return None
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                expired = db.execute(
+                    'SELECT id, attempts, cancel_requested, source_path FROM jobs '
+                    'WHERE status = ? AND lease_expires_at < ?',
+                    (RUNNING, now)
+                ).fetchall()
+                abandoned = [
+                    row['source_path'] for row in expired if self._recover(db, row, now, max_attempts) != QUEUED
+                ]
+                row = db.execute(
+                    'SELECT jobs.id, jobs.tenant FROM jobs '
+                    'LEFT JOIN job_tenants ON job_tenants.tenant = jobs.tenant '
+                    'WHERE jobs.status = ? AND jobs.cancel_requested = 0 '
+                    f'ORDER BY {PRIORITY_ORDER}, COALESCE(job_tenants.last_claim, 0), jobs.created_at LIMIT 1',
+                    (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        'UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, '
+                        'lease_owner = ?, lease_expires_at = ? WHERE id = ?',
+                        (RUNNING, now, owner, now + lease_seconds, row['id'])
+                    )
+                    db.execute(
+                        'INSERT INTO job_tenants (tenant, last_claim) '
+                        'VALUES (?, (SELECT COALESCE(MAX(last_claim), 0) + 1 FROM job_tenants)) '
+                        'ON CONFLICT(tenant) DO UPDATE SET last_claim = excluded.last_claim',
+                        (row['tenant'],)
+                    )
+                db.execute('COMMIT')
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+        for source_path in abandoned:
+            _remove(Path(source_path))
+        return self.get(row['id']) if row is not None else None
+
+    def _recover(self, db, row, now, max_attempts):
+        if row['cancel_requested']:
+            status, error = CANCELLED, ConversionCancelledException('job_cancelled').to_dict()
+        elif row['attempts'] >= max_attempts:
+            status, error = FAILED, JobAbandonedException(row['attempts']).to_dict()
+        else:
+            status, error = QUEUED, None
+        db.execute(
+            'UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_owner = NULL, lease_expires_at = NULL '
+            'WHERE id = ?',
+            (status, _dumps(error), now if status != QUEUED else None, row['id'])
+        )
+        logger.warning(f"Job lease expired: {row['id']} (attempt {row['attempts']}, now {status})")
+        return status
+
+    def heartbeat(self, owner, job_ids, lease_seconds):
+        """
+        Renueva los leases de los jobs en curso de un worker
+
+        Returns:
+            set: Ids de job_ids con cancelación pedida
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return set()
+        placeholders = ','.join('?' * len(job_ids))
+        with closing(self._connect()) as db:
+            db.execute(
+                f'UPDATE jobs SET lease_expires_at = ? '
+                f'WHERE lease_owner = ? AND status = ? AND id IN ({placeholders})',
+                (time.time() + lease_seconds, owner, RUNNING, *job_ids)
+            )
+            rows = db.execute(
+                f'SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({placeholders})',
+                job_ids
+            ).fetchall()
+        return {row['id'] for row in rows}
+
+    def finish(self, job_id, status, result=None, error=None, owner=None):
+        """
+        Cierra un job
+
+        Args:
+            owner: Si se indica, solo se cierra si el lease sigue siendo suyo
+
+        Returns:
+            bool: False si el job ya no pertenecía a owner
+        """
+        query = 'UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ?, lease_owner = NULL, ' \
+                'lease_expires_at = NULL WHERE id = ?'
+        params = [status, time.time(), _dumps(result), _dumps(error), job_id]
+        if owner is not None:
+            query += ' AND lease_owner = ?'
+            params.append(owner)
+        with closing(self._connect()) as db:
+            cursor = db.execute(query, params)
+        return cursor.rowcount == 1
+
+    def release(self, job_id, owner):
+        """
+        Devuelve a la cola un job en curso sin contarlo como intento
+
+        Returns:
+            bool: False si el job ya no pertenecía a owner
+        """
+        with closing(self._connect()) as db:
+            cursor = db.execute(
+                'UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), lease_owner = NULL, '
+                'lease_expires_at = NULL WHERE id = ? AND lease_owner = ? AND status = ?',
+                (QUEUED, job_id, owner, RUNNING)
+            )
+        return cursor.rowcount == 1
+
+    def request_cancel(self, job_id):
+        """
+        Marca un job para cancelar; si aún está en cola pasa a cancelado
+
+        Returns:
+            dict o None: Fila del job tras la petición
+        """
+        with closing(self._connect()) as db:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute(
+                'UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN (?, ?)',
+                (job_id, QUEUED, RUNNING)
+            )
+            db.execute(
+                'UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?',
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            db.execute('COMMIT')
+        return self.get(job_id)
+
+    def prune(self, older_than_seconds):
+        """
+        Borra los jobs terminados hace más de older_than_seconds
+
+        Returns:
+            int: Jobs borrados
+        """
+        cutoff = time.time() - older_than_seconds
+        with closing(self._connect()) as db:
+            cursor = db.execute(
+                f'DELETE FROM jobs WHERE status IN ({",".join("?" * len(FINISHED_STATES))}) AND finished_at < ?',
+                (*FINISHED_STATES, cutoff)
+            )
+        return cursor.rowcount
+
+    def pending_sources(self):
+        """
+        Archivos de origen de los jobs en cola o en curso
+
+        Returns:
+            set: Rutas (str) que la limpieza de UPLOAD_FOLDER debe respetar
+        """
+        with closing(self._connect()) as db:
+            rows = db.execute('SELECT source_path FROM jobs WHERE status IN (?, ?)', (QUEUED, RUNNING))
+            return {row['source_path'] for row in rows}
+
+
+# Los scripts reciben el prefijo de claves en ARGV: el broker vive en un
+# único nodo de Redis, no en un clúster. Cada cliente tiene una cola por
+# clase (queue:<clase>:<cliente>) y tenants:<clase> ordena a los clientes
+# con jobs en cola por su último turno (0 = aún sin turno)
+REDIS_QUEUE_OF = """
+local function queue_of(prefix, key)
+    local tenant, priority = unpack(redis.call('HMGET', key, 'tenant', 'priority'))
+    tenant, priority = tenant or 'anonymous', priority or 'normal'
+    return prefix .. 'queue:' .. priority .. ':' .. tenant, prefix .. 'tenants:' .. priority, tenant
+end
+"""
+
+REDIS_CLAIM = REDIS_QUEUE_OF + """
+local prefix, now, owner = ARGV[1], tonumber(ARGV[2]), ARGV[3]
+local lease, max_attempts = tonumber(ARGV[4]), tonumber(ARGV[5])
+local leases, finished = prefix .. 'leases', prefix .. 'finished'
+local recovered = {}
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', leases, '-inf', now)) do
+    redis.call('ZREM', leases, id)
+    local key = prefix .. 'job:' .. id
+    local status, attempts, cancel = unpack(redis.call('HMGET', key, 'status', 'attempts', 'cancel_requested'))
+    if status == 'running' then
+        local next_status = 'queued'
+        if cancel == '1' then
+            next_status = 'cancelled'
+            redis.call('HSET', key, 'error', ARGV[6])
+        elseif tonumber(attempts) >= max_attempts then
+            next_status = 'failed'
+            redis.call('HSET', key, 'error', (string.gsub(ARGV[7], '"attempts": 0', '"attempts": ' .. attempts)))
+        end
+        redis.call('HSET', key, 'status', next_status, 'lease_owner', '', 'lease_expires_at', '')
+        if next_status == 'queued' then
+            local queue, tenants, tenant = queue_of(prefix, key)
+            redis.call('RPUSH', queue, id)
+            redis.call('ZADD', tenants, 'NX', 0, tenant)
+        else
+            redis.call('HSET', key, 'finished_at', now)
+            redis.call('ZADD', finished, now, id)
+        end
+        table.insert(recovered, id)
+        table.insert(recovered, next_status)
+        table.insert(recovered, redis.call('HGET', key, 'source_path'))
+    end
+end
+local function take(id)
+    local key = prefix .. 'job:' .. id
+    local status, cancel = unpack(redis.call('HMGET', key, 'status', 'cancel_requested'))
+    if status ~= 'queued' or cancel ~= '0' then
+        return false
+    end
+    redis.call('HSET', key, 'status', 'running', 'started_at', now,
+               'lease_owner', owner, 'lease_expires_at', now + lease)
+    redis.call('HINCRBY', key, 'attempts', 1)
+    redis.call('ZADD', leases, now + lease, id)
+    return true
+end
+-- ARGV[8..]: clases de prioridad de mayor a menor
+for i = 8, #ARGV do
+    local tenants = prefix .. 'tenants:' .. ARGV[i]
+    while true do
+        local tenant = redis.call('ZRANGE', tenants, 0, 0)[1]
+        if not tenant then
+            break
+        end
+        local queue = prefix .. 'queue:' .. ARGV[i] .. ':' .. tenant
+        local id = redis.call('RPOP', queue)
+        if redis.call('LLEN', queue) == 0 then
+            redis.call('ZREM', tenants, tenant)
+        end
+        if id and take(id) then
+            redis.call('ZADD', tenants, 'XX', redis.call('INCR', prefix .. 'turns'), tenant)
+            return {id, recovered}
+        end
+    end
+end
+-- Jobs encolados por versiones anteriores, en una sola lista
+while true do
+    local id = redis.call('RPOP', prefix .. 'queue')
+    if not id then
+        return {false, recovered}
+    end
+    if take(id) then
+        return {id, recovered}
+    end
+end
+"""
+
+REDIS_HEARTBEAT = """
+local prefix, owner, expires = ARGV[1], ARGV[2], tonumber(ARGV[3])
+local cancelled = {}
+for i = 4, #ARGV do
+    local id = ARGV[i]
+    local key = prefix .. 'job:' .. id
+    local status, lease_owner, cancel = unpack(redis.call('HMGET', key, 'status', 'lease_owner', 'cancel_requested'))
+    if status == 'running' and lease_owner == owner then
+        redis.call('HSET', key, 'lease_expires_at', expires)
+        redis.call('ZADD', prefix .. 'leases', expires, id)
+    end
+    if cancel == '1' then
+        table.insert(cancelled, id)
+    end
+end
+return cancelled
+"""
+
+REDIS_FINISH = """
+local prefix, id, owner = ARGV[1], ARGV[2], ARGV[3]
+local key = prefix .. 'job:' .. id
+if redis.call('EXISTS', key) == 0 then
+    return 0
+end
+if owner ~= '' and redis.call('HGET', key, 'lease_owner') ~= owner then
+    return 0
+end
+redis.call('HSET', key, 'status', ARGV[4], 'finished_at', ARGV[5], 'result', ARGV[6], 'error', ARGV[7],
+           'lease_owner', '', 'lease_expires_at', '')
+redis.call('ZREM', prefix .. 'leases', id)
+redis.call('ZADD', prefix .. 'finished', ARGV[5], id)
+return 1
+"""
+
+REDIS_RELEASE = REDIS_QUEUE_OF + """
+local prefix, id, owner = ARGV[1], ARGV[2], ARGV[3]
+local key = prefix .. 'job:' .. id
+local status, lease_owner = unpack(redis.call('HMGET', key, 'status', 'lease_owner'))
+if status ~= 'running' or lease_owner ~= owner then
+    return 0
+end
+local attempts = tonumber(redis.call('HGET', key, 'attempts'))
+redis.call('HSET', key, 'status', 'queued', 'attempts', math.max(attempts - 1, 0),
+           'lease_owner', '', 'lease_expires_at', '')
+redis.call('ZREM', prefix .. 'leases', id)
+local queue, tenants, tenant = queue_of(prefix, key)
+redis.call('RPUSH', queue, id)
+redis.call('ZADD', tenants, 'NX', 0, tenant)
+return 1
+"""
+
+REDIS_CANCEL = REDIS_QUEUE_OF + """
+local prefix, id, now = ARGV[1], ARGV[2], ARGV[3]
+local key = prefix .. 'job:' .. id
+local status = redis.call('HGET', key, 'status')
+if status == 'queued' or status == 'running' then
+    redis.call('HSET', key, 'cancel_requested', 1)
+end
+if status == 'queued' then
+    redis.call('HSET', key, 'status', 'cancelled', 'finished_at', now)
+    redis.call('LREM', (queue_of(prefix, key)), 0, id)
+    redis.call('LREM', prefix .. 'queue', 0, id)
+    redis.call('ZADD', prefix .. 'finished', now, id)
+end
+return status
+"""
+
+
+class RedisJobStore:
+    """
+    Broker de jobs sobre Redis, con la misma interfaz que JobStore
+
+    Cada job es un hash; cada cliente tiene una lista por clase de
+    prioridad, y los clientes en cola, los leases y los jobs terminados
+    son conjuntos ordenados por turno, fecha de vencimiento y de fin.
+    Las transiciones de estado se hacen con scripts Lua para que sean
+    atómicas entre workers.
+    """
+
+    def __init__(self, url=None, prefix='file_converter:jobs:', client=None):
+        """
+        Args:
+            url: URL de Redis (None = REDIS_URL)
+            prefix: Prefijo de las claves
+            client: Cliente ya creado (en lugar de url)
+        """
+        if client is None:
+            if redis is None:
+                raise RuntimeError("JOB_BROKER=redis requires the 'redis' package")
+            client = redis.Redis.from_url(url or settings.REDIS_URL, decode_responses=True)
+        self.client = client
+        self.prefix = prefix
+        self._claim = client.register_script(REDIS_CLAIM)
+        self._heartbeat = client.register_script(REDIS_HEARTBEAT)
+        self._finish = client.register_script(REDIS_FINISH)
+        self._release = client.register_script(REDIS_RELEASE)
+        self._cancel = client.register_script(REDIS_CANCEL)
+
+    def _key(self, job_id):
+        return f"{self.prefix}job:{job_id}"
+
+    def _queue_key(self, priority, tenant):
+        return f"{self.prefix}queue:{priority}:{tenant}"
+
+    def create(self, source_path, target_format, options=None):
+        job_id = uuid.uuid4().hex
+        options = options or {}
+        tenant, priority = _queue_of(options)
+        pipeline = self.client.pipeline()
+        pipeline.hset(self._key(job_id), mapping={
+            'id': job_id,
+            'status': QUEUED,
+            'source_path': str(source_path),
+            'target_format': target_format,
+            'cancel_requested': 0,
+            'created_at': time.time(),
+            'attempts': 0,
+            'options': _dumps(options),
+            'tenant': tenant,
+            'priority': priority
+        })
+        pipeline.lpush(self._queue_key(priority, tenant), job_id)
+        pipeline.zadd(f"{self.prefix}tenants:{priority}", {tenant: 0}, nx=True)
+        pipeline.execute()
+        return job_id
+
+    def get(self, job_id):
+        data = self.client.hgetall(self._key(job_id))
+        if not data:
+            return None
+        # Misma forma que las filas de SQLite
+        row = {
+            'id': data['id'],
+            'status': data['status'],
+            'source_path': data['source_path'],
+            'target_format': data['target_format'],
+            'cancel_requested': int(data.get('cancel_requested') or 0),
+            'attempts': int(data.get('attempts') or 0),
+            'lease_owner': data.get('lease_owner') or None,
+            'result': data.get('result') or None,
+            'error': data.get('error') or None,
+            'options': data.get('options') or None,
+            'tenant': data.get('tenant') or ANONYMOUS_TENANT,
+            'priority': data.get('priority') or DEFAULT_PRIORITY
+        }
+        for field in ('created_at', 'started_at', 'finished_at', 'lease_expires_at'):
+            row[field] = float(data[field]) if data.get(field) else None
+        return row
+
+    def claim(self, owner, lease_seconds, max_attempts):
+        job_id, recovered = self._claim(args=[
+            self.prefix, time.time(), owner, lease_seconds, max_attempts,
+            json.dumps(ConversionCancelledException('job_cancelled').to_dict()),
+            json.dumps(JobAbandonedException(0).to_dict()),
+            *PRIORITIES
+        ])
+        for expired_id, status, source_path in zip(recovered[::3], recovered[1::3], recovered[2::3]):
+            logger.warning(f"Job lease expired: {expired_id} (now {status})")
+            if status != QUEUED:
+                _remove(Path(source_path))
+        return self.get(job_id) if job_id else None
+
+    def heartbeat(self, owner, job_ids, lease_seconds):
+        job_ids = list(job_ids)
+        if not job_ids:
+            return set()
+        return set(self._heartbeat(args=[self.prefix, owner, time.time() + lease_seconds, *job_ids]))
+
+    def finish(self, job_id, status, result=None, error=None, owner=None):
+        return self._finish(args=[
+            self.prefix, job_id, owner or '', status, time.time(), _dumps(result) or '', _dumps(error) or ''
+        ]) == 1
+
+    def release(self, job_id, owner):
+        return self._release(args=[self.prefix, job_id, owner]) == 1
+
+    def request_cancel(self, job_id):
+        self._cancel(args=[self.prefix, job_id, time.time()])
+        return self.get(job_id)
+
+    def prune(self, older_than_seconds):
+        finished = f"{self.prefix}finished"
+        job_ids = self.client.zrangebyscore(finished, '-inf', time.time() - older_than_seconds)
+        if not job_ids:
+            return 0
+        pipeline = self.client.pipeline()
+        pipeline.delete(*(self._key(job_id) for job_id in job_ids))
+        pipeline.zrem(finished, *job_ids)
+        pipeline.execute()
+        return len(job_ids)
+
+    def pending_sources(self):
+        # Los jobs en cola están en las listas de cada cliente y los que están en curso, en los leases
+        queues = [f"{self.prefix}queue"]
+        for priority in PRIORITIES:
+            for tenant in self.client.zrange(f"{self.prefix}tenants:{priority}", 0, -1):
+                queues.append(self._queue_key(priority, tenant))
+        job_ids = set(self.client.zrange(f"{self.prefix}leases", 0, -1))
+        for queue in queues:
+            job_ids.update(self.client.lrange(queue, 0, -1))
+        pipeline = self.client.pipeline()
+        for job_id in job_ids:
+            pipeline.hget(self._key(job_id), 'source_path')
+        return {path for path in pipeline.execute() if path}
+
+
+def create_store(broker=None):
+    """
+    Crea el broker configurado
+
+    Args:
+        broker: 'sqlite' o 'redis' (None = JOB_BROKER)
+
+    Returns:
+        JobStore o RedisJobStore
+    """
+    broker = broker or settings.JOB_BROKER
+    if broker == 'redis':
+        return RedisJobStore()
+    return JobStore()
+
+
+def describe(row):
+    """
+    Representación pública de un job
+
+    Args:
+        row: Fila de JobStore
+
+    Returns:
+        dict: {'job_id', 'status', 'cancel_requested', 'attempts',
+            'created_at', 'started_at', 'finished_at', 'result', 'error'}
+    """
+    return {
+        'job_id': row['id'],
+        'status': row['status'],
+        'cancel_requested': bool(row['cancel_requested']),
+        'attempts': row['attempts'],
+        'created_at': row['created_at'],
+        'started_at': row['started_at'],
+        'finished_at': row['finished_at'],
+        'result': json.loads(row['result']) if row['result'] else None,
+        'error': json.loads(row['error']) if row['error'] else None
+    }
+
+
+class JobWorker:
+    """
+    Reclama jobs del broker y los ejecuta en hilos de este proceso
+    """
+
+    def __init__(self, store, runner, concurrency=2, lease_seconds=None, max_attempts=None,
+                 poll_interval_seconds=0.5):
+        """
+        Args:
+            store: JobStore o RedisJobStore
+            runner: Función (source_path, target_format, token, **options)
+                -> dict que convierte y devuelve el resultado público o
+                lanza FileConverterException; options son las del job
+            concurrency: Jobs simultáneos
+            lease_seconds: Duración del lease (None = JOB_LEASE_SECONDS)
+            max_attempts: Intentos por job (None = JOB_MAX_ATTEMPTS)
+            poll_interval_seconds: Pausa cuando la cola está vacía y cada
+                cuánto se renuevan los leases y se buscan cancelaciones
+        """
+        self.store = store
+        self.runner = runner
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+        self.poll_interval_seconds = poll_interval_seconds
+        self.owner = None
+        self._tokens = {}
+        self._released = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._pid = None
+
+    @property
+    def active(self):
+        """Ids de los jobs en curso en este proceso."""
+        with self._lock:
+            return list(self._tokens)
+
+    def start(self):
+        """Arranca los hilos en este proceso si aún no están en marcha."""
+        # Los workers creados con fork heredan el objeto pero no los hilos
+        with self._lock:
+            if self._threads and self._pid == os.getpid() and not self._stop.is_set():
+                return
+            self._pid = os.getpid()
+            self.owner = f"{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}"
+            self._tokens = {}
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._claim_loop, name=f'job-worker-{i}', daemon=True)
+                for i in range(self.concurrency)
+            ]
+            self._threads.append(threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True))
+            for thread in self._threads:
+                thread.start()
+        logger.info(f"Job worker started: {self.owner} ({self.concurrency} threads)")
+
+    def notify(self):
+        """Despierta a los hilos ociosos (hay un job nuevo en cola)."""
+        self._wakeup.set()
+
+    def cancel_local(self, job_id):
+        """
+        Activa el token de un job si se está ejecutando en este proceso
+
+        Returns:
+            bool: True si el job estaba en curso aquí
+        """
+        with self._lock:
+            token = self._tokens.get(job_id)
+        return token is not None and token.cancel('job_cancelled')
+
+    def stop(self, timeout=None):
+        """
+        Deja de reclamar jobs y espera a los que están en curso
+
+        Los que no terminan en 'timeout' segundos vuelven a la cola (sin
+        contar el intento) y se mata su herramienta.
+
+        Args:
+            timeout: Espera máxima (None = sin límite)
+        """
+        self._stop.set()
+        self._wakeup.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            if thread.name == 'job-heartbeat':
+                continue
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            thread.join(remaining)
+        with self._lock:
+            pending = dict(self._tokens)
+        for job_id, token in pending.items():
+            if self.store.release(job_id, self.owner):
+                with self._lock:
+                    self._released.add(job_id)
+                token.cancel(WORKER_SHUTDOWN)
+                logger.info(f"Job returned to queue: {job_id}")
+        for thread in self._threads:
+            thread.join(5)
+        logger.info(f"Job worker stopped: {self.owner}")
+
+    def _claim_loop(self):
+        while not self._stop.is_set():
+            try:
+                row = self.store.claim(self.owner, self.lease_seconds, self.max_attempts)
+            except Exception as e:
+                logger.error(f"Job claim failed: {str(e)}")
+                row = None
+            if row is None:
+                self._wakeup.wait(self.poll_interval_seconds)
+                self._wakeup.clear()
+                continue
+            self._execute(row)
+
+    def _heartbeat_loop(self):
+        # Sigue renovando tras stop() mientras queden jobs en curso
+        while not (self._stop.is_set() and not self.active):
+            time.sleep(self.poll_interval_seconds)
+            with self._lock:
+                pending = dict(self._tokens)
+            try:
+                for job_id in self.store.heartbeat(self.owner, pending, self.lease_seconds):
+                    pending[job_id].cancel('job_cancelled')
+            except Exception as e:
+                logger.error(f"Job heartbeat failed: {str(e)}")
+
+    def _execute(self, row):
+        job_id = row['id']
+        source_path = Path(row['source_path'])
+        token = CancellationToken()
+        with self._lock:
+            self._tokens[job_id] = token
+        logger.info(f"Job started: {job_id} (attempt {row['attempts']})")
+        status, result, error = FAILED, None, None
+        try:
+            options = json.loads(row['options']) if row.get('options') else {}
+            result = self.runner(source_path, row['target_format'], token, **options)
+            status = SUCCEEDED
+        except ConversionCancelledException as e:
+            status, error = CANCELLED, e.to_dict()
+        except FileConverterException as e:
+            error = e.to_dict()
+            logger.warning(f"Job failed: {job_id}: {e.error_code}: {e.message}")
+        except Exception as e:
+            logger.error(f"Unexpected job error {job_id}: {str(e)}", exc_info=True)
+            error = {
+                'success': False,
+                'error': 'Conversion failed',
+                'error_code': 'CONVERSION_ERROR'
+            }
+        finally:
+            with self._lock:
+                self._tokens.pop(job_id, None)
+                released = job_id in self._released
+                self._released.discard(job_id)
+
+        if released:
+            # Otro worker lo repetirá: la subida debe seguir ahí
+            return
+        if self.store.finish(job_id, status, result=result, error=error, owner=self.owner):
+            logger.info(f"Job {status}: {job_id}")
+        else:
+            logger.warning(f"Job lease lost before finishing: {job_id}")
+        _remove(source_path)
+
+
+class JobManager:
+    """
+    Cara de la API: encola, consulta y cancela jobs
+
+    Con workers > 0 ejecuta también jobs en este proceso (JobWorker);
+    con workers = 0 solo encola y los ejecutan los procesos de src.worker.
+    """
+
+    def __init__(self, store, runner, workers=2, retention_seconds=None, **worker_options):
+        """
+        Args:
+            store: JobStore o RedisJobStore
+            runner: Ver JobWorker
+            workers: Jobs simultáneos de este proceso (0 = solo encolar)
+            retention_seconds: Tiempo que se conservan los jobs terminados
+                (None = MAX_UPLOAD_TIMEOUT, como los archivos convertidos)
+            worker_options: Opciones adicionales de JobWorker
+        """
+        self.store = store
+        self.retention_seconds = retention_seconds or settings.MAX_UPLOAD_TIMEOUT
+        self.worker = JobWorker(store, runner, concurrency=workers, **worker_options) if workers else None
+
+    def ensure_started(self):
+        """Arranca los hilos de jobs de este proceso (si los hay)."""
+        if self.worker is not None:
+            self.worker.start()
+
+    def stop(self, timeout=None):
+        """Detiene los hilos de jobs de este proceso (ver JobWorker.stop)."""
+        if self.worker is not None and self.worker.owner is not None:
+            self.worker.stop(timeout)
+
+    def submit(self, source_path, target_format, **options):
+        """
+        Encola una conversión
+
+        Args:
+            options: Argumentos adicionales del runner (tenant, priority...)
+
+        Returns:
+            dict: Job (describe)
+        """
+        self.store.prune(self.retention_seconds)
+        job_id = self.store.create(source_path, target_format, options)
+        if self.worker is not None:
+            self.worker.start()
+            self.worker.notify()
+        logger.info(f"Job queued: {job_id}")
+        return describe(self.store.get(job_id))
+
+    def get(self, job_id):
+        """
+        Returns:
+            dict o None: Job (describe)
+        """
+        row = self.store.get(job_id)
+        return describe(row) if row else None
+
+    def cancel(self, job_id):
+        """
+        Cancela un job en cola o en curso (no hace nada si ya terminó)
+
+        Un job en cola se descarta y se borra su subida. Si está en curso
+        en otro proceso, su worker lo ve al renovar el lease.
+
+        Returns:
+            dict o None: Job (describe) tras la petición
+        """
+        row = self.store.request_cancel(job_id)
+        if row is None:
+            return None
+        if row['status'] in FINISHED_STATES:
+            _remove(Path(row['source_path']))
+        elif self.worker is not None:
+            self.worker.cancel_local(job_id)
+        logger.info(f"Job cancellation requested: {job_id}")
+        return describe(row)
+
+
+def _remove(path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
@@ -1,25 +1,189 @@
+"""
+Configuración de logging
+
+Los hilos de las peticiones solo encolan los registros (QueueHandler); un
+QueueListener en segundo plano los formatea y los escribe en el archivo
+rotativo y en stdout, así que ni la escritura en disco ni la rotación
+afectan a la latencia. Los registros llevan el id de la petición y, si se
+pasan en 'extra', el motor y la duración. Los mensajes repetitivos se
+limitan por punto de llamada, es decir logger, archivo y línea
+(LOG_RATE_LIMIT), o se muestrean por logger (LOG_SAMPLE_RATES).
+"""
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
 from src.config import settings
 
 logger = logging.getLogger('file_converter')
 
-def setup_logging():
-    log_folder = settings.LOGS_FOLDER
-    if not os.path.exists(log_folder):
-        os.makedirs(log_folder)
+# Loggers configurados: el de la aplicación y los de módulos (logging.getLogger(__name__))
+CONFIGURED_LOGGERS = ('file_converter', 'src')
 
-    log_level = getattr(logging, settings.LOG_LEVEL.upper())
-    logger.setLevel(log_level)
+# Campos opcionales que se copian al JSON si se pasan en 'extra'
+EXTRA_FIELDS = ('request_id', 'engine', 'duration_ms', 'file_id', 'status_code')
 
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formatea cada registro como una línea JSON
+    """
+
+    def format(self, record):
+        log_dict = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'message': record.getMessage()
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                log_dict[field] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_dict['exception'] = record.exc_text
+
+        return json.dumps(log_dict, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Añade el id de la petición en curso (flask.g.request_id) al registro
+
+    Se ejecuta en el hilo que emite el registro, antes de encolarlo.
+    """
+
+    def filter(self, record):
+        if getattr(record, 'request_id', None) is None:
+            try:
+                from flask import g, has_request_context
+                if has_request_context():
+                    record.request_id = g.get('request_id')
+            except Exception:
+                pass
+        return True
+
+
+class LogThrottleFilter(logging.Filter):
+    """
+    Limita los mensajes repetitivos
+
+    Los avisos y errores nunca se descartan. Para niveles inferiores:
+    - sample_rates: {logger: fracción} conserva solo esa fracción de los
+      registros del logger (y sus hijos)
+    - rate_limit: máximo de registros por punto de llamada (logger,
+      archivo y línea) en cada ventana de window_seconds; al abrir la
+      ventana siguiente se indica cuántos se descartaron. No se usa el
+      mensaje porque con f-strings cambia en cada llamada
+    """
+
+    def __init__(self, rate_limit=0, window_seconds=60, sample_rates=None):
+        super().__init__()
+        self.rate_limit = rate_limit
+        self.window_seconds = window_seconds
+        self.sample_rates = sample_rates or {}
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        rate = self._sample_rate(record.name)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+
+        if not self.rate_limit:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window_start, count, dropped = self._windows.get(key, (now, 0, 0))
+            if now - window_start >= self.window_seconds:
+                # StructuredQueueHandler lo añade al mensaje ya formateado
+                record.suppressed_count = dropped
+                window_start, count, dropped = now, 0, 0
+
+            if count >= self.rate_limit:
+                self._windows[key] = (window_start, count, dropped + 1)
+                return False
+
+            self._windows[key] = (window_start, count + 1, dropped)
+            return True
+
+    def _sample_rate(self, name):
+        while name:
+            if name in self.sample_rates:
+                return self.sample_rates[name]
+            name = name.rpartition('.')[0]
+        return 1.0
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler que conserva la traza de excepción como campo aparte
+
+    El QueueHandler estándar mezcla la traza en el mensaje; aquí se guarda
+    en exc_text para que el formateador JSON la emita en 'exception'.
+    También indica los mensajes que LogThrottleFilter descartó.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if getattr(record, 'suppressed_count', 0):
+            record.message += f" ({record.suppressed_count} similar messages suppressed)"
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level=None, log_file=None):
+    """
+    Configura el logging asíncrono de la aplicación
+
+    Args:
+        level: Nivel ('DEBUG', 'INFO', ...). None usa LOG_LEVEL
+        log_file: Ruta del archivo de log. None usa LOG_FILE o
+            LOGS_FOLDER/app.log
+
+    Returns:
+        logging.Logger: Logger de la aplicación
+    """
+    global _listener
+
+    level_name = (level or settings.LOG_LEVEL).upper()
+    log_level = getattr(logging, level_name)
+    log_file = log_file or settings.LOG_FILE or os.path.join(settings.LOGS_FOLDER, 'app.log')
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+
+    if settings.LOG_JSON:
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
     file_handler = RotatingFileHandler(
-        os.path.join(log_folder, 'app.log'),
+        log_file,
         maxBytes=10*1024*1024,
         backupCount=5
     )
@@ -30,8 +194,55 @@ def setup_logging():
     console_handler.setFormatter(formatter)
     console_handler.setLevel(log_level)
 
-    logger.handlers = []
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(LogThrottleFilter(
+        rate_limit=settings.LOG_RATE_LIMIT,
+        window_seconds=settings.LOG_RATE_LIMIT_WINDOW,
+        sample_rates=settings.LOG_SAMPLE_RATES
+    ))
+
+    with _listener_lock:
+        _stop_listener()
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+
+    for name in CONFIGURED_LOGGERS:
+        configured = logging.getLogger(name)
+        configured.setLevel(log_level)
+        configured.handlers = [queue_handler]
+
+    logger.info(f"Logging configured (Level: {level_name})")
+    return logger
+
+
+def stop_logging():
+    """Vacía la cola de logs y detiene el hilo escritor."""
+    with _listener_lock:
+        _stop_listener()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_logger(name='file_converter'):
+    """
+    Obtiene un logger por nombre
+
+    Args:
+        name: Nombre del logger
+
+    Returns:
+        logging.Logger
+    """
+    return logging.getLogger(name)
+
 
-    logger.info(f"Logging configured (Level: {settings.LOG_LEVEL})")
+atexit.register(stop_logging)
@@ -0,0 +1,212 @@
+"""
+Métricas Prometheus del servicio
+
+Las métricas se exponen en /metrics. Con varios workers (Gunicorn) hay que
+definir PROMETHEUS_MULTIPROC_DIR antes de arrancar: cada proceso escribe
+sus valores en ese directorio y /metrics los agrega todos. Los gauges de
+cola usan el modo 'livesum' para sumar solo los procesos vivos. Ninguna
+métrica abre su archivo en ese directorio al importar este módulo.
+"""
+import os
+import threading
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+
+# Las conversiones van de milisegundos (imágenes) a minutos (vídeo)
+CONVERSION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+CONVERSIONS = Counter(
+    'file_converter_conversions_total',
+    'Conversiones realizadas',
+    ['engine', 'from_ext', 'to_ext', 'status']
+)
+CONVERSION_DURATION = Histogram(
+    'file_converter_conversion_duration_seconds',
+    'Duración de las conversiones (sin contar la espera en cola)',
+    ['engine', 'from_ext', 'to_ext'],
+    buckets=CONVERSION_BUCKETS
+)
+BYTES_IN = Counter(
+    'file_converter_input_bytes_total',
+    'Bytes de entrada convertidos',
+    ['engine']
+)
+BYTES_OUT = Counter(
+    'file_converter_output_bytes_total',
+    'Bytes de salida generados',
+    ['engine']
+)
+CONVERSIONS_CANCELLED = Counter(
+    'file_converter_conversions_cancelled_total',
+    'Conversiones canceladas antes de terminar',
+    ['engine', 'reason']
+)
+CONVERSIONS_SHARED = Counter(
+    'file_converter_conversions_shared_total',
+    'Conversiones servidas con la salida de otra idéntica en curso',
+    ['to_ext']
+)
+QUEUE_DEPTH = Gauge(
+    'file_converter_queue_depth',
+    'Conversiones esperando turno',
+    ['engine'],
+    multiprocess_mode='livesum'
+)
+IN_FLIGHT = Gauge(
+    'file_converter_in_flight',
+    'Conversiones en curso',
+    ['engine'],
+    multiprocess_mode='livesum'
+)
+SCHEDULER_WAIT = Histogram(
+    'file_converter_scheduler_wait_seconds',
+    'Espera por un turno de conversión por clase de prioridad y carril',
+    ['priority', 'lane'],
+    buckets=CONVERSION_BUCKETS
+)
+DEADLINE_REQUESTS = Counter(
+    'file_converter_deadline_requests_total',
+    'Conversiones con max_latency según el resultado del plazo',
+    ['engine', 'outcome']
+)
+OCR_CACHE_REQUESTS = Counter(
+    'file_converter_ocr_cache_requests_total',
+    'Consultas a la caché OCR (hit/miss)',
+    ['result']
+)
+OCR_PAGES = Counter(
+    'file_converter_ocr_pages_total',
+    'Páginas procesadas por OCR',
+    ['profile']
+)
+OCR_SECONDS = Counter(
+    'file_converter_ocr_seconds_total',
+    'Tiempo dedicado a OCR',
+    ['profile']
+)
+CONVERSION_CPU_SECONDS = Histogram(
+    'file_converter_conversion_cpu_seconds',
+    'CPU (usuario + sistema) consumida por los procesos de una conversión',
+    ['engine', 'from_ext', 'to_ext'],
+    buckets=CONVERSION_BUCKETS
+)
+CONVERSION_MAX_RSS = Histogram(
+    'file_converter_conversion_max_rss_bytes',
+    'Memoria residente máxima de los procesos de una conversión',
+    ['engine', 'from_ext', 'to_ext'],
+    buckets=tuple(mb * 1024 * 1024 for mb in (16, 32, 64, 128, 256, 512, 1024, 2048, 4096))
+)
+SUBPROCESS_FAILURES = Counter(
+    'file_converter_subprocess_failures_total',
+    'Herramientas externas que fallaron o excedieron el timeout',
+    ['tool', 'reason']
+)
+
+
+# Un gauge sin etiquetas abre su archivo al crearse: se crea al primer uso
+_concurrency_limit = None
+_concurrency_limit_lock = threading.Lock()
+
+
+def set_concurrency_limit(limit):
+    """
+    Publica el límite de conversiones simultáneas del proceso
+
+    Cada proceso tiene su propio límite; con varios workers se expone el
+    mayor ('max'), no la suma.
+
+    Args:
+        limit: Límite actual del planificador
+    """
+    global _concurrency_limit
+    with _concurrency_limit_lock:
+        if _concurrency_limit is None:
+            _concurrency_limit = Gauge(
+                'file_converter_concurrency_limit',
+                'Límite de conversiones simultáneas por proceso (ajustado por la presión del sistema)',
+                multiprocess_mode='max'
+            )
+    _concurrency_limit.set(limit)
+
+
+def observe_conversion(engine, from_ext, to_ext, seconds, success, input_bytes=0, output_bytes=0):
+    """
+    Registra una conversión terminada
+
+    Args:
+        engine: Motor usado
+        from_ext: Extensión de origen
+        to_ext: Extensión de destino
+        seconds: Duración de la conversión
+        success: Si terminó correctamente
+        input_bytes: Tamaño del archivo de entrada
+        output_bytes: Tamaño del archivo generado
+    """
+    CONVERSIONS.labels(engine, from_ext, to_ext, 'success' if success else 'failure').inc()
+    CONVERSION_DURATION.labels(engine, from_ext, to_ext).observe(seconds)
+    BYTES_IN.labels(engine).inc(input_bytes)
+    if success:
+        BYTES_OUT.labels(engine).inc(output_bytes)
+
+
+def observe_resources(engine, from_ext, to_ext, resources):
+    """
+    Registra el consumo de los procesos de una conversión
+
+    Args:
+        engine: Motor usado
+        from_ext: Extensión de origen
+        to_ext: Extensión de destino
+        resources: dict de summarize_resource_usage
+    """
+    cpu_seconds = resources['user_seconds'] + resources['system_seconds']
+    CONVERSION_CPU_SECONDS.labels(engine, from_ext, to_ext).observe(cpu_seconds)
+    CONVERSION_MAX_RSS.labels(engine, from_ext, to_ext).observe(resources['max_rss_kb'] * 1024)
+
+
+def observe_subprocess_failure(command, timeout=False):
+    """
+    Registra un fallo de una herramienta externa
+
+    Args:
+        command: Lista del comando ejecutado
+        timeout: True si se excedió el timeout
+    """
+    tool = os.path.basename(command[0]) if command else 'unknown'
+    SUBPROCESS_FAILURES.labels(tool, 'timeout' if timeout else 'error').inc()
+
+
+def collect_metrics():
+    """
+    Genera la exposición en formato texto de Prometheus
+
+    Returns:
+        tuple: (bytes, content type)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """
+    Limpia los gauges 'livesum' de un worker terminado
+
+    Args:
+        pid: PID del worker
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
@@ -3,16 +3,127 @@ Módulo de OCR (Optical Character Recognition)
 Extrae texto de imágenes y PDFs usando Tesseract
 """
 import pytesseract
-from PIL import Image, ImageEnhance, ImageFilter
-import os
+from PIL import Image
+import hashlib
 import logging
-from pdf2image import convert_from_path
-import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from src.preprocessing import ImagePreprocessor
+from src import metrics, tiling
 
 
 logger = logging.getLogger(__name__)
 
 
+class OCRResultCache:
+    """
+    Caché LRU acotada de resultados OCR
+
+    Las claves combinan el hash del raster de la página con el idioma,
+    el preprocesamiento y la configuración del motor, de modo que una
+    página idéntica (portadas, hojas en blanco, membretes repetidos)
+    solo pasa por Tesseract una vez.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=None):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entries: Número máximo de resultados guardados
+            ttl_seconds: Antigüedad máxima de una entrada (None = sin caducidad)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(image, **params):
+        """
+        Calcula la clave de caché de una imagen
+
+        Args:
+            image: PIL Image object (antes de preprocesar)
+            **params: Parámetros del motor que afectan al resultado
+
+        Returns:
+            str: Digest hexadecimal
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}".encode())
+        digest.update(image.tobytes())
+        for name in sorted(params):
+            digest.update(f"|{name}={params[name]}".encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Obtiene un resultado guardado
+
+        Returns:
+            dict o None si no existe o ha caducado
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry[0]):
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                metrics.OCR_CACHE_REQUESTS.labels('miss').inc()
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.OCR_CACHE_REQUESTS.labels('hit').inc()
+            return dict(entry[1])
+
+    def set(self, key, value):
+        """Guarda un resultado, expulsando las entradas más antiguas."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Estadísticas de uso
+
+        Returns:
+            dict: {'entries', 'max_entries', 'hits', 'misses', 'hit_ratio'}
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _is_expired(self, stored_at):
+        if not self.ttl_seconds:
+            return False
+        return time.monotonic() - stored_at > self.ttl_seconds
+
+
 class OCRProcessor:
     """
     Procesador de OCR para extracción de texto de imágenes y PDFs
@@ -28,14 +139,162 @@ class OCRProcessor:
         'por': 'Português'
     }
     
-    def __init__(self, default_lang='spa'):
+    # Perfiles de velocidad: resolución de render, modo de Tesseract y modelos
+    # 'tessdata' elige la variante de traineddata ('fast', 'standard', 'best')
+    PROFILES = {
+        'fast': {'dpi': 150, 'grayscale': True, 'oem': 1, 'psm': 6, 'tessdata': 'fast'},
+        'balanced': {'dpi': 200, 'grayscale': True, 'oem': 1, 'psm': 3, 'tessdata': 'standard'},
+        'accurate': {'dpi': 300, 'grayscale': False, 'oem': 1, 'psm': 3, 'tessdata': 'best'}
+    }
+    
+    # Idiomas candidatos por escritura detectada con OSD (en orden de preferencia)
+    SCRIPT_LANGUAGES = {
+        'Latin': ['spa', 'eng', 'fra', 'deu', 'ita', 'por'],
+        'Cyrillic': ['rus', 'ukr'],
+        'Greek': ['ell'],
+        'Arabic': ['ara'],
+        'Hebrew': ['heb'],
+        'Devanagari': ['hin'],
+        'Han': ['chi_sim', 'chi_tra'],
+        'Japanese': ['jpn'],
+        'Hangul': ['kor'],
+        'Korean': ['kor'],
+        'Thai': ['tha']
+    }
+    
+    # Rotación horaria indicada por OSD -> transposición sin pérdidas de PIL
+    OSD_TRANSPOSE = {
+        90: Image.Transpose.ROTATE_270,
+        180: Image.Transpose.ROTATE_180,
+        270: Image.Transpose.ROTATE_90
+    }
+    
+    def __init__(self, default_lang='spa', tesseract_config='', cache=None, preprocessor=None,
+                 default_profile='balanced', tessdata_dirs=None, tile_threshold_pixels=0,
+                 tile_size=3000, tile_overlap=200, tile_workers=2, timeout_seconds=300,
+                 batch_workers=2, osd_enabled=False, osd_max_side=1200, osd_min_confidence=2.0):
         """
         Inicializa el procesador OCR
         
         Args:
             default_lang: Idioma por defecto ('spa', 'eng', etc.)
+            tesseract_config: Opciones extra para Tesseract comunes a todos los perfiles
+            cache: OCRResultCache para reutilizar resultados (None = sin caché)
+            preprocessor: ImagePreprocessor a usar (None = configuración por defecto)
+            default_profile: Perfil usado cuando no se indica ninguno
+            tessdata_dirs: Directorios de traineddata por variante
+                ({'fast': '/usr/share/tessdata_fast', ...}); las variantes
+                sin directorio usan los modelos instalados por defecto
+            tile_threshold_pixels: Imágenes con más píxeles se procesan por
+                teselas (0 = nunca)
+            tile_size: Lado máximo de cada tesela
+            tile_overlap: Solape entre teselas (mayor que la palabra más ancha)
+            tile_workers: Teselas procesadas en paralelo
+            timeout_seconds: Timeout de las herramientas externas por tesela
+            batch_workers: Tamaño del pool compartido para lotes de archivos
+            osd_enabled: Detectar orientación y escritura antes del OCR por defecto
+            osd_max_side: Lado máximo de la miniatura usada para OSD
+            osd_min_confidence: Confianza mínima de OSD para rotar o
+                reducir los idiomas
         """
+        if default_profile not in self.PROFILES:
+            raise ValueError(f"Unknown OCR profile: {default_profile}")
+        
         self.default_lang = default_lang
+        self.tesseract_config = tesseract_config
+        self.cache = cache
+        self.preprocessor = preprocessor or ImagePreprocessor()
+        self.default_profile = default_profile
+        self.tessdata_dirs = {k: v for k, v in (tessdata_dirs or {}).items() if v}
+        self.tile_threshold_pixels = tile_threshold_pixels
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tile_workers = tile_workers
+        self.timeout_seconds = timeout_seconds
+        self.batch_workers = batch_workers
+        self._batch_pool = None
+        self._batch_pool_lock = threading.Lock()
+        self._profile_stats = {name: {'pages': 0, 'seconds': 0.0} for name in self.PROFILES}
+        self._stats_lock = threading.Lock()
+        self.osd_enabled = osd_enabled
+        self.osd_max_side = osd_max_side
+        self.osd_min_confidence = osd_min_confidence
+        self._languages = None
+    
+    def get_profile(self, name=None):
+        """
+        Obtiene la configuración de un perfil
+        
+        Args:
+            name: 'fast', 'balanced' o 'accurate' (None usa el perfil por defecto)
+            
+        Returns:
+            dict: Copia de la configuración del perfil con su nombre
+            
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        name = name or self.default_profile
+        if name not in self.PROFILES:
+            raise ValueError(f"Unknown OCR profile: {name}")
+        profile = dict(self.PROFILES[name])
+        profile['name'] = name
+        return profile
+    
+    def build_tesseract_config(self, profile=None):
+        """
+        Construye las opciones de línea de comandos de Tesseract para un perfil
+        
+        Args:
+            profile: Nombre del perfil (None usa el perfil por defecto)
+            
+        Returns:
+            str: Opciones para pytesseract (parámetro config)
+        """
+        selected = self.get_profile(profile)
+        options = [f"--oem {selected['oem']}", f"--psm {selected['psm']}"]
+        tessdata_dir = self.tessdata_dirs.get(selected['tessdata'])
+        if tessdata_dir:
+            options.append(f'--tessdata-dir "{tessdata_dir}"')
+        if self.tesseract_config:
+            options.append(self.tesseract_config)
+        return ' '.join(options)
+    
+    def build_metadata(self, profile, pages, seconds, cached_pages=0):
+        """
+        Registra el rendimiento de una extracción y construye sus metadatos
+        
+        Args:
+            profile: Nombre del perfil usado
+            pages: Páginas (o imágenes) procesadas
+            seconds: Tiempo total de la extracción
+            cached_pages: Páginas servidas desde la caché
+            
+        Returns:
+            dict: Configuración del perfil y rendimiento de esta petición
+                y acumulado del perfil
+        """
+        selected = self.get_profile(profile)
+        with self._stats_lock:
+            stats = self._profile_stats[selected['name']]
+            stats['pages'] += pages
+            stats['seconds'] += seconds
+            average = stats['pages'] / stats['seconds'] if stats['seconds'] else 0.0
+        metrics.OCR_PAGES.labels(selected['name']).inc(pages)
+        metrics.OCR_SECONDS.labels(selected['name']).inc(seconds)
+        
+        return {
+            'profile': selected['name'],
+            'dpi': selected['dpi'],
+            'oem': selected['oem'],
+            'psm': selected['psm'],
+            'tessdata': selected['tessdata'],
+            'pages': pages,
+            'cached_pages': cached_pages,
+            'elapsed_seconds': round(seconds, 3),
+            'pages_per_second': round(pages / seconds, 3) if seconds else 0.0,
+            'profile_avg_pages_per_second': round(average, 3)
+        }
         
     def preprocess_image(self, image, deskew=True, enhance=True):
         """
@@ -43,74 +302,229 @@ class OCRProcessor:
         
         Args:
             image: PIL Image object
-            deskew: Corregir rotación
-            enhance: Mejorar contraste y nitidez
+            deskew: Corregir rotación (si el pipeline la tiene habilitada)
+            enhance: Binarizar y limpiar ruido según el pipeline; si es False
+                solo se convierte a escala de grises
             
         Returns:
             PIL Image: Imagen procesada
         """
-        # Convertir a escala de grises
-        if image.mode != 'L':
-            image = image.convert('L')
+        if not enhance:
+            return self.preprocessor.process(
+                image,
+                deskew=deskew and self.preprocessor.deskew,
+                binarize='none',
+                denoise=False
+            )
         
-        if enhance:
-            # Mejorar contraste
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2.0)
+        return self.preprocessor.process(
+            image,
+            deskew=deskew and self.preprocessor.deskew
+        )
+    
+    def detect_orientation(self, image, lang=None):
+        """
+        Detecta rotación y escritura con Tesseract OSD sobre una miniatura
+        
+        OSD no necesita resolución completa, así que se ejecuta sobre una
+        copia reducida; un fallo de OSD (página casi vacía, sin modelo
+        'osd') no impide el OCR normal.
+        
+        Args:
+            image: PIL Image object
+            lang: Idiomas solicitados ('spa+eng'). None usa default
+            
+        Returns:
+            dict: {
+                'rotate': int (grados horarios a corregir: 0, 90, 180, 270),
+                'script': str o None,
+                'orientation_confidence': float,
+                'script_confidence': float,
+                'language': str (idiomas a usar en el OCR)
+            }
+        """
+        language = lang or self.default_lang
+        result = {
+            'rotate': 0,
+            'script': None,
+            'orientation_confidence': 0.0,
+            'script_confidence': 0.0,
+            'language': language
+        }
+        
+        try:
+            thumbnail = image
+            scale = self.osd_max_side / float(max(image.size))
+            if scale < 1:
+                thumbnail = image.resize(
+                    (max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+                    Image.BILINEAR
+                )
+            if thumbnail.mode not in ('L', 'RGB'):
+                thumbnail = thumbnail.convert('L')
             
-            # Mejorar nitidez
-            image = image.filter(ImageFilter.SHARPEN)
+            osd = pytesseract.image_to_osd(
+                thumbnail,
+                output_type=pytesseract.Output.DICT,
+                timeout=self.timeout_seconds
+            )
+        except Exception as e:
+            logger.debug(f"OSD failed, using page as is: {str(e)}")
+            return result
+        
+        result['orientation_confidence'] = round(float(osd.get('orientation_conf', 0)), 2)
+        result['script_confidence'] = round(float(osd.get('script_conf', 0)), 2)
+        
+        if result['orientation_confidence'] >= self.osd_min_confidence:
+            result['rotate'] = int(osd.get('rotate', 0)) % 360
+        if result['script_confidence'] >= self.osd_min_confidence:
+            result['script'] = osd.get('script')
+            result['language'] = self.select_languages(language, result['script'])
+        
+        return result
+    
+    def select_languages(self, lang, script):
+        """
+        Reduce los idiomas solicitados a los de la escritura detectada
+        
+        Args:
+            lang: Idiomas solicitados ('spa+eng+rus')
+            script: Escritura detectada por OSD ('Latin', 'Cyrillic', ...)
+            
+        Returns:
+            str: Idiomas de la escritura dentro de los solicitados; si
+                ninguno coincide, el primero instalado para esa escritura;
+                si la escritura es desconocida, los solicitados sin cambios
+        """
+        candidates = self.SCRIPT_LANGUAGES.get(script)
+        if not candidates:
+            return lang
         
-        # TODO: Implementar deskew si es necesario
-        # (requiere biblioteca adicional como deskew o scipy)
+        requested = lang.split('+')
+        matching = [code for code in requested if code in candidates]
+        if matching:
+            return '+'.join(matching)
         
-        return image
+        installed = self.get_available_languages()
+        for code in candidates:
+            if code in installed:
+                return code
+        return lang
     
-    def extract_text_from_image(self, image_path, lang=None, preprocess=True):
+    def extract_text_from_image(self, image_path, lang=None, preprocess=True, profile=None, osd=None):
         """
         Extrae texto de una imagen
         
         Args:
-            image_path: Ruta de la imagen
+            image_path: Ruta de la imagen o PIL Image ya cargada
             lang: Código de idioma ('spa', 'eng', etc.). None usa default
             preprocess: Aplicar preprocesamiento
+            profile: Perfil de velocidad ('fast', 'balanced', 'accurate')
+            osd: Detectar orientación y escritura antes del OCR
+                (None usa la configuración del procesador)
             
         Returns:
             dict: {
                 'success': bool,
                 'text': str,
                 'confidence': float,
-                'language': str,
+                'language': str (idiomas usados tras OSD),
+                'cached': bool,
+                'orientation': dict de detect_orientation (si OSD está activo),
                 'error': str (si falla)
             }
         """
+        osd = self.osd_enabled if osd is None else osd
         try:
+            # Imágenes enormes se procesan por teselas sin cargarlas completas
+            if not isinstance(image_path, Image.Image) and self.tile_threshold_pixels:
+                size = tiling.probe_image_size(image_path, timeout=self.timeout_seconds)
+                if size and size[0] * size[1] > self.tile_threshold_pixels:
+                    return self.extract_text_tiled(
+                        image_path, lang, preprocess, profile=profile, size=size
+                    )
+            
             # Cargar imagen
-            image = Image.open(image_path)
+            if isinstance(image_path, Image.Image):
+                image = image_path
+            else:
+                image = Image.open(image_path)
+            
+            # Idioma y opciones del motor a usar
+            language = lang or self.default_lang
+            config = self.build_tesseract_config(profile)
+            
+            # Reutilizar resultado si la misma página ya se procesó
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(
+                    image,
+                    lang=language,
+                    preprocess=self.preprocessor.signature() if preprocess else False,
+                    config=config,
+                    osd=bool(osd)
+                )
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    response = {
+                        'success': True,
+                        'text': cached['text'],
+                        'confidence': cached['confidence'],
+                        'language': cached.get('language', language),
+                        'cached': True
+                    }
+                    if cached.get('orientation') is not None:
+                        response['orientation'] = cached['orientation']
+                    return response
+            
+            # Corregir rotación y acotar idiomas antes del pase completo
+            orientation = None
+            if osd:
+                orientation = self.detect_orientation(image, language)
+                if orientation['rotate'] in self.OSD_TRANSPOSE:
+                    image = image.transpose(self.OSD_TRANSPOSE[orientation['rotate']])
+                language = orientation['language']
             
             # Preprocesar si está habilitado
             if preprocess:
                 image = self.preprocess_image(image)
             
-            # Idioma a usar
-            language = lang or self.default_lang
-            
             # Extraer texto
-            text = pytesseract.image_to_string(image, lang=language)
+            text = pytesseract.image_to_string(
+                image, lang=language, config=config
+            )
             
             # Obtener datos detallados (incluye confianza)
-            data = pytesseract.image_to_data(image, lang=language, output_type=pytesseract.Output.DICT)
+            data = pytesseract.image_to_data(
+                image,
+                lang=language,
+                config=config,
+                output_type=pytesseract.Output.DICT
+            )
             
-            # Calcular confianza promedio
-            confidences = [int(conf) for conf in data['conf'] if conf != '-1']
+            # Calcular confianza promedio (Tesseract usa -1 para bloques sin texto)
+            confidences = [float(conf) for conf in data['conf'] if float(conf) >= 0]
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0
             
-            return {
-                'success': True,
+            result = {
                 'text': text.strip(),
                 'confidence': round(avg_confidence, 2),
-                'language': language
+                'language': language,
+                'orientation': orientation
             }
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
+            
+            response = {
+                'success': True,
+                'text': result['text'],
+                'confidence': result['confidence'],
+                'language': language,
+                'cached': False
+            }
+            if orientation is not None:
+                response['orientation'] = orientation
+            return response
             
         except Exception as e:
             logger.error(f"OCR failed for {image_path}: {str(e)}")
@@ -122,7 +536,74 @@ class OCRProcessor:
                 'language': lang or self.default_lang
             }
     
-    def extract_text_from_pdf(self, pdf_path, lang=None, preprocess=True, max_pages=None):
+    def extract_text_tiled(self, image_path, lang=None, preprocess=True, profile=None, size=None):
+        """
+        Extrae texto de una imagen muy grande por teselas solapadas
+        
+        Cada tesela se decodifica desde disco bajo demanda y se procesa en
+        paralelo; las palabras se trasladan a coordenadas globales y las
+        repetidas en las zonas de solape se descartan.
+        
+        Args:
+            image_path: Ruta de la imagen
+            lang: Código de idioma
+            preprocess: Aplicar preprocesamiento (sin deskew, para no
+                desalinear las coordenadas entre teselas)
+            profile: Perfil de velocidad
+            size: (ancho, alto) si ya se conoce
+            
+        Returns:
+            dict: Igual que extract_text_from_image, más 'tiles'
+        """
+        language = lang or self.default_lang
+        try:
+            size = size or tiling.probe_image_size(image_path, timeout=self.timeout_seconds)
+            if not size:
+                raise ValueError(f"Could not read image size: {image_path}")
+            
+            config = self.build_tesseract_config(profile)
+            tiles = tiling.plan_tiles(size[0], size[1], self.tile_size, self.tile_overlap)
+            logger.info(f"Tiled OCR: {size[0]}x{size[1]} in {len(tiles)} tiles")
+            
+            def process_tile(tile):
+                image = tiling.read_tile(image_path, tile, timeout=self.timeout_seconds)
+                if preprocess:
+                    image = self.preprocess_image(image, deskew=False)
+                data = pytesseract.image_to_data(
+                    image,
+                    lang=language,
+                    config=config,
+                    output_type=pytesseract.Output.DICT
+                )
+                return tiling.extract_tile_words(data, tile)
+            
+            with ThreadPoolExecutor(max_workers=max(1, self.tile_workers)) as executor:
+                words = [w for tile_words in executor.map(process_tile, tiles) for w in tile_words]
+            
+            confidences = [w['conf'] for w in words]
+            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+            
+            return {
+                'success': True,
+                'text': tiling.merge_words(words),
+                'confidence': round(avg_confidence, 2),
+                'language': language,
+                'cached': False,
+                'tiles': len(tiles)
+            }
+        
+        except Exception as e:
+            logger.error(f"Tiled OCR failed for {image_path}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'text': '',
+                'confidence': 0,
+                'language': language
+            }
+    
+    def extract_text_from_pdf(self, pdf_path, lang=None, preprocess=True, max_pages=None, profile=None,
+                              osd=None):
         """
         Extrae texto de un PDF escaneado
         
@@ -131,6 +612,8 @@ class OCRProcessor:
             lang: Código de idioma
             preprocess: Aplicar preprocesamiento
             max_pages: Máximo número de páginas a procesar (None = todas)
+            profile: Perfil de velocidad (define DPI y modo de render)
+            osd: Detectar orientación y escritura de cada página
             
         Returns:
             dict: {
@@ -142,8 +625,15 @@ class OCRProcessor:
             }
         """
         try:
-            # Convertir PDF a imágenes
-            images = convert_from_path(pdf_path)
+            render = self.get_profile(profile)
+            
+            # Convertir PDF a imágenes (solo las páginas que se van a procesar)
+            images = convert_from_path(
+                pdf_path,
+                dpi=render['dpi'],
+                grayscale=render['grayscale'],
+                last_page=max_pages
+            )
             
             # Limitar páginas si se especifica
             if max_pages:
@@ -152,19 +642,11 @@ class OCRProcessor:
             pages_data = []
             full_text = []
             total_confidence = 0
+            cached_pages = 0
             
-            # Procesar cada página
+            # Procesar cada página (las páginas repetidas salen de la caché)
             for i, image in enumerate(images, 1):
-                # Guardar imagen temporalmente
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                    tmp_path = tmp.name
-                    image.save(tmp_path, 'PNG')
-                
-                # Extraer texto
-                result = self.extract_text_from_image(tmp_path, lang, preprocess)
-                
-                # Limpiar archivo temporal
-                os.unlink(tmp_path)
+                result = self.extract_text_from_image(image, lang, preprocess, profile=profile, osd=osd)
                 
                 # Guardar resultado de la página
                 page_result = {
@@ -172,9 +654,13 @@ class OCRProcessor:
                     'text': result['text'],
                     'confidence': result['confidence']
                 }
+                if result.get('orientation'):
+                    page_result['orientation'] = result['orientation']
                 pages_data.append(page_result)
                 full_text.append(result['text'])
                 total_confidence += result['confidence']
+                if result.get('cached'):
+                    cached_pages += 1
             
             avg_confidence = total_confidence / len(images) if images else 0
             
@@ -183,6 +669,7 @@ class OCRProcessor:
                 'pages': pages_data,
                 'full_text': '\n\n'.join(full_text),
                 'total_pages': len(images),
+                'cached_pages': cached_pages,
                 'avg_confidence': round(avg_confidence, 2),
                 'language': lang or self.default_lang
             }
@@ -198,6 +685,163 @@ class OCRProcessor:
                 'avg_confidence': 0
             }
     
+    def iter_pdf_pages(self, pdf_path, lang=None, preprocess=True, max_pages=None, profile=None,
+                       osd=None):
+        """
+        Extrae texto de un PDF página a página
+        
+        Cada página se renderiza, se procesa y se libera antes de pasar a la
+        siguiente, de modo que la memoria no crece con el número de páginas
+        y el primer resultado está disponible en cuanto termina la página 1.
+        
+        Args:
+            pdf_path: Ruta del PDF
+            lang: Código de idioma
+            preprocess: Aplicar preprocesamiento
+            max_pages: Máximo número de páginas a procesar (None = todas)
+            profile: Perfil de velocidad
+            osd: Detectar orientación y escritura de cada página
+            
+        Yields:
+            dict: Primero {'total_pages': int}; después, por cada página,
+                {'page', 'success', 'text', 'confidence', 'cached'},
+                'orientation' si OSD está activo y 'error' si la página falla
+        """
+        render = self.get_profile(profile)
+        total_pages = pdfinfo_from_path(pdf_path)['Pages']
+        if max_pages:
+            total_pages = min(total_pages, max_pages)
+        
+        yield {'total_pages': total_pages}
+        
+        for page_number in range(1, total_pages + 1):
+            images = convert_from_path(
+                pdf_path,
+                dpi=render['dpi'],
+                grayscale=render['grayscale'],
+                first_page=page_number,
+                last_page=page_number
+            )
+            if not images:
+                break
+            
+            result = self.extract_text_from_image(images[0], lang, preprocess, profile=profile, osd=osd)
+            page_result = {
+                'page': page_number,
+                'success': result['success'],
+                'text': result['text'],
+                'confidence': result['confidence'],
+                'cached': result.get('cached', False)
+            }
+            if result.get('orientation'):
+                page_result['orientation'] = result['orientation']
+            if not result['success']:
+                page_result['error'] = result.get('error')
+            
+            del images
+            yield page_result
+    
+    def extract_text(self, path, lang=None, preprocess=True, max_pages=None, profile=None, osd=None):
+        """
+        Extrae texto de un PDF o una imagen según su extensión
+        
+        Returns:
+            dict: {'success', 'text', 'confidence', 'pages', 'cached_pages', 'error' (si falla)}
+        """
+        if str(path).lower().endswith('.pdf'):
+            result = self.extract_text_from_pdf(
+                path, lang, preprocess, max_pages=max_pages, profile=profile, osd=osd
+            )
+            summary = {
+                'success': result['success'],
+                'text': result.get('full_text', ''),
+                'confidence': result.get('avg_confidence', 0),
+                'pages': result.get('total_pages', 0),
+                'cached_pages': result.get('cached_pages', 0)
+            }
+        else:
+            result = self.extract_text_from_image(path, lang, preprocess, profile=profile, osd=osd)
+            summary = {
+                'success': result['success'],
+                'text': result.get('text', ''),
+                'confidence': result.get('confidence', 0),
+                'pages': 1,
+                'cached_pages': 1 if result.get('cached') else 0
+            }
+        
+        if not result['success']:
+            summary['error'] = result.get('error')
+        return summary
+    
+    def iter_batch(self, paths, lang=None, preprocess=True, max_pages=None, profile=None, ordered=True,
+                   osd=None):
+        """
+        Procesa un lote de archivos en el pool OCR compartido
+        
+        Solo se encolan unos pocos archivos por delante de los que están en
+        curso, así que varios lotes simultáneos se intercalan en el pool en
+        lugar de esperar uno detrás de otro.
+        
+        Args:
+            paths: Lista de rutas (PDF o imagen)
+            lang: Código de idioma
+            preprocess: Aplicar preprocesamiento
+            max_pages: Máximo de páginas por PDF
+            profile: Perfil de velocidad
+            ordered: True = resultados en el orden de entrada;
+                False = en cuanto termina cada archivo
+            osd: Detectar orientación y escritura de cada página
+            
+        Yields:
+            tuple: (índice, dict de extract_text)
+        """
+        pool = self._get_batch_pool()
+        window = max(1, self.batch_workers * 2)
+        pending = {}
+        next_index = 0
+        next_to_yield = 0
+        done = {}
+        
+        def run(path):
+            try:
+                return self.extract_text(
+                    path, lang, preprocess, max_pages=max_pages, profile=profile, osd=osd
+                )
+            except Exception as e:
+                logger.error(f"Batch OCR failed for {path}: {str(e)}")
+                return {'success': False, 'text': '', 'confidence': 0, 'pages': 0,
+                        'cached_pages': 0, 'error': str(e)}
+        
+        try:
+            while next_index < len(paths) or pending:
+                while next_index < len(paths) and len(pending) + len(done) < window:
+                    pending[pool.submit(run, paths[next_index])] = next_index
+                    next_index += 1
+                
+                finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done[pending.pop(future)] = future.result()
+                
+                if ordered:
+                    while next_to_yield in done:
+                        yield next_to_yield, done.pop(next_to_yield)
+                        next_to_yield += 1
+                else:
+                    for index in sorted(done):
+                        yield index, done.pop(index)
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def _get_batch_pool(self):
+        with self._batch_pool_lock:
+            if self._batch_pool is None:
+                self._batch_pool = ThreadPoolExecutor(
+                    max_workers=max(1, self.batch_workers),
+                    thread_name_prefix='ocr-batch'
+                )
+            return self._batch_pool
+    
     def is_language_available(self, lang_code):
         """
         Verifica si un idioma está disponible en Tesseract
@@ -214,15 +858,24 @@ class OCRProcessor:
         except Exception:
             return False
     
-    def get_available_languages(self):
+    def get_available_languages(self, refresh=False):
         """
         Obtiene lista de idiomas disponibles en Tesseract
         
+        La lista se guarda tras la primera consulta para no lanzar un
+        proceso de Tesseract en cada página.
+        
+        Args:
+            refresh: Volver a consultar a Tesseract
+        
         Returns:
             list: Lista de códigos de idioma disponibles
         """
+        if self._languages is not None and not refresh:
+            return self._languages
         try:
-            return pytesseract.get_languages()
+            self._languages = pytesseract.get_languages()
+            return self._languages
         except Exception as e:
             logger.error(f"Failed to get available languages: {str(e)}")
             return ['eng']  # Fallback a inglés
@@ -0,0 +1,267 @@
+"""
+Preprocesamiento vectorizado de imágenes para OCR
+
+Binarización (Otsu o adaptativa), limpieza de ruido y corrección de
+inclinación por perfil de proyección, todo con NumPy. El análisis
+(umbral global y ángulo) se calcula sobre una copia reducida y después
+se aplica a la imagen a resolución completa.
+"""
+import logging
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+
+logger = logging.getLogger(__name__)
+
+
+BINARIZATION_METHODS = ('otsu', 'adaptive', 'none')
+
+
+def otsu_threshold(gray):
+    """
+    Calcula el umbral de Otsu de una imagen en escala de grises
+
+    Args:
+        gray: np.ndarray uint8
+
+    Returns:
+        int: Umbral (los píxeles > umbral se consideran fondo)
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 127
+
+    levels = np.arange(256, dtype=np.float64)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    cum_mean = np.cumsum(hist * levels)
+    mean_total = cum_mean[-1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_bg = cum_mean / weight_bg
+        mean_fg = (mean_total - cum_mean) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+
+    between = np.nan_to_num(between)
+    return int(np.argmax(between))
+
+
+def adaptive_threshold(gray, block_size=31, offset=10):
+    """
+    Binarización adaptativa por media local (imagen integral)
+
+    Args:
+        gray: np.ndarray uint8
+        block_size: Lado de la ventana local (impar)
+        offset: Margen restado a la media local
+
+    Returns:
+        np.ndarray bool: True para fondo, False para tinta
+    """
+    half = block_size // 2
+    padded = np.pad(gray.astype(np.int64), half + 1, mode='edge')
+    integral = padded.cumsum(axis=0).cumsum(axis=1)
+
+    height, width = gray.shape
+    y0 = np.arange(height)
+    x0 = np.arange(width)
+    y1 = y0 + block_size
+    x1 = x0 + block_size
+
+    window_sum = (
+        integral[np.ix_(y1, x1)]
+        - integral[np.ix_(y0, x1)]
+        - integral[np.ix_(y1, x0)]
+        + integral[np.ix_(y0, x0)]
+    )
+    local_mean = window_sum / float(block_size * block_size)
+    return gray > (local_mean - offset)
+
+
+def remove_noise(binary, min_neighbors=5):
+    """
+    Filtro de mayoría 3x3 sobre una imagen binaria
+
+    Elimina puntos aislados de tinta y rellena huecos de un píxel.
+
+    Args:
+        binary: np.ndarray bool (True = fondo)
+        min_neighbors: Mínimo de vecinos de fondo (incluido el propio píxel)
+            para que el píxel quede como fondo
+
+    Returns:
+        np.ndarray bool
+    """
+    padded = np.pad(binary, 1, mode='edge').astype(np.uint8)
+    height, width = binary.shape
+    votes = np.zeros((height, width), dtype=np.uint8)
+    for dy in range(3):
+        for dx in range(3):
+            votes += padded[dy:dy + height, dx:dx + width]
+    return votes >= min_neighbors
+
+
+def estimate_skew_angle(binary, max_angle=10.0, coarse_step=1.0, fine_step=0.1, max_samples=200000):
+    """
+    Estima la inclinación del texto por perfil de proyección
+
+    Proyecta los píxeles de tinta sobre el eje vertical girado a cada
+    ángulo candidato; las líneas de texto alineadas producen el perfil
+    más concentrado.
+
+    Args:
+        binary: np.ndarray bool (True = fondo)
+        max_angle: Inclinación máxima a considerar (grados)
+        coarse_step: Paso de la búsqueda inicial
+        fine_step: Paso del refinamiento alrededor del mejor ángulo
+        max_samples: Máximo de píxeles de tinta usados en el cálculo
+
+    Returns:
+        float: Ángulo en grados para PIL.Image.rotate (antihorario)
+    """
+    ys, xs = np.nonzero(~binary)
+    if ys.size < 50:
+        return 0.0
+
+    if ys.size > max_samples:
+        stride = int(np.ceil(ys.size / max_samples))
+        ys = ys[::stride]
+        xs = xs[::stride]
+
+    ys = ys.astype(np.float64)
+    xs = xs.astype(np.float64)
+
+    def score(angle):
+        radians = np.deg2rad(angle)
+        rows = ys * np.cos(radians) - xs * np.sin(radians)
+        rows = np.round(rows - rows.min()).astype(np.int64)
+        profile = np.bincount(rows).astype(np.float64)
+        return float(np.sum(profile ** 2))
+
+    def search(candidates):
+        scores = [score(a) for a in candidates]
+        return float(candidates[int(np.argmax(scores))])
+
+    best = search(np.arange(-max_angle, max_angle + coarse_step / 2, coarse_step))
+    best = search(np.arange(best - coarse_step, best + coarse_step + fine_step / 2, fine_step))
+    return round(best, 2)
+
+
+class ImagePreprocessor:
+    """
+    Pipeline de preprocesamiento configurable para OCR
+    """
+
+    def __init__(self, binarize='otsu', denoise=True, deskew=True,
+                 analysis_max_side=1024, max_skew_angle=10.0,
+                 adaptive_block_size=31, adaptive_offset=10):
+        """
+        Inicializa el pipeline
+
+        Args:
+            binarize: Método de binarización ('otsu', 'adaptive', 'none')
+            denoise: Aplicar filtro de ruido
+            deskew: Corregir inclinación
+            analysis_max_side: Lado máximo de la copia reducida usada para el análisis
+            max_skew_angle: Inclinación máxima corregible (grados)
+            adaptive_block_size: Ventana de la binarización adaptativa (a resolución completa)
+            adaptive_offset: Margen de la binarización adaptativa
+        """
+        if binarize not in BINARIZATION_METHODS:
+            raise ValueError(f"binarize must be one of {BINARIZATION_METHODS}")
+
+        self.binarize = binarize
+        self.denoise = denoise
+        self.deskew = deskew
+        self.analysis_max_side = analysis_max_side
+        self.max_skew_angle = max_skew_angle
+        self.adaptive_block_size = adaptive_block_size | 1
+        self.adaptive_offset = adaptive_offset
+
+    def signature(self):
+        """
+        Resumen de la configuración (forma parte de la clave de caché OCR)
+
+        Returns:
+            str
+        """
+        return (
+            f"bin={self.binarize};denoise={self.denoise};deskew={self.deskew};"
+            f"side={self.analysis_max_side};block={self.adaptive_block_size};"
+            f"offset={self.adaptive_offset}"
+        )
+
+    def analyze(self, image):
+        """
+        Calcula umbral global y ángulo de inclinación sobre una copia reducida
+
+        Args:
+            image: PIL Image en modo 'L'
+
+        Returns:
+            dict: {'threshold': int, 'angle': float}
+        """
+        small = image.copy()
+        small.thumbnail((self.analysis_max_side, self.analysis_max_side))
+        gray = np.asarray(small, dtype=np.uint8)
+
+        threshold = otsu_threshold(gray)
+        angle = 0.0
+        if self.deskew:
+            angle = estimate_skew_angle(gray > threshold, max_angle=self.max_skew_angle)
+
+        return {'threshold': threshold, 'angle': angle}
+
+    def process(self, image, deskew=None, binarize=None, denoise=None):
+        """
+        Aplica el pipeline a la imagen completa
+
+        Args:
+            image: PIL Image object
+            deskew: Sobrescribe la corrección de inclinación (None usa la configuración)
+            binarize: Sobrescribe el método de binarización
+            denoise: Sobrescribe el filtro de ruido
+
+        Returns:
+            PIL Image: Imagen en modo 'L' lista para Tesseract
+        """
+        deskew = self.deskew if deskew is None else deskew
+        binarize = self.binarize if binarize is None else binarize
+        denoise = self.denoise if denoise is None else denoise
+
+        if image.mode != 'L':
+            image = image.convert('L')
+
+        analysis = self.analyze(image) if (deskew or binarize == 'otsu') else {}
+        angle = analysis.get('angle', 0.0) if deskew else 0.0
+
+        if abs(angle) >= 0.1:
+            logger.debug(f"Deskewing image by {angle} degrees")
+            image = image.rotate(
+                angle,
+                resample=Image.BICUBIC,
+                expand=True,
+                fillcolor=255
+            )
+
+        if binarize == 'none':
+            if denoise:
+                image = image.filter(ImageFilter.MedianFilter(3))
+            return image
+
+        gray = np.asarray(image, dtype=np.uint8)
+        if binarize == 'otsu':
+            binary = gray > analysis['threshold']
+        else:
+            binary = adaptive_threshold(
+                gray,
+                block_size=self.adaptive_block_size,
+                offset=self.adaptive_offset
+            )
+
+        if denoise:
+            binary = remove_noise(binary)
+
+        return Image.fromarray(np.where(binary, 255, 0).astype(np.uint8), mode='L')
@@ -0,0 +1,233 @@
+"""
+Límite de conversiones adaptativo según la presión del sistema
+
+Un hilo en segundo plano mide cada ADAPTIVE_INTERVAL_SECONDS la CPU y la
+memoria disponible (psutil) y, en Linux, la presión de CPU, memoria y E/S
+del kernel (PSI, /proc/pressure). Con esas muestras ajusta el límite de
+conversiones simultáneas del planificador al estilo AIMD:
+
+- Memoria disponible por debajo de ADAPTIVE_MEMORY_RESERVE_MB o presión
+  de memoria 'full' por encima del umbral: el límite baja de golpe al
+  mínimo, antes de que el OOM killer mate a soffice o FFmpeg.
+- CPU por encima de ADAPTIVE_CPU_TARGET_PERCENT o presión 'some' de CPU,
+  memoria o E/S por encima de ADAPTIVE_PSI_THRESHOLD: el límite se
+  multiplica por ADAPTIVE_DECREASE_FACTOR.
+- Sin presión y con conversiones esperando turno: el límite sube de uno en
+  uno hasta ADAPTIVE_MAX_CONCURRENCY.
+
+Las conversiones en curso no se interrumpen al bajar el límite: solo dejan
+de entrar nuevas hasta que haya hueco. Cada proceso ajusta su propio
+planificador; como todos ven la misma presión, bajan a la vez.
+"""
+import logging
+import os
+import threading
+
+import psutil
+
+from src import metrics
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+PSI_ROOT = '/proc/pressure'
+PSI_RESOURCES = ('cpu', 'memory', 'io')
+
+
+def read_psi(resource, root=PSI_ROOT):
+    """
+    Lee la presión de un recurso (media de los últimos 10 segundos)
+
+    Args:
+        resource: 'cpu', 'memory' o 'io'
+        root: Directorio de PSI
+
+    Returns:
+        dict o None si el kernel no expone PSI: {'some': float, 'full': float}
+            (porcentaje del tiempo con alguna / todas las tareas esperando)
+    """
+    try:
+        with open(os.path.join(root, resource)) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    pressure = {'some': 0.0, 'full': 0.0}
+    for line in lines:
+        kind, _, fields = line.partition(' ')
+        for field in fields.split():
+            name, _, value = field.partition('=')
+            if name == 'avg10' and kind in pressure:
+                pressure[kind] = float(value)
+    return pressure
+
+
+def sample_pressure(psi_root=PSI_ROOT):
+    """
+    Toma una muestra de la presión del sistema
+
+    Args:
+        psi_root: Directorio de PSI
+
+    Returns:
+        dict: {
+            'cpu_percent': float,
+            'memory_available_mb': float,
+            'psi': {recurso: {'some', 'full'} o None}
+        }
+    """
+    memory_info = psutil.virtual_memory()
+    return {
+        'cpu_percent': psutil.cpu_percent(interval=None),
+        'memory_available_mb': memory_info.available / (1024 * 1024),
+        'psi': {resource: read_psi(resource, psi_root) for resource in PSI_RESOURCES}
+    }
+
+
+class AdaptiveConcurrency:
+    """
+    Controlador AIMD del límite de un ConversionScheduler
+    """
+
+    def __init__(self, scheduler, min_limit=1, max_limit=16, interval_seconds=2.0,
+                 cpu_target_percent=85.0, psi_threshold=20.0, memory_reserve_mb=512,
+                 decrease_factor=0.5, sampler=None):
+        """
+        Inicializa el controlador (el hilo arranca con ensure_started)
+
+        Args:
+            scheduler: ConversionScheduler cuyo límite se ajusta
+            min_limit: Límite mínimo
+            max_limit: Límite máximo
+            interval_seconds: Segundos entre muestras
+            cpu_target_percent: Uso de CPU a partir del cual se reduce
+            psi_threshold: Presión 'some' (avg10, %) a partir de la cual se reduce
+            memory_reserve_mb: Memoria disponible mínima antes de bajar al mínimo
+            decrease_factor: Factor de reducción multiplicativa
+            sampler: Callable que devuelve una muestra (None = sample_pressure)
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError('min_limit must be between 1 and max_limit')
+
+        self.scheduler = scheduler
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.interval_seconds = interval_seconds
+        self.cpu_target_percent = cpu_target_percent
+        self.psi_threshold = psi_threshold
+        self.memory_reserve_mb = memory_reserve_mb
+        self.decrease_factor = decrease_factor
+        self.sampler = sampler or sample_pressure
+        self.last_sample = None
+        self.last_reason = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @classmethod
+    def from_settings(cls, scheduler):
+        """
+        Returns:
+            AdaptiveConcurrency: Configurado con ADAPTIVE_*
+        """
+        return cls(
+            scheduler,
+            min_limit=settings.ADAPTIVE_MIN_CONCURRENCY,
+            max_limit=settings.ADAPTIVE_MAX_CONCURRENCY,
+            interval_seconds=settings.ADAPTIVE_INTERVAL_SECONDS,
+            cpu_target_percent=settings.ADAPTIVE_CPU_TARGET_PERCENT,
+            psi_threshold=settings.ADAPTIVE_PSI_THRESHOLD,
+            memory_reserve_mb=settings.ADAPTIVE_MEMORY_RESERVE_MB,
+            decrease_factor=settings.ADAPTIVE_DECREASE_FACTOR
+        )
+
+    def ensure_started(self):
+        """
+        Arranca el hilo en este proceso si aún no está en marcha
+
+        Comprueba el PID porque los workers creados con fork heredan el
+        objeto pero no el hilo.
+        """
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='adaptive-concurrency', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo; el límite se queda en su último valor"""
+        self._stop.set()
+
+    def _run(self):
+        # La primera llamada sin intervalo solo fija la referencia de CPU
+        psutil.cpu_percent(interval=None)
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.adjust()
+            except Exception as e:
+                logger.error(f"Adaptive concurrency sampling failed: {str(e)}")
+
+    def adjust(self, sample=None):
+        """
+        Toma una muestra y ajusta el límite del planificador
+
+        Args:
+            sample: Muestra ya tomada (None = llamar a sampler)
+
+        Returns:
+            int: Límite resultante
+        """
+        sample = sample if sample is not None else self.sampler()
+        current = self.scheduler.max_concurrent
+        limit, reason = self.decide(sample, current, self.scheduler.stats()['queued'] > 0)
+        self.last_sample = sample
+        self.last_reason = reason
+        if limit != current:
+            logger.info(f"Concurrency limit {current} → {limit} ({reason})")
+            self.scheduler.set_limit(limit)
+        metrics.set_concurrency_limit(limit)
+        return limit
+
+    def decide(self, sample, current, waiting):
+        """
+        Calcula el nuevo límite a partir de una muestra
+
+        Args:
+            sample: dict de sample_pressure
+            current: Límite actual
+            waiting: Si hay conversiones esperando turno
+
+        Returns:
+            tuple: (límite, motivo: 'memory', 'pressure', 'increase' o 'steady')
+        """
+        psi = sample.get('psi') or {}
+        memory_psi = psi.get('memory') or {}
+        if (sample['memory_available_mb'] < self.memory_reserve_mb
+                or memory_psi.get('full', 0.0) > self.psi_threshold):
+            return self.min_limit, 'memory'
+
+        stalled = any(
+            (psi.get(resource) or {}).get('some', 0.0) > self.psi_threshold
+            for resource in PSI_RESOURCES
+        )
+        if stalled or sample['cpu_percent'] > self.cpu_target_percent:
+            return max(self.min_limit, int(current * self.decrease_factor)), 'pressure'
+
+        if waiting and current < self.max_limit:
+            return current + 1, 'increase'
+        return max(self.min_limit, min(current, self.max_limit)), 'steady'
+
+    def stats(self):
+        """
+        Estado del controlador para /health
+
+        Returns:
+            dict: {'limit', 'min', 'max', 'reason', 'sample'}
+        """
+        return {
+            'limit': self.scheduler.max_concurrent,
+            'min': self.min_limit,
+            'max': self.max_limit,
+            'reason': self.last_reason,
+            'sample': self.last_sample
+        }
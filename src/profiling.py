@@ -0,0 +1,139 @@
+"""
+Perfilado bajo demanda de peticiones individuales
+
+Un administrador puede pedir el perfil de una petición concreta con la
+cabecera X-Profile-Key (o el parámetro _profile_key) igual a
+PROFILING_ADMIN_KEY. La petición se ejecuta bajo pyinstrument (muestreo,
+si está instalado) o cProfile y el resultado se guarda en
+LOGS_FOLDER/profiles/<request_id>. Como mucho se perfilan
+PROFILING_MAX_PER_MINUTE peticiones por minuto y proceso; el resto se
+atiende con normalidad.
+"""
+import cProfile
+import logging
+import secrets
+import threading
+import time
+from pathlib import Path
+
+from flask import g, request
+
+from src.config import settings
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileBudget:
+    """
+    Ventana deslizante de un minuto que limita los perfiles por proceso
+    """
+
+    def __init__(self):
+        self._started = []
+        self._lock = threading.Lock()
+
+    def try_acquire(self, limit):
+        """
+        Args:
+            limit: Perfiles permitidos por minuto
+
+        Returns:
+            bool: True si aún queda cupo
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._started = [t for t in self._started if now - t < 60]
+            if len(self._started) >= limit:
+                return False
+            self._started.append(now)
+            return True
+
+
+budget = ProfileBudget()
+
+
+def is_profile_requested():
+    """
+    Returns:
+        bool: True si la petición trae la clave de administración correcta
+    """
+    admin_key = settings.PROFILING_ADMIN_KEY
+    if not admin_key:
+        return False
+    provided = request.headers.get('X-Profile-Key') or request.args.get('_profile_key', '')
+    return bool(provided) and secrets.compare_digest(provided, admin_key)
+
+
+def start_request_profile():
+    """
+    Arranca el perfilador si la petición lo pide y hay cupo
+
+    Se llama en before_request, después de asignar g.request_id.
+    """
+    if not is_profile_requested():
+        return
+
+    if not budget.try_acquire(settings.PROFILING_MAX_PER_MINUTE):
+        g.profile_status = 'rate_limited'
+        logger.warning("Profiling request skipped: per-minute limit reached")
+        return
+
+    try:
+        if pyinstrument is not None:
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+    except Exception as e:
+        # Otro perfilador activo en el proceso (p. ej. en otro hilo)
+        g.profile_status = 'unavailable'
+        logger.warning(f"Profiling request skipped: {str(e)}")
+        return
+
+    g.request_profiler = profiler
+
+
+def finish_request_profile(response):
+    """
+    Detiene el perfilador y guarda el resultado
+
+    Args:
+        response: Respuesta de Flask
+
+    Returns:
+        La misma respuesta con X-Profile-Status (y X-Profile-Id si se guardó)
+    """
+    profiler = g.pop('request_profiler', None)
+    if profiler is None:
+        status = g.get('profile_status')
+        if status:
+            response.headers['X-Profile-Status'] = status
+        return response
+
+    profile_dir = Path(settings.LOGS_FOLDER) / 'profiles'
+    try:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        if pyinstrument is not None and isinstance(profiler, pyinstrument.Profiler):
+            profiler.stop()
+            profile_path = profile_dir / f"{g.request_id}.html"
+            profile_path.write_text(profiler.output_html())
+        else:
+            profiler.disable()
+            profile_path = profile_dir / f"{g.request_id}.prof"
+            profiler.dump_stats(str(profile_path))
+    except Exception as e:
+        logger.error(f"Failed to save request profile: {str(e)}")
+        response.headers['X-Profile-Status'] = 'failed'
+        return response
+
+    logger.info(f"Request profile saved: {profile_path.name}")
+    response.headers['X-Profile-Status'] = 'saved'
+    response.headers['X-Profile-Id'] = profile_path.name
+    return response
@@ -1,12 +1,15 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, g, request, jsonify, send_file, stream_with_context
 from werkzeug.utils import secure_filename
+import json
 import os
+import re
 import uuid
 from pathlib import Path
-import psutil
 import time
 from datetime import datetime
-from typing import Tuple
+from typing import List, Tuple
+import shutil
+import zipfile
 
 from src.config import settings
 from src.logging import logger
@@ -14,12 +17,13 @@ from src.exceptions import (
     FileConverterException,
     InvalidFileException,
     UnsupportedFormatException,
-    ConversionFailedException,
     FileTooLargeException,
     FileNotFoundException,
     OCRDisabledException,
     OCRProcessingException,
-    URLDownloadException
+    InvalidParameterException,
+    URLDownloadException,
+    JobNotFoundException
 )
 from src.utils import (
     get_allowed_extensions,
@@ -32,51 +36,214 @@ from src.utils import (
 )
 from src.converters.factory import ConverterFactory
 from src.validators import FileValidator
-from src.ocr import OCRProcessor
+from src.ocr import OCRProcessor, OCRResultCache
+from src.preprocessing import ImagePreprocessor
+from src.scheduler import ConversionScheduler, PRIORITIES
+from src.auth import auth
+from src.health import HealthSampler
+from src.pressure import AdaptiveConcurrency
+from src.cancellation import CancellationToken, disconnect_monitor
+from src.conversion import CONVERT_MODES, convert_source, parse_max_latency
+from src.jobs import JobManager, create_store
+from src import metrics, profiling, timing
 
 main_bp = Blueprint('main', __name__)
-converter_factory = ConverterFactory()
+conversion_scheduler = ConversionScheduler.from_settings()
+converter_factory = ConverterFactory(scheduler=conversion_scheduler)
+concurrency_controller = (
+    AdaptiveConcurrency.from_settings(conversion_scheduler) if settings.ADAPTIVE_CONCURRENCY else None
+)
+
+ocr_cache = OCRResultCache(
+    max_entries=settings.OCR_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CACHE_TTL_HOURS * 3600
+) if settings.OCR_CACHE_ENABLED else None
 
 ocr_processor = OCRProcessor(
-    default_lang=settings.OCR_DEFAULT_LANGUAGE
+    default_lang=settings.OCR_DEFAULT_LANGUAGE,
+    cache=ocr_cache,
+    preprocessor=ImagePreprocessor(
+        binarize=settings.OCR_BINARIZATION,
+        denoise=settings.OCR_DENOISE,
+        deskew=settings.OCR_DESKEW,
+        analysis_max_side=settings.OCR_ANALYSIS_MAX_SIDE
+    ),
+    default_profile=settings.OCR_DEFAULT_PROFILE,
+    tessdata_dirs={
+        'fast': settings.OCR_TESSDATA_FAST_DIR,
+        'best': settings.OCR_TESSDATA_BEST_DIR
+    },
+    tile_threshold_pixels=settings.OCR_TILE_THRESHOLD_PIXELS,
+    tile_size=settings.OCR_TILE_SIZE,
+    tile_overlap=settings.OCR_TILE_OVERLAP,
+    tile_workers=settings.OCR_TILE_WORKERS,
+    timeout_seconds=settings.OCR_TIMEOUT_SECONDS,
+    batch_workers=settings.OCR_BATCH_WORKERS,
+    osd_enabled=settings.OCR_OSD_ENABLED,
+    osd_max_side=settings.OCR_OSD_MAX_SIDE,
+    osd_min_confidence=settings.OCR_OSD_MIN_CONFIDENCE
 ) if settings.ENABLE_OCR else None
 
+health_sampler = HealthSampler(
+    interval_seconds=settings.HEALTH_SAMPLE_INTERVAL_SECONDS,
+    folders={
+        'upload_folder': settings.UPLOAD_FOLDER,
+        'converted_folder': settings.CONVERTED_FOLDER,
+        'logs_folder': settings.LOGS_FOLDER
+    },
+    languages_provider=ocr_processor.get_available_languages if ocr_processor else None
+)
+
+OCR_BATCH_EXTENSIONS = ['.pdf', '.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.gif', '.webp']
+
+STREAM_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
+}
+
 def register_routes(app):
     app.register_blueprint(main_bp)
 
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,128}$')
+
+@main_bp.before_request
+def assign_request_id():
+    incoming = request.headers.get('X-Request-ID', '')
+    g.request_id = incoming if REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+    profiling.start_request_profile()
+
+@main_bp.after_request
+def finalize_response(response):
+    response = profiling.finish_request_profile(response)
+    if g.get('request_id'):
+        response.headers['X-Request-ID'] = g.request_id
+    return timing.add_server_timing_header(response)
+
+def _wants_timings() -> bool:
+    return request.values.get('timings', 'false').lower() == 'true'
+
+def _format_stream_event(stream_format: str, event: str, payload: dict) -> str:
+    if stream_format == 'sse':
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    return json.dumps({'type': event, **payload}) + '\n'
+
+def _iter_ocr_pages(source_path: Path, lang: str, preprocess: bool, profile: str, osd: bool):
+    if source_path.suffix.lower() == '.pdf':
+        max_pages = settings.OCR_MAX_PAGES
+        yield from ocr_processor.iter_pdf_pages(
+            str(source_path),
+            lang=lang,
+            preprocess=preprocess,
+            max_pages=max_pages if max_pages > 0 else None,
+            profile=profile,
+            osd=osd
+        )
+        return
+
+    yield {'total_pages': 1}
+    result = ocr_processor.extract_text_from_image(
+        str(source_path),
+        lang=lang,
+        preprocess=preprocess,
+        profile=profile,
+        osd=osd
+    )
+    page_result = {
+        'page': 1,
+        'success': result['success'],
+        'text': result['text'],
+        'confidence': result['confidence'],
+        'cached': result.get('cached', False)
+    }
+    if result.get('orientation'):
+        page_result['orientation'] = result['orientation']
+    if not result['success']:
+        page_result['error'] = result.get('error')
+    yield page_result
+
+def _stream_ocr_results(source_path: Path, stream_format: str, lang: str, preprocess: bool, profile: str,
+                        osd: bool):
+    started = time.monotonic()
+    pages = 0
+    failed_pages = 0
+    cached_pages = 0
+    total_confidence = 0.0
+
+    try:
+        for item in _iter_ocr_pages(source_path, lang, preprocess, profile, osd):
+            if 'page' not in item:
+                yield _format_stream_event(stream_format, 'start', {
+                    'total_pages': item['total_pages'],
+                    'language': lang,
+                    'profile': profile
+                })
+                continue
+
+            pages += 1
+            if item['success']:
+                total_confidence += item['confidence']
+            else:
+                failed_pages += 1
+            if item['cached']:
+                cached_pages += 1
+
+            yield _format_stream_event(stream_format, 'page', item)
+
+        metadata = ocr_processor.build_metadata(
+            profile, pages, time.monotonic() - started, cached_pages
+        )
+        succeeded = pages - failed_pages
+        yield _format_stream_event(stream_format, 'summary', {
+            'success': failed_pages == 0,
+            'total_pages': pages,
+            'failed_pages': failed_pages,
+            'avg_confidence': round(total_confidence / succeeded, 2) if succeeded else 0,
+            'language': lang,
+            'metadata': metadata,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        logger.info(f"OCR stream completed ({pages} pages, {failed_pages} failed, profile: {profile})")
+
+    except Exception as e:
+        logger.error(f"OCR stream error: {str(e)}", exc_info=True)
+        yield _format_stream_event(stream_format, 'error', {
+            'success': False,
+            'error': 'OCR processing failed',
+            'error_code': 'OCR_ERROR',
+            'pages_completed': pages,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+
 @main_bp.route('/health', methods=['GET'])
 def health_check():
     try:
-        disk_usage = psutil.disk_usage('/')
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        memory_info = psutil.virtual_memory()
+        snapshot = health_sampler.snapshot()
+        folders = snapshot['folders']
 
         health_data = {
             'success': True,
             'status': 'healthy',
             'service': 'file-converter',
             'timestamp': datetime.utcnow().isoformat(),
-            'uptime_seconds': time.time(),
-            'system': {
-                'cpu_usage_percent': cpu_percent,
-                'memory_usage_percent': memory_info.percent,
-                'memory_available_mb': memory_info.available / (1024 * 1024),
-                'disk_usage_percent': disk_usage.percent,
-                'disk_free_gb': disk_usage.free / (1024 ** 3)
-            },
+            'uptime_seconds': round(health_sampler.uptime_seconds(), 2),
+            'snapshot_age_seconds': round(health_sampler.age_seconds(snapshot), 2),
+            'system': snapshot['system'],
             'api': {
                 'version': '2.0.0',
-                'upload_folder_exists': settings.UPLOAD_FOLDER.exists(),
-                'converted_folder_exists': settings.CONVERTED_FOLDER.exists(),
-                'logs_folder_exists': settings.LOGS_FOLDER.exists()
+                'upload_folder_exists': folders.get('upload_folder', False),
+                'converted_folder_exists': folders.get('converted_folder', False),
+                'logs_folder_exists': folders.get('logs_folder', False)
             },
+            'engines': snapshot['engines'],
+            'queue': conversion_scheduler.stats(),
+            'adaptive_concurrency': concurrency_controller.stats() if concurrency_controller else None,
             'features': {
                 'ocr_enabled': settings.ENABLE_OCR,
-                'ocr_languages': ocr_processor.get_available_languages() if ocr_processor else []
+                'ocr_languages': snapshot['languages']
             }
         }
 
-        logger.info("Health check performed successfully")
+        logger.debug("Health check performed successfully")
         return jsonify(health_data), 200
 
     except Exception as e:
@@ -89,6 +256,47 @@ def health_check():
             'timestamp': datetime.utcnow().isoformat()
         }), 500
 
+@main_bp.route('/health/live', methods=['GET'])
+def health_live():
+    return jsonify({
+        'success': True,
+        'status': 'alive',
+        'timestamp': datetime.utcnow().isoformat()
+    }), 200
+
+@main_bp.route('/health/ready', methods=['GET'])
+def health_ready():
+    snapshot = health_sampler.snapshot()
+    snapshot_age = health_sampler.age_seconds(snapshot)
+    queue = conversion_scheduler.stats()
+
+    checks = {
+        'snapshot_fresh': snapshot_age <= settings.HEALTH_MAX_SNAPSHOT_AGE_SECONDS,
+        'folders_available': (
+            snapshot['folders'].get('upload_folder', False)
+            and snapshot['folders'].get('converted_folder', False)
+        ),
+        'queue_available': queue['queued'] <= settings.HEALTH_READY_MAX_QUEUED
+    }
+    ready = all(checks.values())
+
+    if not ready:
+        logger.warning(f"Readiness check failed: {[name for name, ok in checks.items() if not ok]}")
+
+    return jsonify({
+        'success': ready,
+        'status': 'ready' if ready else 'not_ready',
+        'checks': checks,
+        'snapshot_age_seconds': round(snapshot_age, 2),
+        'queue': queue,
+        'timestamp': datetime.utcnow().isoformat()
+    }), 200 if ready else 503
+
+@main_bp.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    payload, content_type = metrics.collect_metrics()
+    return Response(payload, content_type=content_type)
+
 @main_bp.route('/formats', methods=['GET'])
 def get_supported_formats():
     from src.config import Config
@@ -99,10 +307,20 @@ def get_supported_formats():
         'timestamp': datetime.utcnow().isoformat()
     }), 200
 
+def _run_conversion_job(source_path: Path, target_format: str, token: CancellationToken, **options) -> dict:
+    response_data, _ = convert_source(converter_factory, source_path, target_format, timing.StageTimer(), token, **options)
+    return response_data
+
+job_manager = JobManager(create_store(), _run_conversion_job, workers=settings.JOB_WORKERS)
+
 @main_bp.route('/convert', methods=['POST'])
 def convert_file() -> Tuple[dict, int]:
     try:
-        target_format = request.form.get('format', '').lower().strip()
+        timer = timing.start_timer()
+        
+        # El cuerpo multipart se lee al acceder al formulario
+        with timer.stage('upload'):
+            target_format = request.form.get('format', '').lower().strip()
         
         if not target_format:
             raise UnsupportedFormatException(
@@ -116,6 +334,19 @@ def convert_file() -> Tuple[dict, int]:
                 supported_formats=get_allowed_extensions()
             )
         
+        mode = request.values.get('mode', 'sync').lower().strip()
+        if mode not in CONVERT_MODES:
+            raise InvalidParameterException('mode', mode, CONVERT_MODES)
+        
+        priority = request.values.get('priority', 'normal').lower().strip()
+        if priority not in PRIORITIES:
+            raise InvalidParameterException('priority', priority, list(PRIORITIES))
+        tenant = auth.get_tenant_from_request()
+        
+        # El plazo cuenta desde que llega la petición (descarga de URL incluida)
+        max_latency = parse_max_latency(request.values.get('max_latency'))
+        deadline_at = None if max_latency is None else time.time() + max_latency
+        
         upload_folder = settings.UPLOAD_FOLDER
         source_path = None
 
@@ -128,7 +359,8 @@ def convert_file() -> Tuple[dict, int]:
             
             unique_name = f"{uuid.uuid4().hex}_{filename}"
             source_path = upload_folder / unique_name
-            file.save(source_path)
+            with timer.stage('upload'):
+                file.save(source_path)
             logger.info(f"File uploaded: {unique_name}")
 
         elif 'url' in request.form:
@@ -137,7 +369,8 @@ def convert_file() -> Tuple[dict, int]:
                 raise URLDownloadException('', 'Empty URL provided')
             
             try:
-                source_path = download_file_from_url(url, upload_folder)
+                with timer.stage('fetch'):
+                    source_path = download_file_from_url(url, upload_folder)
                 logger.info(f"File downloaded from URL: {url}")
             except ValueError as e:
                 raise URLDownloadException(url, str(e))
@@ -148,51 +381,42 @@ def convert_file() -> Tuple[dict, int]:
                 details={'expected': ['file', 'url']}
             )
 
-        file_size = get_file_size(source_path)
-        max_size_mb = settings.MAX_FILE_SIZE / (1024 * 1024)
-        
-        if source_path.stat().st_size > settings.MAX_FILE_SIZE:
-            source_path.unlink()
-            raise FileTooLargeException(file_size, max_size_mb)
-
-        original_ext = source_path.suffix.lower()
-        target_ext = f".{target_format}" if not target_format.startswith('.') else target_format
-        file_id = source_path.stem.split('_')[0]
-        output_filename = f"{file_id}{target_ext}"
-        output_path = settings.CONVERTED_FOLDER / output_filename
-
-        logger.info(f"Starting conversion {original_ext} → {target_ext} (ID: {file_id})")
-
-        conversion_result = converter_factory.perform_conversion(
-            str(source_path),
-            str(output_path),
-            original_ext,
-            target_ext
-        )
-
-        if not conversion_result['success']:
-            if source_path.exists():
+        with timer.stage('validate'):
+            file_size = get_file_size(source_path)
+            max_size_mb = settings.MAX_FILE_SIZE / (1024 * 1024)
+            
+            if source_path.stat().st_size > settings.MAX_FILE_SIZE:
                 source_path.unlink()
-            raise ConversionFailedException(
-                conversion_result.get('error', 'Unknown error'),
-                source_format=original_ext,
-                target_format=target_ext
-            )
+                raise FileTooLargeException(file_size, max_size_mb)
 
-        if source_path.exists():
-            source_path.unlink()
+        if mode == 'job':
+            job = job_manager.submit(
+                source_path, target_format, tenant=tenant, priority=priority, deadline_at=deadline_at
+            )
+            return jsonify({
+                'success': True,
+                **job,
+                'status_url': f"/jobs/{job['job_id']}"
+            }), 202
 
-        logger.info(f"Conversion completed successfully (ID: {file_id})")
+        # Si el cliente cierra la conexión se mata la herramienta en curso
+        token = CancellationToken()
+        try:
+            with disconnect_monitor.watch(request.environ, token):
+                response_data, conversion_result = convert_source(
+                    converter_factory, source_path, target_format, timer, token,
+                    tenant=tenant, priority=priority, deadline_at=deadline_at
+                )
+        finally:
+            with timer.stage('cleanup'):
+                if source_path.exists():
+                    source_path.unlink()
 
-        return jsonify({
-            'success': True,
-            'file_id': file_id,
-            'source_format': original_ext,
-            'output_format': target_format,
-            'output_size_mb': get_file_size(output_path),
-            'download_url': f'/download/{output_filename}',
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
+        if _wants_timings():
+            response_data['timings'] = timer.as_dict()
+            if conversion_result.get('resources'):
+                response_data['resources'] = conversion_result['resources']
+        return jsonify(response_data), 200
 
     except FileConverterException as e:
         logger.warning(f"{e.error_code}: {e.message}")
@@ -207,16 +431,44 @@ def convert_file() -> Tuple[dict, int]:
             'timestamp': datetime.utcnow().isoformat()
         }), 500
 
+@main_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    try:
+        job = job_manager.get(job_id)
+        if job is None:
+            raise JobNotFoundException(job_id)
+        return jsonify({'success': True, **job}), 200
+    
+    except FileConverterException as e:
+        logger.warning(f"{e.error_code}: {e.message}")
+        return jsonify(e.to_dict()), e.status_code
+
+@main_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id: str):
+    try:
+        job = job_manager.cancel(job_id)
+        if job is None:
+            raise JobNotFoundException(job_id)
+        return jsonify({'success': True, **job}), 200
+    
+    except FileConverterException as e:
+        logger.warning(f"{e.error_code}: {e.message}")
+        return jsonify(e.to_dict()), e.status_code
+
 @main_bp.route('/download/<filename>', methods=['GET'])
 def download_file(filename: str):
     try:
-        safe_filename = secure_filename(filename)
-        file_path = settings.CONVERTED_FOLDER / safe_filename
+        timer = timing.start_timer()
         
-        if not file_path.exists():
-            raise FileNotFoundException(safe_filename)
+        with timer.stage('lookup'):
+            safe_filename = secure_filename(filename)
+            file_path = settings.CONVERTED_FOLDER / safe_filename
+            
+            if not file_path.exists():
+                raise FileNotFoundException(safe_filename)
         
         logger.info(f"File downloaded: {safe_filename}")
+        # El cuerpo se envía después de la cabecera: su envío no se puede medir aquí
         return send_file(file_path, as_attachment=True)
     
     except FileConverterException as e:
@@ -238,8 +490,29 @@ def extract_text():
         if not settings.ENABLE_OCR:
             raise OCRDisabledException()
         
-        lang = request.form.get('lang', settings.OCR_DEFAULT_LANGUAGE)
+        timer = timing.start_timer()
+        
+        with timer.stage('upload'):
+            lang = request.form.get('lang', settings.OCR_DEFAULT_LANGUAGE)
         preprocess = request.form.get('preprocess', 'true').lower() == 'true'
+        profile = request.form.get('profile', settings.OCR_DEFAULT_PROFILE).lower().strip()
+        osd = request.form.get('osd', str(settings.OCR_OSD_ENABLED)).lower() == 'true'
+        
+        stream_format = request.form.get('stream', '').lower().strip()
+        
+        if profile not in OCRProcessor.PROFILES:
+            raise InvalidParameterException(
+                'profile',
+                profile,
+                allowed=list(OCRProcessor.PROFILES)
+            )
+        
+        if stream_format and stream_format not in STREAM_MIMETYPES:
+            raise InvalidParameterException(
+                'stream',
+                stream_format,
+                allowed=list(STREAM_MIMETYPES)
+            )
         
         upload_folder = settings.UPLOAD_FOLDER
         source_path = None
@@ -249,7 +522,8 @@ def extract_text():
             filename = sanitize_filename(secure_filename(file.filename))
             unique_name = f"{uuid.uuid4().hex}_{filename}"
             source_path = upload_folder / unique_name
-            file.save(source_path)
+            with timer.stage('upload'):
+                file.save(source_path)
             logger.info(f"OCR file uploaded: {unique_name}")
         
         elif 'url' in request.form:
@@ -258,7 +532,8 @@ def extract_text():
                 raise URLDownloadException('', 'Empty URL provided')
             
             try:
-                source_path = download_file_from_url(url, upload_folder)
+                with timer.stage('fetch'):
+                    source_path = download_file_from_url(url, upload_folder)
                 logger.info(f"OCR file downloaded from URL")
             except ValueError as e:
                 raise URLDownloadException(url, str(e))
@@ -268,14 +543,29 @@ def extract_text():
                 'Provide either "file" or "url" parameter'
             )
         
-        file_size = get_file_size(source_path)
-        max_size_mb = settings.MAX_FILE_SIZE / (1024 * 1024)
+        with timer.stage('validate'):
+            file_size = get_file_size(source_path)
+            max_size_mb = settings.MAX_FILE_SIZE / (1024 * 1024)
+            
+            if source_path.stat().st_size > settings.MAX_FILE_SIZE:
+                source_path.unlink()
+                raise FileTooLargeException(file_size, max_size_mb)
         
-        if source_path.stat().st_size > settings.MAX_FILE_SIZE:
-            source_path.unlink()
-            raise FileTooLargeException(file_size, max_size_mb)
+        if stream_format:
+            response = Response(
+                stream_with_context(
+                    _stream_ocr_results(source_path, stream_format, lang, preprocess, profile, osd)
+                ),
+                mimetype=STREAM_MIMETYPES[stream_format]
+            )
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Accel-Buffering'] = 'no'
+            response.call_on_close(lambda: source_path.unlink(missing_ok=True))
+            logger.info(f"Streaming OCR results as {stream_format} (profile: {profile})")
+            return response
         
         file_ext = source_path.suffix.lower()
+        started = time.monotonic()
         
         if file_ext == '.pdf':
             max_pages = settings.OCR_MAX_PAGES
@@ -283,27 +573,58 @@ def extract_text():
                 str(source_path),
                 lang=lang,
                 preprocess=preprocess,
-                max_pages=max_pages if max_pages > 0 else None
+                max_pages=max_pages if max_pages > 0 else None,
+                profile=profile,
+                osd=osd
             )
+            text = result.get('full_text', '')
+            confidence = result.get('avg_confidence', 0)
+            pages = result.get('total_pages', 0)
+            cached_pages = result.get('cached_pages', 0)
         else:
             result = ocr_processor.extract_text_from_image(
                 str(source_path),
                 lang=lang,
-                preprocess=preprocess
+                preprocess=preprocess,
+                profile=profile,
+                osd=osd
             )
+            text = result.get('text', '')
+            confidence = result.get('confidence', 0)
+            pages = 1
+            cached_pages = 1 if result.get('cached') else 0
         
-        if source_path.exists():
-            source_path.unlink()
+        elapsed = time.monotonic() - started
+        timer.record('ocr', elapsed)
+        
+        with timer.stage('cleanup'):
+            if source_path.exists():
+                source_path.unlink()
         
         if result['success']:
-            logger.info(f"OCR extraction successful (lang: {lang}, confidence: {result.get('confidence', 0)})")
-            return jsonify({
+            metadata = ocr_processor.build_metadata(profile, pages, elapsed, cached_pages)
+            logger.info(
+                f"OCR extraction successful (lang: {lang}, profile: {profile}, "
+                f"confidence: {confidence}, pages/s: {metadata['pages_per_second']})"
+            )
+            response_data = {
                 'success': True,
-                'text': result.get('text', ''),
-                'confidence': result.get('confidence', 0),
+                'text': text,
+                'confidence': confidence,
                 'language': lang,
+                'metadata': metadata,
                 'timestamp': datetime.utcnow().isoformat()
-            }), 200
+            }
+            if result.get('orientation'):
+                response_data['orientation'] = result['orientation']
+            elif result.get('pages') and any('orientation' in page for page in result['pages']):
+                response_data['pages'] = [
+                    {'page': page['page'], 'orientation': page.get('orientation')}
+                    for page in result['pages']
+                ]
+            if _wants_timings():
+                response_data['timings'] = timer.as_dict()
+            return jsonify(response_data), 200
         else:
             raise OCRProcessingException(
                 result.get('error', 'Unknown OCR error'),
@@ -323,6 +644,255 @@ def extract_text():
             'timestamp': datetime.utcnow().isoformat()
         }), 500
 
+def _extract_batch_archive(archive, batch_dir: Path) -> Tuple[List[Tuple[str, Path]], int]:
+    """Extrae las imágenes/PDFs de un zip respetando límites de número y tamaño."""
+    sources = []
+    skipped = 0
+    total_bytes = 0
+
+    try:
+        with zipfile.ZipFile(archive) as bundle:
+            for index, info in enumerate(bundle.infolist()):
+                if info.is_dir():
+                    continue
+
+                filename = sanitize_filename(secure_filename(Path(info.filename).name))
+                if Path(filename).suffix.lower() not in OCR_BATCH_EXTENSIONS:
+                    skipped += 1
+                    continue
+
+                if len(sources) >= settings.OCR_BATCH_MAX_FILES:
+                    raise InvalidFileException(
+                        f"Too many files in batch (maximum: {settings.OCR_BATCH_MAX_FILES})"
+                    )
+
+                target = batch_dir / f"{index:05d}_{filename}"
+                with bundle.open(info) as src, open(target, 'wb') as dst:
+                    while True:
+                        chunk = src.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        total_bytes += len(chunk)
+                        if total_bytes > settings.MAX_FILE_SIZE:
+                            raise FileTooLargeException(
+                                total_bytes / (1024 * 1024),
+                                settings.MAX_FILE_SIZE / (1024 * 1024)
+                            )
+                        dst.write(chunk)
+
+                sources.append((info.filename, target))
+
+    except zipfile.BadZipFile:
+        raise InvalidFileException('Invalid zip archive')
+
+    return sources, skipped
+
+def _receive_batch_sources(batch_dir: Path) -> Tuple[List[Tuple[str, Path]], int]:
+    sources = []
+    skipped = 0
+
+    archive = request.files.get('archive')
+    if archive and archive.filename:
+        sources, skipped = _extract_batch_archive(archive.stream, batch_dir)
+
+    for index, file in enumerate(request.files.getlist('files')):
+        if not file.filename:
+            continue
+
+        filename = sanitize_filename(secure_filename(file.filename))
+        if Path(filename).suffix.lower() not in OCR_BATCH_EXTENSIONS:
+            skipped += 1
+            continue
+
+        if len(sources) >= settings.OCR_BATCH_MAX_FILES:
+            raise InvalidFileException(
+                f"Too many files in batch (maximum: {settings.OCR_BATCH_MAX_FILES})"
+            )
+
+        target = batch_dir / f"f{index:05d}_{filename}"
+        file.save(target)
+        sources.append((file.filename, target))
+
+    total_bytes = sum(path.stat().st_size for _, path in sources)
+    if total_bytes > settings.MAX_FILE_SIZE:
+        raise FileTooLargeException(
+            total_bytes / (1024 * 1024),
+            settings.MAX_FILE_SIZE / (1024 * 1024)
+        )
+
+    return sources, skipped
+
+def _batch_result(index: int, name: str, result: dict) -> dict:
+    item = {
+        'index': index,
+        'filename': name,
+        'success': result['success'],
+        'text': result['text'],
+        'confidence': result['confidence'],
+        'pages': result['pages']
+    }
+    if not result['success']:
+        item['error'] = result.get('error', 'Unknown OCR error')
+    return item
+
+def _stream_batch_results(sources, skipped: int, stream_format: str, lang: str, preprocess: bool, profile: str,
+                          osd: bool):
+    started = time.monotonic()
+    pages = 0
+    cached_pages = 0
+    failed = 0
+
+    try:
+        yield _format_stream_event(stream_format, 'start', {
+            'total_files': len(sources),
+            'skipped_files': skipped,
+            'language': lang,
+            'profile': profile
+        })
+
+        max_pages = settings.OCR_MAX_PAGES
+        for index, result in ocr_processor.iter_batch(
+            [str(path) for _, path in sources],
+            lang=lang,
+            preprocess=preprocess,
+            max_pages=max_pages if max_pages > 0 else None,
+            profile=profile,
+            ordered=False,
+            osd=osd
+        ):
+            pages += result['pages']
+            cached_pages += result['cached_pages']
+            if not result['success']:
+                failed += 1
+            yield _format_stream_event(
+                stream_format, 'result', _batch_result(index, sources[index][0], result)
+            )
+
+        yield _format_stream_event(stream_format, 'summary', {
+            'success': failed == 0,
+            'total_files': len(sources),
+            'failed_files': failed,
+            'metadata': ocr_processor.build_metadata(
+                profile, pages, time.monotonic() - started, cached_pages
+            ),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        logger.info(f"OCR batch stream completed ({len(sources)} files, {failed} failed)")
+
+    except Exception as e:
+        logger.error(f"OCR batch stream error: {str(e)}", exc_info=True)
+        yield _format_stream_event(stream_format, 'error', {
+            'success': False,
+            'error': 'OCR processing failed',
+            'error_code': 'OCR_ERROR',
+            'timestamp': datetime.utcnow().isoformat()
+        })
+
+@main_bp.route('/extract-text/batch', methods=['POST'])
+def extract_text_batch():
+    batch_dir = None
+    try:
+        if not settings.ENABLE_OCR:
+            raise OCRDisabledException()
+
+        lang = request.form.get('lang', settings.OCR_DEFAULT_LANGUAGE)
+        preprocess = request.form.get('preprocess', 'true').lower() == 'true'
+        profile = request.form.get('profile', settings.OCR_DEFAULT_PROFILE).lower().strip()
+        osd = request.form.get('osd', str(settings.OCR_OSD_ENABLED)).lower() == 'true'
+        stream_format = request.form.get('stream', '').lower().strip()
+
+        if profile not in OCRProcessor.PROFILES:
+            raise InvalidParameterException(
+                'profile',
+                profile,
+                allowed=list(OCRProcessor.PROFILES)
+            )
+
+        if stream_format and stream_format not in STREAM_MIMETYPES:
+            raise InvalidParameterException(
+                'stream',
+                stream_format,
+                allowed=list(STREAM_MIMETYPES)
+            )
+
+        batch_dir = settings.UPLOAD_FOLDER / f"batch_{uuid.uuid4().hex}"
+        batch_dir.mkdir(parents=True)
+        sources, skipped = _receive_batch_sources(batch_dir)
+
+        if not sources:
+            raise InvalidFileException(
+                'Provide images or PDFs via "files" (multipart) or a zip "archive"',
+                details={'expected': ['files', 'archive'], 'skipped_files': skipped}
+            )
+
+        logger.info(f"OCR batch received: {len(sources)} files ({skipped} skipped)")
+
+        if stream_format:
+            cleanup_dir = batch_dir
+            batch_dir = None
+            response = Response(
+                stream_with_context(
+                    _stream_batch_results(sources, skipped, stream_format, lang, preprocess, profile, osd)
+                ),
+                mimetype=STREAM_MIMETYPES[stream_format]
+            )
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Accel-Buffering'] = 'no'
+            response.call_on_close(lambda: shutil.rmtree(cleanup_dir, ignore_errors=True))
+            return response
+
+        started = time.monotonic()
+        results = []
+        pages = 0
+        cached_pages = 0
+        max_pages = settings.OCR_MAX_PAGES
+        for index, result in ocr_processor.iter_batch(
+            [str(path) for _, path in sources],
+            lang=lang,
+            preprocess=preprocess,
+            max_pages=max_pages if max_pages > 0 else None,
+            profile=profile,
+            ordered=True,
+            osd=osd
+        ):
+            pages += result['pages']
+            cached_pages += result['cached_pages']
+            results.append(_batch_result(index, sources[index][0], result))
+
+        failed = sum(1 for item in results if not item['success'])
+        metadata = ocr_processor.build_metadata(
+            profile, pages, time.monotonic() - started, cached_pages
+        )
+        logger.info(f"OCR batch completed ({len(results)} files, {failed} failed)")
+
+        return jsonify({
+            'success': failed == 0,
+            'results': results,
+            'total_files': len(results),
+            'failed_files': failed,
+            'skipped_files': skipped,
+            'language': lang,
+            'metadata': metadata,
+            'timestamp': datetime.utcnow().isoformat()
+        }), 200
+
+    except FileConverterException as e:
+        logger.warning(f"{e.error_code}: {e.message}")
+        return jsonify(e.to_dict()), e.status_code
+
+    except Exception as e:
+        logger.error(f"OCR batch error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': 'OCR processing failed',
+            'error_code': 'OCR_ERROR',
+            'timestamp': datetime.utcnow().isoformat()
+        }), 500
+
+    finally:
+        if batch_dir is not None:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+
 @main_bp.route('/ocr/languages', methods=['GET'])
 def get_ocr_languages():
     try:
@@ -0,0 +1,694 @@
+"""
+Control de admisión de conversiones
+
+Limita el número de conversiones simultáneas (MAX_CONCURRENT_CONVERSIONS)
+y decide qué petición en espera entra cada vez que queda un turno libre:
+
+1. Clase de prioridad ('high', 'normal', 'low'), de forma estricta: no
+   entra ninguna petición de una clase mientras haya otra esperando en una
+   clase superior. La clase sale del cliente (SCHEDULER_TENANT_PRIORITIES);
+   una petición puede pedir una clase menor, nunca una mayor.
+2. Carril corto antes que largo. Una conversión es corta si su duración
+   estimada (motor y tamaño, ver CostEstimator) no supera
+   SCHEDULER_SHORT_JOB_SECONDS. Las largas no pueden ocupar los
+   SCHEDULER_SHORT_LANE_SLOTS últimos turnos, así que un docx→pdf no espera
+   a que termine una transcodificación de una hora.
+3. Dentro de cada clase y carril, deficit round-robin entre clientes (API
+   keys): en cada vuelta un cliente gana SCHEDULER_QUANTUM_SECONDS × su
+   peso (SCHEDULER_TENANT_WEIGHTS) de crédito y entra cuando el crédito
+   cubre el coste estimado de su siguiente conversión. Un cliente con 500
+   vídeos en cola solo se lleva su parte; las peticiones de un mismo
+   cliente se atienden por orden de llegada.
+
+Las peticiones con plazo (max_latency) esperan en el carril de su cliente
+como las demás; cuando su holgura (plazo - ahora - duración estimada) baja
+de SCHEDULER_DEADLINE_SLACK_SECONDS pasan delante del resto de su clase,
+por orden de plazo (earliest deadline first), y el adelanto se descuenta
+del crédito del cliente. Así un plazo lejano no sirve para saltarse el
+reparto. estimate_latency calcula
+cuándo terminaría una petición con el preset más rápido (si el conversor
+tiene uno para ese formato, ver BaseConverter.has_fast_preset), para rechazarla
+de entrada si no llega; needs_fast_path indica, ya con turno, si hay que
+usar ese preset para cumplir el plazo.
+
+Lleva la cuenta de conversiones en curso y en cola por motor, que usan
+/health/ready y las métricas para medir la saturación.
+
+Los turnos se piden desde hilos (acquire) o desde corrutinas
+(acquire_async) sobre las mismas colas, así que la ruta síncrona y la
+asíncrona comparten el límite y el reparto.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from src import metrics
+from src.config import settings
+
+PRIORITIES = ('high', 'normal', 'low')
+DEFAULT_PRIORITY = 'normal'
+ANONYMOUS_TENANT = 'anonymous'
+
+
+def parse_tenant_map(value, cast=str):
+    """
+    Interpreta una lista de clientes y valores ('ACME:4,BATCH:1')
+
+    Args:
+        value: Cadena con pares NOMBRE:valor separados por comas
+        cast: Conversión del valor (str, float, ...)
+
+    Returns:
+        dict: {NOMBRE en mayúsculas: valor}
+    """
+    result = {}
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, raw = part.rsplit(':', 1)
+        result[name.strip().upper()] = cast(raw.strip())
+    return result
+
+
+def effective_priority(tenant, priority, tenant_priorities):
+    """
+    Clase de prioridad con la que espera una petición
+
+    Se puede pedir menos prioridad que la del cliente, no más.
+
+    Args:
+        tenant: Cliente (API key)
+        priority: Clase pedida (None o desconocida = DEFAULT_PRIORITY)
+        tenant_priorities: {CLIENTE: clase} de parse_tenant_map
+
+    Returns:
+        str: Una de PRIORITIES
+    """
+    tenant_priority = tenant_priorities.get((tenant or ANONYMOUS_TENANT).upper(), DEFAULT_PRIORITY)
+    requested = priority if priority in PRIORITIES else DEFAULT_PRIORITY
+    return PRIORITIES[max(PRIORITIES.index(tenant_priority), PRIORITIES.index(requested))]
+
+
+class CostEstimator:
+    """
+    Duración estimada de una conversión a partir del motor y el tamaño
+
+    Parte de unas tasas por defecto (segundos por MB de entrada) y las
+    ajusta con una media móvil exponencial de las conversiones que terminan
+    en este proceso.
+    """
+
+    DEFAULT_SECONDS_PER_MB = {
+        'libreoffice': 2.0,
+        'imagemagick': 0.5,
+        'ffmpeg': 4.0,
+        'archive': 0.3
+    }
+    # Por debajo de 1 MB domina el arranque de la herramienta
+    MIN_MB = 1.0
+    # Fracción de la duración con el preset más rápido (ver fast_encoding),
+    # para las conversiones cuyo conversor tiene uno
+    FAST_PRESET_FACTOR = {
+        'ffmpeg': 0.4
+    }
+
+    def __init__(self, alpha=0.2, seconds_per_mb=None):
+        """
+        Args:
+            alpha: Peso de cada nueva observación en la media
+            seconds_per_mb: Tasas iniciales por motor
+        """
+        self.alpha = alpha
+        self._rates = dict(seconds_per_mb or self.DEFAULT_SECONDS_PER_MB)
+        self._lock = threading.Lock()
+
+    def estimate(self, engine, size_bytes):
+        """
+        Returns:
+            float: Segundos estimados
+        """
+        with self._lock:
+            rate = self._rates.get(engine, 1.0)
+        return rate * max(size_bytes / (1024 * 1024), self.MIN_MB)
+
+    def estimate_fast(self, engine, size_bytes):
+        """
+        Returns:
+            float: Segundos estimados con el preset más rápido del motor
+        """
+        return self.estimate(engine, size_bytes) * self.FAST_PRESET_FACTOR.get(engine, 1.0)
+
+    def observe(self, engine, size_bytes, seconds, fast=False):
+        """
+        Ajusta la tasa del motor con una conversión terminada
+
+        Args:
+            fast: Si se usó el preset más rápido; se traduce a la duración
+                equivalente con el preset normal
+        """
+        if fast:
+            seconds /= self.FAST_PRESET_FACTOR.get(engine, 1.0)
+        rate = seconds / max(size_bytes / (1024 * 1024), self.MIN_MB)
+        with self._lock:
+            previous = self._rates.get(engine, rate)
+            self._rates[engine] = (1 - self.alpha) * previous + self.alpha * rate
+
+
+class _Ticket:
+    """Petición de turno"""
+
+    __slots__ = ('engine', 'tenant', 'priority', 'short', 'cost', 'deadline', 'enqueued_at', 'started_at', 'granted')
+
+    def __init__(self, engine, tenant, priority, short, cost, deadline=None):
+        self.engine = engine
+        self.tenant = tenant
+        self.priority = priority
+        self.short = short
+        self.cost = cost
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.granted = False
+
+
+class ConversionScheduler:
+    """
+    Semáforo con prioridades, carril corto y reparto justo entre clientes
+    """
+
+    def __init__(self, max_concurrent=4, tenant_weights=None, tenant_priorities=None,
+                 short_job_seconds=15.0, short_lane_slots=0, quantum_seconds=10.0, estimator=None,
+                 deadline_slack_seconds=30.0):
+        """
+        Inicializa el planificador
+
+        Args:
+            max_concurrent: Conversiones simultáneas permitidas
+            tenant_weights: {cliente: peso} (por defecto 1)
+            tenant_priorities: {cliente: clase} (por defecto 'normal')
+            short_job_seconds: Duración estimada máxima del carril corto
+            short_lane_slots: Turnos que las conversiones largas no pueden
+                ocupar (como mucho max_concurrent - 1)
+            quantum_seconds: Crédito por vuelta de un cliente de peso 1
+            estimator: CostEstimator (None = tasas por defecto)
+            deadline_slack_seconds: Holgura por debajo de la cual una
+                petición con plazo se adelanta al reparto entre clientes
+        """
+        if max_concurrent <= 0:
+            raise ValueError('max_concurrent must be greater than 0')
+
+        self.max_concurrent = max_concurrent
+        self.tenant_weights = {k.upper(): v for k, v in (tenant_weights or {}).items()}
+        self.tenant_priorities = {k.upper(): v for k, v in (tenant_priorities or {}).items()}
+        self.short_job_seconds = short_job_seconds
+        self._short_lane_setting = short_lane_slots
+        self.short_lane_slots = min(short_lane_slots, max_concurrent - 1)
+        self.quantum_seconds = quantum_seconds
+        self.estimator = estimator or CostEstimator()
+        self.deadline_slack_seconds = deadline_slack_seconds
+        self._condition = threading.Condition()
+        # (clase, corto) -> {cliente: deque de tickets}; el orden del dict es la ronda
+        self._queues = {(priority, short): {} for priority in PRIORITIES for short in (True, False)}
+        # clase -> tickets con plazo (también en su carril), candidatos a adelantarse
+        self._deadlines = {priority: [] for priority in PRIORITIES}
+        self._deficits = {}
+        self._running = []
+        self._waiting = 0
+        self._active = 0
+        self._active_long = 0
+        self._in_flight = {}
+        self._queued = {}
+        # Corrutinas en espera: ticket -> (bucle, futuro a despertar)
+        self._async_waiters = {}
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Returns:
+            ConversionScheduler: Configurado con MAX_CONCURRENT_CONVERSIONS y SCHEDULER_*
+        """
+        return cls(
+            settings.MAX_CONCURRENT_CONVERSIONS,
+            tenant_weights=parse_tenant_map(settings.SCHEDULER_TENANT_WEIGHTS, float),
+            tenant_priorities=parse_tenant_map(settings.SCHEDULER_TENANT_PRIORITIES),
+            short_job_seconds=settings.SCHEDULER_SHORT_JOB_SECONDS,
+            short_lane_slots=settings.SCHEDULER_SHORT_LANE_SLOTS,
+            quantum_seconds=settings.SCHEDULER_QUANTUM_SECONDS,
+            deadline_slack_seconds=settings.SCHEDULER_DEADLINE_SLACK_SECONDS
+        )
+
+    def acquire(self, engine, timeout=None, token=None, tenant=None, priority=None, size_bytes=0, deadline=None):
+        """
+        Espera turno para ejecutar una conversión
+
+        Args:
+            engine: Nombre del motor ('libreoffice', 'ffmpeg', ...)
+            timeout: Segundos máximos de espera (None = sin límite)
+            token: CancellationToken; si se activa se deja de esperar
+            tenant: Cliente (ver APIKeyAuth.get_tenant)
+            priority: Clase pedida; no puede superar la del cliente
+            size_bytes: Tamaño de la entrada, para estimar el coste
+            deadline: Instante (time.monotonic) en que debe estar terminada;
+                con poca holgura la petición se adelanta dentro de su clase
+
+        Returns:
+            bool: True si se obtuvo el turno, False si venció el timeout o
+                se canceló la espera
+        """
+        return self._acquire(engine, timeout, token, tenant, priority, size_bytes, deadline) is not None
+
+    def _acquire(self, engine, timeout, token, tenant, priority, size_bytes, deadline=None):
+        ticket = self._ticket(engine, tenant, priority, size_bytes, deadline)
+        cancelled = lambda: token is not None and token.cancelled  # noqa: E731
+        remove_callback = token.add_callback(self._wake_all) if token is not None else None
+        try:
+            with self._condition:
+                self._enqueue(ticket)
+                self._condition.wait_for(lambda: ticket.granted or cancelled(), timeout=timeout)
+                if ticket.granted and not cancelled():
+                    return ticket
+                if ticket.granted:
+                    self._release(ticket)
+                else:
+                    self._withdraw(ticket)
+                return None
+        finally:
+            if remove_callback is not None:
+                remove_callback()
+
+    async def acquire_async(self, engine, timeout=None, tenant=None, priority=None, size_bytes=0, deadline=None):
+        """
+        Variante asyncio de acquire: espera sin bloquear el bucle
+
+        Si la tarea se cancela mientras espera, deja la cola sin consumir
+        turno.
+
+        Args:
+            engine: Nombre del motor ('libreoffice', 'ffmpeg', ...)
+            timeout: Segundos máximos de espera (None = sin límite)
+            tenant, priority, size_bytes, deadline: Ver acquire
+
+        Returns:
+            bool: True si se obtuvo el turno, False si venció el timeout
+        """
+        return await self._acquire_async(engine, timeout, tenant, priority, size_bytes, deadline) is not None
+
+    async def _acquire_async(self, engine, timeout, tenant, priority, size_bytes, deadline=None):
+        loop = asyncio.get_running_loop()
+        expires = None if timeout is None else loop.time() + timeout
+        ticket = self._ticket(engine, tenant, priority, size_bytes, deadline)
+        acquired = None
+        with self._condition:
+            self._enqueue(ticket)
+        try:
+            while True:
+                with self._condition:
+                    if ticket.granted:
+                        acquired = ticket
+                        return ticket
+                    wakeup = loop.create_future()
+                    self._async_waiters[ticket] = (loop, wakeup)
+                remaining = None if expires is None else expires - loop.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(wakeup, remaining)
+                except asyncio.TimeoutError:
+                    return None
+        finally:
+            with self._condition:
+                self._async_waiters.pop(ticket, None)
+                if acquired is None:
+                    # El turno pudo concederse justo al rendirse
+                    if ticket.granted:
+                        self._release(ticket)
+                    else:
+                        self._withdraw(ticket)
+
+    def _ticket(self, engine, tenant, priority, size_bytes, deadline=None):
+        tenant = tenant or ANONYMOUS_TENANT
+        effective = effective_priority(tenant, priority, self.tenant_priorities)
+        cost = self.estimator.estimate(engine, size_bytes)
+        return _Ticket(engine, tenant, effective, cost <= self.short_job_seconds, cost, deadline)
+
+    def _weight(self, tenant):
+        return self.tenant_weights.get(tenant.upper(), 1.0)
+
+    def _enqueue(self, ticket):
+        if ticket.deadline is not None:
+            self._deadlines[ticket.priority].append(ticket)
+        lane = self._queues[ticket.priority, ticket.short]
+        lane.setdefault(ticket.tenant, deque()).append(ticket)
+        self._waiting += 1
+        self._queued[ticket.engine] = self._queued.get(ticket.engine, 0) + 1
+        metrics.QUEUE_DEPTH.labels(ticket.engine).inc()
+        self._dispatch()
+
+    def _unqueue(self, ticket):
+        self._waiting -= 1
+        self._queued[ticket.engine] -= 1
+        metrics.QUEUE_DEPTH.labels(ticket.engine).dec()
+
+    def _withdraw(self, ticket):
+        if ticket.deadline is not None:
+            self._deadlines[ticket.priority].remove(ticket)
+        key = (ticket.priority, ticket.short)
+        queue = self._queues[key][ticket.tenant]
+        queue.remove(ticket)
+        if not queue:
+            self._drop_tenant(key, ticket.tenant)
+        self._unqueue(ticket)
+
+    def _drop_tenant(self, key, tenant):
+        # Un cliente que vacía su cola pierde el crédito acumulado (DRR)
+        del self._queues[key][tenant]
+        self._deficits.pop((key, tenant), None)
+
+    def _dispatch(self):
+        granted = False
+        while self._active < self.max_concurrent:
+            ticket = self._pick()
+            if ticket is None:
+                break
+            self._grant(ticket)
+            granted = True
+        if granted:
+            self._notify()
+
+    def _pick(self):
+        long_allowed = self._active_long < self.max_concurrent - self.short_lane_slots
+        for priority in PRIORITIES:
+            ticket = self._next_urgent(priority, long_allowed)
+            for short in (True, False):
+                if ticket is not None:
+                    break
+                if not short and not long_allowed:
+                    continue
+                ticket = self._next_in_lane((priority, short))
+            if ticket is not None:
+                if ticket.deadline is not None:
+                    self._deadlines[priority].remove(ticket)
+                return ticket
+        return None
+
+    def _next_urgent(self, priority, long_allowed):
+        now = time.monotonic()
+        urgent = [
+            t for t in self._deadlines[priority]
+            if (t.short or long_allowed) and t.deadline - now - t.cost <= self.deadline_slack_seconds
+        ]
+        if not urgent:
+            return None
+        ticket = min(urgent, key=lambda t: t.deadline)
+        key = (priority, ticket.short)
+        queue = self._queues[key][ticket.tenant]
+        queue.remove(ticket)
+        # El adelanto se paga con el crédito del cliente en el DRR
+        self._deficits[key, ticket.tenant] = self._deficits.get((key, ticket.tenant), 0.0) - ticket.cost
+        if not queue:
+            self._drop_tenant(key, ticket.tenant)
+        return ticket
+
+    def _next_in_lane(self, key):
+        lane = self._queues[key]
+        while lane:
+            tenant = next(iter(lane))
+            queue = lane[tenant]
+            deficit = self._deficits.get((key, tenant), 0.0)
+            if deficit < queue[0].cost:
+                # Turno del cliente en la ronda: recibe su quantum
+                deficit += self.quantum_seconds * self._weight(tenant)
+            if deficit >= queue[0].cost:
+                ticket = queue.popleft()
+                deficit -= ticket.cost
+                self._deficits[key, tenant] = deficit
+                if not queue:
+                    self._drop_tenant(key, tenant)
+                elif deficit < queue[0].cost:
+                    # Crédito agotado: pasa al final de la ronda
+                    lane[tenant] = lane.pop(tenant)
+                return ticket
+            self._deficits[key, tenant] = deficit
+            lane[tenant] = lane.pop(tenant)
+        return None
+
+    def _grant(self, ticket):
+        self._unqueue(ticket)
+        ticket.granted = True
+        ticket.started_at = time.monotonic()
+        self._running.append(ticket)
+        self._active += 1
+        if not ticket.short:
+            self._active_long += 1
+        self._in_flight[ticket.engine] = self._in_flight.get(ticket.engine, 0) + 1
+        metrics.IN_FLIGHT.labels(ticket.engine).inc()
+        metrics.SCHEDULER_WAIT.labels(ticket.priority, 'short' if ticket.short else 'long').observe(
+            time.monotonic() - ticket.enqueued_at
+        )
+
+    def _release(self, ticket):
+        self._running.remove(ticket)
+        self._active -= 1
+        if not ticket.short:
+            self._active_long -= 1
+        self._in_flight[ticket.engine] -= 1
+        metrics.IN_FLIGHT.labels(ticket.engine).dec()
+        self._dispatch()
+
+    def _wake_all(self):
+        with self._condition:
+            self._notify()
+
+    def _notify(self):
+        self._condition.notify_all()
+        for ticket, (loop, wakeup) in self._async_waiters.items():
+            if ticket.granted:
+                loop.call_soon_threadsafe(_wake, wakeup)
+
+    def release(self, engine, ticket=None):
+        """
+        Libera el turno de una conversión terminada
+
+        Args:
+            engine: Nombre del motor usado en acquire
+            ticket: Turno concreto (lo pasan slot y slot_async); sin él se
+                libera el turno más antiguo del motor
+        """
+        with self._condition:
+            if ticket is None:
+                ticket = next(t for t in self._running if t.engine == engine)
+            self._release(ticket)
+
+    def set_limit(self, max_concurrent):
+        """
+        Cambia el número de conversiones simultáneas
+
+        Al subirlo entran de inmediato las que esperaban; al bajarlo las
+        que están en curso terminan y no entran nuevas hasta que haya hueco.
+
+        Args:
+            max_concurrent: Nuevo límite (> 0)
+        """
+        if max_concurrent <= 0:
+            raise ValueError('max_concurrent must be greater than 0')
+        with self._condition:
+            self.max_concurrent = max_concurrent
+            self.short_lane_slots = min(self._short_lane_setting, max_concurrent - 1)
+            self._dispatch()
+
+    def record_duration(self, engine, size_bytes, seconds, fast=False):
+        """
+        Ajusta la estimación de coste con una conversión terminada
+
+        Args:
+            engine: Motor usado
+            size_bytes: Tamaño de la entrada
+            seconds: Duración de la conversión (sin la espera)
+            fast: Si se usó el preset más rápido
+        """
+        self.estimator.observe(engine, size_bytes, seconds, fast)
+
+    def estimate_latency(self, engine, size_bytes, deadline, tenant=None, priority=None, fast_preset=False):
+        """
+        Segundos hasta que terminaría ahora una petición con plazo, con el
+        preset más rápido del motor si la conversión tiene uno
+
+        La espera se estima con el trabajo pendiente por delante (lo que
+        queda de las conversiones en curso, las clases superiores y las
+        peticiones de su clase con un plazo anterior) repartido entre los
+        turnos.
+
+        Args:
+            engine: Nombre del motor
+            size_bytes: Tamaño de la entrada
+            deadline: Instante (time.monotonic) en que debe estar terminada
+            tenant, priority: Ver acquire
+            fast_preset: Si el conversor tiene un preset rápido para esta
+                conversión (ver BaseConverter.has_fast_preset)
+
+        Returns:
+            float: Segundos estimados (espera + conversión)
+        """
+        ticket = self._ticket(engine, tenant, priority, size_bytes, deadline)
+        now = time.monotonic()
+        with self._condition:
+            ahead = []
+            for priority_class in PRIORITIES[:PRIORITIES.index(ticket.priority) + 1]:
+                if priority_class == ticket.priority:
+                    ahead.extend(t.cost for t in self._deadlines[priority_class] if t.deadline <= deadline)
+                else:
+                    ahead.extend(
+                        t.cost for lane in (self._queues[priority_class, True], self._queues[priority_class, False])
+                        for queue in lane.values() for t in queue
+                    )
+            if self._active + len(ahead) < self.max_concurrent:
+                wait = 0.0
+            else:
+                running = sum(max(t.cost - (now - t.started_at), 0.0) for t in self._running)
+                wait = (running + sum(ahead)) / self.max_concurrent
+        return wait + self.estimate_duration(engine, size_bytes, fast_preset)
+
+    def needs_fast_path(self, engine, size_bytes, deadline, fast_preset=False):
+        """
+        Indica si una conversión con turno solo cumple su plazo con el
+        preset más rápido
+
+        Args:
+            engine: Nombre del motor
+            size_bytes: Tamaño de la entrada
+            deadline: Instante (time.monotonic) o None
+            fast_preset: Si el conversor tiene un preset rápido para esta
+                conversión; sin él no hay nada que pedir
+
+        Returns:
+            bool: True si la estimación normal no cabe en el plazo
+        """
+        if deadline is None or not fast_preset:
+            return False
+        return self.estimator.estimate(engine, size_bytes) > deadline - time.monotonic()
+
+    def estimate_duration(self, engine, size_bytes, fast_preset=False):
+        """
+        Duración estimada de una conversión, sin la espera
+
+        Args:
+            engine: Nombre del motor
+            size_bytes: Tamaño de la entrada
+            fast_preset: Ver estimate_latency; con él se estima el preset rápido
+
+        Returns:
+            float: Segundos estimados
+        """
+        if fast_preset:
+            return self.estimator.estimate_fast(engine, size_bytes)
+        return self.estimator.estimate(engine, size_bytes)
+
+    def _deadline_timeout(self, engine, size_bytes, deadline, fast_preset=False):
+        # Pasado este punto ni el preset más rápido llega a tiempo
+        if deadline is None:
+            return None
+        return max(deadline - time.monotonic() - self.estimate_duration(engine, size_bytes, fast_preset), 0.0)
+
+    @contextmanager
+    def slot(self, engine, token=None, tenant=None, priority=None, size_bytes=0, deadline=None, fast_preset=False):
+        """
+        Context manager que envuelve acquire/release
+
+        Con deadline deja de esperar cuando ni el preset más rápido
+        terminaría a tiempo.
+
+        Args:
+            engine: Nombre del motor
+            token: CancellationToken; si se activa se deja de esperar
+            tenant, priority, size_bytes, deadline: Ver acquire
+            fast_preset: Ver estimate_latency
+
+        Yields:
+            bool: True si se obtuvo turno (siempre, salvo cancelación o
+                plazo inalcanzable)
+        """
+        timeout = self._deadline_timeout(engine, size_bytes, deadline, fast_preset)
+        ticket = self._acquire(engine, timeout, token, tenant, priority, size_bytes, deadline)
+        try:
+            yield ticket is not None
+        finally:
+            if ticket is not None:
+                self.release(engine, ticket)
+
+    @asynccontextmanager
+    async def slot_async(self, engine, tenant=None, priority=None, size_bytes=0, deadline=None, fast_preset=False):
+        """
+        Variante asyncio de slot
+
+        Args:
+            engine: Nombre del motor
+            tenant, priority, size_bytes, deadline: Ver acquire
+            fast_preset: Ver estimate_latency
+
+        Yields:
+            bool: True si se obtuvo turno (siempre, salvo plazo inalcanzable)
+        """
+        timeout = self._deadline_timeout(engine, size_bytes, deadline, fast_preset)
+        ticket = await self._acquire_async(engine, timeout, tenant, priority, size_bytes, deadline)
+        try:
+            yield ticket is not None
+        finally:
+            if ticket is not None:
+                self.release(engine, ticket)
+
+    def stats(self):
+        """
+        Estado actual de la cola
+
+        Returns:
+            dict: {
+                'limit': int,
+                'in_flight': int,
+                'queued': int,
+                'saturation': float ((en curso + en cola) / límite),
+                'engines': {motor: {'in_flight': int, 'queued': int}},
+                'lanes': {'short'|'long': {'in_flight': int, 'queued': int}},
+                'priorities': {clase: int (en cola)},
+                'tenants_waiting': int,
+                'deadlines_queued': int (en cola con plazo)
+            }
+        """
+        with self._condition:
+            engines = {
+                name: {
+                    'in_flight': self._in_flight.get(name, 0),
+                    'queued': self._queued.get(name, 0)
+                }
+                for name in set(self._in_flight) | set(self._queued)
+            }
+            lanes = {'short': {'in_flight': self._active - self._active_long, 'queued': 0},
+                     'long': {'in_flight': self._active_long, 'queued': 0}}
+            priorities = dict.fromkeys(PRIORITIES, 0)
+            tenants = set()
+            for (priority, short), lane in self._queues.items():
+                waiting = sum(len(queue) for queue in lane.values())
+                lanes['short' if short else 'long']['queued'] += waiting
+                priorities[priority] += waiting
+                tenants.update(lane)
+            deadlines = 0
+            for waiting in self._deadlines.values():
+                deadlines += len(waiting)
+            return {
+                'limit': self.max_concurrent,
+                'in_flight': self._active,
+                'queued': self._waiting,
+                'saturation': round((self._active + self._waiting) / self.max_concurrent, 2),
+                'engines': engines,
+                'lanes': lanes,
+                'priorities': priorities,
+                'tenants_waiting': len(tenants),
+                'deadlines_queued': deadlines
+            }
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,251 @@
+"""
+Deduplicación de conversiones idénticas en curso (single-flight)
+
+Dos peticiones son idénticas si su entrada tiene el mismo contenido
+(SHA-256) y piden el mismo formato con las mismas opciones. La primera
+(líder) toma un flock exclusivo sobre TEMP_FOLDER/singleflight/<clave>.lock
+y convierte; las que llegan mientras tanto esperan ese lock y, cuando el
+líder publica su resultado, enlazan su salida (hard link) en lugar de
+lanzar otra herramienta. Al ser un lock de archivo funciona entre los
+workers de Gunicorn, los hilos de jobs y src.worker de un mismo host.
+
+La limpieza periódica solo borra un .lock si puede tomarlo, y quien toma
+un lock comprueba que su archivo sigue enlazado; así una clave en uso nunca
+pasa a tener dos líderes.
+
+Solo se comparten conversiones correctas: si el líder falla o se cancela,
+la siguiente petición en espera pasa a ser líder y convierte. Una petición
+que llega cuando el líder ya ha terminado no reutiliza nada (no es una
+caché).
+"""
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from src.config import settings
+from src.exceptions import ConversionCancelledException, DeadlineUnachievableException
+
+# Bloques de lectura al calcular el hash de la entrada
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+class Flight:
+    """
+    Participación de una petición en una conversión compartida
+    """
+
+    def __init__(self, lock_path, record_path):
+        self.lock_path = lock_path
+        self.record_path = record_path
+        self.waiting_since = time.time()
+        self.waited = False
+        self._started = time.monotonic()
+        self.wait_seconds = 0.0
+
+    def shared_result(self, output_path, allow_fast_preset=False):
+        """
+        Reutiliza la salida del líder si terminó mientras se esperaba
+
+        Args:
+            output_path: Ruta de salida de esta petición
+            allow_fast_preset: Aceptar una salida hecha con el preset rápido
+                (solo las peticiones con plazo)
+
+        Returns:
+            dict o None: Resultado como el de perform_conversion (con
+                'shared') si output_path ya tiene la salida; None si esta
+                petición debe convertir
+        """
+        if not self.waited:
+            return None
+        try:
+            record = json.loads(self.record_path.read_text())
+        except (OSError, ValueError):
+            return None
+        # Un registro anterior a la espera es de una conversión ya servida
+        if record.get('finished_at', 0) < self.waiting_since:
+            return None
+        if record.get('fast_preset') and not allow_fast_preset:
+            return None
+        source = Path(record['output_path'])
+        if source != Path(output_path):
+            try:
+                os.link(source, output_path)
+            except FileNotFoundError:
+                return None
+            except OSError:
+                # Otro sistema de archivos o sin soporte de hard links
+                try:
+                    shutil.copy2(source, output_path)
+                except OSError:
+                    return None
+        result = {'success': True, 'shared': True, 'queue_seconds': self.wait_seconds}
+        if record.get('fast_preset'):
+            result['fast_preset'] = True
+        return result
+
+    def publish(self, output_path, fast_preset=False):
+        """
+        Deja la salida a disposición de las peticiones en espera
+
+        Args:
+            output_path: Salida generada por esta petición
+            fast_preset: Si se generó con el preset rápido
+        """
+        record = {
+            'output_path': str(output_path),
+            'fast_preset': bool(fast_preset),
+            'finished_at': time.time()
+        }
+        tmp_path = self.record_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(record))
+        os.replace(tmp_path, self.record_path)
+
+
+class SingleFlight:
+    """
+    Coordina conversiones idénticas con locks de archivo
+    """
+
+    def __init__(self, lock_dir=None, poll_interval_seconds=0.05):
+        """
+        Args:
+            lock_dir: Carpeta de locks y registros (None = TEMP_FOLDER/singleflight)
+            poll_interval_seconds: Pausa entre intentos de tomar el lock
+                (para poder atender la cancelación mientras se espera)
+        """
+        self.lock_dir = Path(lock_dir or Path(settings.TEMP_FOLDER) / 'singleflight')
+        self.poll_interval_seconds = poll_interval_seconds
+
+    def key(self, source_path, target_format, options=None):
+        """
+        Clave de una conversión
+
+        Args:
+            source_path: Archivo de entrada
+            target_format: Formato de destino
+            options: Opciones que cambian la salida (formato de origen...)
+
+        Returns:
+            str: Hash hexadecimal
+        """
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        digest.update(b'\0' + target_format.lower().lstrip('.').encode())
+        digest.update(b'\0' + json.dumps(options or {}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    @contextmanager
+    def join(self, key, token=None, deadline=None, reserve_seconds=0.0):
+        """
+        Espera a ser líder de la clave o a que lo sea otra petición
+
+        Args:
+            key: Clave de key()
+            token: CancellationToken; si se activa se deja de esperar
+            deadline: Instante (time.monotonic) en que la petición debe
+                estar terminada (None = sin plazo)
+            reserve_seconds: Duración estimada de la conversión propia; se
+                deja de esperar cuando ya no cabe antes del plazo
+
+        Yields:
+            Flight: flight.shared_result indica si ya hay salida
+
+        Raises:
+            ConversionCancelledException: Si se activó el token esperando
+            DeadlineUnachievableException: Si el plazo vence esperando
+        """
+        flight = self._flight(key)
+        lock_file = None
+        try:
+            while True:
+                lock_file, locked = self._acquire(flight, lock_file)
+                if locked:
+                    break
+                flight.waited = True
+                if token is not None and token.cancelled:
+                    raise ConversionCancelledException(token.reason)
+                _check_deadline(deadline, reserve_seconds)
+                time.sleep(self.poll_interval_seconds)
+            if flight.waited:
+                flight.wait_seconds = time.monotonic() - flight._started
+            yield flight
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+
+    @asynccontextmanager
+    async def join_async(self, key, deadline=None, reserve_seconds=0.0):
+        """
+        Variante asyncio de join: espera sin bloquear el bucle
+
+        Cancelar la tarea deja de esperar.
+
+        Args:
+            key, deadline, reserve_seconds: Ver join
+        """
+        flight = self._flight(key)
+        lock_file = None
+        try:
+            while True:
+                lock_file, locked = self._acquire(flight, lock_file)
+                if locked:
+                    break
+                flight.waited = True
+                _check_deadline(deadline, reserve_seconds)
+                await asyncio.sleep(self.poll_interval_seconds)
+            if flight.waited:
+                flight.wait_seconds = time.monotonic() - flight._started
+            yield flight
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+
+    def _flight(self, key):
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        return Flight(self.lock_dir / f'{key}.lock', self.lock_dir / f'{key}.json')
+
+    def _acquire(self, flight, lock_file):
+        """
+        Intenta tomar el lock de la clave sin bloquear
+
+        Returns:
+            tuple: (archivo del lock abierto, True si se tomó)
+        """
+        if lock_file is None:
+            lock_file = open(flight.lock_path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return lock_file, False
+        if not _is_linked(lock_file, flight.lock_path):
+            # La limpieza lo borró mientras se esperaba: vale el archivo nuevo
+            lock_file.close()
+            return self._acquire(flight, None)
+        return lock_file, True
+
+
+def _is_linked(lock_file, lock_path):
+    try:
+        return os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def _check_deadline(deadline, reserve_seconds):
+    if deadline is None:
+        return
+    remaining = deadline - time.monotonic()
+    if remaining < reserve_seconds:
+        raise DeadlineUnachievableException(reserve_seconds, remaining)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,201 @@
+"""
+OCR por teselas para imágenes muy grandes
+
+Divide la imagen en teselas solapadas que se decodifican desde disco bajo
+demanda (ImageMagick `stream`, fila a fila), de modo que la imagen completa
+nunca se carga en memoria. Las palabras de cada tesela se trasladan a
+coordenadas globales y se descartan las duplicadas de las zonas de solape.
+"""
+import subprocess
+
+from PIL import Image
+
+
+def probe_image_size(image_path, timeout=30):
+    """
+    Obtiene ancho y alto de una imagen sin decodificar los píxeles
+
+    Args:
+        image_path: Ruta de la imagen
+        timeout: Timeout de `identify` en segundos
+
+    Returns:
+        tuple: (ancho, alto) o None si no se puede leer
+    """
+    try:
+        with Image.open(image_path) as probe:
+            width, height = probe.size
+            return int(width), int(height)
+    except Image.DecompressionBombError:
+        pass
+    except Exception:
+        return None
+
+    # Pillow rechaza imágenes enormes; `identify -ping` solo lee la cabecera
+    try:
+        result = subprocess.run(
+            ['identify', '-ping', '-format', '%w %h', f'{image_path}[0]'],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=True
+        )
+        width, height = result.stdout.split()
+        return int(width), int(height)
+    except Exception:
+        return None
+
+
+def plan_tiles(width, height, tile_size, overlap):
+    """
+    Calcula la rejilla de teselas solapadas
+
+    Cada tesela tiene un "núcleo": la parte de la que es responsable. Los
+    núcleos no se solapan y cubren toda la imagen, así que cada palabra se
+    asigna a la única tesela cuyo núcleo contiene su centro.
+
+    Args:
+        width: Ancho de la imagen
+        height: Alto de la imagen
+        tile_size: Lado máximo de cada tesela
+        overlap: Píxeles compartidos entre teselas vecinas
+
+    Returns:
+        list: dicts {'x', 'y', 'width', 'height', 'core': (x0, y0, x1, y1)}
+    """
+    if overlap >= tile_size:
+        raise ValueError('overlap must be smaller than tile_size')
+
+    def axis(length):
+        step = tile_size - overlap
+        starts = [0]
+        while starts[-1] + tile_size < length:
+            starts.append(starts[-1] + step)
+        spans = []
+        for index, start in enumerate(starts):
+            end = min(start + tile_size, length)
+            core_start = 0 if index == 0 else start + overlap // 2
+            core_end = length if index == len(starts) - 1 else starts[index + 1] + overlap // 2
+            spans.append((start, end, core_start, core_end))
+        return spans
+
+    tiles = []
+    for y0, y1, core_y0, core_y1 in axis(height):
+        for x0, x1, core_x0, core_x1 in axis(width):
+            tiles.append({
+                'x': x0,
+                'y': y0,
+                'width': x1 - x0,
+                'height': y1 - y0,
+                'core': (core_x0, core_y0, core_x1, core_y1)
+            })
+    return tiles
+
+
+def read_tile(image_path, tile, timeout=120):
+    """
+    Decodifica una tesela desde disco en escala de grises
+
+    Args:
+        image_path: Ruta de la imagen
+        tile: dict devuelto por plan_tiles
+        timeout: Timeout de `stream` en segundos
+
+    Returns:
+        PIL Image en modo 'L'
+    """
+    geometry = f"{tile['width']}x{tile['height']}+{tile['x']}+{tile['y']}"
+    result = subprocess.run(
+        [
+            'stream',
+            '-map', 'i',
+            '-storage-type', 'char',
+            '-extract', geometry,
+            f'{image_path}[0]',
+            '-'
+        ],
+        capture_output=True,
+        timeout=timeout,
+        check=True
+    )
+    return Image.frombytes('L', (tile['width'], tile['height']), result.stdout)
+
+
+def extract_tile_words(data, tile):
+    """
+    Convierte la salida de image_to_data de una tesela en palabras globales
+
+    Descarta las palabras cuyo centro cae fuera del núcleo de la tesela
+    (las recoge la tesela vecina).
+
+    Args:
+        data: dict de pytesseract.image_to_data (Output.DICT)
+        tile: dict devuelto por plan_tiles
+
+    Returns:
+        list: dicts {'text', 'left', 'top', 'width', 'height', 'conf'}
+    """
+    core_x0, core_y0, core_x1, core_y1 = tile['core']
+    words = []
+    for index, text in enumerate(data['text']):
+        text = (text or '').strip()
+        conf = float(data['conf'][index])
+        if not text or conf < 0:
+            continue
+
+        left = tile['x'] + int(data['left'][index])
+        top = tile['y'] + int(data['top'][index])
+        width = int(data['width'][index])
+        height = int(data['height'][index])
+        center_x = left + width / 2
+        center_y = top + height / 2
+
+        if core_x0 <= center_x < core_x1 and core_y0 <= center_y < core_y1:
+            words.append({
+                'text': text,
+                'left': left,
+                'top': top,
+                'width': width,
+                'height': height,
+                'conf': conf
+            })
+    return words
+
+
+def merge_words(words):
+    """
+    Reconstruye el texto a partir de palabras en coordenadas globales
+
+    Agrupa las palabras en renglones por su centro vertical y ordena cada
+    renglón de izquierda a derecha.
+
+    Args:
+        words: Lista de palabras de extract_tile_words
+
+    Returns:
+        str: Texto con un renglón por línea
+    """
+    if not words:
+        return ''
+
+    ordered = sorted(words, key=lambda w: (w['top'] + w['height'] / 2, w['left']))
+    heights = sorted(w['height'] for w in ordered)
+    tolerance = max(heights[len(heights) // 2] / 2, 1)
+
+    lines = []
+    current = [ordered[0]]
+    current_center = ordered[0]['top'] + ordered[0]['height'] / 2
+    for word in ordered[1:]:
+        center = word['top'] + word['height'] / 2
+        if abs(center - current_center) <= tolerance:
+            current.append(word)
+        else:
+            lines.append(current)
+            current = [word]
+            current_center = center
+    lines.append(current)
+
+    return '\n'.join(
+        ' '.join(w['text'] for w in sorted(line, key=lambda w: w['left']))
+        for line in lines
+    )
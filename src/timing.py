@@ -0,0 +1,142 @@
+"""
+Desglose de tiempos por etapa de una petición
+
+Cada endpoint abre un StageTimer en flask.g y envuelve sus etapas (subida,
+validación, conversión, limpieza...). Al responder, los tiempos se envían
+en la cabecera Server-Timing y, si se piden, en el campo 'timings' del
+JSON. Con SERVER_TIMING_ENABLED=false se usa un temporizador nulo cuyas
+operaciones no hacen nada.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+
+from flask import g
+
+from src.config import settings
+
+
+class StageTimer:
+    """
+    Acumula la duración de cada etapa con un reloj monótono
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Mide la duración del bloque como etapa 'name'
+
+        Args:
+            name: Nombre de la etapa (token válido para Server-Timing)
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        """
+        Añade una duración ya medida (se suma si la etapa se repite)
+
+        Args:
+            name: Nombre de la etapa
+            seconds: Duración en segundos
+        """
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def record_within(self, name, parent, seconds):
+        """
+        Separa una duración medida dentro de otra etapa
+
+        La duración se suma a 'name' y se resta de 'parent' (sin bajar de
+        cero), así el desglose no la cuenta dos veces.
+
+        Args:
+            name: Nombre de la etapa contenida
+            parent: Etapa ya medida que la incluye
+            seconds: Duración en segundos
+        """
+        self.record(name, seconds)
+        self.stages[parent] = max(self.stages.get(parent, 0.0) - seconds, 0.0)
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: {etapa: milisegundos, ..., 'total': milisegundos}
+        """
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        timings['total'] = round((time.perf_counter() - self.started) * 1000, 3)
+        return timings
+
+    def header(self):
+        """
+        Returns:
+            str: Valor de la cabecera Server-Timing
+        """
+        return ', '.join(f"{name};dur={ms}" for name, ms in self.as_dict().items())
+
+
+class NullTimer:
+    """
+    Temporizador desactivado: mismas operaciones, sin coste
+    """
+
+    stages = {}
+
+    def stage(self, name):
+        return nullcontext()
+
+    def record(self, name, seconds):
+        pass
+
+    def record_within(self, name, parent, seconds):
+        pass
+
+    def as_dict(self):
+        return {}
+
+    def header(self):
+        return ''
+
+
+NULL_TIMER = NullTimer()
+
+
+def start_timer():
+    """
+    Crea el temporizador de la petición actual
+
+    Returns:
+        StageTimer o NULL_TIMER si SERVER_TIMING_ENABLED está desactivado
+    """
+    timer = StageTimer() if settings.SERVER_TIMING_ENABLED else NULL_TIMER
+    g.stage_timer = timer
+    return timer
+
+
+def current_timer():
+    """
+    Returns:
+        Temporizador de la petición actual (NULL_TIMER si no hay)
+    """
+    return g.get('stage_timer', NULL_TIMER)
+
+
+def add_server_timing_header(response):
+    """
+    Añade la cabecera Server-Timing si la petición usó un temporizador
+
+    Args:
+        response: Respuesta de Flask
+
+    Returns:
+        La misma respuesta
+    """
+    header = current_timer().header()
+    if header:
+        response.headers['Server-Timing'] = header
+    return response
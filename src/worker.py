@@ -0,0 +1,99 @@
+"""
+Worker de conversiones independiente
+
+    python -m src.worker [--concurrency N]
+
+Reclama jobs del broker configurado (JOB_BROKER) y los convierte en este
+proceso, de modo que LibreOffice y FFmpeg no compiten por CPU con las
+peticiones de la API. Los nodos worker deben ver las mismas UPLOAD_FOLDER
+y CONVERTED_FOLDER que la API (volumen compartido) y el mismo broker; con
+JOB_WORKERS=0 las API solo encolan.
+
+Con SIGTERM o SIGINT deja de reclamar jobs y espera hasta GRACEFUL_TIMEOUT
+a los que están en curso; los que no terminan vuelven a la cola. Una
+segunda señal sale de inmediato y sus jobs se repiten al vencer el lease.
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+
+from src import timing
+from src.config import settings
+from src.conversion import convert_source
+from src.converters.factory import ConverterFactory
+from src.jobs import JobWorker, create_store
+from src.logging import logger, setup_logging, stop_logging
+from src.pressure import AdaptiveConcurrency
+from src.scheduler import ConversionScheduler
+
+
+def build_worker(concurrency, store=None):
+    """
+    Crea un JobWorker con su propio planificador de conversiones
+
+    Args:
+        concurrency: Jobs simultáneos
+        store: Broker (None = JOB_BROKER)
+
+    Returns:
+        tuple: (JobWorker, AdaptiveConcurrency o None si
+            ADAPTIVE_CONCURRENCY está desactivado)
+    """
+    scheduler = ConversionScheduler.from_settings()
+    factory = ConverterFactory(scheduler=scheduler)
+    controller = AdaptiveConcurrency.from_settings(scheduler) if settings.ADAPTIVE_CONCURRENCY else None
+
+    def run(source_path, target_format, token, **options):
+        response_data, _ = convert_source(factory, source_path, target_format, timing.StageTimer(), token, **options)
+        return response_data
+
+    return JobWorker(store or create_store(), run, concurrency=concurrency), controller
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.worker', description='File converter job worker')
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=settings.ADAPTIVE_MAX_CONCURRENCY if settings.ADAPTIVE_CONCURRENCY else settings.MAX_CONCURRENT_CONVERSIONS,
+        help='Jobs claimed at the same time (default: ADAPTIVE_MAX_CONCURRENCY with ADAPTIVE_CONCURRENCY, '
+             'otherwise MAX_CONCURRENT_CONVERSIONS)'
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+
+    setup_logging()
+    os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(settings.CONVERTED_FOLDER, exist_ok=True)
+
+    worker, controller = build_worker(args.concurrency)
+    stopping = threading.Event()
+
+    def signal_handler(sig, frame):
+        if stopping.is_set():
+            logger.warning("Second signal received, exiting without waiting for jobs")
+            stop_logging()
+            os._exit(1)
+        logger.info("Shutting down worker...")
+        stopping.set()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    if controller is not None:
+        controller.ensure_started()
+    worker.start()
+    while not stopping.wait(1):
+        pass
+    worker.stop(timeout=settings.GRACEFUL_TIMEOUT)
+    if controller is not None:
+        controller.stop()
+    stop_logging()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
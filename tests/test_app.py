@@ -66,6 +66,14 @@ class TestAppStartup:
         except Exception as e:
             pytest.fail(f"App startup failed: {e}")
     
+    def test_app_startup_fails_without_limit_tools(self):
+        """Probar que la app no arranca si faltan las herramientas de los límites configurados."""
+        from src.exceptions import InvalidConfigException
+        with patch('src.converters.supervisor._limit_tool', return_value=None), \
+                patch('src.converters.supervisor.settings.CONVERTER_MEMORY_LIMIT_MB', 512):
+            with pytest.raises(InvalidConfigException):
+                create_app()
+    
     def test_app_context_available(self):
         """Probar que app context está disponible."""
         app = create_app()
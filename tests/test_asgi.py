@@ -0,0 +1,262 @@
+"""
+Tests para la aplicación ASGI con conversión asíncrona (src/asgi.py).
+"""
+import asyncio
+import json
+import pytest
+from src.asgi import AsyncConverterApp
+from src.config import settings
+
+BOUNDARY = 'test-boundary'
+
+
+def multipart(fields, filename=None, content=b''):
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    if filename:
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    return b''.join(parts) + f'--{BOUNDARY}--\r\n'.encode()
+
+
+def call(app, body, disconnect=None, chunk_size=1024, headers=None):
+    """
+    Ejecuta una petición POST /convert contra la aplicación ASGI
+
+    Args:
+        disconnect: asyncio.Event que, al activarse, simula el cierre de
+            la conexión (None = el cliente espera la respuesta)
+
+    Returns:
+        tuple: (status o None si no hubo respuesta, cabeceras, JSON)
+    """
+    scope = {
+        'type': 'http',
+        'method': 'POST',
+        'path': '/convert',
+        'query_string': b'',
+        'headers': [(b'content-type', f'multipart/form-data; boundary={BOUNDARY}'.encode())] + (headers or [])
+    }
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    sent = []
+
+    async def run():
+        gate = disconnect or asyncio.Event()
+
+        async def receive():
+            if chunks:
+                chunk = chunks.pop(0)
+                return {'type': 'http.request', 'body': chunk, 'more_body': bool(chunks)}
+            await gate.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+
+    asyncio.run(run())
+    if not sent:
+        return None, {}, None
+    headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    return sent[0]['status'], headers, json.loads(sent[1]['body'])
+
+
+class FakeFactory:
+    """Factory con perform_conversion_async controlable"""
+
+    def __init__(self, delay=0.0, result=None):
+        self.delay = delay
+        self.result = result or {'success': True}
+        self.cancelled = False
+        self.calls = []
+
+    async def perform_conversion_async(self, input_path, output_path, from_ext, to_ext, **options):
+        self.calls.append((input_path, output_path, from_ext, to_ext))
+        self.options = options
+        with open(output_path, 'wb') as partial:
+            partial.write(b'partial')
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return dict(self.result)
+
+
+class FakeJobManager:
+    """JobManager que solo registra lo que se le encola"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, source_path, target_format, **options):
+        self.submitted.append((source_path, target_format, options))
+        return {'job_id': 'job-1', 'status': 'queued'}
+
+
+@pytest.fixture
+def folders(tmp_path, monkeypatch):
+    upload = tmp_path / 'uploads'
+    converted = tmp_path / 'converted'
+    upload.mkdir()
+    converted.mkdir()
+    monkeypatch.setattr(settings, 'UPLOAD_FOLDER', upload)
+    monkeypatch.setattr(settings, 'CONVERTED_FOLDER', converted)
+    return upload, converted
+
+
+class TestAsyncConvert:
+
+    def test_convert_streams_upload_and_returns_download_url(self, folders):
+        """Probar una conversión completa con el cuerpo en varios trozos."""
+        upload, converted = folders
+        factory = FakeFactory()
+        app = AsyncConverterApp(factory)
+
+        status, headers, data = call(
+            app,
+            multipart({'format': 'pdf'}, 'report.docx', b'x' * 5000),
+            headers=[(b'x-request-id', b'req-123')]
+        )
+
+        assert status == 200
+        assert data['success'] is True
+        assert data['download_url'] == f"/download/{data['file_id']}.pdf"
+        assert headers['x-request-id'] == 'req-123'
+        assert 'server-timing' in headers
+        input_path, output_path, from_ext, to_ext = factory.calls[0]
+        assert (from_ext, to_ext) == ('.docx', '.pdf')
+        assert input_path.endswith('_report.docx')
+        assert list(upload.iterdir()) == []
+        assert (converted / f"{data['file_id']}.pdf").exists()
+
+    def test_disconnect_cancels_conversion_and_removes_files(self, folders):
+        """Probar que si el cliente se va se cancela la conversión y se borran los parciales."""
+        upload, converted = folders
+        factory = FakeFactory(delay=30)
+        app = AsyncConverterApp(factory)
+        disconnect = asyncio.Event()
+
+        async def leave_soon():
+            while not factory.calls:
+                await asyncio.sleep(0.01)
+            disconnect.set()
+
+        original = factory.perform_conversion_async
+
+        async def perform(*args, **options):
+            asyncio.ensure_future(leave_soon())
+            return await original(*args, **options)
+
+        factory.perform_conversion_async = perform
+        status, _, _ = call(app, multipart({'format': 'pdf'}, 'report.docx', b'x'), disconnect=disconnect)
+
+        assert status is None
+        assert factory.cancelled
+        assert list(upload.iterdir()) == []
+        assert list(converted.iterdir()) == []
+
+    def test_deadline_returns_504(self, folders):
+        """Probar que al vencer el plazo se cancela y se responde 504."""
+        upload, converted = folders
+        factory = FakeFactory(delay=30)
+        app = AsyncConverterApp(factory, deadline_seconds=0.05)
+
+        status, _, data = call(app, multipart({'format': 'pdf'}, 'report.docx', b'x'))
+
+        assert status == 504
+        assert data['error_code'] == 'CONVERSION_TIMEOUT'
+        assert factory.cancelled
+        assert list(converted.iterdir()) == []
+
+    def test_upload_over_limit_is_rejected_while_streaming(self, folders, monkeypatch):
+        """Probar que el límite de tamaño se aplica sin esperar al final del cuerpo."""
+        upload, _ = folders
+        monkeypatch.setattr(settings, 'MAX_FILE_SIZE', 2048)
+        factory = FakeFactory()
+
+        status, _, data = call(AsyncConverterApp(factory), multipart({'format': 'pdf'}, 'big.docx', b'x' * 10000))
+
+        assert status == 413
+        assert data['error_code'] == 'FILE_TOO_LARGE'
+        assert factory.calls == []
+        assert list(upload.iterdir()) == []
+
+    def test_invalid_target_format(self, folders):
+        """Probar el error de formato de destino y la limpieza de la subida."""
+        upload, _ = folders
+
+        status, _, data = call(AsyncConverterApp(FakeFactory()), multipart({'format': 'exe'}, 'report.docx', b'x'))
+
+        assert status == 400
+        assert data['error_code'] == 'UNSUPPORTED_FORMAT'
+        assert list(upload.iterdir()) == []
+
+    def test_large_body_in_transport_sized_chunks(self, folders):
+        """Probar una subida de más de 256 KiB recibida en trozos de 256 KiB, como los de uvicorn."""
+        _, converted = folders
+        factory = FakeFactory()
+
+        status, _, data = call(
+            AsyncConverterApp(factory),
+            multipart({'format': 'pdf'}, 'photo.jpg', b'x' * (2 * 1024 * 1024)),
+            chunk_size=256 * 1024
+        )
+
+        assert status == 200
+        assert data['success'] is True
+        assert factory.calls[0][0].endswith('_photo.jpg')
+
+    def test_form_field_over_limit_is_rejected(self, folders):
+        """Probar que un campo de texto demasiado grande se rechaza."""
+        upload, _ = folders
+        factory = FakeFactory()
+
+        status, _, data = call(
+            AsyncConverterApp(factory),
+            multipart({'format': 'pdf', 'url': 'x' * (128 * 1024)}, 'report.docx', b'x'),
+            chunk_size=256 * 1024
+        )
+
+        assert status == 400
+        assert data['error_code'] == 'INVALID_FILE'
+        assert factory.calls == []
+        assert list(upload.iterdir()) == []
+
+    def test_job_mode_submits_job(self, folders):
+        """Probar que mode=job encola un job y responde 202 sin convertir."""
+        upload, _ = folders
+        factory = FakeFactory()
+        jobs = FakeJobManager()
+
+        status, _, data = call(
+            AsyncConverterApp(factory, job_manager=jobs),
+            multipart({'format': 'pdf', 'mode': 'job', 'priority': 'low'}, 'report.docx', b'x')
+        )
+
+        assert status == 202
+        assert data['job_id'] == 'job-1'
+        assert data['status_url'] == '/jobs/job-1'
+        assert factory.calls == []
+        source_path, target_format, options = jobs.submitted[0]
+        assert target_format == 'pdf'
+        assert options['priority'] == 'low'
+        assert source_path.exists()
+
+    def test_invalid_mode(self, folders):
+        """Probar que un modo desconocido, o job sin JobManager, se rechaza."""
+        upload, _ = folders
+
+        for app, mode in ((AsyncConverterApp(FakeFactory(), job_manager=FakeJobManager()), 'later'),
+                          (AsyncConverterApp(FakeFactory()), 'job')):
+            status, _, data = call(app, multipart({'format': 'pdf', 'mode': mode}, 'report.docx', b'x'))
+
+            assert status == 400
+            assert data['error_code'] == 'INVALID_PARAMETER'
+        assert list(upload.iterdir()) == []
@@ -4,3 +4,14 @@ from src.auth import APIKeyAuth, auth
 class TestAuth:
     def test_auth_instance(self):
         assert isinstance(auth, APIKeyAuth)
+
+    def test_get_tenant(self, monkeypatch):
+        """Probar que el cliente es el nombre de API_KEY_<NOMBRE>."""
+        monkeypatch.setenv('API_KEY_ACME', 'secret-acme')
+        tenants = APIKeyAuth()
+
+        assert tenants.get_tenant('secret-acme') == 'ACME'
+        assert tenants.get_tenant(None) == 'anonymous'
+        unknown = tenants.get_tenant('unregistered-key')
+        assert unknown.startswith('key-')
+        assert 'unregistered' not in unknown
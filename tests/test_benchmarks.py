@@ -0,0 +1,70 @@
+"""
+Tests para la suite de benchmarks (benchmarks/).
+"""
+import hashlib
+import zipfile
+from unittest.mock import MagicMock, patch
+from benchmarks import suite
+from benchmarks.compare import compare
+from benchmarks.fixtures import generate_fixtures
+
+
+def digest(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class TestBenchmarkFixtures:
+
+    def test_fixtures_are_deterministic(self, tmp_path):
+        """Probar que dos generaciones producen los mismos bytes."""
+        names = ['docx', 'xlsx', 'png_small', 'jpg_small', 'pdf', 'zip', 'tar']
+        first = generate_fixtures(tmp_path / 'a', names)
+        second = generate_fixtures(tmp_path / 'b', names)
+
+        for name in names:
+            assert digest(first[name]) == digest(second[name]), name
+
+    def test_office_fixtures_are_valid_packages(self, tmp_path):
+        """Probar que docx y xlsx contienen sus partes OOXML."""
+        fixtures = generate_fixtures(tmp_path, ['docx', 'xlsx'])
+
+        assert 'word/document.xml' in zipfile.ZipFile(fixtures['docx']).namelist()
+        assert 'xl/worksheets/sheet1.xml' in zipfile.ZipFile(fixtures['xlsx']).namelist()
+
+
+class TestBenchmarkComparison:
+
+    def test_regression_needs_relative_and_absolute_slowdown(self):
+        """Probar el umbral relativo y el margen absoluto."""
+        baseline = {'results': {
+            'slow': {'status': 'ok', 'median_seconds': 1.0},
+            'tiny': {'status': 'ok', 'median_seconds': 0.01},
+            'steady': {'status': 'ok', 'median_seconds': 2.0}
+        }}
+        current = {'results': {
+            'slow': {'status': 'ok', 'median_seconds': 1.5},
+            'tiny': {'status': 'ok', 'median_seconds': 0.02},
+            'steady': {'status': 'ok', 'median_seconds': 2.1},
+            'new': {'status': 'ok', 'median_seconds': 3.0}
+        }}
+
+        rows = {row['case']: row for row in compare(current, baseline, threshold=0.2)}
+
+        assert rows['slow']['regression']
+        assert not rows['tiny']['regression']
+        assert not rows['steady']['regression']
+        assert 'new' not in rows
+
+    def test_conversion_case_measures_factory_route(self, tmp_path):
+        """Probar la medición de un caso con un motor simulado."""
+        fixture = generate_fixtures(tmp_path / 'fixtures', ['png_small'])['png_small']
+        factory = MagicMock()
+        factory.get_engine_name.return_value = 'imagemagick'
+        factory.perform_conversion.return_value = {'success': True}
+
+        with patch.object(suite, 'missing_tools', return_value=None):
+            case = suite.run_conversion_case(factory, fixture, '.jpg', tmp_path, repeat=3, warmup=1)
+
+        assert case['status'] == 'ok'
+        assert len(case['samples']) == 3
+        assert factory.perform_conversion.call_count == 4
@@ -0,0 +1,90 @@
+"""
+Tests para la cancelación de conversiones (src/cancellation.py).
+"""
+import socket
+import time
+from src.cancellation import CancellationToken, DisconnectMonitor, cancellation_scope, current_token
+
+
+def _wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestCancellationToken:
+
+    def test_cancel_runs_callbacks_once(self):
+        """Probar que los callbacks se ejecutan una sola vez con el primer motivo."""
+        token = CancellationToken()
+        calls = []
+        token.add_callback(lambda: calls.append('a'))
+        remove = token.add_callback(lambda: calls.append('b'))
+        remove()
+
+        assert token.cancel('job_cancelled') is True
+        assert token.cancel('client_disconnected') is False
+        assert token.cancelled
+        assert token.reason == 'job_cancelled'
+        assert calls == ['a']
+
+    def test_callback_added_after_cancel_runs_immediately(self):
+        """Probar que registrar un callback en un token ya cancelado lo ejecuta."""
+        token = CancellationToken()
+        token.cancel()
+        calls = []
+
+        token.add_callback(lambda: calls.append(True))
+
+        assert calls == [True]
+
+    def test_scope_sets_current_token(self):
+        """Probar que el token solo es el actual dentro del bloque."""
+        token = CancellationToken()
+
+        with cancellation_scope(token):
+            assert current_token() is token
+        assert current_token() is None
+
+
+class TestDisconnectMonitor:
+
+    def test_peer_close_cancels_token(self):
+        """Probar que cerrar la conexión del cliente activa el token."""
+        server, client = socket.socketpair()
+        monitor = DisconnectMonitor(interval_seconds=0.05)
+        token = CancellationToken()
+
+        with monitor.watch({'gunicorn.socket': server}, token):
+            client.close()
+            assert _wait_for(lambda: token.cancelled)
+
+        assert token.reason == 'client_disconnected'
+        server.close()
+
+    def test_pipelined_data_does_not_cancel(self):
+        """Probar que datos del cliente (keep-alive) no se toman por desconexión."""
+        server, client = socket.socketpair()
+        monitor = DisconnectMonitor(interval_seconds=0.05)
+        token = CancellationToken()
+
+        with monitor.watch({'werkzeug.socket': server}, token):
+            client.sendall(b'GET / HTTP/1.1\r\n')
+            assert _wait_for(lambda: not monitor._selector.get_map())
+
+        assert not token.cancelled
+        assert server.recv(3) == b'GET'
+        server.close()
+        client.close()
+
+    def test_without_socket_is_noop(self):
+        """Probar que sin socket en el entorno no se vigila nada."""
+        monitor = DisconnectMonitor()
+        token = CancellationToken()
+
+        with monitor.watch({}, token) as watched:
+            assert watched is token
+
+        assert monitor._thread is None
+        assert not token.cancelled
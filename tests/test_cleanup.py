@@ -0,0 +1,63 @@
+"""
+Tests para la limpieza periódica de archivos (src/cleanup.py).
+"""
+import os
+import time
+from src.cleanup import CleanupService
+from src.jobs import QUEUED, RUNNING, SUCCEEDED, JobStore
+
+
+class TestCleanupService:
+
+    def test_only_one_service_holds_the_host_lock(self, tmp_path):
+        """Probar que solo un proceso (o servicio) limpia a la vez."""
+        lock_path = str(tmp_path / 'cleanup.lock')
+        first = CleanupService(folders=[tmp_path], lock_path=lock_path)
+        second = CleanupService(folders=[tmp_path], lock_path=lock_path)
+
+        assert first.try_acquire()
+        assert not second.try_acquire()
+
+        first.stop()
+        assert second.try_acquire()
+        assert open(lock_path).read() == str(os.getpid())
+        second.stop()
+
+    def test_cleanup_removes_only_expired_files(self, tmp_path):
+        """Probar que solo se borran los archivos más antiguos que el TTL."""
+        old_file = tmp_path / 'old.pdf'
+        new_file = tmp_path / 'new.pdf'
+        old_file.write_text('old')
+        new_file.write_text('new')
+        expired = time.time() - 3600
+        os.utime(old_file, (expired, expired))
+
+        service = CleanupService(folders=[tmp_path], ttl_seconds=600, lock_path=str(tmp_path / 'lock'))
+
+        assert service.cleanup_once() == 1
+        assert not old_file.exists()
+        assert new_file.exists()
+
+    def test_cleanup_keeps_sources_of_pending_jobs(self, tmp_path):
+        """Probar que no se borran las subidas de jobs en cola o en curso."""
+        store = JobStore(tmp_path / 'jobs.sqlite3')
+        uploads = tmp_path / 'uploads'
+        uploads.mkdir()
+        queued, running, done = (uploads / f'{name}_report.docx' for name in ('aaa', 'bbb', 'ccc'))
+        expired = time.time() - 3600
+        for path in (queued, running, done):
+            path.write_text('x')
+            os.utime(path, (expired, expired))
+        running_id = store.create(running, 'pdf')
+        store.claim('worker', 60, 3)
+        queued_id = store.create(queued, 'pdf')
+        finished = store.create(done, 'pdf')
+        store.finish(finished, SUCCEEDED)
+        service = CleanupService(folders=[uploads], ttl_seconds=600, lock_path=str(tmp_path / 'lock'), job_store=store)
+
+        assert store.get(running_id)['status'] == RUNNING
+        assert store.get(queued_id)['status'] == QUEUED
+        assert service.cleanup_once() == 1
+        assert queued.exists()
+        assert running.exists()
+        assert not done.exists()
@@ -79,6 +79,14 @@ class TestSettings:
         with pytest.raises(ValueError):
             Settings(OCR_MAX_PAGES=2000)
 
+    def test_ocr_cache_size_validation(self):
+        """Probar validación del tamaño de la caché OCR."""
+        settings = Settings(OCR_CACHE_MAX_ENTRIES=64)
+        assert settings.OCR_CACHE_MAX_ENTRIES == 64
+
+        with pytest.raises(ValueError):
+            Settings(OCR_CACHE_MAX_ENTRIES=0)
+
     def test_rate_limit_validation(self):
         """Probar validación de rate limit."""
         # Valor válido
@@ -89,6 +97,43 @@ class TestSettings:
         with pytest.raises(ValueError):
             Settings(RATE_LIMIT_REQUESTS=0)
 
+    def test_job_broker_validation(self):
+        """Probar validación del broker y los leases de jobs."""
+        settings = Settings(JOB_BROKER='Redis', JOB_WORKERS=0)
+        assert settings.JOB_BROKER == 'redis'
+        assert settings.JOB_WORKERS == 0
+
+        with pytest.raises(ValueError):
+            Settings(JOB_BROKER='rabbitmq')
+        with pytest.raises(ValueError):
+            Settings(JOB_LEASE_SECONDS=1)
+
+    def test_scheduler_validation(self):
+        """Probar validación del reparto entre clientes."""
+        settings = Settings(SCHEDULER_TENANT_WEIGHTS='acme:4,batch:0.5', SCHEDULER_TENANT_PRIORITIES='batch:low')
+        assert settings.SCHEDULER_TENANT_WEIGHTS == 'acme:4,batch:0.5'
+
+        with pytest.raises(ValueError):
+            Settings(SCHEDULER_TENANT_WEIGHTS='acme')
+        with pytest.raises(ValueError):
+            Settings(SCHEDULER_TENANT_PRIORITIES='batch:urgent')
+        with pytest.raises(ValueError):
+            Settings(SCHEDULER_SHORT_JOB_SECONDS=0)
+        with pytest.raises(ValueError):
+            Settings(SCHEDULER_DEADLINE_SLACK_SECONDS=-1)
+
+    def test_adaptive_concurrency_validation(self):
+        """Probar validación del límite adaptativo."""
+        settings = Settings(ADAPTIVE_CONCURRENCY=True, ADAPTIVE_MIN_CONCURRENCY=2, ADAPTIVE_MAX_CONCURRENCY=8)
+        assert settings.ADAPTIVE_MAX_CONCURRENCY == 8
+
+        with pytest.raises(ValueError):
+            Settings(ADAPTIVE_MIN_CONCURRENCY=8, ADAPTIVE_MAX_CONCURRENCY=4)
+        with pytest.raises(ValueError):
+            Settings(ADAPTIVE_DECREASE_FACTOR=1.5)
+        with pytest.raises(ValueError):
+            Settings(ADAPTIVE_PSI_THRESHOLD=0)
+
     def test_directory_creation(self, tmp_path):
         """Probar creación automática de directorios."""
         upload_dir = tmp_path / "uploads"
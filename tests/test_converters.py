@@ -1,10 +1,25 @@
+import asyncio
+import time
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.cancellation import CancellationToken
 from src.converters.factory import ConverterFactory
 from src.converters.libreoffice import LibreOfficeConverter
 from src.converters.imagemagick import ImageMagickConverter
 from src.converters.ffmpeg import FFmpegConverter
 from src.converters.archive import ArchiveConverter
+from src.scheduler import ConversionScheduler, CostEstimator
+
+
+def _completed(returncode=0):
+    return {
+        'returncode': returncode,
+        'stdout': '',
+        'stderr': '',
+        'timed_out': False,
+        'output_truncated': False,
+        'resources': {'wall_seconds': 0.01, 'user_seconds': 0.0, 'system_seconds': 0.0, 'max_rss_kb': 1024}
+    }
 
 class TestConverters(unittest.TestCase):
     def setUp(self):
@@ -47,23 +62,181 @@ class TestConverters(unittest.TestCase):
         mock_run.assert_called_once()
         mock_move.assert_called_once()
 
-    @patch('subprocess.run')
+    @patch('src.converters.base.supervise')
     def test_imagemagick_convert(self, mock_run):
         converter = ImageMagickConverter()
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = _completed()
 
         result = converter.convert('input.jpg', 'output.png', '.jpg', '.png')
         self.assertTrue(result['success'])
         mock_run.assert_called_once()
 
-    @patch('subprocess.run')
+    @patch('src.converters.base.supervise')
     def test_ffmpeg_convert(self, mock_run):
         converter = FFmpegConverter()
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = _completed()
 
         result = converter.convert('input.mp4', 'output.gif', '.mp4', '.gif')
         self.assertTrue(result['success'])
         mock_run.assert_called_once()
 
+    def test_run_command_reports_resources(self):
+        """Cada comando devuelve tiempo de reloj, CPU y memoria máxima"""
+        result = ImageMagickConverter().run_command(['sh', '-c', 'echo ok; echo warn >&2'])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['stdout'].strip(), 'ok')
+        self.assertEqual(result['stderr'].strip(), 'warn')
+        resources = result['resources']
+        self.assertEqual(
+            set(resources),
+            {'wall_seconds', 'user_seconds', 'system_seconds', 'max_rss_kb'}
+        )
+        self.assertGreater(resources['max_rss_kb'], 0)
+
+    def test_run_command_failure_and_timeout_keep_resources(self):
+        """Los fallos y timeouts también informan del consumo"""
+        converter = ImageMagickConverter()
+
+        failed = converter.run_command(['sh', '-c', 'exit 3'])
+        self.assertFalse(failed['success'])
+        self.assertEqual(failed['returncode'], 3)
+        self.assertIn('resources', failed)
+
+        timed_out = converter.run_command(['sleep', '5'], timeout_seconds=0.2)
+        self.assertTrue(timed_out['timeout'])
+        self.assertLess(timed_out['resources']['wall_seconds'], 5)
+
+    def test_factory_aggregates_resources_of_all_commands(self):
+        """La conversión suma el consumo de todos sus procesos"""
+        factory = ConverterFactory()
+        converter = factory.converters['archive']
+
+        def convert(input_path, output_path, from_ext, to_ext):
+            converter.run_command(['true'])
+            converter.run_command(['true'])
+            return {'success': True}
+
+        with patch.object(converter, 'convert', side_effect=convert):
+            result = factory.perform_conversion('in.zip', 'out.tar', '.zip', '.tar')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['resources']['commands'], 2)
+        self.assertGreater(result['resources']['max_rss_kb'], 0)
+
+    def test_factory_conversion_uses_scheduler_slot(self):
+        scheduler = MagicMock()
+        factory = ConverterFactory(scheduler=scheduler)
+        factory.converters['ffmpeg'] = MagicMock()
+        factory.converters['ffmpeg'].convert.return_value = {'success': True}
+        factory.converters['ffmpeg'].has_fast_preset.return_value = False
+
+        result = factory.perform_conversion('in.mp4', 'out.gif', '.mp4', '.gif')
+
+        self.assertTrue(result['success'])
+        scheduler.slot.assert_called_once_with(
+            'ffmpeg', token=None, tenant=None, priority=None, size_bytes=0, deadline=None, fast_preset=False
+        )
+        self.assertEqual(factory.get_engine_name('.docx', '.pdf'), 'libreoffice')
+        self.assertIsNone(factory.get_engine_name('.xyz', '.abc'))
+
+    def test_convert_async_runs_the_same_commands(self):
+        """convert y convert_async comparten la construcción de argumentos"""
+        converter = ArchiveConverter()
+        sync_commands = []
+        async_commands = []
+
+        def run(command, timeout_seconds=None):
+            sync_commands.append(command)
+            return {'success': True}
+
+        async def run_async(command, timeout_seconds=None):
+            async_commands.append(command)
+            return {'success': True}
+
+        with patch.object(converter, 'run_command', side_effect=run), \
+                patch.object(converter, 'run_command_async', side_effect=run_async):
+            sync_result = converter.convert('in.zip', 'out.tar', '.zip', '.tar')
+            async_result = asyncio.run(converter.convert_async('in.zip', 'out.tar', '.zip', '.tar'))
+
+        self.assertEqual(sync_result, async_result)
+        self.assertEqual([c[:2] for c in sync_commands], [['7z', 'x'], ['tar', '-cf']])
+        self.assertEqual([c[:2] for c in async_commands], [['7z', 'x'], ['tar', '-cf']])
+
+    def test_factory_async_aggregates_resources(self):
+        """La variante asyncio mide y agrega el consumo igual que la síncrona"""
+        factory = ConverterFactory()
+
+        with patch('src.converters.base.supervise_async', AsyncMock(return_value=_completed())) as mock_run:
+            result = asyncio.run(factory.perform_conversion_async('in.png', 'out.jpg', '.png', '.jpg'))
+
+        self.assertTrue(result['success'])
+        self.assertEqual(mock_run.call_args[0][0], ['convert', 'in.png', 'out.jpg'])
+        self.assertEqual(result['resources']['commands'], 1)
+
+    def test_factory_stops_when_token_cancelled(self):
+        """Una conversión cancelada no lanza más comandos y lo indica"""
+        factory = ConverterFactory()
+        converter = factory.converters['archive']
+        token = CancellationToken()
+        commands = []
+
+        def run(command, timeout_seconds=None):
+            commands.append(command)
+            token.cancel('job_cancelled')
+            return converter._cancelled_result()
+
+        with patch('src.converters.base.BaseConverter.run_command', side_effect=run):
+            result = factory.perform_conversion('in.zip', 'out.tar', '.zip', '.tar', token=token)
+
+        self.assertFalse(result['success'])
+        self.assertTrue(result['cancelled'])
+        self.assertEqual(len(commands), 1)
+
+    def test_factory_rejects_unreachable_deadline(self):
+        """Con un plazo que ni el preset rápido cumple no se lanza nada"""
+        scheduler = ConversionScheduler(1, estimator=CostEstimator(seconds_per_mb={'ffmpeg': 4.0}))
+        factory = ConverterFactory(scheduler=scheduler)
+
+        with patch('src.converters.base.supervise') as mock_run:
+            result = factory.perform_conversion('in.mp4', 'out.mp4', '.mp4', '.mp4', deadline=time.monotonic() + 1)
+
+        self.assertFalse(result['success'])
+        self.assertTrue(result['deadline_unachievable'])
+        self.assertAlmostEqual(result['estimated_seconds'], 1.6)
+        mock_run.assert_not_called()
+
+    def test_factory_uses_fast_preset_when_deadline_at_risk(self):
+        """Si el preset normal no llega al plazo FFmpeg usa el más rápido"""
+        scheduler = ConversionScheduler(1, estimator=CostEstimator(seconds_per_mb={'ffmpeg': 4.0}))
+        factory = ConverterFactory(scheduler=scheduler)
+
+        with patch('src.converters.base.supervise', return_value=_completed()) as mock_run:
+            fast = factory.perform_conversion('in.mp4', 'out.mp4', '.mp4', '.mp4', deadline=time.monotonic() + 3)
+            normal = factory.perform_conversion('in.mp4', 'out.mp4', '.mp4', '.mp4', deadline=time.monotonic() + 60)
+
+        self.assertTrue(fast['fast_preset'])
+        self.assertIn('ultrafast', mock_run.call_args_list[0][0][0])
+        self.assertNotIn('fast_preset', normal)
+        self.assertNotIn('ultrafast', mock_run.call_args_list[1][0][0])
+
+    def test_factory_without_fast_preset_for_target(self):
+        """Los destinos sin preset rápido (gif, audio) se estiman con el preset normal"""
+        scheduler = ConversionScheduler(1, estimator=CostEstimator(seconds_per_mb={'ffmpeg': 4.0}))
+        factory = ConverterFactory(scheduler=scheduler)
+
+        with patch('src.converters.base.supervise') as mock_run:
+            rejected = factory.perform_conversion('in.mp4', 'out.gif', '.mp4', '.gif', deadline=time.monotonic() + 3)
+        self.assertTrue(rejected['deadline_unachievable'])
+        self.assertAlmostEqual(rejected['estimated_seconds'], 4.0)
+        mock_run.assert_not_called()
+
+        with patch('src.converters.base.supervise', return_value=_completed()) as mock_run:
+            result = factory.perform_conversion('in.mp4', 'out.gif', '.mp4', '.gif', deadline=time.monotonic() + 5)
+
+        self.assertTrue(result['success'])
+        self.assertNotIn('fast_preset', result)
+        self.assertNotIn('ultrafast', mock_run.call_args[0][0])
+
 if __name__ == '__main__':
     unittest.main()
@@ -10,11 +10,15 @@ from src.exceptions import (
     InvalidFileException,
     UnsupportedFormatException,
     ConversionFailedException,
+    ConversionTimeoutException,
+    ConversionCancelledException,
+    DeadlineUnachievableException,
     FileTooLargeException,
     FileNotFoundException,
     OCRDisabledException,
     OCRProcessingException,
     InvalidConfigException,
+    JobNotFoundException,
     RateLimitExceededException,
     URLDownloadException
 )
@@ -203,6 +207,52 @@ class TestConversionFailedException:
         assert result['details']['target_format'] == '.docx'
 
 
+class TestConversionTimeoutException:
+    """
+    Tests para ConversionTimeoutException.
+    """
+    
+    def test_conversion_timeout(self):
+        """Probar el código 504 y el plazo en los detalles."""
+        exc = ConversionTimeoutException(30, source_format='.mp4', target_format='.gif')
+        
+        result = exc.to_dict()
+        
+        assert exc.status_code == 504
+        assert result['error_code'] == 'CONVERSION_TIMEOUT'
+        assert result['details'] == {'deadline_seconds': 30, 'source_format': '.mp4', 'target_format': '.gif'}
+    
+    def test_deadline_unachievable(self):
+        """Probar el código 503 y la estimación en los detalles."""
+        exc = DeadlineUnachievableException(12.345, -0.5)
+        
+        assert exc.status_code == 503
+        assert exc.error_code == 'DEADLINE_UNACHIEVABLE'
+        assert exc.to_dict()['details'] == {'estimated_seconds': 12.35, 'remaining_seconds': 0.0}
+
+
+class TestJobExceptions:
+    """
+    Tests para la cancelación y los jobs.
+    """
+    
+    def test_conversion_cancelled(self):
+        """Probar el código 499 y el motivo en los detalles."""
+        exc = ConversionCancelledException('client_disconnected')
+        
+        assert exc.status_code == 499
+        assert exc.error_code == 'CONVERSION_CANCELLED'
+        assert exc.to_dict()['details'] == {'reason': 'client_disconnected'}
+    
+    def test_job_not_found(self):
+        """Probar el 404 de un job inexistente."""
+        exc = JobNotFoundException('abc')
+        
+        assert exc.status_code == 404
+        assert exc.error_code == 'JOB_NOT_FOUND'
+        assert exc.to_dict()['details'] == {'job_id': 'abc'}
+
+
 class TestOCRExceptions:
     """
     Tests para excepciones relacionadas con OCR.
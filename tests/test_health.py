@@ -0,0 +1,65 @@
+"""
+Tests para el muestreo de salud (src/health.py).
+"""
+import os
+import time
+from unittest.mock import MagicMock, patch
+from src.health import HealthSampler
+
+
+class TestHealthSampler:
+
+    def test_sample_without_languages_does_not_call_provider(self, tmp_path):
+        """Probar que una muestra en la petición no consulta a Tesseract."""
+        provider = MagicMock(return_value=['spa'])
+        sampler = HealthSampler(folders={'upload_folder': tmp_path}, languages_provider=provider)
+
+        snapshot = sampler.sample()
+
+        provider.assert_not_called()
+        assert snapshot['languages'] == []
+        assert snapshot['folders'] == {'upload_folder': True}
+        assert 'cpu_usage_percent' in snapshot['system']
+
+    def test_sample_keeps_previous_languages(self):
+        """Probar que los idiomas se conservan entre muestras."""
+        sampler = HealthSampler(languages_provider=lambda: ['spa', 'eng'])
+        sampler.sample(include_languages=True)
+
+        assert sampler.sample()['languages'] == ['spa', 'eng']
+
+    @patch('src.health.psutil.cpu_percent', return_value=12.5)
+    def test_cpu_sampling_is_non_blocking(self, mock_cpu):
+        """Probar que la CPU se mide sin intervalo bloqueante."""
+        HealthSampler().sample()
+
+        mock_cpu.assert_called_with(interval=None)
+
+    def test_background_thread_refreshes_snapshot(self):
+        """Probar que el hilo de fondo renueva la instantánea."""
+        sampler = HealthSampler(interval_seconds=0.01, languages_provider=lambda: ['spa'])
+        try:
+            sampler.ensure_started()
+            deadline = time.monotonic() + 2
+            while time.monotonic() < deadline and not (sampler._snapshot or {}).get('languages'):
+                time.sleep(0.01)
+
+            snapshot = sampler.snapshot()
+            assert snapshot['languages'] == ['spa']
+            assert sampler.age_seconds(snapshot) < 1
+        finally:
+            sampler.stop()
+
+    def test_restarts_thread_after_fork(self):
+        """Probar que un proceso hijo arranca su propio hilo."""
+        sampler = HealthSampler(interval_seconds=60)
+        try:
+            sampler.ensure_started()
+            first_thread = sampler._thread
+
+            with patch('src.health.os.getpid', return_value=os.getpid() + 1):
+                sampler.ensure_started()
+
+            assert sampler._thread is not first_thread
+        finally:
+            sampler.stop()
@@ -0,0 +1,322 @@
+"""
+Tests para las conversiones en modo job (src/jobs.py).
+"""
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from src.exceptions import ConversionCancelledException, ConversionFailedException
+from src.jobs import CANCELLED, FAILED, JobManager, JobStore, JobWorker, QUEUED, RUNNING, SUCCEEDED
+
+
+def _wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def _wait_for_cancel(path, target_format, token):
+    if not _wait_for(lambda: token.cancelled, timeout=5):
+        return {'success': True}
+    raise ConversionCancelledException(token.reason)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(tmp_path / 'jobs.sqlite3')
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'abc_report.docx'
+    path.write_bytes(b'x')
+    return path
+
+
+class TestJobStore:
+
+    def test_claim_in_arrival_order(self, store, source):
+        """Probar que los jobs se reclaman por orden de llegada con un lease."""
+        first = store.create(source, 'pdf')
+        second = store.create(source, 'pdf')
+
+        claimed = store.claim('worker-a', 30, 3)
+
+        assert claimed['id'] == first
+        assert claimed['status'] == RUNNING
+        assert claimed['attempts'] == 1
+        assert claimed['lease_owner'] == 'worker-a'
+        assert store.claim('worker-b', 30, 3)['id'] == second
+        assert store.claim('worker-b', 30, 3) is None
+
+    def test_claim_round_robin_across_tenants(self, store, source):
+        """Probar que se reclama por clase de prioridad y por turnos entre clientes."""
+        batch = [store.create(source, 'mp4', {'tenant': 'batch'}) for _ in range(3)]
+        acme = [store.create(source, 'pdf', {'tenant': 'acme'}) for _ in range(2)]
+        with patch('src.jobs.settings.SCHEDULER_TENANT_PRIORITIES', 'VIP:high'):
+            vip = store.create(source, 'pdf', {'tenant': 'vip', 'priority': 'high'})
+            capped = store.create(source, 'pdf', {'tenant': 'acme', 'priority': 'high'})
+
+        claimed = [store.claim('worker', 30, 3)['id'] for _ in range(7)]
+
+        assert claimed == [vip, batch[0], acme[0], batch[1], acme[1], batch[2], capped]
+        assert store.get(vip)['priority'] == 'high'
+        assert store.get(capped)['priority'] == 'normal'
+
+    def test_cancel_queued_job(self, store, source):
+        """Probar que cancelar un job en cola lo descarta antes de empezar."""
+        job_id = store.create(source, 'pdf')
+
+        row = store.request_cancel(job_id)
+
+        assert row['status'] == CANCELLED
+        assert store.claim('worker-a', 30, 3) is None
+
+    def test_cancel_running_job_only_flags_it(self, store, source):
+        """Probar que un job en curso queda marcado y lo cierra quien lo ejecuta."""
+        job_id = store.create(source, 'pdf')
+        store.claim('worker-a', 30, 3)
+
+        row = store.request_cancel(job_id)
+
+        assert row['status'] == RUNNING
+        assert store.heartbeat('worker-a', [job_id], 30) == {job_id}
+
+    def test_expired_lease_is_claimed_again(self, store, source):
+        """Probar que el job de un worker muerto vuelve a ejecutarse."""
+        job_id = store.create(source, 'pdf')
+        store.claim('dead-worker', 0.05, 3)
+        time.sleep(0.1)
+
+        claimed = store.claim('worker-b', 30, 3)
+
+        assert claimed['id'] == job_id
+        assert claimed['attempts'] == 2
+        assert source.exists()
+        assert store.finish(job_id, SUCCEEDED, owner='dead-worker') is False
+        assert store.finish(job_id, SUCCEEDED, owner='worker-b') is True
+
+    def test_heartbeat_keeps_lease(self, store, source):
+        """Probar que renovar el lease impide que otro worker tome el job."""
+        job_id = store.create(source, 'pdf')
+        store.claim('worker-a', 0.2, 3)
+        time.sleep(0.1)
+        store.heartbeat('worker-a', [job_id], 30)
+        time.sleep(0.15)
+
+        assert store.claim('worker-b', 30, 3) is None
+        assert store.get(job_id)['lease_owner'] == 'worker-a'
+
+    def test_attempts_exhausted_fail_job(self, store, source):
+        """Probar que un job que tumba a su worker deja de repetirse."""
+        job_id = store.create(source, 'pdf')
+        store.claim('dead-worker', 0.01, 1)
+        time.sleep(0.05)
+
+        assert store.claim('worker-b', 30, 1) is None
+
+        row = store.get(job_id)
+        assert row['status'] == FAILED
+        assert '"JOB_ABANDONED"' in row['error']
+        assert not source.exists()
+
+    def test_expired_cancelled_job_removes_upload(self, store, source):
+        """Probar que un job cancelado cuyo worker murió termina y borra su subida."""
+        job_id = store.create(source, 'pdf')
+        store.claim('dead-worker', 0.01, 3)
+        store.request_cancel(job_id)
+        time.sleep(0.05)
+
+        assert store.claim('worker-b', 30, 3) is None
+
+        assert store.get(job_id)['status'] == CANCELLED
+        assert not source.exists()
+
+    def test_release_returns_job_to_queue(self, store, source):
+        """Probar que un worker que para devuelve el job sin gastar intento."""
+        job_id = store.create(source, 'pdf')
+        store.claim('worker-a', 30, 3)
+
+        assert store.release(job_id, 'worker-b') is False
+        assert store.release(job_id, 'worker-a') is True
+
+        row = store.get(job_id)
+        assert row['status'] == QUEUED
+        assert row['attempts'] == 0
+
+    def test_prune_removes_only_old_finished_jobs(self, store, source):
+        """Probar que la limpieza conserva los jobs pendientes."""
+        done = store.create(source, 'pdf')
+        pending = store.create(source, 'pdf')
+        store.finish(done, SUCCEEDED, result={'success': True})
+
+        assert store.prune(-1) == 1
+        assert store.get(done) is None
+        assert store.get(pending)['status'] == QUEUED
+
+
+    def test_pending_sources(self, store, source, tmp_path):
+        """Probar que solo se listan las subidas de jobs en cola o en curso."""
+        running = tmp_path / 'def_clip.mp4'
+        done = store.create(tmp_path / 'ghi_old.docx', 'pdf')
+        store.finish(done, SUCCEEDED, result={'success': True})
+        store.create(running, 'gif')
+        store.claim('worker', 60, 3)
+        store.create(source, 'pdf')
+
+        assert store.pending_sources() == {str(source), str(running)}
+
+
+class TestJobManager:
+
+    def test_successful_job(self, store, source):
+        """Probar el ciclo completo y la limpieza de la subida."""
+        manager = JobManager(store, lambda path, fmt, token: {'success': True, 'format': fmt})
+
+        job = manager.submit(source, 'pdf')
+        assert _wait_for(lambda: manager.get(job['job_id'])['status'] == SUCCEEDED)
+
+        assert manager.get(job['job_id'])['result'] == {'success': True, 'format': 'pdf'}
+        assert not source.exists()
+        manager.stop()
+
+    def test_options_reach_runner(self, store, source):
+        """Probar que el cliente y la prioridad llegan al runner a través del broker."""
+        manager = JobManager(store, lambda path, fmt, token, **options: options)
+
+        job = manager.submit(source, 'pdf', tenant='ACME', priority='low')
+        assert _wait_for(lambda: manager.get(job['job_id'])['status'] == SUCCEEDED)
+
+        assert manager.get(job['job_id'])['result'] == {'tenant': 'ACME', 'priority': 'low'}
+        assert 'options' not in manager.get(job['job_id'])
+        manager.stop()
+
+    def test_failed_job_keeps_error(self, store, source):
+        """Probar que un fallo de conversión queda en el job."""
+        def runner(path, fmt, token):
+            raise ConversionFailedException('boom', source_format='.docx', target_format='.pdf')
+
+        manager = JobManager(store, runner)
+        job = manager.submit(source, 'pdf')
+
+        assert _wait_for(lambda: manager.get(job['job_id'])['status'] == FAILED)
+        assert manager.get(job['job_id'])['error']['error_code'] == 'CONVERSION_FAILED'
+        manager.stop()
+
+    def test_enqueue_only(self, store, source):
+        """Probar que con workers=0 la API solo encola."""
+        manager = JobManager(store, lambda path, fmt, token: {}, workers=0)
+
+        job = manager.submit(source, 'pdf')
+        time.sleep(0.1)
+
+        assert manager.get(job['job_id'])['status'] == QUEUED
+        assert source.exists()
+
+    def test_cancel_running_job_activates_token(self, store, source):
+        """Probar que DELETE en el mismo proceso corta el runner en curso."""
+        manager = JobManager(store, _wait_for_cancel)
+        job = manager.submit(source, 'pdf')
+        assert _wait_for(lambda: manager.get(job['job_id'])['status'] == RUNNING)
+
+        manager.cancel(job['job_id'])
+
+        assert _wait_for(lambda: manager.get(job['job_id'])['status'] == CANCELLED)
+        assert manager.get(job['job_id'])['error']['details'] == {'reason': 'job_cancelled'}
+        manager.stop()
+
+    def test_cancel_from_another_process(self, store, source):
+        """Probar que la marca del broker llega al worker que ejecuta el job."""
+        worker = JobWorker(store, _wait_for_cancel, poll_interval_seconds=0.05)
+        api = JobManager(JobStore(store.path), None, workers=0)
+        job = api.submit(source, 'pdf')
+        worker.start()
+        assert _wait_for(lambda: api.get(job['job_id'])['status'] == RUNNING)
+
+        assert api.cancel(job['job_id'])['cancel_requested'] is True
+
+        assert _wait_for(lambda: api.get(job['job_id'])['status'] == CANCELLED)
+        worker.stop()
+
+    def test_cancel_queued_job_removes_upload(self, store, source):
+        """Probar que cancelar un job en cola borra su subida."""
+        manager = JobManager(store, None, workers=0)
+        job = manager.submit(source, 'pdf')
+
+        assert manager.cancel(job['job_id'])['status'] == CANCELLED
+        assert not source.exists()
+
+    def test_cancel_unknown_job(self, store):
+        """Probar que cancelar un job inexistente devuelve None."""
+        manager = JobManager(store, lambda path, fmt, token: {})
+
+        assert manager.cancel('missing') is None
+        assert manager.get('missing') is None
+
+
+class TestJobWorker:
+
+    def test_reruns_job_of_crashed_worker(self, store, source):
+        """Probar que un worker vivo repite el job cuyo lease venció."""
+        job_id = store.create(source, 'pdf')
+        store.claim('dead-worker', 0.05, 3)
+        worker = JobWorker(store, lambda path, fmt, token: {'success': True}, poll_interval_seconds=0.05)
+
+        worker.start()
+
+        assert _wait_for(lambda: store.get(job_id)['status'] == SUCCEEDED)
+        assert store.get(job_id)['attempts'] == 2
+        worker.stop()
+
+    def test_tenants_share_worker_threads(self, store, source):
+        """Probar que un cliente con muchos jobs en cola no acapara al worker."""
+        order = []
+
+        def runner(path, fmt, token, tenant=None, **options):
+            order.append(tenant)
+            return {'success': True}
+
+        for _ in range(4):
+            store.create(source, 'mp4', {'tenant': 'batch'})
+        for _ in range(2):
+            store.create(source, 'pdf', {'tenant': 'acme'})
+        worker = JobWorker(store, runner, concurrency=1, poll_interval_seconds=0.05)
+
+        worker.start()
+
+        assert _wait_for(lambda: len(order) == 6)
+        worker.stop()
+        assert order == ['batch', 'acme', 'batch', 'acme', 'batch', 'batch']
+
+    def test_stop_returns_running_jobs_to_queue(self, store, source):
+        """Probar que al parar sin esperar el job vuelve a la cola con su subida."""
+        worker = JobWorker(store, _wait_for_cancel, poll_interval_seconds=0.05)
+        job_id = store.create(source, 'pdf')
+        worker.start()
+        assert _wait_for(lambda: worker.active == [job_id])
+
+        worker.stop(timeout=0)
+
+        row = store.get(job_id)
+        assert row['status'] == QUEUED
+        assert row['attempts'] == 0
+        assert source.exists()
+
+    def test_stop_waits_for_running_jobs(self, store, source):
+        """Probar que al parar se terminan los jobs en curso."""
+        release = threading.Event()
+
+        def runner(path, fmt, token):
+            release.wait(5)
+            return {'success': True}
+
+        worker = JobWorker(store, runner, poll_interval_seconds=0.05)
+        job_id = store.create(source, 'pdf')
+        worker.start()
+        assert _wait_for(lambda: worker.active == [job_id])
+
+        threading.Timer(0.1, release.set).start()
+        worker.stop()
+
+        assert store.get(job_id)['status'] == SUCCEEDED
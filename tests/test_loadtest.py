@@ -0,0 +1,79 @@
+"""
+Tests para el generador de carga (benchmarks/loadtest.py).
+"""
+import pytest
+from benchmarks.loadtest import (
+    LoadClient,
+    find_knees,
+    parse_mix,
+    parse_server_timing,
+    percentile,
+    summarize_stage
+)
+
+
+def stage(concurrency, rps, p99, queue_p50=0.0):
+    return {'concurrency': concurrency, 'throughput_rps': rps, 'p99_ms': p99, 'queue_p50_ms': queue_p50}
+
+
+class TestLoadTest:
+
+    def test_parse_mix(self):
+        """Probar el formato endpoint:fixture:param=peso."""
+        mix = parse_mix('convert:png_small:jpg=3, ocr:pdf:fast')
+
+        assert mix[0] == {'endpoint': 'convert', 'fixture': 'png_small', 'param': 'jpg', 'weight': 3.0}
+        assert mix[1]['weight'] == 1.0
+        with pytest.raises(ValueError):
+            parse_mix('upload:png_small:jpg=1')
+
+    def test_percentile_nearest_rank(self):
+        """Probar el percentil por rango más cercano."""
+        values = list(range(1, 101))
+
+        assert percentile(values, 0.50) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.99) == 0.0
+
+    def test_parse_server_timing(self):
+        """Probar la lectura de la etapa de cola."""
+        stages = parse_server_timing('upload;dur=1.5, queue;dur=12.25, total;dur=40')
+
+        assert stages == {'upload': 1.5, 'queue': 12.25, 'total': 40.0}
+
+    def test_request_sequence_is_reproducible(self):
+        """Probar que la misma semilla genera la misma secuencia."""
+        mix = parse_mix('convert:a:pdf=1,convert:b:jpg=2,ocr:a:fast=1')
+        payloads = {'a': ('a.docx', b''), 'b': ('b.png', b'')}
+
+        def sequence(seed):
+            client = LoadClient('http://localhost', mix, payloads, seed, timeout=1)
+            return [client.next_request()[0]['param'] for _ in range(50)]
+
+        assert sequence('42-4-0') == sequence('42-4-0')
+        assert sequence('42-4-0') != sequence('42-4-1')
+
+    def test_summarize_stage(self):
+        """Probar las métricas agregadas de una etapa."""
+        samples = [
+            {'kind': 'convert:a:pdf', 'latency': 0.1, 'status': 200, 'queue_ms': 0.0},
+            {'kind': 'convert:a:pdf', 'latency': 0.3, 'status': 500, 'queue_ms': 20.0}
+        ]
+        summary = summarize_stage(2, samples, 2.0)
+
+        assert summary['requests'] == 2
+        assert summary['throughput_rps'] == 1.0
+        assert summary['error_rate'] == 0.5
+        assert summary['p99_ms'] == 300.0
+
+    def test_find_knees(self):
+        """Probar la detección del inicio de cola y de la saturación."""
+        stages = [
+            stage(1, 10, 120),
+            stage(2, 19, 130),
+            stage(4, 35, 150, queue_p50=8),
+            stage(8, 36, 400, queue_p50=120)
+        ]
+
+        assert find_knees(stages) == {'queueing_starts_at': 4, 'saturation_at': 8}
+        assert find_knees(stages[:2]) == {'queueing_starts_at': None, 'saturation_at': None}
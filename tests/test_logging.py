@@ -5,6 +5,7 @@ Tests para sistema de logging.
 import pytest
 import logging
 import json
+import queue
 from io import StringIO
 from pathlib import Path
 from unittest.mock import patch, MagicMock
@@ -339,3 +340,115 @@ class TestLoggerIntegration:
         assert child_logger is not None
         # El logger hijo debe estar bajo padre
         assert 'parent.child' in child_logger.name
+
+
+class TestAsyncJSONLogging:
+    """
+    Tests para el pipeline QueueHandler/QueueListener.
+    """
+    
+    def teardown_method(self):
+        setup_logging()
+    
+    def test_records_written_by_listener(self, tmp_path):
+        """Probar que los registros llegan al archivo como JSON con campos extra."""
+        from src.logging import stop_logging
+        log_file = tmp_path / 'app.log'
+        logger = setup_logging(level='INFO', log_file=str(log_file))
+        
+        assert all(
+            type(handler).__name__ == 'StructuredQueueHandler' for handler in logger.handlers
+        )
+        logger.info('Conversion done', extra={'engine': 'ffmpeg', 'duration_ms': 12.5})
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.error('Conversion crashed', exc_info=True)
+        stop_logging()
+        
+        lines = [json.loads(line) for line in log_file.read_text().splitlines()]
+        done = next(line for line in lines if line['message'] == 'Conversion done')
+        assert done['engine'] == 'ffmpeg'
+        assert done['duration_ms'] == 12.5
+        crashed = next(line for line in lines if line['message'] == 'Conversion crashed')
+        assert 'ValueError: boom' in crashed['exception']
+    
+    def test_request_id_added_in_request_context(self, app):
+        """Probar que el id de la petición se añade al registro."""
+        from flask import g
+        from src.logging import RequestContextFilter
+        record = logging.getLogger('test').makeRecord(
+            'test', logging.INFO, 'test.py', 1, 'msg', (), None
+        )
+        
+        with app.test_request_context('/'):
+            g.request_id = 'abc123'
+            RequestContextFilter().filter(record)
+        
+        assert record.request_id == 'abc123'
+        assert json.loads(JSONFormatter().format(record))['request_id'] == 'abc123'
+
+
+class TestLogThrottleFilter:
+    """
+    Tests para la limitación y el muestreo de mensajes.
+    """
+    
+    def make_record(self, name='file_converter', level=logging.INFO, msg='Health check', lineno=1):
+        return logging.getLogger(name).makeRecord(name, level, 'test.py', lineno, msg, (), None)
+    
+    def test_rate_limit_repeated_messages(self):
+        """Probar que se descartan los mensajes repetidos por encima del límite."""
+        from src.logging import LogThrottleFilter
+        throttle = LogThrottleFilter(rate_limit=2, window_seconds=60)
+        
+        results = [throttle.filter(self.make_record()) for _ in range(4)]
+        
+        assert results == [True, True, False, False]
+        assert throttle.filter(self.make_record(lineno=2)) is True
+    
+    def test_rate_limit_by_call_site(self):
+        """Probar que los mensajes formateados de una misma línea comparten límite."""
+        from src.logging import LogThrottleFilter
+        throttle = LogThrottleFilter(rate_limit=2, window_seconds=60)
+        
+        results = [throttle.filter(self.make_record(msg=f"Converted file {i}")) for i in range(4)]
+        
+        assert results == [True, True, False, False]
+        assert len(throttle._windows) == 1
+    
+    def test_warnings_never_dropped(self):
+        """Probar que avisos y errores no se limitan."""
+        from src.logging import LogThrottleFilter
+        throttle = LogThrottleFilter(rate_limit=1, sample_rates={'file_converter': 0.0})
+        
+        assert all(
+            throttle.filter(self.make_record(level=logging.WARNING)) for _ in range(3)
+        )
+    
+    def test_sampling_by_logger_hierarchy(self):
+        """Probar el muestreo por logger (se aplica también a sus hijos)."""
+        from src.logging import LogThrottleFilter
+        throttle = LogThrottleFilter(sample_rates={'src.ocr': 0.0})
+        
+        assert throttle.filter(self.make_record(name='src.ocr.tiles')) is False
+        assert throttle.filter(self.make_record(name='src.routes')) is True
+    
+    @patch('src.logging.time.monotonic')
+    def test_suppressed_count_reported_in_next_window(self, mock_monotonic):
+        """Probar que la ventana siguiente informa de los mensajes descartados."""
+        from src.logging import LogThrottleFilter, StructuredQueueHandler
+        throttle = LogThrottleFilter(rate_limit=1, window_seconds=10)
+        mock_monotonic.return_value = 0
+        throttle.filter(self.make_record())
+        throttle.filter(self.make_record())
+        
+        mock_monotonic.return_value = 11
+        record = logging.getLogger('file_converter').makeRecord(
+            'file_converter', logging.INFO, 'test.py', 1, 'Health check %s', ('ok',), None
+        )
+        
+        assert throttle.filter(record) is True
+        assert record.getMessage() == 'Health check ok'
+        prepared = StructuredQueueHandler(queue.SimpleQueue()).prepare(record)
+        assert prepared.getMessage() == 'Health check ok (1 similar messages suppressed)'
@@ -0,0 +1,131 @@
+"""
+Tests para las métricas Prometheus (src/metrics.py).
+"""
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from src.converters.base import BaseConverter
+from src.converters.factory import ConverterFactory
+from src.ocr import OCRResultCache
+from src.scheduler import ConversionScheduler
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class DummyConverter(BaseConverter):
+    def plan(self, input_path, output_path, from_ext, to_ext):
+        return (yield ['true'])
+
+
+class TestMetrics:
+
+    def test_conversion_counters_and_bytes(self, tmp_path):
+        """Probar el registro de conversiones, latencia y bytes por motor."""
+        source = tmp_path / 'in.mp4'
+        source.write_bytes(b'x' * 100)
+        target = tmp_path / 'out.gif'
+        target.write_bytes(b'y' * 40)
+
+        factory = ConverterFactory()
+        factory.converters['ffmpeg'] = MagicMock()
+        factory.converters['ffmpeg'].convert.return_value = {'success': True}
+
+        labels = {'engine': 'ffmpeg', 'from_ext': '.mp4', 'to_ext': '.gif'}
+        before_count = sample('file_converter_conversions_total', status='success', **labels)
+        before_hist = sample('file_converter_conversion_duration_seconds_count', **labels)
+        before_in = sample('file_converter_input_bytes_total', engine='ffmpeg')
+        before_out = sample('file_converter_output_bytes_total', engine='ffmpeg')
+
+        factory.perform_conversion(str(source), str(target), '.mp4', '.gif')
+
+        assert sample('file_converter_conversions_total', status='success', **labels) == before_count + 1
+        assert sample('file_converter_conversion_duration_seconds_count', **labels) == before_hist + 1
+        assert sample('file_converter_input_bytes_total', engine='ffmpeg') == before_in + 100
+        assert sample('file_converter_output_bytes_total', engine='ffmpeg') == before_out + 40
+
+    def test_scheduler_gauges(self):
+        """Probar los gauges de cola y conversiones en curso."""
+        scheduler = ConversionScheduler(1)
+        before = sample('file_converter_in_flight', engine='metrics-test')
+
+        scheduler.acquire('metrics-test')
+        assert sample('file_converter_in_flight', engine='metrics-test') == before + 1
+        assert scheduler.acquire('metrics-test', timeout=0.01) is False
+        assert sample('file_converter_queue_depth', engine='metrics-test') == 0
+
+        scheduler.release('metrics-test')
+        assert sample('file_converter_in_flight', engine='metrics-test') == before
+
+    def test_ocr_cache_hits_and_misses(self):
+        """Probar los contadores de la caché OCR."""
+        cache = OCRResultCache()
+        hits = sample('file_converter_ocr_cache_requests_total', result='hit')
+        misses = sample('file_converter_ocr_cache_requests_total', result='miss')
+
+        cache.get('missing')
+        cache.set('key', {'text': 'a'})
+        cache.get('key')
+
+        assert sample('file_converter_ocr_cache_requests_total', result='hit') == hits + 1
+        assert sample('file_converter_ocr_cache_requests_total', result='miss') == misses + 1
+
+    @patch('src.converters.base.supervise')
+    def test_subprocess_timeouts_and_failures(self, mock_run):
+        """Probar el recuento de fallos y timeouts de herramientas externas."""
+        converter = DummyConverter()
+        timeouts = sample('file_converter_subprocess_failures_total', tool='ffmpeg', reason='timeout')
+        errors = sample('file_converter_subprocess_failures_total', tool='ffmpeg', reason='error')
+
+        resources = {'wall_seconds': 1.0, 'user_seconds': 0.0, 'system_seconds': 0.0, 'max_rss_kb': 1024}
+        mock_run.return_value = {
+            'returncode': -9, 'stdout': '', 'stderr': '', 'timed_out': True, 'output_truncated': False, 'resources': resources
+        }
+        converter.run_command(['/usr/bin/ffmpeg', '-i', 'a'], timeout_seconds=1)
+        mock_run.return_value = {
+            'returncode': 1, 'stdout': '', 'stderr': 'bad', 'timed_out': False, 'output_truncated': False, 'resources': resources
+        }
+        converter.run_command(['ffmpeg', '-i', 'a'])
+
+        assert sample('file_converter_subprocess_failures_total', tool='ffmpeg', reason='timeout') == timeouts + 1
+        assert sample('file_converter_subprocess_failures_total', tool='ffmpeg', reason='error') == errors + 1
+
+    def test_conversion_resources(self):
+        """Probar que el consumo de CPU y memoria se registra por motor."""
+        factory = ConverterFactory()
+        converter = factory.converters['imagemagick']
+        labels = {'engine': 'imagemagick', 'from_ext': '.png', 'to_ext': '.webp'}
+        before = sample('file_converter_conversion_max_rss_bytes_count', **labels)
+
+        with patch.object(converter, 'convert', side_effect=lambda *args: converter.run_command(['true'])):
+            factory.perform_conversion('in.png', 'out.webp', '.png', '.webp')
+
+        assert sample('file_converter_conversion_max_rss_bytes_count', **labels) == before + 1
+        assert sample('file_converter_conversion_cpu_seconds_count', **labels) >= 1
+
+    def test_metrics_endpoint(self, client):
+        """Probar que /metrics expone el formato de texto de Prometheus."""
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        body = response.get_data(as_text=True)
+        assert 'file_converter_conversion_duration_seconds' in body
+        assert 'file_converter_ocr_pages_total' in body
+
+    def test_concurrency_limit_across_processes(self, tmp_path):
+        """Probar que importar no crea archivos y que el límite se agrega con el máximo."""
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+        subprocess.run([sys.executable, '-c', 'import src.metrics'], env=env, check=True)
+        assert list(tmp_path.iterdir()) == []
+
+        for limit in (4, 6):
+            script = f'from src import metrics; metrics.set_concurrency_limit({limit})'
+            subprocess.run([sys.executable, '-c', script], env=env, check=True)
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+        assert registry.get_sample_value('file_converter_concurrency_limit') == 6
@@ -1,9 +1,11 @@
 """
 Tests para OCR (src/ocr.py).
 """
+import time
 import pytest
 from unittest.mock import MagicMock, patch, mock_open
-from src.ocr import OCRProcessor
+from PIL import Image
+from src.ocr import OCRProcessor, OCRResultCache
 
 class TestOCRProcessor:
 
@@ -100,3 +102,313 @@ class TestOCRProcessor:
 
         assert result['success'] is False
         assert "PDF Error" in result['error']
+
+
+class TestOCRResultCache:
+
+    def test_lru_eviction(self):
+        """Probar que se expulsan las entradas menos usadas."""
+        cache = OCRResultCache(max_entries=2)
+        cache.set('a', {'text': 'A', 'confidence': 90})
+        cache.set('b', {'text': 'B', 'confidence': 90})
+        assert cache.get('a')['text'] == 'A'
+
+        cache.set('c', {'text': 'C', 'confidence': 90})
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+
+    @patch('src.ocr.time.monotonic')
+    def test_ttl_expiry(self, mock_monotonic):
+        """Probar caducidad de entradas antiguas."""
+        cache = OCRResultCache(max_entries=4, ttl_seconds=60)
+        mock_monotonic.return_value = 1000
+        cache.set('a', {'text': 'A', 'confidence': 90})
+
+        mock_monotonic.return_value = 1030
+        assert cache.get('a') is not None
+
+        mock_monotonic.return_value = 1100
+        assert cache.get('a') is None
+        assert cache.stats()['entries'] == 0
+
+    def test_key_depends_on_pixels_and_params(self):
+        """Probar que la clave cambia con el raster y los parámetros."""
+        white = Image.new('L', (20, 20), 255)
+        black = Image.new('L', (20, 20), 0)
+
+        key = OCRResultCache.make_key(white, lang='spa', preprocess=True)
+        assert key == OCRResultCache.make_key(white.copy(), lang='spa', preprocess=True)
+        assert key != OCRResultCache.make_key(black, lang='spa', preprocess=True)
+        assert key != OCRResultCache.make_key(white, lang='eng', preprocess=True)
+        assert key != OCRResultCache.make_key(white, lang='spa', preprocess=False)
+
+    @patch('src.ocr.pytesseract.image_to_string')
+    @patch('src.ocr.pytesseract.image_to_data')
+    def test_processor_reuses_cached_result(self, mock_data, mock_string):
+        """Probar que una imagen repetida no vuelve a Tesseract."""
+        mock_string.return_value = "Hola"
+        mock_data.return_value = {'conf': [80, -1]}
+        cache = OCRResultCache()
+        processor = OCRProcessor(default_lang='spa', cache=cache)
+        image = Image.new('RGB', (32, 32), 'white')
+
+        first = processor.extract_text_from_image(image)
+        second = processor.extract_text_from_image(image.copy())
+
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert second['text'] == "Hola"
+        assert second['confidence'] == 80
+        mock_string.assert_called_once()
+        mock_data.assert_called_once()
+        assert cache.stats()['hits'] == 1
+
+    @patch('src.ocr.convert_from_path')
+    @patch('src.ocr.pytesseract.image_to_string')
+    @patch('src.ocr.pytesseract.image_to_data')
+    def test_pdf_identical_pages_processed_once(self, mock_data, mock_string, mock_convert):
+        """Probar que páginas idénticas de un PDF se procesan una sola vez."""
+        mock_string.return_value = "Membrete"
+        mock_data.return_value = {'conf': [70]}
+        blank = Image.new('RGB', (32, 32), 'white')
+        mock_convert.return_value = [blank, blank.copy(), blank.copy()]
+        processor = OCRProcessor(default_lang='spa', cache=OCRResultCache())
+
+        result = processor.extract_text_from_pdf('doc.pdf')
+
+        assert result['success'] is True
+        assert result['total_pages'] == 3
+        assert result['cached_pages'] == 2
+        mock_string.assert_called_once()
+
+
+class TestOCRProfiles:
+
+    def test_profile_configs(self):
+        """Probar opciones de Tesseract por perfil."""
+        processor = OCRProcessor()
+        assert processor.build_tesseract_config('fast') == '--oem 1 --psm 6'
+        assert processor.build_tesseract_config('accurate') == '--oem 1 --psm 3'
+        assert processor.build_tesseract_config() == processor.build_tesseract_config('balanced')
+
+    def test_tessdata_variant_dirs(self):
+        """Probar que cada perfil usa su variante de traineddata."""
+        processor = OCRProcessor(
+            tessdata_dirs={'fast': '/opt/tessdata_fast', 'best': '/opt/tessdata_best'},
+            tesseract_config='-c preserve_interword_spaces=1'
+        )
+        assert '--tessdata-dir "/opt/tessdata_fast"' in processor.build_tesseract_config('fast')
+        assert '--tessdata-dir "/opt/tessdata_best"' in processor.build_tesseract_config('accurate')
+        assert '--tessdata-dir' not in processor.build_tesseract_config('balanced')
+        assert processor.build_tesseract_config('fast').endswith('preserve_interword_spaces=1')
+
+    def test_unknown_profile(self):
+        """Probar que un perfil desconocido es rechazado."""
+        with pytest.raises(ValueError):
+            OCRProcessor().get_profile('turbo')
+        with pytest.raises(ValueError):
+            OCRProcessor(default_profile='turbo')
+
+    @patch('src.ocr.convert_from_path')
+    @patch('src.ocr.OCRProcessor.extract_text_from_image')
+    def test_pdf_render_follows_profile(self, mock_extract_img, mock_convert):
+        """Probar que el perfil define DPI, escala de grises y páginas renderizadas."""
+        mock_convert.return_value = [MagicMock()]
+        mock_extract_img.return_value = {'success': True, 'text': 'x', 'confidence': 50}
+
+        OCRProcessor().extract_text_from_pdf('doc.pdf', max_pages=5, profile='fast')
+
+        mock_convert.assert_called_once_with('doc.pdf', dpi=150, grayscale=True, last_page=5)
+        assert mock_extract_img.call_args.kwargs['profile'] == 'fast'
+
+    def test_build_metadata_tracks_throughput(self):
+        """Probar métricas de rendimiento por perfil."""
+        processor = OCRProcessor()
+        processor.build_metadata('fast', pages=10, seconds=2.0)
+        metadata = processor.build_metadata('fast', pages=2, seconds=2.0, cached_pages=1)
+
+        assert metadata['profile'] == 'fast'
+        assert metadata['dpi'] == 150
+        assert metadata['pages_per_second'] == 1.0
+        assert metadata['profile_avg_pages_per_second'] == 3.0
+        assert metadata['cached_pages'] == 1
+
+
+class TestOCRPageIterator:
+
+    @patch('src.ocr.pdfinfo_from_path')
+    @patch('src.ocr.convert_from_path')
+    @patch('src.ocr.OCRProcessor.extract_text_from_image')
+    def test_iter_pdf_pages_renders_one_page_at_a_time(self, mock_extract_img, mock_convert, mock_info):
+        """Probar que cada página se renderiza y se entrega por separado."""
+        mock_info.return_value = {'Pages': 5}
+        mock_convert.return_value = [MagicMock()]
+        mock_extract_img.return_value = {'success': True, 'text': 'Texto', 'confidence': 88}
+
+        items = list(OCRProcessor().iter_pdf_pages('doc.pdf', max_pages=3, profile='fast'))
+
+        assert items[0] == {'total_pages': 3}
+        assert [item['page'] for item in items[1:]] == [1, 2, 3]
+        assert items[1]['text'] == 'Texto'
+        assert mock_convert.call_count == 3
+        assert mock_convert.call_args_list[1].kwargs['first_page'] == 2
+        assert mock_convert.call_args_list[1].kwargs['last_page'] == 2
+
+    @patch('src.ocr.pdfinfo_from_path')
+    @patch('src.ocr.convert_from_path')
+    @patch('src.ocr.OCRProcessor.extract_text_from_image')
+    def test_iter_pdf_pages_reports_page_errors(self, mock_extract_img, mock_convert, mock_info):
+        """Probar que un fallo en una página no detiene el resto."""
+        mock_info.return_value = {'Pages': 2}
+        mock_convert.return_value = [MagicMock()]
+        mock_extract_img.side_effect = [
+            {'success': False, 'text': '', 'confidence': 0, 'error': 'boom'},
+            {'success': True, 'text': 'ok', 'confidence': 75}
+        ]
+
+        items = list(OCRProcessor().iter_pdf_pages('doc.pdf'))
+
+        assert items[1]['success'] is False
+        assert items[1]['error'] == 'boom'
+        assert items[2]['success'] is True
+
+
+class TestOCRBatch:
+
+    def test_iter_batch_preserves_input_order(self):
+        """Probar que el modo ordenado respeta el orden de entrada."""
+        processor = OCRProcessor(batch_workers=3)
+        delays = {'a.png': 0.05, 'b.png': 0.0, 'c.png': 0.02}
+
+        def fake_extract(path, *args, **kwargs):
+            time.sleep(delays[path])
+            return {'success': True, 'text': path, 'confidence': 90, 'pages': 1, 'cached_pages': 0}
+
+        with patch.object(processor, 'extract_text', side_effect=fake_extract):
+            results = list(processor.iter_batch(['a.png', 'b.png', 'c.png']))
+
+        assert [index for index, _ in results] == [0, 1, 2]
+        assert [result['text'] for _, result in results] == ['a.png', 'b.png', 'c.png']
+
+    def test_iter_batch_unordered_yields_as_completed(self):
+        """Probar que el modo no ordenado entrega primero lo que termina antes."""
+        processor = OCRProcessor(batch_workers=2)
+
+        def fake_extract(path, *args, **kwargs):
+            time.sleep(0.1 if path == 'slow.png' else 0)
+            return {'success': True, 'text': path, 'confidence': 90, 'pages': 1, 'cached_pages': 0}
+
+        with patch.object(processor, 'extract_text', side_effect=fake_extract):
+            results = list(processor.iter_batch(['slow.png', 'fast.png'], ordered=False))
+
+        assert [index for index, _ in results] == [1, 0]
+
+    def test_iter_batch_isolates_failures(self):
+        """Probar que un archivo que falla no interrumpe el lote."""
+        processor = OCRProcessor(batch_workers=1)
+
+        def fake_extract(path, *args, **kwargs):
+            if path == 'bad.png':
+                raise RuntimeError('corrupt')
+            return {'success': True, 'text': 'ok', 'confidence': 90, 'pages': 1, 'cached_pages': 0}
+
+        with patch.object(processor, 'extract_text', side_effect=fake_extract):
+            results = dict(processor.iter_batch(['bad.png', 'good.png']))
+
+        assert results[0]['success'] is False
+        assert 'corrupt' in results[0]['error']
+        assert results[1]['success'] is True
+
+    @patch('src.ocr.OCRProcessor.extract_text_from_pdf')
+    def test_extract_text_normalizes_pdf_result(self, mock_pdf):
+        """Probar el resumen común para PDFs."""
+        mock_pdf.return_value = {
+            'success': True, 'full_text': 'a\n\nb', 'avg_confidence': 80,
+            'total_pages': 2, 'cached_pages': 1
+        }
+        result = OCRProcessor().extract_text('scan.PDF')
+        assert result == {
+            'success': True, 'text': 'a\n\nb', 'confidence': 80, 'pages': 2, 'cached_pages': 1
+        }
+
+class TestOCROrientation:
+
+    def setup_method(self):
+        self.processor = OCRProcessor(default_lang='spa+eng+rus', osd_max_side=400)
+
+    @patch('src.ocr.pytesseract.image_to_osd')
+    def test_detect_orientation_uses_thumbnail(self, mock_osd):
+        """Probar que OSD se ejecuta sobre una miniatura y acota los idiomas."""
+        mock_osd.return_value = {
+            'rotate': 180, 'orientation_conf': 9.5, 'script': 'Latin', 'script_conf': 4.0
+        }
+        image = Image.new('L', (2000, 1000), color=255)
+
+        result = self.processor.detect_orientation(image)
+
+        assert max(mock_osd.call_args.args[0].size) == 400
+        assert result['rotate'] == 180
+        assert result['script'] == 'Latin'
+        assert result['language'] == 'spa+eng'
+
+    @patch('src.ocr.pytesseract.image_to_osd')
+    def test_detect_orientation_ignores_low_confidence(self, mock_osd):
+        """Probar que una detección poco fiable no rota ni cambia idiomas."""
+        mock_osd.return_value = {
+            'rotate': 90, 'orientation_conf': 0.4, 'script': 'Cyrillic', 'script_conf': 0.2
+        }
+        result = self.processor.detect_orientation(Image.new('L', (300, 300)))
+
+        assert result['rotate'] == 0
+        assert result['script'] is None
+        assert result['language'] == 'spa+eng+rus'
+
+    @patch('src.ocr.pytesseract.image_to_osd', side_effect=Exception('Too few characters'))
+    def test_detect_orientation_failure_falls_back(self, mock_osd):
+        """Probar que un fallo de OSD deja la página como está."""
+        result = self.processor.detect_orientation(Image.new('L', (300, 300)), lang='eng')
+
+        assert result['rotate'] == 0
+        assert result['language'] == 'eng'
+
+    @patch('src.ocr.pytesseract.get_languages', return_value=['eng', 'spa', 'ell'])
+    def test_select_languages_uses_installed_script_language(self, mock_get_languages):
+        """Probar que una escritura no solicitada usa el idioma instalado de esa escritura."""
+        assert self.processor.select_languages('spa+eng', 'Greek') == 'ell'
+        assert self.processor.select_languages('spa+eng', 'Arabic') == 'spa+eng'
+        assert self.processor.select_languages('spa+eng', 'Unknown') == 'spa+eng'
+        self.processor.select_languages('spa', 'Hebrew')
+        mock_get_languages.assert_called_once()
+
+    @patch('src.ocr.pytesseract.image_to_data')
+    @patch('src.ocr.pytesseract.image_to_string', return_value='Texto')
+    @patch('src.ocr.pytesseract.image_to_osd')
+    def test_extract_text_rotates_before_ocr(self, mock_osd, mock_string, mock_data):
+        """Probar que la página se gira y se reconoce con los idiomas detectados."""
+        mock_osd.return_value = {
+            'rotate': 90, 'orientation_conf': 6.0, 'script': 'Cyrillic', 'script_conf': 5.0
+        }
+        mock_data.return_value = {'conf': ['88']}
+        image = Image.new('L', (100, 300), color=255)
+
+        result = self.processor.extract_text_from_image(image, preprocess=False, osd=True)
+
+        assert result['success'] is True
+        assert result['language'] == 'rus'
+        assert result['orientation']['rotate'] == 90
+        assert mock_string.call_args.args[0].size == (300, 100)
+        assert mock_string.call_args.kwargs['lang'] == 'rus'
+
+    @patch('src.ocr.pytesseract.image_to_data')
+    @patch('src.ocr.pytesseract.image_to_string', return_value='Texto')
+    @patch('src.ocr.pytesseract.image_to_osd')
+    def test_osd_disabled_by_default(self, mock_osd, mock_string, mock_data):
+        """Probar que sin OSD no se lanza el pase previo."""
+        mock_data.return_value = {'conf': ['88']}
+
+        result = self.processor.extract_text_from_image(Image.new('L', (50, 50)), preprocess=False)
+
+        mock_osd.assert_not_called()
+        assert 'orientation' not in result
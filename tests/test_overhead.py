@@ -0,0 +1,51 @@
+"""
+Tests para los microbenchmarks con motor falso (benchmarks/overhead.py).
+"""
+from benchmarks.overhead import FakeEngine, run_microbenchmarks, run_scheduler_benchmark
+from src.converters.base import BaseConverter
+from src.converters.factory import ConverterFactory
+
+
+class TestFakeEngine:
+
+    def test_output_paths_per_tool(self):
+        """Probar la ruta de salida deducida de cada herramienta."""
+        assert FakeEngine.output_paths(['convert', 'in.png', 'out.jpg']) == ['out.jpg']
+        assert FakeEngine.output_paths(['ffmpeg', '-i', 'in.wav', '-y', 'out.mp3']) == ['out.mp3']
+        assert FakeEngine.output_paths(
+            ['libreoffice', '--headless', '--convert-to', 'pdf', '--outdir', '/out', '/up/abc_report.docx']
+        ) == ['/out/abc_report.pdf']
+        assert FakeEngine.output_paths(['tar', '-czf', 'out.tar.gz', '-C', 'src', '.']) == ['out.tar.gz']
+        assert FakeEngine.output_paths(['7z', 'x', 'in.zip', '-o/tmp/x', '-y']) == ['/tmp/x/extracted.bin']
+
+    def test_installed_engine_replaces_run_command(self, tmp_path):
+        """Probar que la factoría convierte con el motor falso y se restaura."""
+        original = BaseConverter.run_command
+        engine = FakeEngine(output_bytes=10)
+        output = tmp_path / 'out.jpg'
+
+        with engine.installed():
+            result = ConverterFactory().perform_conversion('in.png', str(output), '.png', '.jpg')
+
+        assert result['success']
+        assert output.stat().st_size == 10
+        assert engine.calls == 1
+        assert BaseConverter.run_command is original
+
+
+class TestOverheadBenchmarks:
+
+    def test_microbenchmarks_report_per_op_time(self, app, tmp_path):
+        """Probar que cada paso devuelve su tiempo por operación."""
+        results = run_microbenchmarks(app, tmp_path, number=5, repeat=1)
+
+        assert {'secure_filename', 'json_response', 'file_save_64kb'} <= set(results)
+        assert all(case['status'] == 'ok' and case['per_op_us'] >= 0 for case in results.values())
+
+    def test_scheduler_benchmark_respects_limit(self):
+        """Probar que el planificador no supera el límite con latencia fija."""
+        case = run_scheduler_benchmark(FakeEngine(0.01), clients=4, conversions_per_client=2, limit=2)
+
+        assert case['conversions'] == 8
+        assert case['ideal_seconds'] == 0.04
+        assert case['overhead_ratio'] >= 1.0
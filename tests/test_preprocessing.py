@@ -0,0 +1,105 @@
+"""
+Tests para el preprocesamiento de imágenes OCR (src/preprocessing.py).
+"""
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from src.preprocessing import (
+    ImagePreprocessor,
+    adaptive_threshold,
+    estimate_skew_angle,
+    otsu_threshold,
+    remove_noise,
+)
+
+
+def make_text_page(size=(1200, 900)):
+    """Página sintética con renglones horizontales de 'texto'."""
+    image = Image.new('L', size, 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(80, size[1] - 80, 40):
+        draw.rectangle([80, y, size[0] - 80, y + 10], fill=0)
+    return image
+
+
+class TestThresholds:
+
+    def test_otsu_separates_bimodal_histogram(self):
+        """Probar que Otsu cae entre los dos modos."""
+        gray = np.array([30] * 500 + [220] * 500, dtype=np.uint8).reshape(20, 50)
+        threshold = otsu_threshold(gray)
+        assert 30 <= threshold < 220
+
+    def test_adaptive_handles_uneven_lighting(self):
+        """Probar que la binarización adaptativa tolera un gradiente de fondo."""
+        background = np.tile(np.linspace(120, 250, 200), (100, 1)).astype(np.uint8)
+        gray = background.copy()
+        gray[40:50, 20:180] = background[40:50, 20:180] - 80
+
+        binary = adaptive_threshold(gray, block_size=31, offset=10)
+
+        assert not binary[45, 30] and not binary[45, 170]
+        assert binary[10, 30] and binary[10, 170]
+
+    def test_remove_noise_drops_isolated_pixels(self):
+        """Probar que el filtro elimina puntos aislados."""
+        binary = np.ones((20, 20), dtype=bool)
+        binary[10, 10] = False
+        assert remove_noise(binary).all()
+
+
+class TestDeskew:
+
+    @pytest.mark.parametrize('skew', [3.0, -4.5])
+    def test_estimate_skew_angle(self, skew):
+        """Probar que el ángulo estimado corrige la inclinación aplicada."""
+        rotated = make_text_page().rotate(skew, expand=True, fillcolor=255)
+        gray = np.asarray(rotated)
+
+        angle = estimate_skew_angle(gray > 128)
+
+        assert angle == pytest.approx(-skew, abs=0.3)
+
+    def test_blank_page_has_no_skew(self):
+        """Probar que una página en blanco no se gira."""
+        assert estimate_skew_angle(np.ones((100, 100), dtype=bool)) == 0.0
+
+
+class TestImagePreprocessor:
+
+    def test_process_returns_binary_grayscale(self):
+        """Probar que la salida es una imagen 'L' binarizada."""
+        image = make_text_page().convert('RGB')
+        result = ImagePreprocessor().process(image)
+
+        assert result.mode == 'L'
+        assert set(np.unique(np.asarray(result))) <= {0, 255}
+
+    def test_process_straightens_page(self):
+        """Probar que la página corregida ya no está inclinada."""
+        preprocessor = ImagePreprocessor()
+        skewed = make_text_page().rotate(4, expand=True, fillcolor=255)
+
+        result = preprocessor.process(skewed)
+
+        assert preprocessor.analyze(result)['angle'] == pytest.approx(0, abs=0.3)
+
+    def test_steps_are_toggleable(self):
+        """Probar que cada paso se puede desactivar."""
+        skewed = make_text_page().rotate(4, expand=True, fillcolor=255)
+        preprocessor = ImagePreprocessor(binarize='none', denoise=False, deskew=False)
+
+        result = preprocessor.process(skewed)
+
+        assert result.size == skewed.size
+        assert np.array_equal(np.asarray(result), np.asarray(skewed))
+
+    def test_invalid_binarization(self):
+        """Probar que un método desconocido es rechazado."""
+        with pytest.raises(ValueError):
+            ImagePreprocessor(binarize='magic')
+
+    def test_signature_changes_with_options(self):
+        """Probar que la firma refleja la configuración."""
+        assert ImagePreprocessor().signature() != ImagePreprocessor(deskew=False).signature()
@@ -0,0 +1,131 @@
+"""
+Tests para el límite de conversiones adaptativo (src/pressure.py).
+"""
+import threading
+import time
+import pytest
+from src.pressure import AdaptiveConcurrency, read_psi, sample_pressure
+from src.scheduler import ConversionScheduler
+
+
+def _sample(cpu=10.0, available_mb=4096, memory_some=0.0, memory_full=0.0, io_some=0.0):
+    return {
+        'cpu_percent': cpu,
+        'memory_available_mb': available_mb,
+        'psi': {
+            'cpu': {'some': 0.0, 'full': 0.0},
+            'memory': {'some': memory_some, 'full': memory_full},
+            'io': {'some': io_some, 'full': 0.0}
+        }
+    }
+
+
+@pytest.fixture
+def psi_root(tmp_path):
+    (tmp_path / 'memory').write_text(
+        'some avg10=12.50 avg60=3.00 avg300=1.00 total=123\n'
+        'full avg10=4.25 avg60=1.00 avg300=0.50 total=45\n'
+    )
+    (tmp_path / 'cpu').write_text('some avg10=1.00 avg60=0.00 avg300=0.00 total=1\n')
+    return tmp_path
+
+
+class TestPressureSampling:
+
+    def test_read_psi(self, psi_root):
+        """Probar la lectura de avg10 de /proc/pressure."""
+        assert read_psi('memory', psi_root) == {'some': 12.5, 'full': 4.25}
+        assert read_psi('cpu', psi_root) == {'some': 1.0, 'full': 0.0}
+
+    def test_missing_psi(self, psi_root):
+        """Probar que sin PSI (kernel antiguo, otro SO) se devuelve None."""
+        assert read_psi('io', psi_root) is None
+
+    def test_sample_pressure(self, psi_root):
+        """Probar que la muestra combina psutil y PSI."""
+        sample = sample_pressure(psi_root)
+
+        assert sample['memory_available_mb'] > 0
+        assert 'cpu_percent' in sample
+        assert sample['psi']['memory']['full'] == 4.25
+        assert sample['psi']['io'] is None
+
+
+class TestAdaptiveConcurrency:
+
+    def test_invalid_limits(self):
+        """Probar que el mínimo debe estar entre 1 y el máximo."""
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(ConversionScheduler(4), min_limit=0)
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(ConversionScheduler(4), min_limit=8, max_limit=4)
+
+    def test_additive_increase_only_with_waiters(self):
+        """Probar que el límite sube de uno en uno solo si hay cola."""
+        scheduler = ConversionScheduler(1)
+        controller = AdaptiveConcurrency(scheduler, max_limit=3)
+
+        assert controller.adjust(_sample()) == 1
+
+        scheduler.acquire('ffmpeg')
+        waiter = threading.Thread(target=scheduler.acquire, args=('ffmpeg',), kwargs={'timeout': 2})
+        waiter.start()
+        while scheduler.stats()['queued'] < 1:
+            time.sleep(0.001)
+
+        assert controller.adjust(_sample()) == 2
+        waiter.join(timeout=2)
+        assert scheduler.stats()['in_flight'] == 2
+        assert controller.last_reason == 'increase'
+
+    def test_multiplicative_decrease_under_pressure(self):
+        """Probar que la CPU o la presión de E/S reducen el límite a la mitad."""
+        scheduler = ConversionScheduler(8)
+        controller = AdaptiveConcurrency(scheduler, max_limit=8)
+
+        assert controller.adjust(_sample(cpu=95.0)) == 4
+        assert controller.adjust(_sample(io_some=50.0)) == 2
+        assert controller.adjust(_sample(io_some=50.0)) == 1
+        assert controller.adjust(_sample(io_some=50.0)) == 1
+        assert controller.last_reason == 'pressure'
+
+    def test_low_memory_drops_to_minimum(self):
+        """Probar que con poca memoria se baja al mínimo de golpe."""
+        controller = AdaptiveConcurrency(ConversionScheduler(8), min_limit=2, max_limit=8, memory_reserve_mb=512)
+
+        assert controller.adjust(_sample(available_mb=300)) == 2
+        assert controller.last_reason == 'memory'
+
+        controller.scheduler.set_limit(8)
+        assert controller.adjust(_sample(memory_full=30.0)) == 2
+
+    def test_running_conversions_are_not_interrupted(self):
+        """Probar que al bajar el límite solo dejan de entrar nuevas."""
+        scheduler = ConversionScheduler(2)
+        scheduler.acquire('ffmpeg')
+        scheduler.acquire('ffmpeg')
+
+        AdaptiveConcurrency(scheduler, max_limit=2).adjust(_sample(cpu=99.0))
+
+        assert scheduler.stats()['in_flight'] == 2
+        assert scheduler.acquire('imagemagick', timeout=0.05) is False
+        scheduler.release('ffmpeg')
+        assert scheduler.acquire('imagemagick', timeout=0.05) is False
+        scheduler.release('ffmpeg')
+        assert scheduler.acquire('imagemagick', timeout=0.05) is True
+
+    def test_background_thread_adjusts_limit(self):
+        """Probar que el hilo de fondo aplica las muestras."""
+        scheduler = ConversionScheduler(4)
+        controller = AdaptiveConcurrency(
+            scheduler, max_limit=4, interval_seconds=0.01, sampler=lambda: _sample(cpu=99.0)
+        )
+
+        controller.ensure_started()
+        deadline = time.monotonic() + 2
+        while scheduler.max_concurrent > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        controller.stop()
+
+        assert scheduler.max_concurrent == 1
+        assert controller.stats()['reason'] == 'pressure'
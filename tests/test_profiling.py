@@ -0,0 +1,57 @@
+"""
+Tests para el perfilado bajo demanda (src/profiling.py).
+"""
+import pstats
+from unittest.mock import patch
+from src import profiling
+
+
+class TestRequestProfiling:
+
+    def setup_method(self):
+        profiling.budget = profiling.ProfileBudget()
+
+    def test_profile_saved_under_request_id(self, client, tmp_path):
+        """Probar que una petición con la clave de administración guarda su perfil."""
+        with patch('src.profiling.settings.PROFILING_ADMIN_KEY', 'secret'), \
+                patch('src.profiling.settings.LOGS_FOLDER', tmp_path), \
+                patch('src.profiling.pyinstrument', None):
+            response = client.get(
+                '/formats',
+                headers={'X-Profile-Key': 'secret', 'X-Request-ID': 'req-prof-1'}
+            )
+
+        assert response.status_code == 200
+        assert response.headers['X-Profile-Status'] == 'saved'
+        profile_path = tmp_path / 'profiles' / 'req-prof-1.prof'
+        assert response.headers['X-Profile-Id'] == profile_path.name
+        assert pstats.Stats(str(profile_path)).total_calls > 0
+
+    def test_wrong_key_is_ignored(self, client, tmp_path):
+        """Probar que sin la clave correcta no se perfila."""
+        with patch('src.profiling.settings.PROFILING_ADMIN_KEY', 'secret'), \
+                patch('src.profiling.settings.LOGS_FOLDER', tmp_path):
+            response = client.get('/formats?_profile_key=wrong')
+
+        assert 'X-Profile-Status' not in response.headers
+        assert not (tmp_path / 'profiles').exists()
+
+    def test_disabled_without_admin_key(self, client, tmp_path):
+        """Probar que sin PROFILING_ADMIN_KEY el perfilado está desactivado."""
+        with patch('src.profiling.settings.LOGS_FOLDER', tmp_path):
+            response = client.get('/formats', headers={'X-Profile-Key': ''})
+
+        assert 'X-Profile-Status' not in response.headers
+
+    def test_rate_limited(self, client, tmp_path):
+        """Probar que se respeta el máximo de perfiles por minuto."""
+        with patch('src.profiling.settings.PROFILING_ADMIN_KEY', 'secret'), \
+                patch('src.profiling.settings.PROFILING_MAX_PER_MINUTE', 1), \
+                patch('src.profiling.settings.LOGS_FOLDER', tmp_path), \
+                patch('src.profiling.pyinstrument', None):
+            first = client.get('/formats', headers={'X-Profile-Key': 'secret'})
+            second = client.get('/formats', headers={'X-Profile-Key': 'secret'})
+
+        assert first.headers['X-Profile-Status'] == 'saved'
+        assert second.headers['X-Profile-Status'] == 'rate_limited'
+        assert second.status_code == 200
@@ -2,10 +2,17 @@
 Tests para los endpoints de rutas.
 """
 
+import io
 import pytest
 import json
+import time
+import zipfile
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from src import routes
+from src.jobs import JobManager, JobStore
+
 
 class TestHealthCheck:
     """
@@ -59,6 +66,64 @@ class TestHealthCheck:
         features = data['features']
         assert 'ocr_enabled' in features
         assert isinstance(features['ocr_enabled'], bool)
+    
+    def test_health_check_uses_cached_snapshot(self, client):
+        """Probar que /health no mide la CPU de forma bloqueante ni lanza procesos."""
+        with patch('src.health.psutil.cpu_percent', return_value=5.0) as mock_cpu, \
+                patch('subprocess.run') as mock_run, patch('subprocess.Popen') as mock_popen:
+            response = client.get('/health')
+        
+        assert response.status_code == 200
+        for call in mock_cpu.call_args_list:
+            assert call.kwargs.get('interval') is None
+        mock_run.assert_not_called()
+        mock_popen.assert_not_called()
+        data = response.get_json()
+        assert 0 <= data['uptime_seconds'] < 365 * 24 * 3600
+        assert 'queue' in data
+    
+    def test_request_id_header(self, client):
+        """Probar que se propaga o genera el X-Request-ID."""
+        response = client.get('/health/live', headers={'X-Request-ID': 'req-123'})
+        assert response.headers['X-Request-ID'] == 'req-123'
+        
+        generated = client.get('/health/live', headers={'X-Request-ID': 'bad id; drop'})
+        assert len(generated.headers['X-Request-ID']) == 32
+    
+    def test_health_live(self, client):
+        """Probar que /health/live responde siempre 200."""
+        response = client.get('/health/live')
+        
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'alive'
+    
+    def test_health_ready(self, client):
+        """Probar que /health/ready informa de cada comprobación."""
+        response = client.get('/health/ready')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['status'] == 'ready'
+        assert data['checks']['queue_available'] is True
+    
+    def test_health_ready_fails_when_queue_saturated(self, client):
+        """Probar que /health/ready devuelve 503 con la cola saturada."""
+        stats = {'limit': 4, 'in_flight': 4, 'queued': 50, 'saturation': 13.5, 'engines': {}}
+        with patch('src.routes.conversion_scheduler.stats', return_value=stats):
+            response = client.get('/health/ready')
+        
+        assert response.status_code == 503
+        data = response.get_json()
+        assert data['status'] == 'not_ready'
+        assert data['checks']['queue_available'] is False
+    
+    def test_health_ready_fails_when_snapshot_stale(self, client):
+        """Probar que una instantánea antigua marca el servicio como no listo."""
+        with patch('src.routes.health_sampler.age_seconds', return_value=3600):
+            response = client.get('/health/ready')
+        
+        assert response.status_code == 503
+        assert response.get_json()['checks']['snapshot_fresh'] is False
 
 
 class TestGetSupportedFormats:
@@ -156,6 +221,167 @@ class TestConvertFile:
         assert 'success' in data
         assert 'error' in data or 'error_code' in data
         assert 'timestamp' in data
+    
+    @patch('src.routes.converter_factory')
+    def test_convert_reports_stage_timings(self, mock_factory, client):
+        """Probar que /convert devuelve el desglose por etapas."""
+        mock_factory.perform_conversion.return_value = {'success': True, 'queue_seconds': 0.25}
+        
+        response = client.post(
+            '/convert',
+            data={'file': (io.BytesIO(b'hola'), 'nota.txt'), 'format': 'pdf', 'timings': 'true'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 200
+        header = response.headers['Server-Timing']
+        for stage in ('upload', 'validate', 'convert', 'queue', 'cleanup', 'total'):
+            assert f"{stage};dur=" in header
+        timings = response.get_json()['timings']
+        assert timings['queue'] == 250.0
+        assert timings['total'] >= timings['convert']
+    
+    @patch('src.routes.converter_factory')
+    def test_convert_timings_disabled(self, mock_factory, client):
+        """Probar que sin SERVER_TIMING_ENABLED no se añade cabecera ni timings."""
+        mock_factory.perform_conversion.return_value = {'success': True}
+        
+        with patch('src.timing.settings.SERVER_TIMING_ENABLED', False):
+            response = client.post(
+                '/convert',
+                data={'file': (io.BytesIO(b'hola'), 'nota.txt'), 'format': 'pdf', 'timings': 'true'},
+                content_type='multipart/form-data'
+            )
+        
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response.headers
+        assert response.get_json()['timings'] == {}
+
+
+    def test_convert_invalid_mode(self, client):
+        """Probar que un modo desconocido se rechaza."""
+        response = client.post(
+            '/convert',
+            data={'file': (io.BytesIO(b'hola'), 'nota.txt'), 'format': 'pdf', 'mode': 'later'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 400
+        assert response.get_json()['error_code'] == 'INVALID_PARAMETER'
+    
+    def test_convert_invalid_priority(self, client):
+        """Probar que una prioridad desconocida se rechaza."""
+        response = client.post(
+            '/convert',
+            data={'file': (io.BytesIO(b'hola'), 'nota.txt'), 'format': 'pdf', 'priority': 'urgent'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 400
+        assert response.get_json()['details']['parameter'] == 'priority'
+    
+    @patch('src.routes.converter_factory')
+    def test_convert_cancelled_returns_499(self, mock_factory, client):
+        """Probar que una conversión cancelada responde 499."""
+        mock_factory.perform_conversion.return_value = {'success': False, 'cancelled': True}
+        
+        response = client.post(
+            '/convert',
+            data={'file': (io.BytesIO(b'hola'), 'nota.txt'), 'format': 'pdf'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 499
+        assert response.get_json()['error_code'] == 'CONVERSION_CANCELLED'
+    
+    def test_convert_invalid_max_latency(self, client):
+        """Probar que max_latency debe ser un número de segundos positivo."""
+        for value in ('soon', '0', '-5'):
+            response = client.post(
+                '/convert',
+                data={'file': (io.BytesIO(b'hola'), 'nota.txt'), 'format': 'pdf', 'max_latency': value},
+                content_type='multipart/form-data'
+            )
+            
+            assert response.status_code == 400
+            assert response.get_json()['details']['parameter'] == 'max_latency'
+    
+    @patch('src.routes.converter_factory')
+    def test_convert_unachievable_deadline_returns_503(self, mock_factory, client):
+        """Probar que un plazo inalcanzable se rechaza con 503 sin convertir."""
+        mock_factory.perform_conversion.return_value = {
+            'success': False,
+            'deadline_unachievable': True,
+            'estimated_seconds': 12.0,
+            'remaining_seconds': 5.0
+        }
+        
+        response = client.post(
+            '/convert',
+            data={'file': (io.BytesIO(b'hola'), 'nota.txt'), 'format': 'pdf', 'max_latency': '5'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 503
+        data = response.get_json()
+        assert data['error_code'] == 'DEADLINE_UNACHIEVABLE'
+        assert data['details']['estimated_seconds'] == 12.0
+        assert mock_factory.perform_conversion.call_args.kwargs['deadline'] is not None
+
+
+class TestJobs:
+    """
+    Tests para /convert en modo job y /jobs/<job_id>.
+    """
+    
+    @pytest.fixture
+    def job_manager(self, tmp_path, monkeypatch):
+        manager = JobManager(JobStore(tmp_path / 'jobs.sqlite3'), routes._run_conversion_job)
+        monkeypatch.setattr(routes, 'job_manager', manager)
+        yield manager
+        manager.stop()
+    
+    @patch('src.routes.converter_factory')
+    def test_job_mode_returns_202_and_status(self, mock_factory, client, job_manager):
+        """Probar que el modo job responde 202 y el estado final se consulta después."""
+        mock_factory.perform_conversion.return_value = {'success': True}
+        
+        response = client.post(
+            '/convert',
+            data={'file': (io.BytesIO(b'hola'), 'nota.txt'), 'format': 'pdf', 'mode': 'job'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 202
+        data = response.get_json()
+        assert data['status_url'] == f"/jobs/{data['job_id']}"
+        
+        for _ in range(200):
+            status = client.get(data['status_url']).get_json()
+            if status['status'] == 'succeeded':
+                break
+            time.sleep(0.01)
+        assert status['status'] == 'succeeded'
+        assert status['result']['download_url'].endswith('.pdf')
+    
+    def test_delete_queued_job(self, client, job_manager, tmp_path):
+        """Probar que DELETE cancela un job que aún no ha empezado."""
+        source = tmp_path / 'abc_nota.txt'
+        source.write_bytes(b'hola')
+        job_id = job_manager.store.create(source, 'pdf')
+        
+        response = client.delete(f'/jobs/{job_id}')
+        
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'cancelled'
+        assert client.delete(f'/jobs/{job_id}').status_code == 200
+    
+    def test_unknown_job_returns_404(self, client, job_manager):
+        """Probar el 404 de GET y DELETE con un id inexistente."""
+        for method in (client.get, client.delete):
+            response = method('/jobs/missing')
+            assert response.status_code == 404
+            assert response.get_json()['error_code'] == 'JOB_NOT_FOUND'
 
 
 class TestDownloadFile:
@@ -172,6 +398,7 @@ class TestDownloadFile:
         
         assert data['success'] is False
         assert data['error_code'] == 'FILE_NOT_FOUND'
+        assert 'lookup;dur=' in response.headers['Server-Timing']
     
     def test_download_response_structure(self, client):
         """Probar estructura de respuesta de download."""
@@ -211,6 +438,114 @@ class TestExtractText:
         
         assert data['success'] is False
     
+    def test_extract_text_invalid_profile(self, client):
+        """Probar que un perfil OCR desconocido es rechazado."""
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post('/extract-text', data={'profile': 'turbo'})
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data['error_code'] == 'INVALID_PARAMETER'
+        assert 'fast' in data['details']['allowed']
+    
+    @patch('src.routes.ocr_processor')
+    def test_extract_text_reports_profile_metadata(self, mock_processor, client):
+        """Probar que la respuesta incluye perfil y rendimiento."""
+        mock_processor.extract_text_from_image.return_value = {
+            'success': True, 'text': 'Hola', 'confidence': 91.0, 'cached': False
+        }
+        mock_processor.build_metadata.return_value = {'profile': 'fast', 'pages_per_second': 2.0}
+        
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post(
+                '/extract-text',
+                data={'file': (io.BytesIO(b'fake'), 'scan.png'), 'profile': 'fast'},
+                content_type='multipart/form-data'
+            )
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['text'] == 'Hola'
+        assert data['metadata']['profile'] == 'fast'
+        assert mock_processor.extract_text_from_image.call_args.kwargs['profile'] == 'fast'
+        assert mock_processor.build_metadata.call_args.args[:2] == ('fast', 1)
+    
+    @patch('src.routes.ocr_processor')
+    def test_extract_text_osd_reports_orientation(self, mock_processor, client):
+        """Probar que el parámetro osd se propaga y la orientación se devuelve."""
+        orientation = {'rotate': 180, 'script': 'Latin', 'language': 'spa'}
+        mock_processor.extract_text_from_image.return_value = {
+            'success': True, 'text': 'Hola', 'confidence': 91.0, 'cached': False,
+            'orientation': orientation
+        }
+        mock_processor.build_metadata.return_value = {'profile': 'balanced', 'pages_per_second': 1.0}
+        
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post(
+                '/extract-text',
+                data={'file': (io.BytesIO(b'fake'), 'scan.png'), 'osd': 'true'},
+                content_type='multipart/form-data'
+            )
+        
+        assert response.status_code == 200
+        assert response.get_json()['orientation'] == orientation
+        assert mock_processor.extract_text_from_image.call_args.kwargs['osd'] is True
+    
+    @patch('src.routes.ocr_processor')
+    def test_extract_text_streams_ndjson_pages(self, mock_processor, client):
+        """Probar que el modo stream entrega una línea NDJSON por página."""
+        mock_processor.iter_pdf_pages.return_value = iter([
+            {'total_pages': 2},
+            {'page': 1, 'success': True, 'text': 'uno', 'confidence': 90, 'cached': False},
+            {'page': 2, 'success': True, 'text': 'dos', 'confidence': 80, 'cached': True},
+        ])
+        mock_processor.build_metadata.return_value = {'profile': 'balanced'}
+        
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post(
+                '/extract-text',
+                data={'file': (io.BytesIO(b'%PDF-1.4'), 'scan.pdf'), 'stream': 'ndjson'},
+                content_type='multipart/form-data'
+            )
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        response.close()
+        assert [event['type'] for event in events] == ['start', 'page', 'page', 'summary']
+        assert events[1]['text'] == 'uno'
+        assert events[-1]['avg_confidence'] == 85
+        assert mock_processor.build_metadata.call_args.args == ('balanced', 2, pytest.approx(0, abs=5), 1)
+    
+    @patch('src.routes.ocr_processor')
+    def test_extract_text_streams_sse(self, mock_processor, client):
+        """Probar el formato Server-Sent Events."""
+        mock_processor.extract_text_from_image.return_value = {
+            'success': True, 'text': 'Hola', 'confidence': 70, 'cached': False
+        }
+        mock_processor.build_metadata.return_value = {}
+        
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post(
+                '/extract-text',
+                data={'file': (io.BytesIO(b'fake'), 'scan.png'), 'stream': 'sse'},
+                content_type='multipart/form-data'
+            )
+        
+        body = response.get_data(as_text=True)
+        response.close()
+        assert response.mimetype == 'text/event-stream'
+        assert 'event: page\ndata: {"page": 1' in body
+        assert body.rstrip().split('\n\n')[-1].startswith('event: summary')
+    
+    def test_extract_text_invalid_stream_format(self, client):
+        """Probar que un formato de stream desconocido es rechazado."""
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post('/extract-text', data={'stream': 'xml'})
+        
+        assert response.status_code == 400
+        assert response.get_json()['error_code'] == 'INVALID_PARAMETER'
+    
     def test_extract_text_response_structure_error(self, client):
         """Probar estructura de respuesta de error en /extract-text."""
         response = client.post('/extract-text', data={})
@@ -221,6 +556,98 @@ class TestExtractText:
         assert 'timestamp' in data
 
 
+class TestExtractTextBatch:
+    """
+    Tests para el endpoint /extract-text/batch.
+    """
+    
+    @staticmethod
+    def fake_batch(paths, **kwargs):
+        for index, path in enumerate(paths):
+            yield index, {
+                'success': not path.endswith('bad.png'),
+                'text': f'text-{index}',
+                'confidence': 90,
+                'pages': 1,
+                'cached_pages': 0,
+                'error': 'corrupt'
+            }
+    
+    @patch('src.routes.ocr_processor')
+    def test_batch_returns_results_in_input_order(self, mock_processor, client):
+        """Probar lote de archivos multipart con resultados ordenados."""
+        mock_processor.iter_batch.side_effect = self.fake_batch
+        mock_processor.build_metadata.return_value = {'pages': 3}
+        
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post(
+                '/extract-text/batch',
+                data={'files': [
+                    (io.BytesIO(b'a'), 'one.png'),
+                    (io.BytesIO(b'b'), 'bad.png'),
+                    (io.BytesIO(b'c'), 'notes.docx'),
+                    (io.BytesIO(b'd'), 'three.jpg'),
+                ]},
+                content_type='multipart/form-data'
+            )
+        
+        data = response.get_json()
+        assert response.status_code == 200
+        assert [item['filename'] for item in data['results']] == ['one.png', 'bad.png', 'three.jpg']
+        assert data['failed_files'] == 1
+        assert data['skipped_files'] == 1
+        assert data['results'][1]['error'] == 'corrupt'
+        assert mock_processor.iter_batch.call_args.kwargs['ordered'] is True
+    
+    @patch('src.routes.ocr_processor')
+    def test_batch_accepts_zip_and_streams(self, mock_processor, client):
+        """Probar lote desde zip con resultados en streaming."""
+        mock_processor.iter_batch.side_effect = self.fake_batch
+        mock_processor.build_metadata.return_value = {}
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as bundle:
+            bundle.writestr('scans/a.png', b'a')
+            bundle.writestr('scans/b.pdf', b'b')
+            bundle.writestr('README.txt', b'ignored')
+        archive.seek(0)
+        
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post(
+                '/extract-text/batch',
+                data={'archive': (archive, 'scans.zip'), 'stream': 'ndjson'},
+                content_type='multipart/form-data'
+            )
+        
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        batch_dir = Path(mock_processor.iter_batch.call_args.args[0][0]).parent
+        assert batch_dir.exists()
+        response.close()
+        assert not batch_dir.exists()
+        assert [event['type'] for event in events] == ['start', 'result', 'result', 'summary']
+        assert events[0]['total_files'] == 2
+        assert events[0]['skipped_files'] == 1
+        assert mock_processor.iter_batch.call_args.kwargs['ordered'] is False
+    
+    def test_batch_without_files(self, client):
+        """Probar que un lote vacío es rechazado."""
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post('/extract-text/batch', data={})
+        
+        assert response.status_code == 400
+        assert response.get_json()['error_code'] == 'INVALID_FILE'
+    
+    def test_batch_invalid_zip(self, client):
+        """Probar que un zip corrupto es rechazado."""
+        with patch('src.routes.settings.ENABLE_OCR', True):
+            response = client.post(
+                '/extract-text/batch',
+                data={'archive': (io.BytesIO(b'not a zip'), 'scans.zip')},
+                content_type='multipart/form-data'
+            )
+        
+        assert response.status_code == 400
+
+
 class TestOCRLanguages:
     """
     Tests para el endpoint /ocr/languages.
@@ -0,0 +1,359 @@
+"""
+Tests para el control de admisión de conversiones (src/scheduler.py).
+"""
+import asyncio
+import threading
+import time
+import pytest
+from src.cancellation import CancellationToken
+from src.scheduler import ConversionScheduler, CostEstimator, parse_tenant_map
+
+MB = 1024 * 1024
+
+
+def _grant_order(scheduler, requests):
+    """
+    Encola las peticiones (nombre, opciones de slot) con el único turno
+    ocupado y devuelve el orden en que lo reciben
+    """
+    scheduler.acquire('blocker')
+    order = []
+
+    def worker(name, options):
+        with scheduler.slot('imagemagick', **options):
+            order.append(name)
+
+    threads = []
+    for name, options in requests:
+        thread = threading.Thread(target=worker, args=(name, options))
+        thread.start()
+        threads.append(thread)
+        while scheduler.stats()['queued'] < len(threads):
+            time.sleep(0.001)
+
+    scheduler.release('blocker')
+    for thread in threads:
+        thread.join(timeout=2)
+    return order
+
+
+class TestConversionScheduler:
+
+    def test_invalid_limit(self):
+        """Probar que el límite debe ser positivo."""
+        with pytest.raises(ValueError):
+            ConversionScheduler(0)
+
+    def test_stats_per_engine(self):
+        """Probar el recuento de conversiones en curso por motor."""
+        scheduler = ConversionScheduler(2)
+        scheduler.acquire('ffmpeg')
+        scheduler.acquire('libreoffice')
+
+        stats = scheduler.stats()
+        assert stats['in_flight'] == 2
+        assert stats['queued'] == 0
+        assert stats['saturation'] == 1.0
+        assert stats['engines']['ffmpeg'] == {'in_flight': 1, 'queued': 0}
+
+        scheduler.release('ffmpeg')
+        assert scheduler.stats()['engines']['ffmpeg']['in_flight'] == 0
+
+    def test_acquire_timeout_when_full(self):
+        """Probar que la espera vence si no hay turno libre."""
+        scheduler = ConversionScheduler(1)
+        scheduler.acquire('ffmpeg')
+
+        assert scheduler.acquire('imagemagick', timeout=0.05) is False
+        assert scheduler.stats()['queued'] == 0
+        assert scheduler.stats()['engines']['imagemagick']['queued'] == 0
+
+    def test_waiters_served_in_arrival_order(self):
+        """Probar que las peticiones en espera se atienden por orden de llegada."""
+        scheduler = ConversionScheduler(1)
+        scheduler.acquire('ffmpeg')
+        order = []
+
+        def worker(name):
+            with scheduler.slot(name):
+                order.append(name)
+
+        threads = []
+        for name in ('a', 'b', 'c'):
+            thread = threading.Thread(target=worker, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while scheduler.stats()['queued'] < len(threads):
+                time.sleep(0.001)
+
+        assert scheduler.stats()['engines']['b']['queued'] == 1
+        scheduler.release('ffmpeg')
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert order == ['a', 'b', 'c']
+        assert scheduler.stats()['in_flight'] == 0
+
+    def test_cancelled_token_leaves_queue(self):
+        """Probar que cancelar el token saca la petición de la cola sin turno."""
+        scheduler = ConversionScheduler(1)
+        scheduler.acquire('ffmpeg')
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+
+        started = time.monotonic()
+        assert scheduler.acquire('libreoffice', token=token) is False
+        assert time.monotonic() - started < 2
+        assert scheduler.stats()['queued'] == 0
+
+        scheduler.release('ffmpeg')
+        assert scheduler.acquire('libreoffice', timeout=0.05) is True
+
+    def test_async_waiter_wakes_when_thread_releases(self):
+        """Probar que una corrutina obtiene turno cuando un hilo lo libera."""
+        scheduler = ConversionScheduler(1)
+        scheduler.acquire('ffmpeg')
+
+        async def wait_for_slot():
+            waiter = asyncio.ensure_future(scheduler.acquire_async('libreoffice'))
+            await asyncio.sleep(0.05)
+            assert not waiter.done()
+            assert scheduler.stats()['queued'] == 1
+            threading.Timer(0.05, scheduler.release, args=('ffmpeg',)).start()
+            return await asyncio.wait_for(waiter, 2)
+
+        assert asyncio.run(wait_for_slot()) is True
+        assert scheduler.stats()['engines']['libreoffice'] == {'in_flight': 1, 'queued': 0}
+
+    def test_cancelled_async_waiter_leaves_queue(self):
+        """Probar que cancelar la espera no consume turno ni bloquea la cola."""
+        scheduler = ConversionScheduler(1)
+        scheduler.acquire('ffmpeg')
+
+        async def cancel_waiter():
+            waiter = asyncio.ensure_future(scheduler.acquire_async('ffmpeg'))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert await scheduler.acquire_async('ffmpeg', timeout=0.05) is False
+
+        asyncio.run(cancel_waiter())
+        scheduler.release('ffmpeg')
+
+        stats = scheduler.stats()
+        assert stats['queued'] == 0
+        assert stats['in_flight'] == 0
+        assert scheduler.acquire('ffmpeg', timeout=0.05) is True
+
+
+class TestFairScheduling:
+
+    def test_tenants_take_turns(self):
+        """Probar que un cliente con muchas peticiones no acapara los turnos."""
+        scheduler = ConversionScheduler(1, quantum_seconds=0.5)
+        requests = [(f'a{i}', {'tenant': 'A'}) for i in range(4)]
+        requests += [(f'b{i}', {'tenant': 'B'}) for i in range(2)]
+
+        order = _grant_order(scheduler, requests)
+
+        assert order == ['a0', 'b0', 'a1', 'b1', 'a2', 'a3']
+
+    def test_tenant_weights(self):
+        """Probar que un cliente de peso 2 recibe el doble de turnos."""
+        scheduler = ConversionScheduler(1, tenant_weights={'a': 2}, quantum_seconds=0.5)
+        requests = [(f'a{i}', {'tenant': 'A'}) for i in range(4)]
+        requests += [(f'b{i}', {'tenant': 'B'}) for i in range(2)]
+
+        order = _grant_order(scheduler, requests)
+
+        assert order == ['a0', 'a1', 'b0', 'a2', 'a3', 'b1']
+
+    def test_higher_priority_goes_first(self):
+        """Probar que las clases de prioridad se atienden en orden estricto."""
+        scheduler = ConversionScheduler(1, tenant_priorities={'vip': 'high'})
+        requests = [
+            ('low', {'tenant': 'A', 'priority': 'low'}),
+            ('normal', {'tenant': 'A'}),
+            ('high', {'tenant': 'VIP', 'priority': 'high'})
+        ]
+
+        assert _grant_order(scheduler, requests) == ['high', 'normal', 'low']
+
+    def test_priority_cannot_exceed_tenant_class(self):
+        """Probar que un cliente no puede pedir más prioridad que la suya."""
+        scheduler = ConversionScheduler(1, tenant_priorities={'batch': 'low'})
+        requests = [
+            ('batch', {'tenant': 'BATCH', 'priority': 'high'}),
+            ('normal', {'tenant': 'A'})
+        ]
+
+        assert _grant_order(scheduler, requests) == ['normal', 'batch']
+
+    def test_short_jobs_overtake_long_ones(self):
+        """Probar que dentro de una clase las conversiones cortas van antes."""
+        scheduler = ConversionScheduler(1, short_job_seconds=5)
+        requests = [
+            ('long', {'tenant': 'A', 'size_bytes': 100 * MB}),
+            ('short', {'tenant': 'B', 'size_bytes': MB})
+        ]
+
+        assert _grant_order(scheduler, requests) == ['short', 'long']
+
+    def test_short_lane_slot_is_reserved(self):
+        """Probar que las conversiones largas no ocupan el turno reservado."""
+        scheduler = ConversionScheduler(2, short_job_seconds=5, short_lane_slots=1)
+
+        assert scheduler.acquire('ffmpeg', size_bytes=100 * MB) is True
+        assert scheduler.acquire('ffmpeg', timeout=0.05, size_bytes=100 * MB) is False
+        assert scheduler.acquire('imagemagick', timeout=0.05, size_bytes=MB) is True
+
+        stats = scheduler.stats()
+        assert stats['lanes'] == {
+            'short': {'in_flight': 1, 'queued': 0},
+            'long': {'in_flight': 1, 'queued': 0}
+        }
+
+    def test_stats_do_not_expose_tenants(self):
+        """Probar que /health solo ve cuántos clientes esperan."""
+        scheduler = ConversionScheduler(1)
+        scheduler.acquire('ffmpeg')
+        waiter = threading.Thread(target=scheduler.acquire, args=('ffmpeg',), kwargs={'tenant': 'ACME', 'timeout': 2})
+        waiter.start()
+        while scheduler.stats()['queued'] < 1:
+            time.sleep(0.001)
+
+        stats = scheduler.stats()
+        assert stats['tenants_waiting'] == 1
+        assert stats['priorities']['normal'] == 1
+        assert 'ACME' not in str(stats)
+
+        scheduler.release('ffmpeg')
+        waiter.join(timeout=2)
+
+
+class TestDeadlineScheduling:
+
+    def test_earliest_deadline_first(self):
+        """Probar que las peticiones con plazo cercano entran antes y por orden de plazo."""
+        scheduler = ConversionScheduler(1, deadline_slack_seconds=120)
+        now = time.monotonic()
+        requests = [
+            ('none', {'tenant': 'A'}),
+            ('late', {'tenant': 'B', 'deadline': now + 60}),
+            ('soon', {'tenant': 'C', 'deadline': now + 30})
+        ]
+
+        assert _grant_order(scheduler, requests) == ['soon', 'late', 'none']
+
+    def test_distant_deadline_keeps_fair_share(self):
+        """Probar que un plazo lejano no se salta el reparto entre clientes."""
+        scheduler = ConversionScheduler(1, quantum_seconds=0.5)
+        far = time.monotonic() + 100000
+        requests = [
+            ('A1', {'tenant': 'A', 'deadline': far}),
+            ('A2', {'tenant': 'A', 'deadline': far}),
+            ('A3', {'tenant': 'A', 'deadline': far}),
+            ('B1', {'tenant': 'B'})
+        ]
+
+        assert _grant_order(scheduler, requests) == ['A1', 'B1', 'A2', 'A3']
+
+    def test_urgent_deadline_is_charged_to_tenant(self):
+        """Probar que el adelanto por plazo se descuenta del crédito del cliente."""
+        scheduler = ConversionScheduler(1, quantum_seconds=0.5)
+        requests = [
+            ('B1', {'tenant': 'B'}),
+            ('A1', {'tenant': 'A', 'deadline': time.monotonic() + 5}),
+            ('A2', {'tenant': 'A'}),
+            ('B2', {'tenant': 'B'})
+        ]
+
+        assert _grant_order(scheduler, requests) == ['A1', 'B1', 'B2', 'A2']
+
+    def test_deadline_does_not_skip_priority_class(self):
+        """Probar que el plazo ordena dentro de la clase, no por encima de ella."""
+        scheduler = ConversionScheduler(1, tenant_priorities={'vip': 'high'})
+        requests = [
+            ('deadline', {'tenant': 'A', 'deadline': time.monotonic() + 30}),
+            ('vip', {'tenant': 'VIP', 'priority': 'high'})
+        ]
+
+        assert _grant_order(scheduler, requests) == ['vip', 'deadline']
+
+    def test_estimate_latency_counts_work_ahead(self):
+        """Probar que la estimación suma la espera cuando no hay turno libre."""
+        estimator = CostEstimator(seconds_per_mb={'ffmpeg': 4.0, 'libreoffice': 2.0})
+        scheduler = ConversionScheduler(1, estimator=estimator)
+        deadline = time.monotonic() + 60
+
+        assert scheduler.estimate_latency('ffmpeg', MB, deadline, fast_preset=True) == pytest.approx(1.6)
+        assert scheduler.estimate_latency('ffmpeg', MB, deadline) == pytest.approx(4.0)
+
+        scheduler.acquire('libreoffice')
+        assert scheduler.estimate_latency('ffmpeg', MB, deadline, fast_preset=True) == pytest.approx(3.6, abs=0.1)
+
+    def test_needs_fast_path(self):
+        """Probar que el preset rápido solo se pide si el normal no llega y hay preset."""
+        scheduler = ConversionScheduler(1, estimator=CostEstimator(seconds_per_mb={'ffmpeg': 4.0}))
+        now = time.monotonic()
+
+        assert scheduler.needs_fast_path('ffmpeg', MB, None, fast_preset=True) is False
+        assert scheduler.needs_fast_path('ffmpeg', MB, now + 60, fast_preset=True) is False
+        assert scheduler.needs_fast_path('ffmpeg', MB, now + 2, fast_preset=True) is True
+        assert scheduler.needs_fast_path('ffmpeg', MB, now + 2) is False
+
+    def test_slot_gives_up_when_deadline_unreachable(self):
+        """Probar que se deja de esperar cuando ya no se llega al plazo."""
+        scheduler = ConversionScheduler(1, estimator=CostEstimator(seconds_per_mb={'imagemagick': 0.05}))
+        scheduler.acquire('ffmpeg')
+
+        started = time.monotonic()
+        with scheduler.slot('imagemagick', deadline=started + 0.15) as acquired:
+            assert acquired is False
+        assert time.monotonic() - started < 1
+        assert scheduler.stats()['queued'] == 0
+
+        async def wait_async():
+            async with scheduler.slot_async('imagemagick', deadline=time.monotonic() + 0.15) as acquired:
+                return acquired
+
+        assert asyncio.run(wait_async()) is False
+        assert scheduler.stats()['in_flight'] == 1
+
+
+class TestCostEstimator:
+
+    def test_estimate_scales_with_size(self):
+        """Probar la estimación por motor con un mínimo de 1 MB."""
+        estimator = CostEstimator(seconds_per_mb={'ffmpeg': 4.0})
+
+        assert estimator.estimate('ffmpeg', 0) == 4.0
+        assert estimator.estimate('ffmpeg', 10 * MB) == 40.0
+        assert estimator.estimate('unknown', 2 * MB) == 2.0
+
+    def test_observe_updates_moving_average(self):
+        """Probar que las duraciones reales ajustan la tasa del motor."""
+        estimator = CostEstimator(alpha=0.5, seconds_per_mb={'ffmpeg': 4.0})
+
+        estimator.observe('ffmpeg', 2 * MB, 4.0)
+
+        assert estimator.estimate('ffmpeg', MB) == pytest.approx(3.0)
+
+    def test_fast_preset(self):
+        """Probar la estimación y el ajuste con el preset más rápido."""
+        estimator = CostEstimator(alpha=1.0, seconds_per_mb={'ffmpeg': 4.0, 'libreoffice': 2.0})
+
+        assert estimator.estimate_fast('ffmpeg', MB) == pytest.approx(1.6)
+        assert estimator.estimate_fast('libreoffice', MB) == pytest.approx(2.0)
+
+        estimator.observe('ffmpeg', MB, 0.8, fast=True)
+        assert estimator.estimate('ffmpeg', MB) == pytest.approx(2.0)
+
+
+class TestParseTenantMap:
+
+    def test_parse(self):
+        """Probar el formato NOMBRE:valor separado por comas."""
+        assert parse_tenant_map('acme:4, batch:0.5', float) == {'ACME': 4.0, 'BATCH': 0.5}
+        assert parse_tenant_map('') == {}
@@ -0,0 +1,254 @@
+"""
+Tests para la deduplicación de conversiones en curso (src/singleflight.py).
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from src.cancellation import CancellationToken
+from src.conversion import convert_source
+from src.cleanup import CleanupService
+from src.exceptions import ConversionCancelledException, DeadlineUnachievableException
+from src.singleflight import SingleFlight
+from src.timing import StageTimer
+
+
+def _wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def flights(tmp_path):
+    return SingleFlight(tmp_path / 'locks', poll_interval_seconds=0.01)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'abc_clip.mp4'
+    path.write_bytes(b'video')
+    return path
+
+
+def _follow(flights, key, output_path, results, **options):
+    with flights.join(key) as flight:
+        results.append(flight.shared_result(output_path, **options))
+
+
+class TestSingleFlight:
+
+    def test_key_depends_on_content_format_and_options(self, flights, source, tmp_path):
+        """Probar que solo las conversiones idénticas comparten clave."""
+        copy = tmp_path / 'def_other-name.mp4'
+        copy.write_bytes(b'video')
+        other = tmp_path / 'ghi_clip.mp4'
+        other.write_bytes(b'other video')
+        key = flights.key(source, '.gif', {'source_format': '.mp4'})
+
+        assert flights.key(copy, 'gif', {'source_format': '.mp4'}) == key
+        assert flights.key(other, '.gif', {'source_format': '.mp4'}) != key
+        assert flights.key(source, '.webm', {'source_format': '.mp4'}) != key
+        assert flights.key(source, '.gif', {'source_format': '.mov'}) != key
+
+    def test_waiting_request_reuses_leader_output(self, flights, tmp_path):
+        """Probar que quien espera enlaza la salida del líder sin convertir."""
+        leader_output = tmp_path / 'leader.gif'
+        follower_output = tmp_path / 'follower.gif'
+        results = []
+
+        with flights.join('k') as flight:
+            assert flight.shared_result(leader_output) is None
+            follower = threading.Thread(target=_follow, args=(flights, 'k', follower_output, results))
+            follower.start()
+            time.sleep(0.05)
+            leader_output.write_bytes(b'gif')
+            flight.publish(leader_output)
+        follower.join(timeout=2)
+
+        assert results[0]['shared'] is True
+        assert results[0]['queue_seconds'] > 0
+        assert follower_output.read_bytes() == b'gif'
+
+    def test_failed_leader_is_not_shared(self, flights, tmp_path):
+        """Probar que si el líder no publica, el siguiente convierte."""
+        results = []
+
+        with flights.join('k'):
+            follower = threading.Thread(target=_follow, args=(flights, 'k', tmp_path / 'out.gif', results))
+            follower.start()
+            time.sleep(0.05)
+        follower.join(timeout=2)
+
+        assert results == [None]
+
+    def test_finished_conversion_is_not_a_cache(self, flights, tmp_path):
+        """Probar que una petición posterior no reutiliza una conversión terminada."""
+        output = tmp_path / 'first.gif'
+        output.write_bytes(b'gif')
+        with flights.join('k') as flight:
+            flight.publish(output)
+
+        with flights.join('k') as flight:
+            assert flight.shared_result(tmp_path / 'second.gif') is None
+
+    def test_fast_preset_output_only_for_deadlines(self, flights, tmp_path):
+        """Probar que la salida del preset rápido solo se comparte con peticiones con plazo."""
+        output = tmp_path / 'fast.mp4'
+        results = []
+
+        with flights.join('k') as flight:
+            plain = threading.Thread(target=_follow, args=(flights, 'k', tmp_path / 'plain.mp4', results))
+            plain.start()
+            time.sleep(0.05)
+            output.write_bytes(b'mp4')
+            flight.publish(output, fast_preset=True)
+        plain.join(timeout=2)
+
+        assert results == [None]
+
+    def test_cancelled_while_waiting(self, flights):
+        """Probar que cancelar el token deja de esperar al líder."""
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel, args=('client_disconnected',)).start()
+
+        with flights.join('k'):
+            with pytest.raises(ConversionCancelledException):
+                with flights.join('k', token):
+                    pass
+
+    def test_waiting_gives_up_when_deadline_cannot_be_met(self, flights):
+        """Probar que con plazo se deja de esperar cuando la conversión propia ya no cabe."""
+        with flights.join('k'):
+            started = time.monotonic()
+            with pytest.raises(DeadlineUnachievableException):
+                with flights.join('k', deadline=started + 1.0, reserve_seconds=0.9):
+                    pass
+            assert time.monotonic() - started < 0.5
+
+    def test_cleanup_keeps_lock_in_use(self, flights, tmp_path):
+        """Probar que la limpieza no borra un lock tomado y que uno borrado no da dos líderes."""
+        cleanup = CleanupService(folders=[flights.lock_dir], ttl_seconds=1, lock_path=str(tmp_path / 'cleanup.lock'))
+        expired = time.time() - 3600
+
+        with flights.join('k'):
+            lock_path = flights.lock_dir / 'k.lock'
+            os.utime(lock_path, (expired, expired))
+            assert cleanup.cleanup_once() == 0
+            assert lock_path.exists()
+
+        os.utime(lock_path, (expired, expired))
+        assert cleanup.cleanup_once() == 1
+        assert not lock_path.exists()
+
+    def test_waiter_reopens_lock_removed_by_cleanup(self, flights):
+        """Probar que quien esperaba con un lock ya borrado toma el archivo nuevo."""
+        flight = flights._flight('k')
+        stale = open(flight.lock_path, 'a+')
+        flight.lock_path.unlink()
+
+        with flights.join('k'):
+            lock_file, locked = flights._acquire(flight, stale)
+            assert locked is False
+            lock_file.close()
+
+        stale = open(flight.lock_path, 'a+')
+        flight.lock_path.unlink()
+        lock_file, locked = flights._acquire(flight, stale)
+        assert locked is True
+        assert stale.closed
+        assert os.stat(flight.lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino
+        lock_file.close()
+
+    def test_join_async(self, flights, tmp_path):
+        """Probar la variante asyncio: espera sin bloquear y reutiliza la salida."""
+        output = tmp_path / 'leader.gif'
+
+        async def run():
+            async def leader(started):
+                async with flights.join_async('k') as flight:
+                    started.set()
+                    await asyncio.sleep(0.05)
+                    output.write_bytes(b'gif')
+                    flight.publish(output)
+
+            started = asyncio.Event()
+            task = asyncio.create_task(leader(started))
+            await started.wait()
+            async with flights.join_async('k') as flight:
+                result = flight.shared_result(tmp_path / 'follower.gif')
+            await task
+            return result
+
+        result = asyncio.run(run())
+
+        assert result['shared'] is True
+        assert (tmp_path / 'follower.gif').read_bytes() == b'gif'
+
+    def test_lock_is_shared_across_processes(self, flights, tmp_path):
+        """Probar que una petición de otro proceso espera al líder y reutiliza su salida."""
+        output = tmp_path / 'leader.gif'
+        ready = tmp_path / 'ready'
+        script = (
+            'import sys, time; from pathlib import Path; from src.singleflight import SingleFlight\n'
+            'flights = SingleFlight(sys.argv[1])\n'
+            'with flights.join("k") as flight:\n'
+            '    Path(sys.argv[3]).touch(); time.sleep(0.3)\n'
+            '    Path(sys.argv[2]).write_bytes(b"gif"); flight.publish(sys.argv[2])\n'
+        )
+        leader = subprocess.Popen([sys.executable, '-c', script, str(flights.lock_dir), str(output), str(ready)])
+        try:
+            assert _wait_for(ready.exists, timeout=10)
+            with flights.join('k') as flight:
+                result = flight.shared_result(tmp_path / 'follower.gif')
+        finally:
+            leader.wait(timeout=10)
+
+        assert result['shared'] is True
+        assert (tmp_path / 'follower.gif').read_bytes() == b'gif'
+
+
+class TestConvertSourceSingleFlight:
+
+    def test_identical_requests_run_one_conversion(self, tmp_path, flights):
+        """Probar que dos subidas iguales simultáneas lanzan una sola conversión."""
+        release = threading.Event()
+        calls = []
+
+        class Factory:
+            def perform_conversion(self, input_path, output_path, from_ext, to_ext, **options):
+                calls.append(input_path)
+                release.wait(5)
+                with open(output_path, 'wb') as f:
+                    f.write(b'pdf')
+                return {'success': True}
+
+        sources = []
+        for file_id in ('aaa', 'bbb'):
+            path = tmp_path / f'{file_id}_report.docx'
+            path.write_bytes(b'same document')
+            sources.append(path)
+        responses = []
+
+        def convert(path):
+            responses.append(convert_source(Factory(), path, 'pdf', StageTimer())[0])
+
+        with patch('src.conversion.single_flight', flights), \
+                patch('src.conversion.settings.CONVERTED_FOLDER', tmp_path):
+            threads = [threading.Thread(target=convert, args=(path,)) for path in sources]
+            threads[0].start()
+            assert _wait_for(lambda: len(calls) == 1)
+            threads[1].start()
+            time.sleep(0.1)
+            release.set()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        assert len(calls) == 1
+        assert sorted(r['file_id'] for r in responses) == ['aaa', 'bbb']
+        assert (tmp_path / 'aaa.pdf').read_bytes() == (tmp_path / 'bbb.pdf').read_bytes() == b'pdf'
@@ -0,0 +1,213 @@
+"""
+Tests para el supervisor de procesos de conversión (src/converters/supervisor.py).
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from src.cancellation import CancellationToken
+from src.converters.supervisor import OutputBuffer, ProcessLimits, parse_cpu_list, supervise, supervise_async
+from src.exceptions import InvalidConfigException
+
+
+def _alive(pid):
+    # Un zombi pendiente de recoger por init ya no está vivo
+    try:
+        with open(f'/proc/{pid}/stat') as stat:
+            return stat.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+
+class TestSupervisor:
+
+    def test_parse_cpu_list(self):
+        """Probar listas de CPU con rangos."""
+        assert parse_cpu_list('0-2,5') == {0, 1, 2, 5}
+        assert parse_cpu_list('') == set()
+
+    def test_output_buffer_keeps_tail(self):
+        """Probar que el búfer conserva solo los últimos bytes."""
+        buffer = OutputBuffer(4)
+        buffer.append(b'abc')
+        buffer.append(b'defg')
+
+        assert buffer.text() == 'defg'
+        assert buffer.total_bytes == 7
+        assert buffer.truncated
+
+    def test_bounded_output(self):
+        """Probar que una salida grande no se guarda entera en memoria."""
+        command = [sys.executable, '-c', "import sys; sys.stderr.write('x' * 100000 + 'END')"]
+        result = supervise(command, 10, ProcessLimits(output_limit_bytes=1024))
+
+        assert result['returncode'] == 0
+        assert len(result['stderr']) == 1024
+        assert result['stderr'].endswith('END')
+        assert result['output_truncated']
+
+    def test_timeout_kills_process_group(self, tmp_path):
+        """Probar que el timeout mata también a los procesos auxiliares."""
+        pid_file = tmp_path / 'helper.pid'
+        command = ['sh', '-c', f'sleep 30 & echo $! > {pid_file}; wait']
+
+        started = time.monotonic()
+        result = supervise(command, 0.5)
+
+        assert result['timed_out']
+        assert time.monotonic() - started < 10
+        helper = int(pid_file.read_text())
+        time.sleep(0.1)
+        assert not _alive(helper)
+
+    def test_limits_applied_to_child(self):
+        """Probar que los límites de memoria, CPU y nice llegan al hijo."""
+        script = (
+            "import os, resource;"
+            "print(resource.getrlimit(resource.RLIMIT_AS)[0],"
+            " resource.getrlimit(resource.RLIMIT_CPU)[0],"
+            " os.nice(0), sorted(os.sched_getaffinity(0)))"
+        )
+        limits = ProcessLimits(memory_mb=2048, cpu_seconds=30, nice=3, cpu_affinity={0})
+        baseline_nice = os.nice(0)
+
+        result = supervise([sys.executable, '-c', script], 10, limits)
+
+        memory, cpu, nice, cpus = result['stdout'].split(' ', 3)
+        assert int(memory) == 2048 * 1024 * 1024
+        assert int(cpu) == 30
+        assert int(nice) == min(19, baseline_nice + 3)
+        assert cpus.strip() == '[0]'
+
+    def test_limits_without_preexec_fn(self):
+        """Probar que los límites no usan preexec_fn y que sin límites el comando no cambia."""
+        command = [sys.executable, '-c', 'print(1)']
+        assert ProcessLimits().wrap(command) == command
+
+        with patch('src.converters.supervisor.subprocess.Popen', wraps=subprocess.Popen) as popen:
+            result = supervise(command, 10, ProcessLimits(memory_mb=2048, nice=3))
+
+        assert result['stdout'].strip() == '1'
+        assert 'preexec_fn' not in popen.call_args.kwargs
+        assert popen.call_args.args[0][-3:] == command
+
+    def test_missing_limit_tool_is_an_error(self):
+        """Probar que sin la herramienta de un límite no se lanza el comando sin límites."""
+        with patch('src.converters.supervisor._limit_tool', return_value=None):
+            ProcessLimits().check_tools()
+            with pytest.raises(InvalidConfigException) as error:
+                ProcessLimits(cpu_affinity={0}).wrap(['true'])
+
+        assert error.value.details['config_key'] == 'CONVERTER_CPU_AFFINITY'
+
+    def test_memory_limit_fails_conversion(self):
+        """Probar que superar RLIMIT_AS hace fallar el proceso."""
+        command = [sys.executable, '-c', "x = bytearray(512 * 1024 * 1024)"]
+        result = supervise(command, 10, ProcessLimits(memory_mb=256))
+
+        assert result['returncode'] != 0
+        assert 'MemoryError' in result['stderr']
+
+
+    def test_token_kills_process_group(self, tmp_path):
+        """Probar que cancelar el token mata el grupo de procesos."""
+        pid_file = tmp_path / 'helper.pid'
+        command = ['sh', '-c', f'sleep 30 & echo $! > {pid_file}; wait']
+        token = CancellationToken()
+
+        def cancel_when_started():
+            while not pid_file.exists() or not pid_file.read_text().strip():
+                time.sleep(0.01)
+            token.cancel('client_disconnected')
+
+        threading.Thread(target=cancel_when_started).start()
+        result = supervise(command, 60, token=token)
+
+        assert result['cancelled']
+        assert not result['timed_out']
+        helper = int(pid_file.read_text())
+        deadline = time.monotonic() + 2
+        while _alive(helper) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not _alive(helper)
+
+
+class TestSupervisorAsync:
+
+    def test_async_reports_output_and_resources(self):
+        """Probar que la variante asyncio devuelve lo mismo que supervise."""
+        command = ['sh', '-c', 'echo ok; echo warn >&2; exit 3']
+        result = asyncio.run(supervise_async(command, 10))
+
+        assert result['returncode'] == 3
+        assert result['stdout'].strip() == 'ok'
+        assert result['stderr'].strip() == 'warn'
+        assert not result['timed_out']
+        assert result['resources']['max_rss_kb'] > 0
+
+    def test_async_timeout_kills_process(self):
+        """Probar el timeout sin hilos auxiliares."""
+        result = asyncio.run(supervise_async(['sleep', '30'], 0.2))
+
+        assert result['timed_out']
+        assert result['resources']['wall_seconds'] < 5
+
+    def test_async_cancellation_kills_process_group(self, tmp_path):
+        """Probar que cancelar la tarea mata el grupo y recoge el hijo."""
+        pid_file = tmp_path / 'helper.pid'
+        command = ['sh', '-c', f'sleep 30 & echo $! > {pid_file}; wait']
+
+        async def cancel_running():
+            task = asyncio.ensure_future(supervise_async(command, 60))
+            while not pid_file.exists() or not pid_file.read_text().strip():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_running())
+
+        helper = int(pid_file.read_text())
+        deadline = time.monotonic() + 2
+        while _alive(helper) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not _alive(helper)
+
+    def test_async_cancellation_does_not_block_loop(self):
+        """Probar que al cancelar se recoge el hijo cuando ya ha salido, sin wait4 bloqueante."""
+        from src.converters import supervisor
+        reaped_exited = []
+        reap = supervisor._reap
+
+        def checked_reap(process):
+            reaped_exited.append(os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None)
+            return reap(process)
+
+        async def cancel_running():
+            task = asyncio.ensure_future(supervise_async(['sleep', '30'], 60))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        with patch('src.converters.supervisor._reap', checked_reap):
+            asyncio.run(cancel_running())
+
+        assert reaped_exited == [True]
+
+    def test_async_token_kills_process_group(self):
+        """Probar que activar el token corta también la variante asyncio."""
+        token = CancellationToken()
+
+        async def cancel_soon():
+            asyncio.get_running_loop().call_later(0.1, token.cancel, 'job_cancelled')
+            return await supervise_async(['sleep', '30'], 60, token=token)
+
+        result = asyncio.run(cancel_soon())
+
+        assert result['cancelled']
+        assert result['resources']['wall_seconds'] < 5
@@ -0,0 +1,154 @@
+"""
+Tests para OCR por teselas (src/tiling.py).
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from src import tiling
+from src.ocr import OCRProcessor
+
+
+def tesseract_words(*words):
+    """Construye una salida mínima de image_to_data."""
+    data = {'text': [], 'left': [], 'top': [], 'width': [], 'height': [], 'conf': []}
+    for text, left, top, width, height in words:
+        data['text'].append(text)
+        data['left'].append(left)
+        data['top'].append(top)
+        data['width'].append(width)
+        data['height'].append(height)
+        data['conf'].append(90)
+    return data
+
+
+class TestPlanTiles:
+
+    def test_cores_partition_image(self):
+        """Probar que cada píxel pertenece al núcleo de exactamente una tesela."""
+        width, height = 2500, 1300
+        tiles = tiling.plan_tiles(width, height, tile_size=1000, overlap=100)
+
+        for x in range(0, width, 37):
+            for y in range(0, height, 41):
+                owners = [
+                    t for t in tiles
+                    if t['core'][0] <= x < t['core'][2] and t['core'][1] <= y < t['core'][3]
+                ]
+                assert len(owners) == 1
+
+    def test_tiles_overlap_and_stay_in_bounds(self):
+        """Probar solape entre vecinas y límites de la imagen."""
+        tiles = tiling.plan_tiles(2500, 900, tile_size=1000, overlap=100)
+
+        assert [t['x'] for t in tiles] == [0, 900, 1800]
+        assert tiles[-1]['x'] + tiles[-1]['width'] == 2500
+        assert all(t['height'] == 900 for t in tiles)
+
+    def test_small_image_is_single_tile(self):
+        """Probar que una imagen pequeña es una sola tesela."""
+        tiles = tiling.plan_tiles(800, 600, tile_size=1000, overlap=100)
+        assert len(tiles) == 1
+        assert tiles[0]['core'] == (0, 0, 800, 600)
+
+    def test_invalid_overlap(self):
+        """Probar que el solape debe ser menor que la tesela."""
+        with pytest.raises(ValueError):
+            tiling.plan_tiles(100, 100, tile_size=50, overlap=50)
+
+
+class TestTileWords:
+
+    def test_words_are_offset_and_filtered_by_core(self):
+        """Probar traslación a coordenadas globales y descarte del solape."""
+        tile = {'x': 900, 'y': 0, 'width': 1000, 'height': 500, 'core': (950, 0, 1850, 500)}
+        data = tesseract_words(
+            ('borde', 10, 10, 30, 20),
+            ('dentro', 200, 10, 60, 20),
+        )
+
+        words = tiling.extract_tile_words(data, tile)
+
+        assert [w['text'] for w in words] == ['dentro']
+        assert words[0]['left'] == 1100
+
+    def test_merge_words_builds_lines(self):
+        """Probar reconstrucción de renglones."""
+        words = [
+            {'text': 'mundo', 'left': 120, 'top': 12, 'width': 50, 'height': 20, 'conf': 90},
+            {'text': 'Hola', 'left': 10, 'top': 10, 'width': 40, 'height': 20, 'conf': 90},
+            {'text': 'adiós', 'left': 10, 'top': 60, 'width': 50, 'height': 20, 'conf': 90},
+        ]
+        assert tiling.merge_words(words) == 'Hola mundo\nadiós'
+        assert tiling.merge_words([]) == ''
+
+
+class TestTileIO:
+
+    def test_probe_image_size(self, tmp_path):
+        """Probar lectura de dimensiones sin decodificar."""
+        path = tmp_path / 'scan.png'
+        Image.new('L', (320, 200)).save(path)
+        assert tiling.probe_image_size(str(path)) == (320, 200)
+
+    @patch('src.tiling.subprocess.run')
+    def test_read_tile_streams_region(self, mock_run):
+        """Probar que la tesela se decodifica con `stream -extract`."""
+        mock_run.return_value = MagicMock(stdout=bytes(40 * 30))
+        tile = {'x': 100, 'y': 50, 'width': 40, 'height': 30, 'core': (0, 0, 0, 0)}
+
+        image = tiling.read_tile('big.tif', tile)
+
+        command = mock_run.call_args.args[0]
+        assert command[0] == 'stream'
+        assert '40x30+100+50' in command
+        assert image.size == (40, 30)
+        assert image.mode == 'L'
+
+
+class TestTiledOCR:
+
+    @patch('src.ocr.pytesseract.image_to_data')
+    @patch('src.ocr.tiling.read_tile')
+    @patch('src.ocr.tiling.probe_image_size')
+    def test_large_image_is_tiled_and_deduplicated(self, mock_probe, mock_read, mock_data):
+        """Probar que una palabra vista por dos teselas aparece una vez."""
+        mock_probe.return_value = (1800, 400)
+        mock_read.side_effect = lambda path, tile, timeout: Image.new('L', (tile['width'], tile['height']), 255)
+
+        def words_for_tile(image, **kwargs):
+            if image.size[0] == 1000:
+                return tesseract_words(('Plano', 100, 50, 80, 30), ('cota', 930, 50, 60, 30))
+            return tesseract_words(('cota', 30, 50, 60, 30), ('norte', 500, 50, 70, 30))
+
+        mock_data.side_effect = words_for_tile
+        processor = OCRProcessor(
+            tile_threshold_pixels=100_000, tile_size=1000, tile_overlap=100, tile_workers=2
+        )
+
+        result = processor.extract_text_from_image('drawing.tif', preprocess=False)
+
+        assert result['success'] is True
+        assert result['tiles'] == 2
+        assert result['text'] == 'Plano cota norte'
+        assert mock_read.call_count == 2
+
+    @patch('src.ocr.tiling.probe_image_size')
+    @patch('src.ocr.OCRProcessor.extract_text_tiled')
+    @patch('src.ocr.pytesseract.image_to_string')
+    @patch('src.ocr.pytesseract.image_to_data')
+    def test_small_image_is_not_tiled(self, mock_data, mock_string, mock_tiled, mock_probe, tmp_path):
+        """Probar que las imágenes normales siguen el camino directo."""
+        mock_probe.return_value = (100, 100)
+        mock_string.return_value = 'ok'
+        mock_data.return_value = {'conf': [90]}
+        path = tmp_path / 'small.png'
+        Image.new('L', (100, 100), 255).save(path)
+
+        result = OCRProcessor(tile_threshold_pixels=100_000).extract_text_from_image(
+            str(path), preprocess=False
+        )
+
+        assert result['text'] == 'ok'
+        mock_tiled.assert_not_called()
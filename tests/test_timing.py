@@ -0,0 +1,63 @@
+"""
+Tests para el desglose de tiempos por etapa (src/timing.py).
+"""
+from unittest.mock import patch
+from src.timing import NULL_TIMER, StageTimer
+
+
+class TestStageTimer:
+
+    @patch('src.timing.time.perf_counter')
+    def test_stages_and_header(self, mock_clock):
+        """Probar la medición de etapas y el formato Server-Timing."""
+        mock_clock.side_effect = [0.0, 1.0, 1.5, 2.0, 2.002, 3.0]
+        timer = StageTimer()
+
+        with timer.stage('upload'):
+            pass
+        with timer.stage('convert'):
+            pass
+
+        assert timer.header() == 'upload;dur=500.0, convert;dur=2.0, total;dur=3000.0'
+
+    def test_repeated_stage_accumulates(self):
+        """Probar que una etapa repetida suma sus duraciones."""
+        timer = StageTimer()
+        timer.record('upload', 0.1)
+        timer.record('upload', 0.2)
+
+        assert timer.as_dict()['upload'] == 300.0
+
+    def test_record_within_is_not_counted_twice(self):
+        """Probar que la espera medida dentro de otra etapa se resta de ella."""
+        timer = StageTimer()
+        timer.record('convert', 1.5)
+        timer.record_within('queue', 'convert', 1.0)
+
+        timings = timer.as_dict()
+        assert timings['queue'] == 1000.0
+        assert timings['convert'] == 500.0
+
+        timer.record_within('queue', 'convert', 2.0)
+        assert timer.as_dict()['convert'] == 0.0
+
+    def test_stage_recorded_on_exception(self):
+        """Probar que la etapa se registra aunque falle el bloque."""
+        timer = StageTimer()
+        try:
+            with timer.stage('validate'):
+                raise ValueError('too large')
+        except ValueError:
+            pass
+
+        assert 'validate' in timer.as_dict()
+
+    def test_null_timer_is_noop(self):
+        """Probar que el temporizador desactivado no registra nada."""
+        with NULL_TIMER.stage('upload'):
+            pass
+        NULL_TIMER.record('queue', 1.0)
+        NULL_TIMER.record_within('queue', 'convert', 1.0)
+
+        assert NULL_TIMER.as_dict() == {}
+        assert NULL_TIMER.header() == ''